@@ -52,10 +52,117 @@ def nvcc_path() -> str:
     raise FileNotFoundError('Can not find nvcc compiler.')
 
 
-def compile_source(src_path: str, out_lib_path: str, keep_ptx=False) -> None:
+@functools.lru_cache()
+def cpu_compiler_path() -> str:
+    """
+    Get the path of the host c++ compiler used for the cpu target.
+
+    The compiler specified by the environment variable ``CXX`` is preferred, then ``g++`` and ``clang++``.
+    """
+    candidates = [os.environ.get('CXX', None), 'g++', 'clang++']
+    for candidate in candidates:
+        if candidate is None:
+            continue
+        path: Optional[str] = shutil.which(candidate)
+        if path is not None:
+            return path
+    raise FileNotFoundError('Can not find c++ compiler for cpu target, tried: g++, clang++.')
+
+
+def compile_source(src_path: str, out_lib_path: str, keep_ptx=False, target: str = 'cuda') -> None:
     """
     Compile the source code in 'src_path' file and output the library to 'out_lib_path'.
 
+    Parameters
+    ----------
+    src_path: str
+        The path to source code.
+    out_lib_path: str
+        The path to output library.
+    keep_ptx: bool, default False
+        Whether to keep the ptx code in the same directory of output library. Only used for cuda target.
+    target: str, default 'cuda'
+        The target device. Candidates are 'cuda' (compiled by nvcc) and 'cpu' (compiled by the host c++ compiler).
+    """
+    if target == 'cuda':
+        compile_cuda_source(src_path, out_lib_path, keep_ptx)
+    elif target == 'cpu':
+        compile_cpu_source(src_path, out_lib_path)
+    else:
+        raise ValueError('Does not support target {}, candidates: cuda, cpu.'.format(target))
+
+
+def compile_cpu_source(src_path: str, out_lib_path: str) -> None:
+    """
+    Compile the c++ source code in 'src_path' file with the host compiler and output the library to 'out_lib_path'.
+
+    Parameters
+    ----------
+    src_path: str
+        The path to source code.
+    out_lib_path: str
+        The path to output library.
+    """
+    src_path = os.path.abspath(src_path)
+    out_lib_path = os.path.abspath(out_lib_path)
+
+    # dir contains the runtime header file 'hidet/runtime.h'
+    include_dirs = get_include_dirs()
+    # dir contains the runtime library 'libhidet_runtime.so'
+    library_dirs = [os.path.dirname(library_paths['hidet_runtime'])]
+
+    command = [
+        # the path to the host compiler (g++ or clang++)
+        cpu_compiler_path(),
+        # the included directories.
+        *['-I{}'.format(include_dir) for include_dir in include_dirs],
+        # the library directories.
+        *['-L{}'.format(library_dir) for library_dir in library_dirs],
+        # the generated code and the runtime headers are c++11.
+        '-std=c++11',
+        # optimize for the instruction set of current machine.
+        '-O3',
+        '-march=native',
+        # the parallel loops are implemented with openmp.
+        '-fopenmp',
+        # compile into position independent code.
+        '-fPIC',
+        # supress the warnings like unused variables in the generated code.
+        '-w',
+        # generate shared library (lib.so).
+        '-shared',
+        # the source path.
+        src_path,
+        # link the hidet runtime after the source, otherwise the linker might drop it with '--as-needed'.
+        '-lhidet_runtime',
+        # the output library path.
+        '-o',
+        out_lib_path,
+    ]
+
+    out_lib_dir = os.path.dirname(out_lib_path)
+    with open(os.path.join(out_lib_dir, 'compile.sh'), 'w') as f:
+        f.write("#!/bin/bash\n\n")
+        f.write(" ".join(command))
+        f.write("\n")
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        result = subprocess.run(command, stderr=PIPE, stdout=PIPE, cwd=working_dir, check=False)
+        if result.returncode:
+            message = "Command: " + " ".join(command) + "\n"
+            if result.stdout:
+                message += result.stdout.decode().strip() + '\n'
+            if result.stderr:
+                message += result.stderr.decode().strip()
+            raise CompilationFailed(src_path, message)
+        with open(os.path.join(out_lib_dir, 'cc_log.txt'), 'w') as f:
+            f.write('\n'.join([result.stdout.decode('utf-8').strip(), result.stderr.decode('utf-8').strip()]))
+
+
+def compile_cuda_source(src_path: str, out_lib_path: str, keep_ptx=False) -> None:
+    """
+    Compile the cuda source code in 'src_path' file with nvcc and output the library to 'out_lib_path'.
+
     Parameters
     ----------
     src_path: str
@@ -181,32 +288,24 @@ def load_task_func(lib_path: str, task) -> CompiledFunction:
     ret: CompiledFunction
         The loaded function that can be directly called in python.
     """
-    try:
-        lib = SharedLibrary(lib_path)
-    except OSError as e:
-        print("Removed the file '{}'".format(lib_path))
-        os.remove(lib_path)
-        raise e
+    lib = SharedLibrary(lib_path)
     func_name = 'hidet_{}'.format(task.name)
-    param_types = [param.type for param in task.parameters]
+    # the values of the symbol vars follow the tensor parameters
+    param_types = [param.type for param in task.parameters] + [symbol.type for symbol in task.symbols]
     packed_func = PackedFunc(param_types=param_types, c_func_pointer=lib[func_name])
 
-    potential_src_path = os.path.join(os.path.dirname(lib_path), 'source.cu')
-    if os.path.isfile(potential_src_path):
-        src_path = potential_src_path
-    else:
-        src_path = None
+    src_path = None
+    for src_name in ['source.cu', 'source.cc']:
+        potential_src_path = os.path.join(os.path.dirname(lib_path), src_name)
+        if os.path.isfile(potential_src_path):
+            src_path = potential_src_path
+            break
 
     return CompiledFunction(name=task.name, packed_func=packed_func, lib_path=lib_path, src_path=src_path)
 
 
 def load_lib_func(lib_path: str, func_name: str, func_type: FuncType) -> CompiledFunction:
-    try:
-        lib = SharedLibrary(lib_path)
-    except OSError as e:
-        print("Removed the file '{}'".format(lib_path))
-        os.remove(lib_path)
-        raise e
+    lib = SharedLibrary(lib_path)
     func_name = 'hidet_{}'.format(func_name)
     packed_func = PackedFunc(param_types=list(func_type.param_types), c_func_pointer=lib[func_name])
     return CompiledFunction(name=func_name, packed_func=packed_func)
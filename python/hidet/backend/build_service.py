@@ -0,0 +1,216 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A long-lived pool of worker processes that compiles the kernels.
+
+Creating a process pool for each batch of build jobs costs seconds, and a batch can not use the workers left idle by
+another batch. The build service keeps a single pool alive for the whole python session, schedules the jobs from all
+the callers (e.g., the tuning of different tasks in different threads) by their priorities, and merges the identical
+jobs that are in flight.
+"""
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from concurrent.futures import Future
+import atexit
+import contextlib
+import heapq
+import itertools
+import multiprocessing
+import multiprocessing.pool
+import os
+import threading
+import psutil
+
+
+class BuildService:
+    # the memory reserved for each worker, compiling a large kernel may take more than 1 GiB memory
+    mem_for_worker = 1.5 * 1024 * 1024 * 1024  # 1.5 GiB
+
+    def __init__(self, num_workers: Optional[int] = None):
+        if num_workers is None:
+            num_workers = self.default_num_workers()
+        self.num_workers: int = num_workers
+        self._pool: Optional[multiprocessing.pool.Pool] = None
+        self._lock = threading.RLock()
+        self._counter = itertools.count()
+        # pending jobs: (priority, sequence, func, args, future)
+        self._pending: List[Tuple[int, int, Callable, Any, Future]] = []
+        self._num_running: int = 0
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    @staticmethod
+    def default_num_workers() -> int:
+        """
+        The number of workers, bounded by both the number of cpu cores and the available memory.
+
+        Returns
+        -------
+        ret: int
+            The number of workers.
+        """
+        num_workers_by_mem = int(psutil.virtual_memory().available // BuildService.mem_for_worker)
+        return max(min(num_workers_by_mem, psutil.cpu_count()), 1)
+
+    def submit(self, func: Callable, args: Any, key: Optional[Hashable] = None, priority: int = 0) -> Future:
+        """
+        Submit a job to the build service.
+
+        Parameters
+        ----------
+        func: Callable
+            The job function, which will be called with args in a worker process. It must be picklable, e.g., a
+            module-level function.
+
+        args: Any
+            The argument passed to the job function. It must be picklable.
+
+        key: Optional[Hashable]
+            The key identifying the job. When a job with the same key is still in flight, the future of that job is
+            returned instead of submitting a new one. None means the job is never merged.
+
+        priority: int
+            The priority of the job. The jobs with smaller priority values are dispatched to the workers first, and
+            the jobs with the same priority are dispatched in the submission order.
+
+        Returns
+        -------
+        ret: Future
+            The future of the job result.
+        """
+        with self._lock:
+            if key is not None and key in self._in_flight:
+                return self._in_flight[key]
+            future = Future()
+            if key is not None:
+                self._in_flight[key] = future
+                future.add_done_callback(lambda _: self._remove_in_flight(key, future))
+            heapq.heappush(self._pending, (priority, next(self._counter), func, args, future))
+            self._dispatch()
+        return future
+
+    def shutdown(self):
+        """
+        Terminate the worker processes. The service creates new workers when jobs are submitted later.
+        """
+        with self._lock:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool.join()
+                self._pool = None
+            for _, _, _, _, future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            self._num_running = 0
+
+    def _get_pool(self) -> multiprocessing.pool.Pool:
+        if self._pool is None:
+            # Set the affinity of current process. Some package such as numpy will change affinity of current process,
+            # which might limit the parallelism of compilation.
+            os.sched_setaffinity(0, range(os.cpu_count()))
+            self._pool = multiprocessing.Pool(processes=self.num_workers)
+        return self._pool
+
+    def _remove_in_flight(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _dispatch(self):
+        # must be called with self._lock held; only keep as many jobs as workers in the pool, so that a job submitted
+        # later with a higher priority does not wait behind the queued ones
+        while self._pending and self._num_running < self.num_workers:
+            _, _, func, args, future = heapq.heappop(self._pending)
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._num_running += 1
+            self._get_pool().apply_async(
+                func,
+                (args,),
+                callback=lambda result, f=future: self._on_done(f, result, None),
+                error_callback=lambda error, f=future: self._on_done(f, None, error),
+            )
+
+    def _on_done(self, future: Future, result: Any, error: Optional[BaseException]):
+        # called in the result handler thread of the pool
+        with self._lock:
+            self._num_running -= 1
+            self._dispatch()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+class BuildLock:
+    """
+    The lock that serializes the python side of building (implementing, lowering and generating code for tasks) in
+    different threads.
+
+    The ir construction relies on global states (e.g., the script module contexts), thus only one thread can run it
+    at a time. The option and pass context stacks are thread-local, and the options are passed to the building
+    threads explicitly. A thread releases the lock only when it waits for the jobs in the build service, so that the
+    builds in different threads overlap their compilation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def held(self) -> bool:
+        return getattr(self._local, 'held', False)
+
+    @contextlib.contextmanager
+    def hold(self):
+        if self.held():
+            yield
+            return
+        with self._lock:
+            self._local.held = True
+            try:
+                yield
+            finally:
+                self._local.held = False
+
+    @contextlib.contextmanager
+    def release(self):
+        if not self.held():
+            yield
+            return
+        self._local.held = False
+        self._lock.release()
+        try:
+            yield
+        finally:
+            self._lock.acquire()
+            self._local.held = True
+
+
+_build_service: Optional[BuildService] = None
+_build_service_lock = threading.Lock()
+
+build_lock = BuildLock()
+
+
+def build_service() -> BuildService:
+    """
+    Get the build service of current python session.
+
+    Returns
+    -------
+    ret: BuildService
+        The build service.
+    """
+    global _build_service  # pylint: disable=global-statement
+    with _build_service_lock:
+        if _build_service is None:
+            _build_service = BuildService()
+            atexit.register(_build_service.shutdown)
+        return _build_service
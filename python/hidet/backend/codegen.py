@@ -508,6 +508,8 @@ class Codegen(ModuleFunctor, StmtFunctor, ExprFunctor, TypeFunctor):
         return doc
 
     def visit_ForStmt(self, stmt: ForStmt):
+        if stmt.parallel:
+            raise ValueError('Parallel for loop is only supported in cpu target.')
         v = stmt.loop_var
         init_doc = self(v.type) + ' ' + self(v) + ' = ' + self(convert(0))
         cond_doc = self(v < stmt.extent)
@@ -663,8 +665,169 @@ class Codegen(ModuleFunctor, StmtFunctor, ExprFunctor, TypeFunctor):
         raise ValueError()
 
 
-def codegen(ir_module: IRModule, src_out_path: Optional[str] = None) -> str:
-    gen = Codegen()
+class CPUCodegen(Codegen):
+    """
+    Generate C++ source code that can be compiled by a host compiler (e.g., gcc or clang) for the cpu target.
+    """
+
+    def visit_IRModule(self, module: IRModule) -> Doc:
+        self.ir_module = module
+        doc = Doc()
+        doc += Text('#include <stdint.h>') + NewLine()
+        doc += Text('#include <math.h>') + NewLine()
+        doc += Text('#include <hidet/runtime/cpu_context.h>') + NewLine()
+
+        # the x86 simd intrinsics used by the vectorized cpu kernels
+        doc += Text('#if defined(__x86_64__) || defined(__i386__)') + NewLine()
+        doc += Text('#include <immintrin.h>') + NewLine()
+        doc += Text('#endif') + NewLine()
+
+        # the host compiler does not distinguish tfloat32 from float
+        doc += Text('typedef float tfloat32_t;') + NewLine()
+
+        # the integer min/max functions are resolved to the ones in c++ standard library
+        doc += Text('#include <algorithm>') + NewLine()
+        doc += Text('using std::min;') + NewLine()
+        doc += Text('using std::max;') + NewLine()
+
+        # the c math library does not provide reciprocal square root
+        doc += Text('static inline float rsqrtf(float x) { return 1.0f / sqrtf(x); }') + NewLine()
+        doc += Text('static inline double rsqrt(double x) { return 1.0 / sqrt(x); }') + NewLine()
+
+        if module.task is not None:
+            doc += '/*' + NewLine()
+            doc += str(module.task) + NewLine()
+            doc += '*/' + NewLine()
+        doc += Text('extern "C" {') + NewLine()
+
+        call_graph = CallGraph(module)
+        for node in call_graph.reversed_order:
+            doc += self(node.func) + NewLine()
+
+        doc += NewLine() + '}'
+        return doc
+
+    def visit_Function(self, func: Function) -> Doc:
+        if func.kind not in ['packed_func', 'host_kernel']:
+            raise ValueError('Can not generate {} function "{}" for cpu target.'.format(func.kind, func.name))
+        self.namer.clear()
+
+        doc = NewLine()
+
+        # ret
+        doc += self(func.ret_type)
+
+        # func name
+        canonized_func_name = self.canonize_funcname(func.name)
+        doc += ' ' + canonized_func_name
+        self.func_name_map[func.name] = canonized_func_name
+
+        # parameters
+        doc += '('
+        param_docs = []
+        for param in func.params:
+            param_docs.append(self.param_declare(param))
+        doc += doc_join(param_docs, Text(', '))
+        doc += ') {'
+
+        # comments
+        label = func.get_attr('label', default=None, allow_missing=True)
+        if label:
+            doc += (NewLine() + '// label: {}'.format(label)).indent()
+
+        # body
+        doc += self(func.body).indent()
+
+        doc += NewLine() + '}'
+
+        return doc
+
+    def visit_Call(self, e: Call):
+        func_name = e.func_var.hint
+        if func_name in self.ir_module.functions and self.ir_module.lookup(func_name).kind == 'cuda_kernel':
+            raise ValueError('Can not launch cuda kernel "{}" in cpu target.'.format(func_name))
+        return Codegen.visit_Call(self, e)
+
+    def visit_ForStmt(self, stmt: ForStmt):
+        # the unroll pragmas differ among host compilers, leave the unrolling decision to the compiler
+        v = stmt.loop_var
+        init_doc = self(v.type) + ' ' + self(v) + ' = ' + self(convert(0))
+        cond_doc = self(v < stmt.extent)
+        update_doc = self(v) + ' = ' + self(v + 1)
+        doc = Text('')
+        if stmt.parallel:
+            if isinstance(stmt.parallel, bool):
+                doc += NewLine() + '#pragma omp parallel for schedule(static)'
+            else:
+                doc += NewLine() + '#pragma omp parallel for schedule(static) num_threads({})'.format(stmt.parallel)
+        doc += NewLine() + Text('for (') + init_doc + '; ' + cond_doc + '; ' + update_doc + ') '
+        body_doc = self(stmt.body)
+        doc += Text('{') + body_doc.indent() + NewLine() + Text('} ')
+        return doc
+
+    def visit_DeclareStmt(self, stmt: DeclareStmt):
+        if stmt.scope not in [DeclareScope.Default, DeclareScope.Register]:
+            raise ValueError('Can not declare variable in {} scope for cpu target.'.format(stmt.scope))
+        doc = NewLine()
+        if stmt.is_static:
+            doc += 'static '
+        doc += self.local_var_declare(stmt.var)
+        if stmt.init is not None:
+            doc += ' = ' + self(stmt.init)
+        return doc + ';'
+
+    def visit_LaunchKernelStmt(self, stmt: LaunchKernelStmt):
+        raise ValueError('Can not launch cuda kernel in cpu target.')
+
+    @staticmethod
+    def scalar_literal(value, dtype: DataType):
+        if dtype == dtypes.float16:
+            return Text('((_Float16){}f)'.format(float(value)))
+        elif dtype == dtypes.bfloat16:
+            raise NotImplementedError('bfloat16 is not supported by the cpu target.')
+        elif dtype == dtypes.tfloat32:
+            return Text('{}f'.format(float(value)))
+        else:
+            return Codegen.scalar_literal(value, dtype)
+
+    def visit_ScalarType(self, t: DataType):
+        if t.name == 'float16':
+            # supported by gcc >= 12 and clang >= 15 on x86-64 and aarch64
+            return Text('_Float16')
+        elif t.name == 'bfloat16':
+            raise NotImplementedError('bfloat16 is not supported by the cpu target.')
+        elif t.name == 'float32x4':
+            return Text('__m128')
+        elif t.name == 'float32x8':
+            return Text('__m256')
+        return Codegen.visit_ScalarType(self, t)
+
+
+def codegen(ir_module: IRModule, src_out_path: Optional[str] = None, target: str = 'cuda') -> str:
+    """
+    Generate the source code of given ir module.
+
+    Parameters
+    ----------
+    ir_module: IRModule
+        The lowered ir module.
+    src_out_path: Optional[str]
+        The path to write the generated source code. If None, the source code is not written to any file.
+    target: str
+        The target device. Candidates are 'cuda' (cuda c++ source for nvcc) and 'cpu' (c++ source for the host
+        compiler).
+
+    Returns
+    -------
+    ret: str
+        The generated source code.
+    """
+    if target == 'cuda':
+        gen = Codegen()
+    elif target == 'cpu':
+        gen = CPUCodegen()
+    else:
+        raise ValueError('Does not support target {}, candidates: cuda, cpu.'.format(target))
     doc = gen(ir_module)
     code = str(doc)
     if src_out_path is not None:
@@ -0,0 +1,314 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+The on-disk operator cache.
+
+Each compiled task is stored in an entry directory ``<root>/<entry>`` (e.g., ``cuda_space_0/matmul/<task hash>``),
+which contains the library ``lib.so`` as well as the source code and other build artifacts. An sqlite index
+``<root>/index.db`` records the size, checksum and last access time of every entry, and the hit/miss/eviction
+statistics of the cache. The checksum of the library is computed once when the entry is committed, and stored with
+the size of the library in ``lib.so.sha256`` next to it, so that looking up an entry does not read the library.
+
+The entries are built in a staging directory and moved into place with an atomic rename, so that concurrent
+processes never observe a partially written entry. When the total size exceeds the limit given by
+:py:func:`hidet.option.op_cache_limit`, the least recently used entries are evicted.
+"""
+from typing import Dict, Iterator, Optional
+import contextlib
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from hidet import option
+
+
+class OpCache:
+    index_name = 'index.db'
+    digest_name = 'lib.so.sha256'
+    staging_name = '.staging'
+    # the staging directories left by crashed builds are removed when they are older than this
+    stale_staging_seconds = 24 * 60 * 60
+
+    def __init__(self, root: str):
+        self.root: str = os.path.abspath(root)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        os.makedirs(self.root, exist_ok=True)
+        # the database is locked by other processes for a short time only, when they update the index
+        conn = sqlite3.connect(os.path.join(self.root, self.index_name), timeout=60.0, isolation_level=None)
+        try:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, size INTEGER, checksum TEXT, created REAL, last_access REAL, hits INTEGER)'
+            )
+            conn.execute('CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)')
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection, name: str, delta: int = 1):
+        conn.execute(
+            'INSERT INTO stats (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?',
+            (name, delta, delta),
+        )
+
+    @staticmethod
+    def _checksum(lib_path: str) -> str:
+        with open(lib_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    @classmethod
+    def _write_digest(cls, entry_dir: str, checksum: str, lib_size: int):
+        with open(os.path.join(entry_dir, cls.digest_name), 'w') as f:
+            f.write('{} {}\n'.format(checksum, lib_size))
+
+    @classmethod
+    def _verify(cls, entry_dir: str, checksum: str) -> bool:
+        # check the recorded digest and the size of the library, instead of hashing the library in each lookup
+        lib_path = os.path.join(entry_dir, 'lib.so')
+        if not os.path.isfile(lib_path):
+            return False
+        lib_size = os.path.getsize(lib_path)
+        try:
+            with open(os.path.join(entry_dir, cls.digest_name), 'r') as f:
+                recorded_checksum, recorded_size = f.read().split()
+        except (OSError, ValueError):
+            # the entries committed by the previous versions have no digest file, hash their libraries once
+            if cls._checksum(lib_path) != checksum:
+                return False
+            cls._write_digest(entry_dir, checksum, lib_size)
+            return True
+        return recorded_checksum == checksum and recorded_size == str(lib_size)
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        size = 0
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                file_path = os.path.join(dirpath, filename)
+                if not os.path.islink(file_path):
+                    size += os.path.getsize(file_path)
+        return size
+
+    def _remove_dir(self, path: str):
+        # rename before removing, so that the entry directory disappears atomically
+        if not os.path.exists(path):
+            return
+        trash_dir = tempfile.mkdtemp(prefix='trash-', dir=self._staging_root())
+        os.rename(path, os.path.join(trash_dir, 'entry'))
+        shutil.rmtree(trash_dir, ignore_errors=True)
+        try:
+            # remove the empty parent directories (e.g., the directory of the task name)
+            os.removedirs(os.path.dirname(path))
+        except OSError:
+            pass
+
+    def _staging_root(self) -> str:
+        staging_root = os.path.join(self.root, self.staging_name)
+        os.makedirs(staging_root, exist_ok=True)
+        return staging_root
+
+    def entry_dir(self, key: str) -> str:
+        """
+        Get the directory of an entry.
+
+        Parameters
+        ----------
+        key: str
+            The key of the entry, which is the relative path of the entry directory to the cache root.
+
+        Returns
+        -------
+        ret: str
+            The absolute path of the entry directory.
+        """
+        return os.path.join(self.root, key)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        Look up an entry in the cache.
+
+        The digest file of the entry is verified against the checksum recorded in the index, and the library against
+        the size recorded in the digest file. A corrupted entry is removed from the cache, and treated as a miss.
+
+        Parameters
+        ----------
+        key: str
+            The key of the entry.
+
+        Returns
+        -------
+        ret: Optional[str]
+            The entry directory when the entry is in the cache and intact, otherwise None.
+        """
+        entry_dir = self.entry_dir(key)
+        with self._connect() as conn:
+            row = conn.execute('SELECT checksum FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is not None and self._verify(entry_dir, row[0]):
+                conn.execute('UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?', (time.time(), key))
+                self._count(conn, 'hits')
+                return entry_dir
+            if row is not None:
+                self._count(conn, 'corruptions')
+            self._count(conn, 'misses')
+        if row is not None:
+            self.invalidate(key)
+        return None
+
+    def invalidate(self, key: str):
+        """
+        Remove an entry from the cache, e.g., when its library can not be loaded.
+
+        Parameters
+        ----------
+        key: str
+            The key of the entry.
+        """
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self._remove_dir(self.entry_dir(key))
+            conn.execute('COMMIT')
+
+    @contextlib.contextmanager
+    def staging(self) -> Iterator[str]:
+        """
+        Create a staging directory to build an entry in. The directory is removed when the context exits, unless
+        it has been committed to the cache with :py:meth:`commit`.
+
+        Returns
+        -------
+        ret: str
+            The staging directory.
+        """
+        staging_dir = tempfile.mkdtemp(prefix='build-', dir=self._staging_root())
+        try:
+            yield staging_dir
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def commit(self, key: str, staging_dir: str, replace: bool = False) -> str:
+        """
+        Move a built entry from its staging directory into the cache.
+
+        Parameters
+        ----------
+        key: str
+            The key of the entry.
+
+        staging_dir: str
+            The staging directory that contains the library ``lib.so`` of the entry.
+
+        replace: bool
+            Whether to replace the entry when it is already in the cache (e.g., committed by another process in the
+            meantime). If False, the existing entry is kept and the staging directory is discarded.
+
+        Returns
+        -------
+        ret: str
+            The entry directory.
+        """
+        entry_dir = self.entry_dir(key)
+        lib_path = os.path.join(staging_dir, 'lib.so')
+        checksum = self._checksum(lib_path)
+        self._write_digest(staging_dir, checksum, os.path.getsize(lib_path))
+        size = self._dir_size(staging_dir)
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT key FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None or replace:
+                # the directory might be left without an index record, e.g., by an older version of hidet
+                self._remove_dir(entry_dir)
+                os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+                os.rename(staging_dir, entry_dir)
+                now = time.time()
+                conn.execute(
+                    'INSERT OR REPLACE INTO entries (key, size, checksum, created, last_access, hits) '
+                    'VALUES (?, ?, ?, ?, ?, 0)',
+                    (key, size, checksum, now, now),
+                )
+            conn.execute('COMMIT')
+        limit = option.get_option('op_cache_limit')
+        if limit is not None:
+            self.evict(limit, keep=key)
+        return entry_dir
+
+    def evict(self, limit: int, keep: Optional[str] = None):
+        """
+        Evict the least recently used entries until the total size of the cache is within the limit. The stale
+        staging directories left by crashed builds are removed as well.
+
+        Parameters
+        ----------
+        limit: int
+            The maximum total size of the entries, in bytes.
+
+        keep: Optional[str]
+            The key of the entry that should never be evicted, e.g., the entry that is just committed and about to be
+            loaded.
+        """
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            total_size = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total_size > limit:
+                for key, size in conn.execute('SELECT key, size FROM entries ORDER BY last_access').fetchall():
+                    if total_size <= limit:
+                        break
+                    if key == keep:
+                        continue
+                    conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                    self._remove_dir(self.entry_dir(key))
+                    self._count(conn, 'evictions')
+                    total_size -= size
+            conn.execute('COMMIT')
+        staging_root = self._staging_root()
+        for name in os.listdir(staging_root):
+            path = os.path.join(staging_root, name)
+            try:
+                if time.time() - os.path.getmtime(path) > self.stale_staging_seconds:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the statistics of the cache.
+
+        Returns
+        -------
+        ret: Dict[str, int]
+            The statistics, including the number of entries ('entries'), their total size in bytes ('size'), and the
+            number of hits, misses, corrupted entries and evicted entries since the cache was created ('hits',
+            'misses', 'corruptions' and 'evictions').
+        """
+        with self._connect() as conn:
+            num_entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+            ret = {'entries': num_entries, 'size': size, 'hits': 0, 'misses': 0, 'corruptions': 0, 'evictions': 0}
+            for name, value in conn.execute('SELECT name, value FROM stats').fetchall():
+                ret[name] = value
+        return ret
+
+
+def op_cache() -> OpCache:
+    """
+    Get the operator cache in the current cache directory.
+
+    Returns
+    -------
+    ret: OpCache
+        The operator cache.
+    """
+    return OpCache(os.path.join(option.get_option('cache_dir'), 'ops'))
@@ -52,7 +52,13 @@ def device_count() -> int:
     count: int
         The number of available CUDA devices.
     """
-    err, count = cudart.cudaGetDeviceCount()
+    try:
+        err, count = cudart.cudaGetDeviceCount()
+    except RuntimeError:
+        # the cuda driver is not installed, e.g., on the cpu-only machines
+        return 0
+    if err in [cudart.cudaError_t.cudaErrorNoDevice, cudart.cudaError_t.cudaErrorInsufficientDriver]:
+        return 0
     assert err == 0, err
     return count
 
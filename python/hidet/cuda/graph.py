@@ -13,6 +13,7 @@
 from typing import List, Sequence, Optional
 from cuda import cudart
 from cuda.cudart import cudaGraphExec_t
+from hidet.ir.utils.symbol_utils import is_static_shape
 from hidet.graph.tensor import Tensor, zeros_like, randn_like
 from hidet.runtime.storage import MemoryPool, CudaMemoryAPI, memory_pool
 from hidet.runtime.device import Device
@@ -96,6 +97,9 @@ class CudaGraph:
 
         flow_graph: FlowGraph
 
+        if flow_graph.inputs and any(not is_static_shape(tensor.shape) for tensor in flow_graph.inputs):
+            raise ValueError('CUDA graph can only capture the flow graphs with static input shapes.')
+
         self._memory_api: FreezableMemoryAPI = FreezableMemoryAPI(Device('cuda', current_device()))
         self._memory_pool: MemoryPool = MemoryPool(
             memory_api=self._memory_api, block_size=4096, max_reserve_size=10 * 1024**3
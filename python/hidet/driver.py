@@ -10,18 +10,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import subprocess
-from typing import List, Optional, Sequence, Tuple
+from typing import List, Optional, Sequence, Tuple, Hashable
 import os
-import multiprocessing
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
-import psutil
 from tqdm import tqdm
 
 from hidet import option
 from hidet.transforms import lower, PassContext, SaveIRInstrument, ProfileInstrument
 from hidet.backend import codegen, compile_source, load_task_func, load_lib_func
 from hidet.backend.build import CompilationFailed
+from hidet.backend.build_service import build_service, build_lock
+from hidet.backend.op_cache import op_cache
 from hidet.utils.py import cyan, green, Timer
 from hidet.ir.task import Task
 from hidet.ir.func import IRModule, Function
@@ -51,61 +52,83 @@ def build_task(task: Task, target_device='cuda', load=True) -> Optional[Compiled
     compiled_func:
         When load is True, the compiled function is returned. Otherwise, None is returned.
     """
-    task_string: str = str(task)
+    task_key: str = task.structural_hash()
     compiled_func: Optional[CompiledFunction] = None
 
     space_level = option.get_option('search_space')
-    op_cache_dir = os.path.join(option.get_option('cache_dir'), './ops')
     use_cache = option.get_option('cache_operator')
+    device_config = _device_config(target_device)
 
     # check in-memory cache
-    if compiled_task_cache.contains(target_device, space_level, task_string):
+    if compiled_task_cache.contains(device_config, space_level, task_key):
         if load:
-            compiled_func = compiled_task_cache.get(target_device, space_level, task_string)
+            compiled_func = compiled_task_cache.get(device_config, space_level, task_key)
     else:
         # check on-disk cache
-        config_str = f'{target_device}_space_{space_level}'
-        task_hash = sha256(task_string.encode()).hexdigest()[:16]
-        task_dir = os.path.join(op_cache_dir, config_str, task.name, task_hash)
-        src_path = os.path.join(task_dir, 'source.cu')
-        lib_path = os.path.join(task_dir, 'lib.so')
+        cache = op_cache()
+        config_str = f'{device_config}_space_{space_level}'
+        cache_key = os.path.join(config_str, task.name, task_key)
+        src_name = 'source.cu' if target_device == 'cuda' else 'source.cc'
 
         # use previously generated library when available
-        if use_cache and os.path.exists(lib_path):
+        task_dir = cache.lookup(cache_key) if use_cache else None
+        if task_dir is not None:
+            lib_path = os.path.join(task_dir, 'lib.so')
             logger.debug(f"Load cached task binary {green(task.name)} from path: \n{cyan(lib_path)}")
             if load:
-                compiled_func = load_task_func(lib_path, task)
-                compiled_task_cache.add(target_device, space_level, task_string, compiled_func)
-        else:
+                try:
+                    compiled_func = load_task_func(lib_path, task)
+                except OSError:
+                    logger.warning(f"Failed to load cached task binary {cyan(lib_path)}, rebuild it.")
+                    cache.invalidate(cache_key)
+                    task_dir = None
+        if task_dir is None:
             logger.info(f"Compiling {target_device} task {green(task.signature())}...")
-            # build from scratch
-            os.makedirs(task_dir, exist_ok=True)
-            # write task
-            with open(os.path.join(task_dir, 'task.txt'), 'w') as f:
-                f.write(task_string)
-            # implement task
-            ir_module = task.implement(target=target_device, workding_dir=task_dir)
-            # lower ir module
-            if option.get_option('save_lower_ir'):
-                instruments = [
-                    SaveIRInstrument(out_dir=os.path.join(task_dir, './ir')),
-                    ProfileInstrument(log_file=os.path.join(task_dir, './lower_time.txt')),
-                ]
-            else:
-                instruments = []
-            with PassContext(instruments=instruments):
-                ir_module = lower(ir_module)
-            # code generation
-            codegen(ir_module, src_out_path=src_path)
-            # compile source code
-            compile_source(src_path, out_lib_path=lib_path, keep_ptx=False)
+            # build from scratch in a staging directory, and move it into the cache when finished
+            with cache.staging() as staging_dir:
+                src_path = os.path.join(staging_dir, src_name)
+                lib_path = os.path.join(staging_dir, 'lib.so')
+                # write task
+                with open(os.path.join(staging_dir, 'task.txt'), 'w') as f:
+                    f.write(str(task))
+                # implement task
+                ir_module = task.implement(target=target_device, workding_dir=staging_dir)
+                # lower ir module
+                if option.get_option('save_lower_ir'):
+                    instruments = [
+                        SaveIRInstrument(out_dir=os.path.join(staging_dir, './ir')),
+                        ProfileInstrument(log_file=os.path.join(staging_dir, './lower_time.txt')),
+                    ]
+                else:
+                    instruments = []
+                with PassContext(instruments=instruments):
+                    ir_module = lower(ir_module)
+                # code generation
+                codegen(ir_module, src_out_path=src_path, target=target_device)
+                # compile source code
+                compile_source(src_path, out_lib_path=lib_path, keep_ptx=False, target=target_device)
+                task_dir = cache.commit(cache_key, staging_dir, replace=not use_cache)
             # load function
             if load:
-                compiled_func = load_task_func(lib_path, task)
-                compiled_task_cache.add(target_device, space_level, task_string, compiled_func)
+                compiled_func = load_task_func(os.path.join(task_dir, 'lib.so'), task)
+        if load:
+            compiled_task_cache.add(device_config, space_level, task_key, compiled_func)
     return compiled_func
 
 
+def _device_config(target_device: str) -> str:
+    # the parallel split of the cpu kernels depends on the number of threads, which is the number of cpu cores when
+    # not given by the option, distinguish the kernels with different number of threads
+    if target_device == 'cpu':
+        return 'cpu_threads_{}'.format(option.get_option('cpu_num_threads') or os.cpu_count() or 1)
+    return target_device
+
+
+def _task_build_key(task: Task, target_device: str) -> Hashable:
+    # the builds of the same task with the same configuration produce the same library
+    return 'task', _device_config(target_device), option.get_option('search_space'), task.structural_hash()
+
+
 def _build_task_job(args):
     try:
         task, target_device, dumped_options = args
@@ -119,12 +142,58 @@ def _build_task_job(args):
             raise e
 
 
-def build_task_batch(tasks: List[Task], target_device: str = 'cuda', raise_on_error: bool = True):
+def _build_task_thread_job(args):
+    # the option context stacks are thread-local, use the options of the thread that submits the job
+    task, target_device, dumped_options = args
+    option.restore_options(dumped_options)
+    with build_lock.hold():
+        try:
+            build_task(task, target_device, load=False)
+            return True
+        except CompilationFailed:
+            return False
+
+
+def build_task_batch(
+    tasks: List[Task], target_device: str = 'cuda', raise_on_error: bool = True, in_process: bool = False
+):
+    """
+    Build a batch of tasks.
+
+    When parallel build is enabled, the tasks are compiled by the worker processes of the build service, and the
+    identical tasks that are being built (e.g., by another thread) are only built once.
+
+    Parameters
+    ----------
+    tasks: List[Task]
+        The tasks to build.
+
+    target_device: str
+        The target device. Candidates are 'cuda' and 'cpu'.
+
+    raise_on_error: bool
+        Whether to raise an error when some tasks failed to build.
+
+    in_process: bool
+        Whether to build the tasks in the threads of current process instead of the worker processes. The tasks that
+        tune their schedules must be built in current process, because the worker processes can not submit the
+        compilation of tuning candidates to the build service. The tuning candidates of the tasks built in different
+        threads are compiled concurrently.
+    """
     dumped_options = option.dump_options()
     jobs = [(task, target_device, dumped_options) for task in tasks]
     if option.get_option('parallel_build') and len(jobs) > 1:
-        with multiprocessing.Pool() as pool:
-            status_list = list(pool.map(_build_task_job, jobs))
+        if in_process:
+            max_workers = min(len(tasks), build_service().num_workers)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                status_list = list(executor.map(_build_task_thread_job, jobs))
+        else:
+            service = build_service()
+            futures = [
+                service.submit(_build_task_job, job, key=_task_build_key(task, target_device))
+                for task, job in zip(tasks, jobs)
+            ]
+            status_list = [future.result() for future in futures]
     else:
         status_list = list(map(_build_task_job, jobs))
     if not all(status_list) and raise_on_error:
@@ -145,12 +214,13 @@ def build_ir_module(
     profile_pass: bool = True,
     load: bool = True,
     use_hash_dir: bool = True,
+    target: str = 'cuda',
 ):
     if use_hash_dir:
         hash_dir = sha256(str(ir_module).encode()).hexdigest()[:16]
         output_dir = os.path.join(output_dir, hash_dir)
 
-    src_path = os.path.join(output_dir, 'source.cu')
+    src_path = os.path.join(output_dir, 'source.cu' if target == 'cuda' else 'source.cc')
     lib_path = os.path.join(output_dir, 'lib.so')
 
     # get function type
@@ -171,10 +241,10 @@ def build_ir_module(
         ir_module = lower(ir_module)
 
     # code generation
-    codegen(ir_module, src_out_path=src_path)
+    codegen(ir_module, src_out_path=src_path, target=target)
 
     # compile source code
-    compile_source(src_path, out_lib_path=lib_path, keep_ptx=False)
+    compile_source(src_path, out_lib_path=lib_path, keep_ptx=False, target=target)
 
     if load:
         # load function
@@ -184,11 +254,18 @@ def build_ir_module(
 
 
 def _build_ir_module_job(args) -> Optional[Tuple[str, str, FuncType]]:
-    ir_module, func_name, output_dir, dumped_options = args
+    ir_module, func_name, output_dir, dumped_options, target = args
     option.restore_options(dumped_options)
     try:
         return build_ir_module(
-            ir_module, func_name, output_dir, save_ir=False, profile_pass=False, load=False, use_hash_dir=False
+            ir_module,
+            func_name,
+            output_dir,
+            save_ir=False,
+            profile_pass=False,
+            load=False,
+            use_hash_dir=False,
+            target=target,
         )
     except subprocess.CalledProcessError:
         print('Failed launch subprocess to compile the lowered source code via nvcc.')
@@ -199,7 +276,7 @@ def _build_ir_module_job(args) -> Optional[Tuple[str, str, FuncType]]:
 
 
 def build_ir_module_batch(
-    ir_modules: Sequence[IRModule], func_name: str, output_dir: str, parallel=True, verbose=False
+    ir_modules: Sequence[IRModule], func_name: str, output_dir: str, parallel=True, verbose=False, target='cuda'
 ) -> List[Optional[CompiledFunction]]:
     """
     Build a batch of ir modules.
@@ -221,6 +298,9 @@ def build_ir_module_batch(
     verbose: bool
         Whether show the progress and summary. Default False.
 
+    target: str
+        The target device of the ir modules. Candidates are 'cuda' and 'cpu'.
+
     Returns
     -------
     funcs:
@@ -230,28 +310,18 @@ def build_ir_module_batch(
     with Timer() as timer:
         dumped_options = option.dump_options()
         jobs = [
-            (ir_module, func_name, os.path.join(output_dir, str(idx)), dumped_options)
+            (ir_module, func_name, os.path.join(output_dir, str(idx)), dumped_options, target)
             for idx, ir_module in enumerate(ir_modules)
         ]
         build_results = []
         if parallel:
-            # Set the affinity of current process. Some package such as numpy will change affinity of current process,
-            # which might limit the parallelism of compilation.
-            os.sched_setaffinity(0, range(os.cpu_count()))
-
-            # the maximum number of processes is limited by the number of cores and memory
-            mem_for_worker = 1.5 * 1024 * 1024 * 1024  # 1.5 GiB
-            num_workers = min(max(int(psutil.virtual_memory().available // mem_for_worker), 1), psutil.cpu_count())
-
-            with multiprocessing.Pool(processes=num_workers) as pool:
-                for build_result in tqdm(
-                    pool.imap(_build_ir_module_job, jobs),
-                    desc='Compiling',
-                    total=len(jobs),
-                    disable=not verbose,
-                    ncols=80,
-                ):
-                    build_results.append(build_result)
+            # the tasks that are directly needed are compiled before the tuning candidates, see build_task_batch
+            service = build_service()
+            futures = [service.submit(_build_ir_module_job, job, priority=1) for job in jobs]
+            # let other threads build their tasks when this one is waiting for the compilation
+            with build_lock.release():
+                for future in tqdm(futures, desc='Compiling', total=len(jobs), disable=not verbose, ncols=80):
+                    build_results.append(future.result())
         else:
             # sequential build
             build_results = list(map(_build_ir_module_job, jobs))
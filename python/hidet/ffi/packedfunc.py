@@ -9,7 +9,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Sequence, List
+from typing import Dict, Sequence, List
 import time
 import ctypes
 from enum import Enum
@@ -17,7 +17,7 @@ from enum import Enum
 from ctypes import c_int32, c_void_p, pointer, c_float, cast
 from ctypes import POINTER, Structure
 from hidet.ir.type import TypeNode, DataType, TensorType, PointerType, TensorPointerType
-from hidet.utils.py import same_list
+from hidet.ir.expr import Expr, SymbolVar
 from .ffi import _LIB
 
 c_int32_p = POINTER(c_int32)
@@ -58,6 +58,18 @@ def make_c_packed_func(param_types: Sequence[TypeNode], c_func_pointer) -> CPack
     return CPackedFunc(num_args, arg_types, func_pointer)
 
 
+def _match_shape(expect_shape: Sequence, arg, bindings: Dict[Expr, int]) -> bool:
+    if len(expect_shape) != len(arg.shape):
+        return False
+    for expect, actual in zip(expect_shape, arg.shape):
+        if isinstance(expect, int):
+            if expect != actual:
+                return False
+        elif isinstance(expect, SymbolVar) and bindings.setdefault(expect, actual) != actual:
+            return False
+    return True
+
+
 class PackedFunc:
     def __init__(self, param_types: Sequence[TypeNode], c_func_pointer):
         self.param_types: List[TypeNode] = list(param_types)
@@ -84,6 +96,8 @@ class PackedFunc:
             raise ValueError('The callee expects {} arguments, but got {}.'.format(len(self.param_types), len(args)))
 
         converted_args: List[ctypes.c_void_p] = []
+        # the values of the symbolic dimensions given by the tensor arguments
+        bindings: Dict[Expr, int] = {}
         for i, (param_type, arg) in enumerate(zip(self.param_types, args)):
             if isinstance(arg, (float, int)):
                 if not isinstance(param_type, DataType):
@@ -117,7 +131,8 @@ class PackedFunc:
                             i + 1, param_type, type(arg)
                         )
                     )
-                if arg.dtype != expect_dtype or (expect_shape is not None and not same_list(arg.shape, expect_shape)):
+                shape_matched = expect_shape is None or _match_shape(expect_shape, arg, bindings)
+                if arg.dtype != expect_dtype or not shape_matched:
                     raise ValueError(
                         'The callee expects the {}-th element to be a {}{}, but got a {}{}.'.format(
                             i + 1, expect_dtype, expect_shape if expect_shape else " tensor", arg.dtype, arg.shape
@@ -132,21 +147,38 @@ class PackedFunc:
         p_args = self.convert_args(args)
         _LIB.CallPackedFunc(self.c_packed_func, p_args)
 
+    def call_with_addresses(self, addresses: Sequence[int]):
+        """
+        Call the function whose parameters are all tensors, with the addresses of the tensor arguments.
+
+        The arguments are not checked, the caller must make sure that the tensors have the expected dtypes and shapes.
+
+        Parameters
+        ----------
+        addresses: Sequence[int]
+            The addresses of the tensor arguments.
+        """
+        _LIB.CallPackedFunc(self.c_packed_func, (c_void_p * len(addresses))(*addresses))
+
     def profile(self, *args, warmup: int = 1, number: int = 1, repeat: int = 10) -> List[float]:
-        from hidet.cuda import current_stream
+        from hidet.cuda import current_stream, available
 
         p_args = self.convert_args(args)
 
         for _ in range(warmup):
             _LIB.CallPackedFunc(self.c_packed_func, p_args)
 
+        # the cpu kernels are synchronous, there is no stream to wait for on a machine without cuda
+        sync = available()
         results = []
         for _ in range(repeat):
-            current_stream().synchronize()
+            if sync:
+                current_stream().synchronize()
             start = time.time()
             for _ in range(number):
                 _LIB.CallPackedFunc(self.c_packed_func, p_args)
-            current_stream().synchronize()
+            if sync:
+                current_stream().synchronize()
             end = time.time()
             results.append((end - start) / number)
 
@@ -20,7 +20,7 @@ from . import frontend
 from .tensor import Tensor
 from .operator import Operator
 from .module import Module
-from .ir import FlowGraph
+from .ir import FlowGraph, CompiledGraph, BucketedGraph
 from .transforms import GraphPass, PassContext, GraphPassInstrument
 
 from .tensor import asarray, randn, empty, zeros, ones, symbol, randint, randn_like, empty_like, zeros_like, ones_like
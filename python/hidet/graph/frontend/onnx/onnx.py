@@ -29,20 +29,81 @@ import hidet
 from hidet.graph.modules import nn
 from hidet.graph import ops
 from hidet.graph.tensor import Tensor, from_numpy, randn
+from hidet.runtime.device import Device, instantiate_device
 from . import utils
 
 log = logging.getLogger(__name__)
 
 
+class OnnxTensorLoader:
+    """
+    Convert the onnx tensors to hidet tensors on the given device.
+
+    The tensors stored in external data files are memory-mapped instead of being read into the protobuf message. On
+    CPU, the hidet tensors share the mapped pages directly, and the tensors are copied from the mapped pages when
+    loaded to other devices.
+
+    Parameters
+    ----------
+    device: Union[Device, str]
+        The device to load the tensors to.
+
+    base_dir: str
+        The directory that the locations of the external data files are relative to.
+    """
+
+    def __init__(self, device: Union[Device, str], base_dir: str = ''):
+        self.device: Device = instantiate_device(device)
+        self.base_dir: str = base_dir
+
+    def load(self, tensor: onnx.TensorProto) -> Tensor:
+        if onnx.external_data_helper.uses_external_data(tensor):
+            array = self.map_external_data(tensor)
+        else:
+            array = onnx.numpy_helper.to_array(tensor=tensor)
+        return from_numpy(array).to(device=self.device)
+
+    def map_external_data(self, tensor: onnx.TensorProto) -> np.ndarray:
+        info = onnx.external_data_helper.ExternalDataInfo(tensor)
+        shape = [int(v) for v in tensor.dims]
+        try:
+            dtype = np.dtype(utils.dtype_from_onnx(tensor.data_type).name)
+        except (KeyError, TypeError):
+            # the data types that numpy does not support (e.g., bfloat16) are read through onnx
+            return onnx.numpy_helper.to_array(tensor=tensor, base_dir=self.base_dir)
+        count = int(np.prod(shape))
+        if count == 0:
+            return np.zeros(shape, dtype=dtype)
+        # a copy-on-write mapping, which is writable and shares the clean pages with the other processes
+        array = np.memmap(
+            os.path.join(self.base_dir, info.location), dtype=dtype, mode='c', offset=info.offset or 0, shape=(count,)
+        )
+        return array.reshape(shape)
+
+
+def default_device() -> str:
+    return 'cuda' if hidet.cuda.available() else 'cpu'
+
+
 class OnnxOperator:
-    def __init__(self, node, op_sets: List[int]):
+    def __init__(self, node, op_sets: List[int], loader: Optional[OnnxTensorLoader] = None):
         """
         Parameters
         ----------
         node: onnx.NodeProto
+            The onnx node.
+
+        op_sets: List[int]
+            The operator sets used by the model.
+
+        loader: Optional[OnnxTensorLoader]
+            The loader of the tensor attributes, which also determines the device of the constant tensors created
+            by the operator. If None, the tensors are loaded to the default device.
         """
         self.node: onnx.NodeProto = node
         self.op_sets: List[int] = op_sets
+        self.loader: OnnxTensorLoader = loader if loader is not None else OnnxTensorLoader(default_device())
+        self.device: Device = self.loader.device
         self.input_names: List[str] = [name for name in node.input]
         self.output_names: List[str] = [name for name in node.output]
         self.attrs = {}
@@ -54,7 +115,7 @@ class OnnxOperator:
             elif attr.type == 3:  # string
                 v = attr.s.decode('utf-8')
             elif attr.type == 4:  # tensor
-                v = from_numpy(onnx.numpy_helper.to_array(tensor=attr.t)).cuda()
+                v = self.loader.load(attr.t)
             elif attr.type == 5:  # graph
                 v = attr.g
             elif attr.type == 6:  # floats
@@ -512,7 +573,7 @@ class OnnxShape(OnnxOperator):
             end = rank
         start = max(min(start, rank), 0)
         end = max(min(end, rank), 0)
-        return [hidet.asarray(x.shape[start:end]).cuda()]
+        return [hidet.asarray(x.shape[start:end], device=self.device)]
 
 
 @register_onnx_operator
@@ -660,7 +721,7 @@ class OnnxRange(OnnxOperator):
     def run_v11(self, inputs: List[Tensor]) -> List[Tensor]:
         start, limit, delta = [self.tensor2list(t) for t in inputs]
         array = np.arange(start=start, stop=limit, step=delta)
-        array = hidet.asarray(array).cuda().astype(dtype=inputs[0].dtype)
+        array = hidet.asarray(array, device=self.device).astype(dtype=inputs[0].dtype)
         return [array]
 
 
@@ -868,9 +929,10 @@ class OnnxNeg(OnnxOperator):
 
 @register_onnx_operator
 class OnnxIf(OnnxOperator):
-    def __init__(self, node, op_sets: List[int]):
-        super().__init__(node, op_sets)
+    def __init__(self, node, op_sets: List[int], loader: Optional[OnnxTensorLoader] = None):
+        super().__init__(node, op_sets, loader)
         self.env_tensors: Dict[str, Tensor] = {}
+        self.env_graph: Optional[OnnxGraph] = None
 
     def run_v1(self, inputs: List[Tensor]) -> List[Tensor]:
         cond = inputs[0]
@@ -884,9 +946,10 @@ class OnnxIf(OnnxOperator):
         if cond.size > 1:
             raise ValueError('Condition in If operator can only have a single element.')
         if np.all(cond):
-            graph = OnnxGraph(self.attrs['then_branch'], self.op_sets, self.env_tensors)
+            branch = self.attrs['then_branch']
         else:
-            graph = OnnxGraph(self.attrs['else_branch'], self.op_sets, self.env_tensors)
+            branch = self.attrs['else_branch']
+        graph = OnnxGraph(branch, self.op_sets, self.env_tensors, loader=self.loader, parent=self.env_graph)
         return graph(*inputs[1:])
 
 
@@ -1059,17 +1122,19 @@ class OnnxReduceL2(OnnxOperator):
         return [ops.sqrt(ops.sum(ops.square(data), axes, keep_dim=bool(keepdims)))]
 
 
-def dispatch(node, op_sets: List[int]) -> OnnxOperator:
+def dispatch(node, op_sets: List[int], loader: Optional[OnnxTensorLoader] = None) -> OnnxOperator:
     op_type = node.op_type
     if op_type not in dispatch_table:
         raise NotImplementedError(
             "Operator '{}' (in opset {}) from onnx has not been supported yet.".format(op_type, op_sets)
         )
-    op = dispatch_table[op_type](node, op_sets)
+    op = dispatch_table[op_type](node, op_sets, loader)
     return op
 
 
-def dispatch_operators(nodes: Sequence[onnx.NodeProto], op_sets: List[int]) -> List[OnnxOperator]:
+def dispatch_operators(
+    nodes: Sequence[onnx.NodeProto], op_sets: List[int], loader: Optional[OnnxTensorLoader] = None
+) -> List[OnnxOperator]:
     dispatched: List[OnnxOperator] = []
     unsupported: Set[str] = set()
 
@@ -1079,7 +1144,7 @@ def dispatch_operators(nodes: Sequence[onnx.NodeProto], op_sets: List[int]) -> L
             unsupported.add(op_type)
         else:
             op_cls: Type[OnnxOperator] = dispatch_table[op_type]
-            dispatched.append(op_cls(node, op_sets))
+            dispatched.append(op_cls(node, op_sets, loader))
     if len(unsupported) > 0:
         raise NotImplementedError("Operator(s) {} from onnx have not been supported yet.".format(list(unsupported)))
     return dispatched
@@ -1118,24 +1183,88 @@ def run_trt(node: OnnxOperator, inputs: List[Tensor]) -> List[Tensor]:
     outputs = session.run(
         node.output_names, input_feed={name: tensor.cpu().numpy() for name, tensor in zip(node.input_names, inputs)}
     )
-    return [hidet.asarray(output).cuda() for output in outputs]
+    return [hidet.asarray(output, device=node.device) for output in outputs]
 
 
 class OnnxGraph(nn.Module):
-    def __init__(self, graph: onnx.GraphProto, op_sets: List[int], env_tensors: Optional[Dict[str, Tensor]] = None):
+    """
+    An onnx graph.
+
+    The initializers of the graph are kept as onnx tensors, and converted to hidet tensors (the parameters of the
+    module) when an operator consumes them for the first time, unless lazy is False.
+
+    Parameters
+    ----------
+    graph: onnx.GraphProto
+        The onnx graph.
+
+    op_sets: List[int]
+        The operator sets used by the model.
+
+    env_tensors: Optional[Dict[str, Tensor]]
+        The tensors in the enclosing scope, used by the sub-graphs of control flow operators.
+
+    loader: Optional[OnnxTensorLoader]
+        The loader of the initializers. If None, the initializers are loaded to the default device.
+
+    parent: Optional[OnnxGraph]
+        The enclosing graph of a sub-graph, whose initializers can be used by the sub-graph.
+
+    lazy: bool
+        Whether to convert the initializers when they are consumed, instead of when the graph is created.
+    """
+
+    def __init__(
+        self,
+        graph: onnx.GraphProto,
+        op_sets: List[int],
+        env_tensors: Optional[Dict[str, Tensor]] = None,
+        loader: Optional[OnnxTensorLoader] = None,
+        parent: Optional['OnnxGraph'] = None,
+        lazy: bool = True,
+    ):
         super().__init__()
         self.op_sets = op_sets
         self.name: str = graph.name
+        self.loader: OnnxTensorLoader = loader if loader is not None else OnnxTensorLoader(default_device())
+        self.parent: Optional[OnnxGraph] = parent
+        self.initializers: Dict[str, onnx.TensorProto] = {}
         for param in graph.initializer:
-            numpy_array = onnx.numpy_helper.to_array(tensor=param)
-            self.parameters[param.name] = from_numpy(numpy_array).cuda()
+            self.initializers[param.name] = param
+            self.parameters[param.name] = None if lazy else self.loader.load(param)
         self.input_names: List[str] = [input.name for input in graph.input if input.name not in self.parameters]
         self.output_names: List[str] = [output.name for output in graph.output]
-        self.operators: List[OnnxOperator] = dispatch_operators(graph.node, op_sets)
-        # self.operators: List[OnnxOperator] = [dispatch(node, op_sets=self.op_sets) for node in graph.node]
+        self.operators: List[OnnxOperator] = dispatch_operators(graph.node, op_sets, self.loader)
         self.env_tensors: Dict[str, Tensor] = env_tensors if env_tensors else {}
         self.usage_count: Dict[str, int] = self.count_usage()
 
+    def load_parameter(self, name: str) -> Optional[Tensor]:
+        """
+        Get the parameter converted from the initializer with the given name, in this graph or its enclosing graphs.
+
+        Parameters
+        ----------
+        name: str
+            The name of the initializer.
+
+        Returns
+        -------
+        ret: Optional[Tensor]
+            The parameter, or None if there is no initializer with the given name.
+        """
+        if name in self.initializers:
+            if self.parameters[name] is None:
+                self.parameters[name] = self.loader.load(self.initializers[name])
+            return self.parameters[name]
+        if self.parent is not None:
+            return self.parent.load_parameter(name)
+        return None
+
+    def to_cuda(self) -> 'OnnxGraph':
+        # the parameters that have not been loaded yet will be loaded to cuda directly
+        self.loader.device = instantiate_device('cuda')
+        return super().to_cuda()
+
     def forward(self, *args):
         name2tensor = {"": None}
         if self.env_tensors:
@@ -1143,7 +1272,8 @@ class OnnxGraph(nn.Module):
         assert len(args) == len(self.input_names)
         # parameters
         for name, param in self.parameters.items():
-            name2tensor[name] = param
+            if param is not None:
+                name2tensor[name] = param
         # inputs
         for name, inp in zip(self.input_names, args):
             name2tensor[name] = inp
@@ -1155,10 +1285,14 @@ class OnnxGraph(nn.Module):
         for operator in self.operators:
             for name in operator.input_names:
                 if name not in name2tensor:
-                    raise ValueError('Tensor "{}" is used before produce.'.format(name))
+                    param = self.load_parameter(name)
+                    if param is None:
+                        raise ValueError('Tensor "{}" is used before produce.'.format(name))
+                    name2tensor[name] = param
             inputs = [name2tensor[name] for name in operator.input_names]
             if isinstance(operator, OnnxIf):
                 operator.env_tensors = name2tensor
+                operator.env_graph = self
             outputs = operator.run(inputs)
             if not isinstance(outputs, (tuple, list)):
                 raise ValueError(
@@ -1215,6 +1349,15 @@ class OnnxModule(nn.Module):
     model: onnx.ModelProto
         The onnx model to load, in the protobuf format.
 
+    device: Optional[Union[Device, str]]
+        The device to load the parameters to. If None, use cuda if it is available, otherwise cpu.
+
+    base_dir: str
+        The directory that the locations of the external data files of the model are relative to.
+
+    lazy: bool
+        Whether to convert the initializers of the model to parameters only when an operator consumes them.
+
     Attributes
     ----------
     op_sets: List[int]
@@ -1227,7 +1370,13 @@ class OnnxModule(nn.Module):
         The output names of the loaded onnx model.
     """
 
-    def __init__(self, model: onnx.ModelProto):
+    def __init__(
+        self,
+        model: onnx.ModelProto,
+        device: Optional[Union[Device, str]] = None,
+        base_dir: str = '',
+        lazy: bool = True,
+    ):
         super().__init__()
         op_sets = []
         for opset_import in model.opset_import:
@@ -1239,7 +1388,8 @@ class OnnxModule(nn.Module):
                 )
             op_sets.append(int(opset_import.version))
         self.op_sets: List[int] = list(reversed(sorted(op_sets)))
-        self.graph: OnnxGraph = OnnxGraph(model.graph, op_sets=self.op_sets)
+        loader = OnnxTensorLoader(device if device is not None else default_device(), base_dir)
+        self.graph: OnnxGraph = OnnxGraph(model.graph, op_sets=self.op_sets, loader=loader, lazy=lazy)
         self.input_names: List[str] = self.graph.input_names
         self.output_names: List[str] = self.graph.output_names
 
@@ -1276,15 +1426,33 @@ class OnnxModule(nn.Module):
         return output_dict
 
 
-def from_onnx(model: Union[str, 'onnx.ModelProto']) -> OnnxModule:
+def from_onnx(
+    model: Union[str, 'onnx.ModelProto'],
+    device: Optional[Union[Device, str]] = None,
+    lazy: bool = True,
+    base_dir: Optional[str] = None,
+) -> OnnxModule:
     """
     Load an onnx model to hidet.graph.nn.Module.
 
+    The external data of the model is memory-mapped rather than read into memory, and the initializers are converted
+    to hidet tensors only when an operator consumes them, unless lazy is False.
+
     Parameters
     ----------
     model: Union[str, onnx.ModelProto]
         The path or model proto of given onnx model.
 
+    device: Optional[Union[Device, str]]
+        The device to load the parameters of the model to. If None, use cuda if it is available, otherwise cpu.
+
+    lazy: bool
+        Whether to convert the initializers of the model to parameters only when an operator consumes them.
+
+    base_dir: Optional[str]
+        The directory that the locations of the external data files are relative to. If None, use the directory of
+        the model file when model is a path, otherwise the current working directory.
+
     Returns
     -------
     ret: OnnxModule
@@ -1292,6 +1460,8 @@ def from_onnx(model: Union[str, 'onnx.ModelProto']) -> OnnxModule:
     """
     if isinstance(model, str):
         model = os.path.expanduser(model)
+        if base_dir is None:
+            base_dir = os.path.dirname(os.path.abspath(model))
         model = onnx.load_model(model, load_external_data=False)
     try:
         onnx.checker.check_model(model, full_check=True)
@@ -1300,4 +1470,4 @@ def from_onnx(model: Union[str, 'onnx.ModelProto']) -> OnnxModule:
         pass
     except onnx.onnx_cpp2py_export.checker.ValidationError:  # pylint: disable=c-extension-no-member
         warnings.warn('The onnx model has not pass the onnx checker.')
-    return OnnxModule(model)
+    return OnnxModule(model, device=device, base_dir=base_dir if base_dir is not None else '', lazy=lazy)
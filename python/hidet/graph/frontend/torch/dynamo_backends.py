@@ -10,28 +10,33 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # pylint: disable=no-name-in-module
-from typing import List, Callable, Sequence, Union
+from typing import List, Dict, Any, Callable, Sequence, Union, Optional
 import logging
+import threading
 import torch
 import hidet.option
 from hidet.ir.type import data_type
 from hidet.graph.ir.flow_graph import FlowGraph
 from hidet.graph.transforms import PassContext, optimize
 from .utils import serialize_output, deserialize_output
-from .dynamo_config import dynamo_config
+from .dynamo_config import dynamo_config, DynamoConfig
 
 
 logger = logging.getLogger(__name__)
 
+# the building of kernels serializes most of its work, and the capture of a cuda graph fails when other threads call
+# the cuda runtime, thus the graphs are built and their executors are generated one at a time
+_build_lock = threading.Lock()
 
-def generate_executor(flow_graph: FlowGraph) -> Callable:
-    from hidet.cuda.graph import CudaGraph
 
-    use_fp16 = dynamo_config['use_fp16']
-    use_fp16_reduction = dynamo_config['use_fp16_reduction']
-    use_cuda_graph = dynamo_config['use_cuda_graph']
-    search_space = dynamo_config['search_space']
-    parallel_k = dynamo_config['parallel_k']
+def build_flow_graph(flow_graph: FlowGraph, config: DynamoConfig) -> FlowGraph:
+    """
+    Optimize the flow graph and build the kernels of its operators, which takes most of the compilation time.
+    """
+    use_fp16 = config['use_fp16']
+    use_fp16_reduction = config['use_fp16_reduction']
+    search_space = config['search_space']
+    parallel_k = config['parallel_k']
 
     with PassContext() as ctx:
         if use_fp16:
@@ -44,6 +49,19 @@ def generate_executor(flow_graph: FlowGraph) -> Callable:
         logger.info('finish optimizing the flow graph')
 
     logger.info('schedule search space: %d', search_space)
+    with hidet.option.context():
+        hidet.option.search_space(search_space)
+        logger.info('start to build the kernels')
+        graph_opt.build()
+        logger.info('finish building the kernels')
+    return graph_opt
+
+
+def generate_executor(graph_opt: FlowGraph, config: DynamoConfig) -> Callable:
+    from hidet.cuda.graph import CudaGraph
+
+    use_cuda_graph = config['use_cuda_graph']
+    search_space = config['search_space']
 
     has_cpu_tensor = any(tensor.device.type == 'cpu' for tensor in graph_opt.inputs + graph_opt.outputs)
     has_cuda_tensor = any(tensor.device.type == 'cuda' for tensor in graph_opt.inputs + graph_opt.outputs)
@@ -78,7 +96,7 @@ def generate_executor(flow_graph: FlowGraph) -> Callable:
         logger.info('start to generate the executor without cuda graph')
         with hidet.option.context():
             hidet.option.search_space(search_space)
-            dummy_inputs = flow_graph.dummy_inputs()
+            dummy_inputs = graph_opt.dummy_inputs()
             graph_opt(*dummy_inputs)
         logger.info('finish generating the executor without cuda graph')
 
@@ -93,6 +111,68 @@ def generate_executor(flow_graph: FlowGraph) -> Callable:
     return run
 
 
+class BackgroundExecutor:
+    """
+    The executor of a subgraph compiled in a background thread.
+
+    The graph module runs eagerly in torch until the flow graph is optimized and its kernels are built in the
+    background. Then the first call creates the hidet executor and switches to it. The executor is created in the
+    calling thread instead of the background one, because the capture of the cuda graph fails when other threads
+    (e.g., the eager runs of torch) call the cuda runtime at the same time. If the compilation fails, the graph module
+    keeps running eagerly.
+
+    The subgraph is compiled with the configuration and the options when it is captured. The option and pass
+    contexts are thread-local, thus the contexts entered by the background thread are not seen by the other threads.
+    """
+
+    def __init__(self, graph_module: torch.fx.GraphModule, flow_graph: FlowGraph, output_format):
+        self.graph_module: torch.fx.GraphModule = graph_module
+        self.output_format = output_format
+        self.config: DynamoConfig = dynamo_config.snapshot()
+        self.graph_opt: Optional[FlowGraph] = None
+        self.executor: Optional[Callable] = None
+        self.switch_lock = threading.Lock()
+        args = (flow_graph, hidet.option.dump_options())
+        self.thread = threading.Thread(target=self.build, args=args, name='hidet-compile', daemon=True)
+        self.thread.start()
+
+    def build(self, flow_graph: FlowGraph, dumped_options: Dict[str, Any]):
+        try:
+            hidet.option.restore_options(dumped_options)
+            with _build_lock:
+                self.graph_opt = build_flow_graph(flow_graph, self.config)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('failed to compile the subgraph in background, keep running it eagerly')
+
+    def switch(self):
+        # the call never waits: it keeps running eagerly when another call is switching, or another subgraph is
+        # being built, and retries in the next call
+        if not self.switch_lock.acquire(blocking=False):
+            return
+        if not _build_lock.acquire(blocking=False):
+            self.switch_lock.release()
+            return
+        try:
+            if self.executor is None and self.graph_opt is not None:
+                self.executor = generate_executor(self.graph_opt, self.config)
+                logger.info('switch to the hidet executor')
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('failed to generate the executor, keep running the subgraph eagerly')
+        finally:
+            self.graph_opt = None
+            _build_lock.release()
+            self.switch_lock.release()
+
+    def __call__(self, *args: torch.Tensor):
+        if self.executor is None and self.graph_opt is not None:
+            self.switch()
+        executor = self.executor
+        if executor is None:
+            return self.graph_module(*args)
+        outputs: Sequence[torch.Tensor] = executor(*args)
+        return deserialize_output(self.output_format, outputs)
+
+
 def hidet_backend(graph_module, example_inputs):
     from hidet import Tensor
     from .interpreter import Interpreter
@@ -141,7 +221,13 @@ def hidet_backend(graph_module, example_inputs):
     output_format, output_tensors = serialize_output(output)
     flow_graph: FlowGraph = hidet.trace_from(output_tensors, inputs=symbolic_inputs)
 
-    executor = generate_executor(flow_graph)
+    if dynamo_config['background_compile']:
+        logger.info('compile the subgraph in background, run it eagerly until the compilation finishes')
+        return BackgroundExecutor(graph_module, flow_graph, output_format)
+
+    config: DynamoConfig = dynamo_config.snapshot()
+    with _build_lock:
+        executor = generate_executor(build_flow_graph(flow_graph, config), config)
 
     def wrapper(*args: Tensor):
         outputs: Sequence[torch.Tensor] = executor(*args)
@@ -9,7 +9,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from __future__ import annotations
 from typing import Optional
+import copy
 
 
 class DynamoConfig:
@@ -23,11 +25,18 @@ class DynamoConfig:
         self._print_input_graph: bool = False
         self._dump_graph_ir: Optional[str] = None
         self._correctness_report: bool = False
+        self._background_compile: bool = False
 
     def __getitem__(self, item: str):
         assert isinstance(item, str)
         return getattr(self, f"_{item}")
 
+    def snapshot(self) -> DynamoConfig:
+        """
+        Copy the current configuration, which is not affected by the later changes of this one.
+        """
+        return copy.copy(self)
+
     def search_space(self, level: int = 2):
         """
         The schedule search space for the operator kernel tuning
@@ -122,5 +131,13 @@ class DynamoConfig:
         self._correctness_report = flag
         return self
 
+    def background_compile(self, flag=True):
+        """
+        Whether to compile the graphs in a background thread. The graphs run eagerly in torch until hidet finishes
+        compiling them, so that the first calls are not blocked by the compilation.
+        """
+        self._background_compile = flag
+        return self
+
 
 dynamo_config = DynamoConfig()
@@ -10,7 +10,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from . import flow_graph
+from . import compiled_graph
 from . import functors
+from . import bucketed_graph
+from . import model_file
 
 from .flow_graph import FlowGraph, Tensor, Operator, trace_from, load_graph, save_graph, forward_context
+from .compiled_graph import CompiledGraph
+from .bucketed_graph import BucketedGraph, specialize_graph
 from .functors import GraphRewriter, GraphVisitor
@@ -0,0 +1,270 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+from typing import List, Union, Dict, Tuple, Sequence, Any
+import bisect
+import ctypes
+import itertools
+from hidet.ir.expr import Expr, Constant, SymbolVar
+from hidet.ir.utils.symbol_utils import collect_symbols, bind_symbols, eval_shape
+from hidet.graph.tensor import Tensor, symbol, empty
+from hidet.graph.ir.flow_graph import FlowGraph
+from hidet.utils import prod, same_list
+
+
+def _specialize_attr(value: Any, bindings: Dict[SymbolVar, int]) -> Any:
+    if isinstance(value, (list, tuple)):
+        return type(value)(_specialize_attr(v, bindings) for v in value)
+    elif isinstance(value, Expr) and not isinstance(value, Constant):
+        return eval_shape([value], bindings)[0]
+    else:
+        return value
+
+
+def specialize_graph(graph: FlowGraph, bindings: Dict[SymbolVar, int]) -> FlowGraph:
+    """
+    Specialize a flow graph with symbolic dimensions to the given values of its symbol vars.
+
+    The operators of the graph are forwarded again with the static input tensors, thus the graph must consist of
+    the proper operators (i.e., it has not been fused by :func:`hidet.graph.optimize`).
+
+    Parameters
+    ----------
+    graph: FlowGraph
+        The flow graph with symbolic dimensions.
+
+    bindings: Dict[SymbolVar, int]
+        The values of the symbol vars.
+
+    Returns
+    -------
+    ret: FlowGraph
+        The specialized flow graph, whose tensors all have static shapes.
+    """
+    if any(v is None for v in [graph.inputs, graph.nodes, graph.usage_count]):
+        graph.update_nodes()
+    tmap: Dict[Tensor, Tensor] = {}
+    for x in graph.inputs:
+        tmap[x] = symbol(eval_shape(x.shape, bindings), dtype=x.dtype, device=x.device)
+    for op in graph.nodes:
+        inputs = [tmap.get(x, x) for x in op.inputs]
+        attrs = {name: _specialize_attr(value, bindings) for name, value in op.attrs.items()}
+        outputs = op.reforward(inputs, update_attributes=attrs)
+        for original, updated in zip(op.outputs, outputs):
+            tmap[original] = updated
+    return FlowGraph(outputs=[tmap[x] for x in graph.outputs], inputs=[tmap[x] for x in graph.inputs]).update_nodes()
+
+
+def _copy_region(dst: Tensor, src: Tensor, region: Sequence[int]):
+    # copy the leading region of src to the leading region of dst, both tensors are stored in row-major order
+    if len(region) == 0 or prod(region) == 0:
+        return
+    nbytes = dst.dtype.nbytes
+    dst_shape, src_shape = list(dst.shape), list(src.shape)
+    # the region is copied in runs, each run covers the dimensions after the last dimension that is cropped
+    k = 0
+    for i in range(len(region)):
+        if dst_shape[i] != region[i] or src_shape[i] != region[i]:
+            k = i
+    run = prod(region[k:]) * nbytes
+    dst_strides = [prod(dst_shape[i + 1 :]) * nbytes for i in range(len(region))]
+    src_strides = [prod(src_shape[i + 1 :]) * nbytes for i in range(len(region))]
+    for index in itertools.product(*[range(extent) for extent in region[:k]]):
+        dst_addr = dst.storage.addr + sum(i * s for i, s in zip(index, dst_strides))
+        src_addr = src.storage.addr + sum(i * s for i, s in zip(index, src_strides))
+        if dst.device.is_cuda():
+            from hidet.cuda import memcpy_async
+
+            memcpy_async(dst_addr, src_addr, run)
+        else:
+            ctypes.memmove(dst_addr, src_addr, run)
+
+
+def _fill_zeros(tensor: Tensor):
+    if tensor.device.is_cuda():
+        from hidet.cuda import memset_async
+
+        memset_async(tensor.storage.addr, 0, tensor.nbytes)
+    else:
+        ctypes.memset(tensor.storage.addr, 0, tensor.nbytes)
+
+
+class BucketedGraph:
+    """
+    A flow graph with symbolic dimensions, served by the graphs pre-built for a set of shape buckets.
+
+    For each combination of the buckets, the flow graph is specialized to static shapes, optimized, and compiled
+    ahead of time. When it is called, each symbolic dimension of the inputs is rounded up to the nearest bucket,
+    the inputs are padded with zeros, the pre-built graph of the buckets runs, and the outputs are sliced to the
+    shapes the inputs imply. Thus the number of compiled graphs is bounded by the number of bucket combinations,
+    no matter how the input shapes vary.
+
+    Padding is only valid for the dimensions on which the unpadded part of the outputs does not depend on the padded
+    part of the inputs, such as the batch dimension. Dimensions that are reduced over (e.g., the sequence length
+    of an attention) need to be masked by the model itself.
+
+    You can create the bucketed graph by calling :meth:`~hidet.graph.ir.flow_graph.FlowGraph.bucketed`.
+
+    Parameters
+    ----------
+    flow_graph: FlowGraph
+        The flow graph whose inputs have symbolic dimensions. It should not have been optimized, since the graph is
+        optimized after being specialized for each combination of the buckets.
+
+    buckets: Dict[str, Sequence[int]]
+        The buckets of each symbolic dimension, indexed by the name of the symbol var. For example,
+        ``{'batch': [1, 2, 4, 8, 16, 32], 'seq': [128, 256, 512]}``.
+
+    use_cuda_graph: bool
+        Whether to capture the pre-built graphs as :class:`~hidet.cuda.graph.CudaGraph`. All the inputs of the
+        flow graph must be on cuda device.
+
+    optimize: bool
+        Whether to optimize the specialized graphs with :func:`hidet.graph.optimize`.
+    """
+
+    def __init__(
+        self,
+        flow_graph: FlowGraph,
+        buckets: Dict[str, Sequence[int]],
+        use_cuda_graph: bool = False,
+        optimize: bool = True,
+    ):
+        from hidet.graph.transforms import optimize as optimize_graph
+
+        if any(v is None for v in [flow_graph.inputs, flow_graph.nodes, flow_graph.usage_count]):
+            flow_graph.update_nodes()
+        self.flow_graph: FlowGraph = flow_graph
+        self.symbols: List[SymbolVar] = collect_symbols([x.shape for x in flow_graph.inputs])
+        for sym in self.symbols:
+            if sym.hint not in buckets or len(buckets[sym.hint]) == 0:
+                raise ValueError('No bucket is given for the symbolic dimension "{}".'.format(sym.hint))
+        unknown = set(buckets.keys()) - set(sym.hint for sym in self.symbols)
+        if unknown:
+            raise ValueError('The flow graph inputs have no symbolic dimension named {}.'.format(sorted(unknown)))
+        self.buckets: List[List[int]] = [sorted(set(int(v) for v in buckets[sym.hint])) for sym in self.symbols]
+        self.use_cuda_graph: bool = use_cuda_graph
+
+        # specialize the flow graph for each combination of the buckets
+        self.graphs: Dict[Tuple[int, ...], FlowGraph] = {}
+        for key in itertools.product(*self.buckets):
+            graph = specialize_graph(flow_graph, dict(zip(self.symbols, key)))
+            self.graphs[key] = optimize_graph(graph) if optimize else graph
+
+        # build the kernels of all the specialized graphs at once, so that they are compiled in parallel
+        all_outputs = [y for graph in self.graphs.values() for y in graph.outputs]
+        all_inputs = [x for graph in self.graphs.values() for x in graph.inputs]
+        FlowGraph(outputs=all_outputs, inputs=all_inputs).update_nodes().build()
+
+        self.executors: Dict[Tuple[int, ...], Any] = {}
+        for key, graph in self.graphs.items():
+            self.executors[key] = graph.cuda_graph() if use_cuda_graph else graph.compile()
+
+        # the padded inputs of each bucket, allocated when the bucket is used the first time
+        self._padded_inputs: Dict[Tuple[int, ...], List[Tensor]] = {}
+
+    def __call__(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
+        return self.run(*inputs)
+
+    @property
+    def num_graphs(self) -> int:
+        """
+        The number of pre-built graphs.
+        """
+        return len(self.graphs)
+
+    def bucket_of(self, bindings: Dict[SymbolVar, int]) -> Tuple[int, ...]:
+        """
+        Get the buckets of the given values of the symbolic dimensions.
+
+        Parameters
+        ----------
+        bindings: Dict[SymbolVar, int]
+            The values of the symbol vars.
+
+        Returns
+        -------
+        ret: Tuple[int, ...]
+            The smallest bucket of each symbolic dimension that can hold the given value.
+        """
+        key = []
+        for sym, buckets in zip(self.symbols, self.buckets):
+            value = bindings[sym]
+            idx = bisect.bisect_left(buckets, value)
+            if idx == len(buckets):
+                raise ValueError(
+                    'The symbolic dimension "{}" is {}, which exceeds the largest bucket {}.'.format(
+                        sym.hint, value, buckets[-1]
+                    )
+                )
+            key.append(buckets[idx])
+        return tuple(key)
+
+    def run(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
+        """
+        Run the pre-built graph of the buckets that the inputs fall into.
+
+        Parameters
+        ----------
+        *inputs: Tensor
+            The input tensors.
+
+        Returns
+        -------
+        ret: Union[List[Tensor], Tensor]
+            The output tensors, sliced to the shapes implied by the inputs. If there is only one output, it is
+            returned directly.
+        """
+        graph_inputs = self.flow_graph.inputs
+        if len(inputs) != len(graph_inputs):
+            raise ValueError('Expect {} inputs, got {}.'.format(len(graph_inputs), len(inputs)))
+        bindings = bind_symbols([x.shape for x in graph_inputs], [x.shape for x in inputs])
+        key = self.bucket_of(bindings)
+        graph = self.graphs[key]
+
+        # pad the inputs to the shapes of the bucket
+        if self.use_cuda_graph:
+            padded = self.executors[key].inputs
+        else:
+            if key not in self._padded_inputs:
+                self._padded_inputs[key] = [empty(x.shape, dtype=x.dtype, device=x.device) for x in graph.inputs]
+            padded = self._padded_inputs[key]
+        actual_inputs: List[Tensor] = []
+        for x, buffer in zip(inputs, padded):
+            if x.device != buffer.device:
+                raise ValueError('Expect an input on {}, got {}.'.format(buffer.device, x.device))
+            if same_list(x.shape, buffer.shape) and not self.use_cuda_graph:
+                actual_inputs.append(x)
+            else:
+                if not same_list(x.shape, buffer.shape):
+                    _fill_zeros(buffer)
+                _copy_region(buffer, x, x.shape)
+                actual_inputs.append(buffer)
+
+        # run the pre-built graph
+        if self.use_cuda_graph:
+            outputs = self.executors[key].run()
+        else:
+            outputs = self.executors[key].run(*actual_inputs)
+        outputs = [outputs] if isinstance(outputs, Tensor) else list(outputs)
+
+        # slice the outputs to the shapes implied by the inputs
+        results: List[Tensor] = []
+        for y, symbolic_y in zip(outputs, self.flow_graph.outputs):
+            shape = eval_shape(symbolic_y.shape, bindings)
+            if same_list(shape, y.shape):
+                results.append(y)
+            else:
+                sliced = empty(shape, dtype=y.dtype, device=y.device)
+                _copy_region(sliced, y, shape)
+                results.append(sliced)
+        return results[0] if len(results) == 1 else results
@@ -0,0 +1,396 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=protected-access
+from __future__ import annotations
+from typing import List, Union, Dict, Optional, Tuple, Sequence, Set
+from collections import defaultdict, OrderedDict
+import ctypes
+import threading
+from hidet.ir.type import DataType, TensorType
+from hidet.ir.layout import DataLayout
+from hidet.ir.expr import Expr, SymbolVar
+from hidet.ir.utils.symbol_utils import collect_symbols, bind_symbols, eval_shape
+from hidet.graph.tensor import Tensor
+from hidet.graph.operator import Operator
+from hidet.graph.ir.memory_planner import MemoryPlan, plan_memory
+from hidet.ffi.packedfunc import PackedFunc
+from hidet.runtime.storage import Storage
+from hidet.runtime.device import Device
+from hidet.ffi.ffi import get_last_error, BackendException
+from hidet.utils import prod, same_list
+
+
+class Instruction:
+    """
+    An instruction of the compiled graph, which runs an operator.
+
+    The tensors are stored in the slots of the compiled graph, and an instruction refers to them by the slot indices.
+
+    Attributes
+    ----------
+    op: Operator
+        The operator to run.
+
+    packed_func: PackedFunc
+        The packed function of the operator's task, whose parameters are the input and output tensors, followed by
+        the values of the symbol vars of the task.
+
+    inputs: List[int]
+        The slots of the input tensors.
+
+    outputs: List[int]
+        The slots of the output tensors.
+
+    symbols: List[SymbolVar]
+        The symbol vars of the operator's task.
+
+    view_offset: Optional[int]
+        The offset of the output in the storage of the first input, when the output is a view of the first input
+        (see :meth:`~hidet.graph.operator.Operator.view_offset`). Such an instruction creates the view instead of
+        calling a packed function.
+    """
+
+    def __init__(self, op: Operator, inputs: List[int], outputs: List[int], view_offset: Optional[int] = None):
+        self.op: Operator = op
+        self.packed_func: Optional[PackedFunc] = op.task_func.packed_func if view_offset is None else None
+        self.inputs: List[int] = inputs
+        self.outputs: List[int] = outputs
+        self.symbols: List[SymbolVar] = op.task.symbols
+        self.view_offset: Optional[int] = view_offset
+
+
+def _no_free(storage: Storage):
+    # the storages of the planned tensors are views of the arena, which is freed on its own
+    pass
+
+
+class ExecutionPlan:
+    """
+    The compiled graph specialized for the values of its symbolic dimensions.
+
+    Attributes
+    ----------
+    slots: List[Optional[Tensor]]
+        The initial values of the slots: None for the graph inputs and outputs, and the tensor itself for the
+        constant tensors and (when the memory is reused) the planned intermediate tensors.
+
+    allocs: List[List[Tuple[int, Tuple[List[int], DataType, Device, int]]]]
+        The output slots of each instruction whose tensors are allocated each time the instruction runs (i.e., the
+        outputs of the graph and the tensors viewed by them), with the shape, dtype, device and number of bytes of
+        the tensors.
+
+    views: List[Optional[Tuple[List[int], Optional[DataLayout], int]]]
+        The shape, layout and number of bytes of the output of each instruction that creates a view, and None for
+        the other instructions.
+
+    symbol_addresses: List[List[int]]
+        The addresses of the int32 values of the symbol vars, passed to each instruction after the tensors.
+
+    memory_plans: Dict[Device, MemoryPlan]
+        The memory plan of the intermediate tensors on each device.
+
+    arenas: Dict[Device, Storage]
+        The memory arena of the intermediate tensors on each device, which is allocated once and reused by all runs.
+        It is empty when the graph does not reuse the memory, and the arenas are allocated in each run instead.
+
+    planned: Dict[Device, List[Tuple[int, int, Tuple[List[int], DataType, Device, DataLayout, int]]]]
+        The slots of the planned intermediate tensors on each device, with their offsets in the arena and their
+        shapes, dtypes, devices, layouts and numbers of bytes.
+    """
+
+    def __init__(self, graph: CompiledGraph, bindings: Dict[SymbolVar, int]):
+        self.slots: List[Optional[Tensor]] = graph.slots.copy()
+        self.allocs: List[List[Tuple[int, Tuple[List[int], DataType, Device, int]]]] = []
+        self.views: List[Optional[Tuple[List[int], Optional[DataLayout], int]]] = []
+        self.symbol_addresses: List[List[int]] = []
+        self.memory_plans: Dict[Device, MemoryPlan] = {}
+        self.arenas: Dict[Device, Storage] = {}
+        self.planned: Dict[Device, List[Tuple[int, int, Tuple[List[int], DataType, Device, DataLayout, int]]]] = {}
+        # keep the int32 values alive, since the instructions refer to them by addresses
+        self.symbol_values: Dict[SymbolVar, ctypes.c_int32] = {s: ctypes.c_int32(v) for s, v in bindings.items()}
+
+        specs: Dict[int, Tuple[List[int], DataType, Device, DataLayout, int]] = {}
+        for slot, (shape, dtype, device, layout) in graph.specs.items():
+            if len(bindings) > 0:
+                # the tensors with symbolic shapes use the row-major layout of the evaluated shapes
+                shape, layout = eval_shape(shape, bindings), None
+            specs[slot] = (shape, dtype, device, layout, prod(shape) * dtype.nbytes)
+
+        for inst in graph.instructions:
+            self.allocs.append([(slot, specs[slot]) for slot in inst.outputs if slot in graph.allocated_slots])
+            self.symbol_addresses.append([ctypes.addressof(self.symbol_values[s]) for s in inst.symbols])
+            if inst.view_offset is not None:
+                shape, _, _, layout, nbytes = specs[inst.outputs[0]]
+                self.views.append((shape, layout, nbytes))
+            else:
+                self.views.append(None)
+
+        # plan the memory of the intermediate tensors, the views share the memory of the tensors they view
+        device_slots: Dict[Device, List[int]] = defaultdict(list)
+        for slot, spec in specs.items():
+            if slot not in graph.allocated_slots and slot not in graph.view_sources:
+                device_slots[spec[2]].append(slot)
+        for device, slots in device_slots.items():
+            plan = plan_memory([specs[slot][4] for slot in slots], [tuple(graph.lifetimes[slot]) for slot in slots])
+            self.memory_plans[device] = plan
+            self.planned[device] = [(slot, offset, specs[slot]) for slot, offset in zip(slots, plan.offsets)]
+        if graph.reuse_memory:
+            self.arenas = self.allocate(self.slots)
+
+    def allocate(self, slots: List[Optional[Tensor]]) -> Dict[Device, Storage]:
+        """
+        Allocate the arenas of the intermediate tensors, and put the planned tensors into the given slots.
+
+        Parameters
+        ----------
+        slots: List[Optional[Tensor]]
+            The slots to fill with the planned intermediate tensors.
+
+        Returns
+        -------
+        ret: Dict[Device, Storage]
+            The allocated arena on each device, which must be kept alive while the planned tensors are used.
+        """
+        arenas: Dict[Device, Storage] = {}
+        for device, planned in self.planned.items():
+            arena = Storage.new(device, self.memory_plans[device].peak_size)
+            for slot, offset, (shape, dtype, _, layout, nbytes) in planned:
+                storage = Storage(device, arena.addr + offset, nbytes, free_handler=_no_free)
+                slots[slot] = Tensor(shape, dtype, device, storage, layout)
+            arenas[device] = arena
+        return arenas
+
+
+class CompiledGraph:
+    """
+    A flow graph compiled into a static execution plan.
+
+    All the task functions are resolved when the graph is compiled, and each operator is lowered to an instruction
+    that refers to its input and output tensors by slot indices. The shapes and dtypes of all tensors are checked
+    when the graph is compiled (and the inputs when it is run).
+
+    The intermediate tensors are packed into one memory arena for each device, by a static memory planner based on
+    the lifetimes of the tensors (see :mod:`hidet.graph.ir.memory_planner`). Thus running the compiled graph only
+    allocates the graph outputs and calls the task functions with the tensor addresses. The operators whose output
+    is a view of their input (e.g., the reshape of a row-major tensor) are not launched: their outputs alias the
+    memory of the viewed tensors, whose lifetimes are extended to cover the uses of the views. When the arena is reused
+    by all runs, the compiled graph should not be run by multiple threads at the same time. Otherwise, the arena is
+    allocated in each run and freed when the run finishes.
+
+    When the inputs of the graph have symbolic dimensions, the values of the symbolic dimensions are bound by the
+    shapes of the input tensors in each run. The kernels are shared by all the values, while the memory is planned
+    for each of them, and the plans of the most recently used values are cached.
+
+    You can create a compiled graph by calling :meth:`~hidet.graph.ir.flow_graph.FlowGraph.compile`.
+
+    Parameters
+    ----------
+    flow_graph: FlowGraph
+        The flow graph to compile. Its nodes must have been updated, and the tasks of the nodes are loaded from the
+        operator cache, thus should have been built (e.g., by :meth:`~hidet.graph.ir.flow_graph.FlowGraph.build`).
+
+    reuse_memory: bool
+        Whether to allocate the memory arena of the intermediate tensors once and reuse it in all runs.
+
+    Attributes
+    ----------
+    symbols: List[SymbolVar]
+        The symbol vars in the shapes of the graph inputs.
+
+    memory_plans: Dict[Device, MemoryPlan]
+        The memory plan of the intermediate tensors on each device, which reports the planned peak memory. For the
+        graphs with symbolic dimensions, it is the plan of the most recent run.
+    """
+
+    # the maximum number of cached execution plans for the graphs with symbolic dimensions
+    max_cached_plans: int = 16
+
+    def __init__(self, flow_graph, reuse_memory: bool = True):
+        from hidet.graph.ir.flow_graph import FlowGraph
+
+        flow_graph: FlowGraph
+        self.flow_graph: FlowGraph = flow_graph
+        self.reuse_memory: bool = reuse_memory
+        self.nodes: List[Operator] = flow_graph.nodes
+        self.num_inputs: int = len(flow_graph.inputs)
+        self.input_signatures: List[Tuple[Tuple[int, ...], DataType]] = [(t.shape, t.dtype) for t in flow_graph.inputs]
+        self.symbols: List[SymbolVar] = collect_symbols([shape for shape, _ in self.input_signatures])
+        self.instructions: List[Instruction] = []
+        # the initial values of the slots: None for the graph inputs, outputs and the intermediate tensors, and the
+        # tensor itself for the constant tensors
+        self.slots: List[Optional[Tensor]] = []
+        self.output_slots: List[int] = []
+        # the shape, dtype, device and layout of the tensors produced by the instructions
+        self.specs: Dict[int, Tuple[List[Union[int, Expr]], DataType, Device, DataLayout]] = {}
+        # the lifetime of each tensor produced by the instructions: the indices of its first and last instructions
+        self.lifetimes: Dict[int, List[int]] = {}
+        # the slots of the views, mapped to the slots of the (non-view) tensors whose memory they alias
+        self.view_sources: Dict[int, int] = {}
+        # the slots of the tensors allocated in each run: the graph outputs, and the tensors viewed by them
+        self.allocated_slots: Set[int] = set()
+        self.plans: Dict[Tuple[int, ...], ExecutionPlan] = OrderedDict()
+        self.last_plan: Optional[ExecutionPlan] = None
+        self.plans_lock = threading.Lock()
+
+        slot_of: Dict[Tensor, int] = {}
+
+        def get_slot(tensor: Tensor) -> int:
+            if tensor not in slot_of:
+                slot_of[tensor] = len(self.slots)
+                self.slots.append(tensor if tensor.storage is not None else None)
+            return slot_of[tensor]
+
+        for tensor in flow_graph.inputs:
+            get_slot(tensor)
+
+        for idx, node in enumerate(self.nodes):
+            view_offset = node.view_offset()
+            if view_offset is None:
+                node.build_task_func()
+                self._check_types(node)
+            inputs = []
+            for tensor in node.inputs:
+                if tensor.storage is None and tensor not in slot_of:
+                    raise ValueError('Symbolic tensor {} is not produced by any operator.'.format(tensor.signature()))
+                inputs.append(get_slot(tensor))
+                source = self.view_sources.get(inputs[-1], inputs[-1])
+                if source in self.lifetimes:
+                    self.lifetimes[source][1] = idx
+            outputs = [get_slot(tensor) for tensor in node.outputs]
+            output_types = [output.type for output in node.task.parameters[-len(node.task.outputs) :]]
+            for slot, t in zip(outputs, output_types):
+                self.specs[slot] = (t.const_shape(), t.dtype, node.device, t.layout)
+                if view_offset is None:
+                    self.lifetimes[slot] = [idx, idx]
+                else:
+                    self.view_sources[slot] = self.view_sources.get(inputs[0], inputs[0])
+            self.instructions.append(Instruction(node, inputs, outputs, view_offset))
+
+        for tensor in flow_graph.outputs:
+            if tensor.storage is None and tensor not in slot_of:
+                raise RuntimeError('Graph output {} is not produced by any operator.'.format(tensor.signature()))
+            self.output_slots.append(get_slot(tensor))
+            self.allocated_slots.add(self.view_sources.get(self.output_slots[-1], self.output_slots[-1]))
+
+        if len(self.symbols) == 0:
+            self.last_plan = ExecutionPlan(self, bindings={})
+
+    @property
+    def memory_plans(self) -> Dict[Device, MemoryPlan]:
+        return self.last_plan.memory_plans if self.last_plan is not None else {}
+
+    @property
+    def arenas(self) -> Dict[Device, Storage]:
+        return self.last_plan.arenas if self.last_plan is not None else {}
+
+    def __call__(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
+        return self.run(*inputs)
+
+    def run(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
+        """Run the compiled graph.
+
+        Parameters
+        ----------
+        *inputs: Tensor
+            The input tensors. They should be consistent with the symbolic inputs of the flow graph.
+
+        Returns
+        -------
+        output: Union[List[Tensor], Tensor]
+            If there is only one output, it is returned directly. Otherwise, a list of output tensors are returned.
+        """
+        from hidet.graph.ir.flow_graph import GraphForwardContext
+
+        if len(inputs) != self.num_inputs:
+            raise ValueError('Expect {} inputs, got {}.'.format(self.num_inputs, len(inputs)))
+        for idx, (tensor, (shape, dtype)) in enumerate(zip(inputs, self.input_signatures)):
+            if tensor.storage is None:
+                msg = 'Expect non-symbolic input tensors, got symbolic input {} ({}).'.format(idx, tensor.signature())
+                raise ValueError(msg)
+            if tensor.dtype != dtype or len(self.symbols) == 0 and tensor.shape != shape:
+                raise ValueError(
+                    'Expect input {} to be {}{}, got {}{}.'.format(
+                        idx, dtype.name, list(shape), tensor.dtype.name, list(tensor.shape)
+                    )
+                )
+
+        ctx = GraphForwardContext.current()
+        if ctx.instruments:
+            return self._run_instrumented(ctx, inputs)
+
+        plan = self.last_plan if len(self.symbols) == 0 else self._get_plan(inputs)
+        slots = plan.slots.copy()
+        slots[: self.num_inputs] = inputs
+        # keep the arenas of this run alive until all the instructions finish
+        arenas = plan.arenas if self.reuse_memory else plan.allocate(slots)
+        for inst, allocs, symbol_addresses, view in zip(
+            self.instructions, plan.allocs, plan.symbol_addresses, plan.views
+        ):
+            if view is not None:
+                shape, layout, nbytes = view
+                x = slots[inst.inputs[0]]
+                storage = x.storage if inst.view_offset == 0 else x.storage.view(inst.view_offset, nbytes)
+                slots[inst.outputs[0]] = Tensor(shape, x.dtype, x.device, storage, layout)
+                continue
+            for slot, (shape, dtype, device, layout, nbytes) in allocs:
+                slots[slot] = Tensor(shape, dtype, device, Storage.new(device, nbytes), layout)
+            addresses = [slots[i].storage.addr for i in inst.inputs]
+            addresses.extend(slots[i].storage.addr for i in inst.outputs)
+            addresses.extend(symbol_addresses)
+            inst.packed_func.call_with_addresses(addresses)
+            status = get_last_error()
+            if status is not None:
+                raise BackendException('Kernel for operator {} failed. Error:\n{}'.format(inst.op.name, status))
+        outputs = [slots[i] for i in self.output_slots]
+        del arenas
+        return outputs[0] if len(outputs) == 1 else outputs
+
+    def _get_plan(self, inputs: Sequence[Tensor]) -> ExecutionPlan:
+        bindings = bind_symbols([shape for shape, _ in self.input_signatures], [tensor.shape for tensor in inputs])
+        key = tuple(bindings[symbol] for symbol in self.symbols)
+        with self.plans_lock:
+            if key in self.plans:
+                self.plans.move_to_end(key)
+            else:
+                self.plans[key] = ExecutionPlan(self, bindings)
+                if len(self.plans) > self.max_cached_plans:
+                    self.plans.popitem(last=False)
+            self.last_plan = plan = self.plans[key]
+        return plan
+
+    @staticmethod
+    def _check_types(node: Operator):
+        param_types = node.task_func.packed_func.param_types
+        for i, (tensor, param_type) in enumerate(zip(node.inputs + node.outputs, param_types)):
+            if not isinstance(param_type, TensorType):
+                raise ValueError('Expect the parameter {} of operator {} to be a tensor.'.format(i, node.name))
+            if tensor.dtype != param_type.dtype or not same_list(tensor.shape, param_type.const_shape()):
+                raise ValueError(
+                    'The operator {} expects the {}-th argument to be a {}{}, but got a {}{}.'.format(
+                        node.name, i, param_type.dtype, param_type.const_shape(), tensor.dtype, tensor.shape
+                    )
+                )
+
+    def _run_instrumented(self, ctx, inputs: Sequence[Tensor]) -> Union[List[Tensor], Tensor]:
+        ctx._trigger_before_graph(self.flow_graph, list(inputs))
+        slots = self.slots.copy()
+        slots[: self.num_inputs] = inputs
+        for inst in self.instructions:
+            args = [slots[i] for i in inst.inputs]
+            ctx._trigger_before_operator(inst.op, args)
+            outputs = inst.op.imperative_run(args)
+            ctx._trigger_after_operator(inst.op, args, outputs)
+            for slot, output in zip(inst.outputs, outputs):
+                slots[slot] = output
+        outputs = [slots[i] for i in self.output_slots]
+        ctx._trigger_after_graph(self.flow_graph, list(inputs), outputs)
+        return outputs[0] if len(outputs) == 1 else outputs
@@ -13,15 +13,16 @@
 from __future__ import annotations
 from typing import List, Union, Dict, Set, Optional, Tuple, Sequence
 import logging
-import os
 import pickle
 from collections import defaultdict
 
 import hidet.graph.operator
 import hidet.cuda
-from hidet import option
 from hidet.graph.tensor import Tensor, zeros_like, randn_like
 from hidet.graph.operator import Operator
+from hidet.graph.ir.compiled_graph import CompiledGraph
+from hidet.graph.ir.model_file import is_model_file, load_model, save_model, place_graph
+from hidet.runtime.device import Device, instantiate_device
 from hidet.utils.doc import Doc, NewLine, Text, doc_join
 from hidet.utils.namer import Namer
 
@@ -103,6 +104,7 @@ class FlowGraph:
         self.inputs: Optional[List[Tensor]] = inputs
         self.nodes: Optional[List[Operator]] = nodes
         self.usage_count: Optional[Dict[Tensor, int]] = None
+        self._compiled_graph: Optional[CompiledGraph] = None
 
     def __call__(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
         """Run the computation graph.
@@ -169,26 +171,30 @@ class FlowGraph:
         return str(graph_doc)
 
     def build(self):
-        tasks = []
-        tunable_tasks = []
+        # the tasks are grouped by the device they run on
+        tasks: Dict[str, List] = defaultdict(list)
+        tunable_tasks: Dict[str, List] = defaultdict(list)
         task_keys = set()
         search_space = hidet.option.get_option('search_space')
         for node in self.nodes:
-            if node.task_func is None:
-                task_key = hash(str(node.task))
+            # the views of their inputs are not launched, thus not built
+            if node.task_func is None and node.view_offset() is None:
+                device: str = node.device.type
+                task_key = (device, node.task.structural_hash())
                 if task_key in task_keys:
                     continue
                 task_keys.add(task_key)
-                if search_space == 0 or 'implement_cuda' not in node.task.__class__.__dict__:
-                    tasks.append(node.task)
+                if search_space == 0 or 'implement_{}'.format(device) not in node.task.__class__.__dict__:
+                    tasks[device].append(node.task)
                 else:
-                    tunable_tasks.append(node.task)
+                    tunable_tasks[device].append(node.task)
 
-        hidet.driver.build_task_batch(tasks)
+        for device, device_tasks in tasks.items():
+            hidet.driver.build_task_batch(device_tasks, target_device=device)
 
-        with option.context():
-            hidet.option.parallel_build(False)
-            hidet.driver.build_task_batch(tunable_tasks)  # build tunable tasks one by one
+        for device, device_tasks in tunable_tasks.items():
+            # the tunable tasks are built in current process, their tuning candidates are compiled concurrently
+            hidet.driver.build_task_batch(device_tasks, target_device=device, in_process=True)
 
     def forward(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
         """Run the computation graph.
@@ -205,62 +211,33 @@ class FlowGraph:
             If there is only one output, it is returned directly. Otherwise, a list
             of output tensors are returned.
         """
-        inputs: List[Tensor] = list(inputs)
+        if any(v is None for v in [self.inputs, self.nodes, self.usage_count]):
+            self.update_nodes()
+        compiled_graph: Optional[CompiledGraph] = getattr(self, '_compiled_graph', None)
+        if compiled_graph is None or compiled_graph.nodes is not self.nodes:
+            # the intermediate tensors are allocated in each call, thus the graph can be run by multiple threads
+            self.build()
+            compiled_graph = CompiledGraph(self, reuse_memory=False)
+            self._compiled_graph = compiled_graph
+        return compiled_graph.run(*inputs)
+
+    def compile(self) -> CompiledGraph:
+        """Compile the flow graph into a static execution plan.
+
+        All operators are built, and their task functions are resolved once. Different from
+        :func:`FlowGraph.forward`, which allocates the intermediate tensors in each call, the returned compiled graph
+        allocates the memory of the intermediate tensors once and reuses it in all runs. Thus it should not be run by
+        multiple threads at the same time.
 
-        for idx, tensor in enumerate(inputs):
-            if tensor.storage is None:
-                msg = 'Expect non-symbolic input tensors, got symbolic input {} ({}).'.format(idx, tensor.signature())
-                raise ValueError(msg)
+        Returns
+        -------
+        ret: CompiledGraph
+            The compiled graph.
+        """
         if any(v is None for v in [self.inputs, self.nodes, self.usage_count]):
             self.update_nodes()
         self.build()
-
-        GraphForwardContext.current()._trigger_before_graph(self, inputs)
-
-        usage_count = self.usage_count.copy()
-        tensor_map: Dict[Tensor, Tensor] = {}
-        for st, at in zip(self.inputs, inputs):
-            tensor_map[st] = at
-
-        num_operators = len(self.nodes)
-        for idx, node in enumerate(self.nodes):
-            # prepare node inputs
-            node_inputs = []
-            for node_input in node.inputs:
-                if node_input.storage is None:
-                    # symbolic input
-                    node_inputs.append(tensor_map[node_input])
-                    usage_count[node_input] -= 1
-                    if usage_count[node_input] == 0:
-                        # free the memory
-                        del tensor_map[node_input]
-                else:
-                    # constant input
-                    node_inputs.append(node_input)
-
-            # run node
-            GraphForwardContext.current()._trigger_before_operator(node, node_inputs)
-            logger.debug('[%4d/%d] run operator %s', idx, num_operators, node.name)
-            logger.debug('   inputs: %s', [x.signature() for x in node_inputs])
-            node_outputs = node.imperative_run(node_inputs)
-            logger.debug('  outputs: %s', [x.signature() for x in node_outputs])
-            GraphForwardContext.current()._trigger_after_operator(node, node_inputs, node_outputs)
-
-            # update map
-            for node_output, symbolic_output in zip(node_outputs, node.outputs):
-                tensor_map[symbolic_output] = node_output
-
-        outputs = []
-        for graph_output in self.outputs:
-            if graph_output in tensor_map:
-                outputs.append(tensor_map[graph_output])
-            elif graph_output.storage is not None:
-                outputs.append(graph_output)  # constant output, not the graph input or produced by any operator
-            else:
-                raise RuntimeError('Graph output {} is not produced by any operator.'.format(graph_output.signature()))
-
-        GraphForwardContext.current()._trigger_after_graph(self, inputs, outputs)
-        return outputs[0] if len(outputs) == 1 else outputs
+        return CompiledGraph(self, reuse_memory=True)
 
     def dummy_inputs(self) -> List[Tensor]:
         inputs = []
@@ -276,6 +253,9 @@ class FlowGraph:
     def save(self, model_file: str):
         """Save the flow graph to a file.
 
+        The weights are stored as page-aligned raw blobs after the graph, so that :meth:`load` can map them into
+        memory without copying. See :mod:`hidet.graph.ir.model_file` for the format.
+
         Parameters
         ----------
         model_file: str
@@ -284,34 +264,46 @@ class FlowGraph:
         # before save, clear the packed func cache because ctypes object can not be pickled
         for node in self.nodes:
             node.task_func = None
-        self.usage_count, self.nodes = None, None
-
-        dirname = os.path.dirname(model_file)
-        os.makedirs(dirname, exist_ok=True)
-        # save to a temporary file first, in case pickle fails.
-        with open(model_file + '.temp', 'wb') as f:
-            pickle.dump(self, f)
-        os.rename(model_file + '.temp', model_file)
+        self.usage_count, self.nodes, self._compiled_graph = None, None, None
+        save_model(self, model_file)
 
     @staticmethod
-    def load(model_file: str) -> FlowGraph:
+    def load(model_file: str, device: Optional[Union[Device, str]] = None, lazy: bool = True) -> FlowGraph:
         """Load a flow graph from a file.
 
+        The weights kept on CPU share the memory-mapped pages of the file, and the weights on other devices are
+        streamed to the device in chunks. The files saved as a plain pickle by the previous versions are also
+        supported, whose weights are always read when the file is loaded.
+
         Parameters
         ----------
         model_file: str
             The path to the flow graph.
 
+        device: Optional[Union[Device, str]]
+            The device to load the flow graph to. If None, each tensor is loaded to the device it was saved from.
+
+        lazy: bool
+            Whether the pages of the weights kept on CPU are only read from the file on first access, instead of
+            advising the operating system to read ahead the whole file. It only affects the memory-mapped reading of
+            the weights: the weight tensors are always created when the model is loaded.
+
         Returns
         -------
         ret: FlowGraph
             The loaded flow graph.
         """
-        with open(model_file, 'rb') as f:
-            ret = pickle.load(f)
+        if is_model_file(model_file):
+            ret = load_model(model_file, device=device, lazy=lazy)
+        else:
+            with open(model_file, 'rb') as f:
+                ret = pickle.load(f)
         if not isinstance(ret, FlowGraph):
             raise TypeError('Expect to load FlowGraph, got {}'.format(type(ret)))
         ret.update_nodes()
+        if device is not None:
+            # the weights of the model files are loaded to the device directly, and the other tensors are moved
+            place_graph(ret, instantiate_device(device))
         return ret
 
     def update_nodes(self):
@@ -347,6 +339,29 @@ class FlowGraph:
 
         return CudaGraph(self)
 
+    def bucketed(self, buckets: Dict[str, Sequence[int]], use_cuda_graph: bool = False, optimize: bool = True):
+        """Create a BucketedGraph that serves the symbolic dimensions with the graphs pre-built for shape buckets.
+
+        Parameters
+        ----------
+        buckets: Dict[str, Sequence[int]]
+            The buckets of each symbolic dimension, indexed by the name of the symbol var.
+
+        use_cuda_graph: bool
+            Whether to capture the pre-built graphs as cuda graphs.
+
+        optimize: bool
+            Whether to optimize the specialized graphs.
+
+        Returns
+        -------
+        ret: hidet.graph.ir.bucketed_graph.BucketedGraph
+            The created bucketed graph.
+        """
+        from hidet.graph.ir.bucketed_graph import BucketedGraph
+
+        return BucketedGraph(self, buckets, use_cuda_graph=use_cuda_graph, optimize=optimize)
+
     def latency(
         self, warmup=1, number=3, repeat=3, median=True, dummy_inputs: Optional[Sequence[Tensor]] = None
     ) -> Union[float, List[float]]:
@@ -523,5 +538,5 @@ def save_graph(graph: FlowGraph, fname: str):
     graph.save(fname)
 
 
-def load_graph(fname: str) -> FlowGraph:
-    return FlowGraph.load(fname)
+def load_graph(fname: str, device: Optional[Union[Device, str]] = None, lazy: bool = True) -> FlowGraph:
+    return FlowGraph.load(fname, device=device, lazy=lazy)
@@ -0,0 +1,99 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Static memory planning for the intermediate tensors of a graph.
+
+Given the size and the lifetime of each tensor, the planner assigns each tensor an offset in a single arena, such that
+the tensors whose lifetimes overlap do not overlap in the arena. The tensors are placed greedily from the largest to
+the smallest one, and each tensor is placed in the smallest gap that fits it (best-fit), following
+"Efficient Memory Management for Deep Neural Net Inference" (Pisarchyk and Lee, 2020).
+"""
+from typing import List, Sequence, Tuple
+
+
+class MemoryPlan:
+    """
+    The memory plan of a group of tensors.
+
+    Attributes
+    ----------
+    offsets: List[int]
+        The offset of each tensor in the arena, in bytes.
+
+    peak_size: int
+        The size of the arena, in bytes.
+
+    total_size: int
+        The total size of the tensors (aligned), which would be the peak memory if no memory is reused.
+    """
+
+    def __init__(self, offsets: List[int], peak_size: int, total_size: int):
+        self.offsets: List[int] = offsets
+        self.peak_size: int = peak_size
+        self.total_size: int = total_size
+
+    def __str__(self):
+        from hidet.runtime.storage import nbytes2str
+
+        return 'MemoryPlan(tensors={}, peak={}, without reuse={})'.format(
+            len(self.offsets), nbytes2str(self.peak_size), nbytes2str(self.total_size)
+        )
+
+    def __repr__(self):
+        return str(self)
+
+
+def plan_memory(sizes: Sequence[int], lifetimes: Sequence[Tuple[int, int]], alignment: int = 256) -> MemoryPlan:
+    """
+    Plan the memory of a group of tensors.
+
+    Parameters
+    ----------
+    sizes: Sequence[int]
+        The size of each tensor, in bytes.
+
+    lifetimes: Sequence[Tuple[int, int]]
+        The lifetime of each tensor, given by the index of the first and the last instruction (both inclusive) that
+        use the tensor. Two tensors can share memory only when their lifetimes do not overlap.
+
+    alignment: int
+        The alignment of the offsets, in bytes.
+
+    Returns
+    -------
+    ret: MemoryPlan
+        The memory plan.
+    """
+    if len(sizes) != len(lifetimes):
+        raise ValueError(
+            'Expect the same number of sizes and lifetimes, got {} and {}.'.format(len(sizes), len(lifetimes))
+        )
+    aligned_sizes = [(size + alignment - 1) // alignment * alignment for size in sizes]
+    offsets: List[int] = [-1] * len(sizes)
+    placed: List[int] = []
+    for i in sorted(range(len(sizes)), key=lambda i: (-aligned_sizes[i], lifetimes[i][0], i)):
+        first, last = lifetimes[i]
+        # the placed tensors that are alive together with the current one, ordered by their offsets
+        conflicts = sorted(
+            (j for j in placed if lifetimes[j][0] <= last and first <= lifetimes[j][1]), key=lambda j: offsets[j]
+        )
+        best_offset, best_gap = None, None
+        prev_end = 0
+        for j in conflicts:
+            gap = offsets[j] - prev_end
+            if gap >= aligned_sizes[i] and (best_gap is None or gap < best_gap):
+                best_offset, best_gap = prev_end, gap
+            prev_end = max(prev_end, offsets[j] + aligned_sizes[j])
+        offsets[i] = prev_end if best_offset is None else best_offset
+        placed.append(i)
+    peak_size = max((offset + size for offset, size in zip(offsets, aligned_sizes)), default=0)
+    return MemoryPlan(offsets, peak_size, sum(aligned_sizes))
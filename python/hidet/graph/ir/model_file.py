@@ -0,0 +1,240 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+The model file format of flow graphs.
+
+A model file has three sections:
+
+1. A fixed-size prelude with the magic bytes, the format version, the size of the graph section, and the offset of
+   the weight section.
+2. The graph section: the pickled flow graph, where every tensor with storage is replaced by a reference to its blob.
+3. The weight section: the raw bytes of the tensors, each blob aligned to the page size.
+
+:func:`load_model` memory-maps the weight section, and wraps the blobs of the CPU tensors as tensors without copying.
+The pages are read from the file on first access, and are shared through the page cache by all the processes on the
+same host that load the same file. The blobs of the tensors on other devices are streamed to the device in chunks.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+import ctypes
+import io
+import mmap
+import os
+import pickle
+import struct
+import hidet.cuda
+from hidet.ir.type import data_type
+from hidet.runtime.device import Device, instantiate_device
+from hidet.runtime.storage import Storage
+from hidet.graph.tensor import Tensor
+
+MAGIC = b'HIDETMDL'
+VERSION = 1
+
+# magic, version, reserved, size of the graph section, offset of the weight section
+_prelude = struct.Struct('<8sIIQQ')
+
+# the size of the chunks used to stream the weights to the device
+_chunk_size = 64 * 1024 * 1024
+
+
+def _align(offset: int, alignment: int) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def is_model_file(model_file: str) -> bool:
+    """
+    Check whether a file is in the model file format, rather than a plain pickled flow graph.
+
+    Parameters
+    ----------
+    model_file: str
+        The path of the file.
+
+    Returns
+    -------
+    ret: bool
+        True if the file starts with the magic bytes of the model file format.
+    """
+    with open(model_file, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class _GraphPickler(pickle.Pickler):
+    def __init__(self, file, alignment: int):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.alignment: int = alignment
+        self.tensors: List[Tensor] = []
+        self.offsets: List[int] = []
+        self.tensor2ref: Dict[int, Tuple[Any, ...]] = {}
+        self.end: int = 0
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, Tensor) or obj.storage is None:
+            return None
+        if id(obj) not in self.tensor2ref:
+            if obj.trace is not None:
+                raise ValueError('Can not save the tensor {} with storage that is produced by an operator.'.format(obj))
+            offset = _align(self.end, self.alignment)
+            self.end = offset + obj.nbytes
+            self.tensors.append(obj)
+            self.offsets.append(offset)
+            ref = ('tensor', offset, obj.nbytes, obj.shape, obj.dtype.name, str(obj.device), obj.layout)
+            self.tensor2ref[id(obj)] = ref
+        return self.tensor2ref[id(obj)]
+
+
+class _GraphUnpickler(pickle.Unpickler):
+    def __init__(self, file, weights: mmap.mmap, weights_addr: int, device: Optional[Device]):
+        super().__init__(file)
+        self.weights: mmap.mmap = weights
+        self.weights_addr: int = weights_addr
+        self.device: Optional[Device] = device
+        self.ref2tensor: Dict[int, Tensor] = {}
+
+    def persistent_load(self, pid):
+        kind, offset, nbytes, shape, dtype, device, layout = pid
+        if kind != 'tensor':
+            raise pickle.UnpicklingError('Unknown persistent id {}'.format(pid))
+        if offset not in self.ref2tensor:
+            device = self.device if self.device is not None else instantiate_device(device)
+            storage = self.storage_of(offset, nbytes, device)
+            self.ref2tensor[offset] = Tensor(shape, data_type(dtype), device, storage, layout)
+        return self.ref2tensor[offset]
+
+    def storage_of(self, offset: int, nbytes: int, device: Device) -> Storage:
+        addr = self.weights_addr + offset
+        if device.is_cpu():
+            # the storage refers to the mapped pages directly, and keeps the mapping alive until it is freed
+            def free_handler(storage: Storage):
+                storage.addr = 0
+                del storage.mapping
+
+            storage = Storage(device, addr, nbytes, free_handler)
+            storage.mapping = self.weights
+            return storage
+        if not device.is_cuda():
+            raise ValueError('Can not load the weights to device {}'.format(device))
+        storage = Storage.new(device, nbytes)
+        with device:
+            for start in range(0, nbytes, _chunk_size):
+                hidet.cuda.memcpy(storage.addr + start, addr + start, min(_chunk_size, nbytes - start))
+        return storage
+
+
+def place_graph(graph, device: Device):
+    """
+    Place a loaded flow graph on a device in place: the symbolic tensors are placed on the device, and the weights
+    on the other devices are copied to it.
+
+    Parameters
+    ----------
+    graph: FlowGraph
+        The loaded flow graph, whose nodes have been updated.
+
+    device: Device
+        The device to place the flow graph on.
+    """
+    # pylint: disable=protected-access
+    tensors: Dict[int, Tensor] = {}
+    for tensor in graph.inputs + graph.outputs:
+        tensors[id(tensor)] = tensor
+    for node in graph.nodes:
+        for tensor in node.inputs + node.outputs:
+            tensors[id(tensor)] = tensor
+        if len(node.inputs) == 0 and 'device' in node.attrs:
+            node.attrs['device'] = device
+    for tensor in tensors.values():
+        if tensor.device == device:
+            continue
+        if tensor.storage is not None:
+            tensor._storage = tensor.to(device=device).storage
+        tensor._device = device
+
+
+def save_model(graph, model_file: str):
+    """
+    Save a flow graph to a model file.
+
+    Parameters
+    ----------
+    graph: FlowGraph
+        The flow graph to save.
+
+    model_file: str
+        The path of the model file.
+    """
+    alignment = mmap.PAGESIZE
+    buffer = io.BytesIO()
+    pickler = _GraphPickler(buffer, alignment)
+    pickler.dump(graph)
+    header = buffer.getvalue()
+    weights_offset = _align(_prelude.size + len(header), alignment)
+
+    dirname = os.path.dirname(model_file)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    # save to a temporary file first, in case the saving fails
+    with open(model_file + '.temp', 'wb') as f:
+        f.write(_prelude.pack(MAGIC, VERSION, 0, len(header), weights_offset))
+        f.write(header)
+        for tensor, offset in zip(pickler.tensors, pickler.offsets):
+            f.seek(weights_offset + offset)
+            storage = tensor.storage if tensor.device.is_cpu() else tensor.storage.cpu()
+            f.write((ctypes.c_char * tensor.nbytes).from_address(storage.addr))
+        f.seek(weights_offset + _align(pickler.end, alignment))
+        f.truncate()
+    os.replace(model_file + '.temp', model_file)
+
+
+def load_model(model_file: str, device: Optional[Union[Device, str]] = None, lazy: bool = True):
+    """
+    Load a flow graph from a model file.
+
+    Parameters
+    ----------
+    model_file: str
+        The path of the model file.
+
+    device: Optional[Union[Device, str]]
+        The device to load the weights to. If None, each weight is loaded to the device it was saved from. The
+        symbolic tensors are placed on the device by :func:`place_graph`.
+
+    lazy: bool
+        Whether the pages of the weights kept on CPU are only read from the file on first access. Otherwise, the
+        operating system is advised to read ahead the whole weight section (``MADV_WILLNEED``). In both cases, the
+        weight tensors are created when the model is loaded, and the weights on other devices are copied to the
+        device immediately.
+
+    Returns
+    -------
+    ret: FlowGraph
+        The loaded flow graph.
+    """
+    if device is not None:
+        device = instantiate_device(device)
+    with open(model_file, 'rb') as f:
+        magic, version, _, header_size, weights_offset = _prelude.unpack(f.read(_prelude.size))
+        if magic != MAGIC:
+            raise ValueError('{} is not a hidet model file.'.format(model_file))
+        if version != VERSION:
+            raise ValueError('Unsupported model file version {} of {}.'.format(version, model_file))
+        header = f.read(header_size)
+        weights_size = os.fstat(f.fileno()).st_size - weights_offset
+        if weights_size > 0:
+            # a private mapping shares the clean pages with the other processes mapping the same file
+            weights = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            if not lazy and hasattr(mmap, 'MADV_WILLNEED'):
+                weights.madvise(mmap.MADV_WILLNEED)
+            weights_addr = ctypes.addressof(ctypes.c_char.from_buffer(weights)) + weights_offset
+        else:
+            weights, weights_addr = None, 0
+    return _GraphUnpickler(io.BytesIO(header), weights, weights_addr, device).load()
@@ -89,5 +89,6 @@ class Module:
         for name, submodule in self.submodules.items():
             submodule.to_cuda()
         for name, parameter in self.parameters.items():
-            self.parameters[name] = parameter.cuda()
+            if parameter is not None:
+                self.parameters[name] = parameter.cuda()
         return self
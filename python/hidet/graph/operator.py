@@ -13,10 +13,12 @@ from typing import List, Optional, Dict, Any, Union
 
 from hidet.ir.dtypes import float16, bfloat16, float32
 from hidet.ir.task import Task
+from hidet.ir.utils.symbol_utils import bind_symbols, eval_shape
 from hidet.runtime.module import CompiledFunction
 from hidet.graph.tensor import empty, empty_like, Tensor
 from hidet.ffi.ffi import get_last_error, BackendException
 from hidet.runtime.device import Device, instantiate_device
+from hidet.utils import prod
 
 
 def get_operator_name(op, given_name: Optional[str] = None):
@@ -83,16 +85,57 @@ class Operator:
             outputs = self.outputs
         return outputs[idx]
 
+    def view_offset(self) -> Optional[int]:
+        """
+        The offset of the output in the storage of the first input, in bytes, when the output of this operator is a
+        view of its first input (e.g., a reshape of a row-major tensor). Otherwise, None.
+
+        The views are created without launching the task of the operator, both when the operator runs eagerly and in
+        a compiled graph.
+
+        Returns
+        -------
+        ret: Optional[int]
+            The offset of the output, or None when the output is not a view of the first input.
+        """
+        return None
+
+    def view_run(self, inputs: List[Tensor], offset: int) -> List[Tensor]:
+        x = inputs[0]
+        shape = self.task.outputs[0].const_shape()
+        if len(self.task.symbols) > 0:
+            bindings = bind_symbols([self.task.inputs[0].const_shape()], [x.shape])
+            shape = eval_shape(shape, bindings)
+        layout = x.layout.__class__(shape)
+        if offset == 0:
+            storage = x.storage
+        else:
+            storage = x.storage.view(offset, prod(shape) * x.dtype.nbytes)
+        return [Tensor(shape=shape, dtype=x.dtype, device=x.device, storage=storage, layout=layout, trace=None)]
+
     def imperative_run(self, inputs: List[Tensor]) -> List[Tensor]:
+        offset = self.view_offset()
+        if offset is not None:
+            return self.view_run(inputs, offset)
         self.build_task_func()
         assert len(inputs) + len(self.task.outputs) == len(self.task.parameters)
         output_types = [output.type for output in self.task.parameters[-len(self.task.outputs) :]]
-        outputs = [
-            empty(shape=type.const_shape(), dtype=type.dtype.name, device=self.device, layout=type.layout)
-            for type in output_types
-        ]
-
-        self.task_func(*inputs, *outputs)
+        symbols = self.task.symbols
+        if len(symbols) == 0:
+            outputs = [
+                empty(shape=type.const_shape(), dtype=type.dtype.name, device=self.device, layout=type.layout)
+                for type in output_types
+            ]
+            self.task_func(*inputs, *outputs)
+        else:
+            # the symbolic dimensions are bound by the shapes of the inputs
+            input_types = [tensor.type for tensor in self.task.parameters[: len(inputs)]]
+            bindings = bind_symbols([t.const_shape() for t in input_types], [tensor.shape for tensor in inputs])
+            outputs = [
+                empty(shape=eval_shape(type.const_shape(), bindings), dtype=type.dtype.name, device=self.device)
+                for type in output_types
+            ]
+            self.task_func(*inputs, *outputs, *[bindings[symbol] for symbol in symbols])
 
         status = get_last_error()
         if status is not None:
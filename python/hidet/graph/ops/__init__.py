@@ -13,12 +13,16 @@
 from . import definitions
 
 from .definitions.conv2d import conv2d, conv2d_winograd, conv2d_gemm, conv2d_gemm_image_transform
+from .definitions.conv2d import conv2d_channel_last, conv2d_gemm_channel_last
 from .definitions.conv2d_transpose import conv2d_transpose, conv2d_transpose_gemm
 from .definitions.conv3d import conv3d, conv3d_gemm
 from .definitions.matmul import batch_matmul, matmul
 from .definitions.pool import avg_pool2d, avg_pool3d, adaptive_avg_pool1d, adaptive_avg_pool2d, adaptive_avg_pool3d
 from .definitions.pool import max_pool2d, max_pool3d, adaptive_max_pool1d, adaptive_max_pool2d, adaptive_max_pool3d
+from .definitions.pool import max_pool2d_channel_last, avg_pool2d_channel_last
+from .definitions.pool import adaptive_avg_pool2d_channel_last, adaptive_max_pool2d_channel_last
 from .definitions.softmax import softmax
+from .definitions.attention import attention
 from .definitions.activation import relu, leaky_relu, sigmoid, clip, relu6, prelu, gelu
 from .definitions.norm import batch_norm_infer, instance_norm, layer_norm
 from .definitions.image import resize2d
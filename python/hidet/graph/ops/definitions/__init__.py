@@ -40,18 +40,20 @@ from .compare import equal, less, greater, less_equal, greater_equal, logical_no
 from .transform import squeeze, unsqueeze, flatten, concat, cast, take, rearrange, strided_slice, split, pad, conv_pad
 from .pool import avg_pool2d, adaptive_avg_pool1d, adaptive_avg_pool2d, adaptive_avg_pool3d
 from .pool import max_pool2d, adaptive_max_pool1d, adaptive_max_pool2d, adaptive_max_pool3d
+from .pool import max_pool2d_channel_last, avg_pool2d_channel_last
+from .pool import adaptive_avg_pool2d_channel_last, adaptive_max_pool2d_channel_last
 from .softmax import softmax
 from .activation import relu, sigmoid, relu6, clip, prelu
 from .norm import batch_norm_infer, instance_norm
 from .image import resize2d
 from .cumulative import cumsum
 from .special import barrier
-from .conv2d import conv2d
+from .conv2d import conv2d, conv2d_channel_last
 from .conv2d_transpose import conv2d_transpose
 from .matmul import batch_matmul, matmul
 
 from .matmul import BatchMatmulOp, MatmulOp
-from .conv2d import Conv2dOp
+from .conv2d import Conv2dOp, Conv2dChannelLastOp
 from .arithmetic import ErfOp, PowOp, AddOp, SubtractOp, MultiplyOp, DivideOp, WhereOp
 from .compare import EqualOp
 from .reduce import ReduceSumOp, ReduceMeanOp
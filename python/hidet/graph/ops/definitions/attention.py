@@ -0,0 +1,143 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List, Optional
+from hidet.ir import primitives as prim
+from hidet.ir.func import IRModule
+from .utils import Task, Operator, Tensor, TensorNode, compute, input_like, reduce, broadcast_indices, can_broadcast
+
+
+class AttentionTask(Task):
+    def __init__(self, q: TensorNode, k: TensorNode, v: TensorNode, mask: Optional[TensorNode], scale: float):
+        q_shape, k_shape, v_shape = q.const_shape(), k.const_shape(), v.const_shape()
+        batch_shape = q_shape[:-2]
+        q_size, head_size = q_shape[-2:]
+        kv_size, v_head_size = v_shape[-2:]
+        score_shape = batch_shape + [q_size, kv_size]
+
+        self.q_shape: List[int] = q_shape
+        self.k_shape: List[int] = k_shape
+        self.v_shape: List[int] = v_shape
+        self.mask_shape: Optional[List[int]] = mask.const_shape() if mask is not None else None
+        self.scale: float = scale
+
+        dtype = q.ttype.dtype
+
+        def fscore(*indices):
+            bs, i, j = indices[:-2], indices[-2], indices[-1]
+            score = reduce(shape=[head_size], fcompute=lambda d: q[bs + (i, d)] * k[bs + (d, j)], reduce_type='sum')
+            score = score * dtype(scale)
+            if mask is not None:
+                score = score + mask[broadcast_indices(indices, self.mask_shape, score_shape)]
+            return score
+
+        score = compute(name='score', shape=score_shape, fcompute=fscore)
+        max_score = compute(
+            name='max_score',
+            shape=batch_shape + [q_size],
+            fcompute=lambda *indices: reduce(
+                shape=[kv_size], fcompute=lambda j: score[indices + (j,)], reduce_type='max'
+            ),
+        )
+        exp_score = compute(
+            name='exp_score',
+            shape=score_shape,
+            fcompute=lambda *indices: prim.exp(score[indices] - max_score[indices[:-1]]),
+        )
+        sum_score = compute(
+            name='sum_score',
+            shape=batch_shape + [q_size],
+            fcompute=lambda *indices: reduce(
+                shape=[kv_size], fcompute=lambda j: exp_score[indices + (j,)], reduce_type='sum'
+            ),
+        )
+        o = compute(
+            name='o',
+            shape=batch_shape + [q_size, v_head_size],
+            fcompute=lambda *indices: reduce(
+                shape=[kv_size],
+                fcompute=lambda j: exp_score[indices[:-1] + (j,)] * v[indices[:-2] + (j, indices[-1])],
+                reduce_type='sum',
+            )
+            / sum_score[indices[:-1]],
+        )
+        super().__init__(
+            name='attention',
+            inputs=[q, k, v] if mask is None else [q, k, v, mask],
+            outputs=[o],
+            attributes={'scale': scale, 'has_mask': mask is not None},
+        )
+
+    def implement_cuda(self, workding_dir: str) -> IRModule:
+        # pylint: disable=import-outside-toplevel
+        from hidet.graph.ops.schedules.cuda.attention import attention_cuda_schedule
+
+        return attention_cuda_schedule(self)
+
+    def implement_cpu(self, workding_dir: str) -> IRModule:
+        # pylint: disable=import-outside-toplevel
+        from hidet.graph.ops.schedules.cpu.attention import attention_cpu_schedule
+
+        return attention_cpu_schedule(self)
+
+
+class AttentionOp(Operator):
+    def __init__(self, q: Tensor, k: Tensor, v: Tensor, mask: Optional[Tensor] = None, scale: float = 1.0):
+        if not (
+            len(q.shape) == len(k.shape) == len(v.shape) >= 2
+            and q.shape[:-2] == k.shape[:-2] == v.shape[:-2]
+            and q.shape[-1] == k.shape[-2]
+            and k.shape[-1] == v.shape[-2]
+        ):
+            raise ValueError(
+                'Attention expects q, k and v with shape [..., Lq, D], [..., D, Lk] and [..., Lk, Dv]'
+                + ', got {}, {} and {}'.format(q.shape, k.shape, v.shape)
+            )
+        score_shape = list(q.shape[:-1]) + [k.shape[-1]]
+        if mask is not None and not can_broadcast(mask.shape, score_shape):
+            raise ValueError('Can not broadcast the mask with shape {} to {}'.format(mask.shape, score_shape))
+        inputs = [q, k, v] if mask is None else [q, k, v, mask]
+        task = AttentionTask(
+            input_like(q, 'q'),
+            input_like(k, 'k'),
+            input_like(v, 'v'),
+            input_like(mask, 'mask') if mask is not None else None,
+            scale,
+        )
+        super().__init__(inputs=inputs, task=task, attributes={'scale': scale})
+
+
+def attention(q: Tensor, k: Tensor, v: Tensor, mask: Optional[Tensor] = None, scale: float = 1.0) -> Tensor:
+    """
+    Scaled dot-product attention, softmax(scale * (q @ k) + mask) @ v.
+
+    The scores of the queries and keys are not materialized: the keys and values are visited in tiles, and the
+    softmax is computed online.
+
+    Parameters
+    ----------
+    q: Tensor
+        The queries with shape [..., Lq, D].
+    k: Tensor
+        The transposed keys with shape [..., D, Lk].
+    v: Tensor
+        The values with shape [..., Lk, Dv].
+    mask: Optional[Tensor]
+        The additive mask of the scores, which can be broadcast to shape [..., Lq, Lk].
+    scale: float
+        The scale of the scores.
+
+    Returns
+    -------
+    ret: Tensor
+        The attended values with shape [..., Lq, Dv].
+    """
+    return AttentionOp(q, k, v, mask, scale).get_output(0)
@@ -11,6 +11,7 @@
 # limitations under the License.
 from .conv2d import conv2d
 from .conv2d import Conv2dOp
+from .conv2d import conv2d_channel_last, Conv2dChannelLastOp
 from .conv2d_winograd import conv2d_winograd, conv2d_winograd_image_transform, conv2d_winograd_filter_transform
 from .conv2d_winograd import conv2d_winograd_inverse_transform
 from .conv2d_winograd import Conv2dWinogradInverseTransformOp, Conv2dWinogradFilterTransformOp
@@ -18,6 +19,9 @@ from .conv2d_winograd import Conv2dWinogradImageTransformOp
 from .conv2d_gemm import conv2d_gemm, conv2d_gemm_image_transform, conv2d_gemm_filter_transform
 from .conv2d_gemm import conv2d_gemm_inverse_transform
 from .conv2d_gemm import Conv2dGemmImageTransformOp
+from .conv2d_gemm import conv2d_gemm_channel_last, conv2d_gemm_image_transform_channel_last
+from .conv2d_gemm import conv2d_gemm_filter_transform_channel_last, conv2d_gemm_inverse_transform_channel_last
+from .conv2d_gemm import Conv2dGemmImageTransformChannelLastOp
 
 
 from . import resolve
@@ -63,6 +63,55 @@ class Conv2dOp(Operator):
         )
 
 
+class Conv2dChannelLastTask(Task):
+    def __init__(self, data: TensorNode, weight: TensorNode, stride: List[int], dilations: List[int], groups: int):
+        # pylint: disable=too-many-locals
+        n, h, w, c = data.const_shape()
+        oc, wc, kx, ky = weight.const_shape()
+        sx, sy = stride
+        dilx, dily = dilations
+        p, q = (h - dilx * (kx - 1) - 1) // sx + 1, (w - dily * (ky - 1) - 1) // sy + 1
+        if c % groups != 0 or oc % groups != 0:
+            raise ValueError(
+                'Conv2d expect the in_channels % groups == 0 and out_channels % groups == 0, \n'
+                'but got in_channels, out_channels, groups: {}, {}, {}'.format(c, oc, groups)
+            )
+        if wc * groups != c:
+            raise ValueError(
+                'Conv2d expect the weight has shape [out_channels, in_channels / groups, kx, ky], \n'
+                'got weight shape {}, in_channels {} and groups {}'.format([oc, wc, kx, ky], c, groups)
+            )
+        out_group_size = oc // groups
+        output = compute(
+            name='out',
+            shape=[n, p, q, oc],
+            fcompute=lambda ni, pi, qi, oci: reduce(
+                shape=[wc, kx, ky],
+                fcompute=lambda wci, kxi, kyi: (
+                    data[ni, pi * sx + kxi * dilx, qi * sy + kyi * dily, (oci // out_group_size) * wc + wci]
+                    * weight[oci, wci, kxi, kyi]
+                ),
+                reduce_type='sum',
+            ),
+        )
+        self.channels = c
+        self.stride = stride
+        self.groups = groups
+        super().__init__(name='conv2d_channel_last', inputs=[data, weight], outputs=[output])
+
+
+class Conv2dChannelLastOp(Operator):
+    def __init__(self, x: Tensor, w: Tensor, stride: Sequence[int], dilations: Union[int, Sequence[int]], groups: int):
+        stride = normalize_stride(stride)
+        if isinstance(dilations, int):
+            dilations = [dilations, dilations]
+        super().__init__(
+            inputs=[x, w],
+            task=Conv2dChannelLastTask(input_like(x, 'x'), input_like(w, 'w'), stride, dilations, groups),
+            attributes={'stride': stride, 'groups': groups, 'dilations': dilations},
+        )
+
+
 def conv2d(
     data: Tensor,
     weight: Tensor,
@@ -71,3 +120,34 @@ def conv2d(
     groups: int = 1,
 ) -> Tensor:
     return Conv2dOp(data, weight, stride, dilations, groups).get_output(0)
+
+
+def conv2d_channel_last(
+    data: Tensor,
+    weight: Tensor,
+    stride: Union[int, Sequence[int]],
+    dilations: Union[int, Sequence[int]] = (1, 1),
+    groups: int = 1,
+) -> Tensor:
+    """
+    Conv2d on the data in channels-last layout.
+
+    Parameters
+    ----------
+    data: Tensor
+        The data with shape [n, h, w, c].
+    weight: Tensor
+        The weight with shape [oc, c / groups, kx, ky], the same as the one of :func:`conv2d`.
+    stride: Union[int, Sequence[int]]
+        The stride of the convolution.
+    dilations: Union[int, Sequence[int]]
+        The dilations of the convolution.
+    groups: int
+        The number of groups.
+
+    Returns
+    -------
+    ret: Tensor
+        The output with shape [n, p, q, oc].
+    """
+    return Conv2dChannelLastOp(data, weight, stride, dilations, groups).get_output(0)
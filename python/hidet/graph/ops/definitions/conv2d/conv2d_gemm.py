@@ -49,12 +49,51 @@ class Conv2dGemmImageTransformOp(Operator):
         )
 
 
+class Conv2dGemmImageTransformChannelLastTask(Task):
+    def __init__(self, x: TensorNode, kernel: List[int], stride: List[int], dilations: List[int], groups: int):
+        n, h, w, c = x.const_shape()
+        kx, ky = kernel
+        sx, sy = stride
+        dilx, dily = dilations
+        p, q = (h - dilx * (kx - 1) - 1) // sx + 1, (w - dily * (ky - 1) - 1) // sy + 1
+        if c % groups != 0:
+            msg = 'Conv2d expect in_channels % groups == 0, but got in_channels {} and groups {}'.format(c, groups)
+            raise ValueError(msg)
+        gc = c // groups  # group channels
+        # the reduction dimension is ordered as (kx, ky, gc), so that the channels are the innermost, as in the data
+        gemm_x = compute(
+            name='gemm_x',
+            shape=[groups, n * p * q, kx * ky * gc],
+            fcompute=lambda g, i, k: x[
+                i // (p * q), i // q % p * sx + k // (ky * gc) * dilx, i % q * sy + k // gc % ky * dily, g * gc + k % gc
+            ],
+        )
+        super().__init__(name='conv2d_gemm_image_transform_channel_last', inputs=[x], outputs=[gemm_x])
+
+
+class Conv2dGemmImageTransformChannelLastOp(Operator):
+    def __init__(self, x: Tensor, kernel, stride, dilations, groups):
+        kernel = normalize_kernel(kernel)
+        stride = normalize_stride(stride)
+        super().__init__(
+            inputs=[x],
+            task=Conv2dGemmImageTransformChannelLastTask(input_like(x, 'x'), kernel, stride, dilations, groups),
+            attributes={'kernel': kernel, 'stride': stride, 'groups': groups, 'dilations': dilations},
+        )
+
+
 def conv2d_gemm_image_transform(
     x: Tensor, kernel: List[int], stride: List[int], dilations: List[int], groups: int = 1
 ) -> Tensor:
     return Conv2dGemmImageTransformOp(x, kernel, stride, dilations, groups).get_output(0)
 
 
+def conv2d_gemm_image_transform_channel_last(
+    x: Tensor, kernel: List[int], stride: List[int], dilations: List[int], groups: int = 1
+) -> Tensor:
+    return Conv2dGemmImageTransformChannelLastOp(x, kernel, stride, dilations, groups).get_output(0)
+
+
 def conv2d_gemm_filter_transform(w: Tensor, groups: int = 1) -> Tensor:
     # weight shape: [oc, c, kx, ky]
     # output shape: [groups, c * kx * ky, ogc] where ogc = oc // groups
@@ -67,6 +106,18 @@ def conv2d_gemm_filter_transform(w: Tensor, groups: int = 1) -> Tensor:
     return w
 
 
+def conv2d_gemm_filter_transform_channel_last(w: Tensor, groups: int = 1) -> Tensor:
+    # weight shape: [oc, c, kx, ky]
+    # output shape: [groups, kx * ky * c, ogc] where ogc = oc // groups
+    oc, c, kx, ky = w.shape
+    if oc % groups != 0:
+        raise ValueError('invalid conv2d groups {} for out channels {}'.format(groups, oc))
+    ogc = oc // groups
+    w = w.reshape([groups, ogc, c, kx, ky])  # [groups, ogc, c, kx, ky]
+    w = w.rearrange([[0], [3, 4, 2], [1]])  # [groups, kx * ky * c, ogc]
+    return w
+
+
 def conv2d_gemm_inverse_transform(gemm_y: Tensor, out_height, out_width) -> Tensor:
     # gemm_y shape: [groups, n * p * q, ogc]
     # output shape: [n, oc, p, q] where oc = groups * ogc
@@ -79,6 +130,21 @@ def conv2d_gemm_inverse_transform(gemm_y: Tensor, out_height, out_width) -> Tens
     return y
 
 
+def conv2d_gemm_inverse_transform_channel_last(gemm_y: Tensor, out_height, out_width) -> Tensor:
+    # gemm_y shape: [groups, n * p * q, ogc]
+    # output shape: [n, p, q, oc] where oc = groups * ogc
+    p, q = out_height, out_width
+    groups, npq, ogc = gemm_y.shape
+    assert npq % (p * q) == 0
+    n = npq // (p * q)
+    if groups == 1:
+        # the gemm output is already in channels-last layout, thus the reshape is a view of it
+        return gemm_y.reshape([n, p, q, ogc])
+    y = gemm_y.reshape([groups, n, p, q, ogc])
+    y = y.rearrange([[1], [2], [3], [0, 4]])
+    return y
+
+
 def conv2d_gemm(data: Tensor, weight: Tensor, stride, dilations: List[int], groups: int = 1) -> Tensor:
     gemm_x = conv2d_gemm_image_transform(
         data, kernel=weight.shape[2:], stride=stride, dilations=dilations, groups=groups
@@ -89,3 +155,16 @@ def conv2d_gemm(data: Tensor, weight: Tensor, stride, dilations: List[int], grou
     y_shape = infer_conv2d_shape(data.shape, weight.shape, stride, groups, dilations)
     y = conv2d_gemm_inverse_transform(gemm_y, out_height=y_shape[2], out_width=y_shape[3])
     return y
+
+
+def conv2d_gemm_channel_last(data: Tensor, weight: Tensor, stride, dilations: List[int], groups: int = 1) -> Tensor:
+    gemm_x = conv2d_gemm_image_transform_channel_last(
+        data, kernel=weight.shape[2:], stride=stride, dilations=dilations, groups=groups
+    )
+    gemm_w = conv2d_gemm_filter_transform_channel_last(weight, groups=groups)
+    gemm_y = matmul(gemm_x, gemm_w)
+
+    n, h, w, c = data.shape
+    y_shape = infer_conv2d_shape([n, c, h, w], weight.shape, stride, groups, dilations)
+    y = conv2d_gemm_inverse_transform_channel_last(gemm_y, out_height=y_shape[2], out_width=y_shape[3])
+    return y
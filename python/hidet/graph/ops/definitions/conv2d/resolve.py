@@ -14,7 +14,7 @@ from hidet.graph.ir import Operator, Tensor
 from hidet.graph import ops
 from hidet.graph.transforms import ResolveRule, register_resolve_rule
 
-from .conv2d import Conv2dOp
+from .conv2d import Conv2dOp, Conv2dChannelLastOp
 
 
 @register_resolve_rule(Conv2dOp)
@@ -39,3 +39,19 @@ class Conv2dResolveRule(ResolveRule):
             # implicit gemm algorithm
             out = ops.conv2d_gemm(data, weight, stride, dilations, groups)
         return [out]
+
+
+@register_resolve_rule(Conv2dChannelLastOp)
+class Conv2dChannelLastResolveRule(ResolveRule):
+    def resolve(self, op: Operator) -> Optional[List[Tensor]]:
+        assert isinstance(op, Conv2dChannelLastOp)
+        stride = ops.utils.normalize_stride(op.attrs['stride'])
+        groups = op.attrs['groups']
+        dilations = op.attrs['dilations']
+        channels = op.inputs[1].shape[0]
+        if groups == channels:
+            return None  # use depthwise schedule in the default Task
+        data, weight = op.inputs
+        # implicit gemm algorithm, whose output needs no transform when there is a single group
+        out = ops.conv2d_gemm_channel_last(data, weight, stride, dilations, groups)
+        return [out]
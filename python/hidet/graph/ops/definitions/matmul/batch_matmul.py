@@ -48,6 +48,12 @@ class BatchMatmulTask(Task):
         else:
             raise ValueError('Can not recognize mma type {}, candidates: {}'.format(self.mma, ['simt', 'wmma', 'mma']))
 
+    def implement_cpu(self, workding_dir: str) -> IRModule:
+        # pylint: disable=import-outside-toplevel
+        from hidet.graph.ops.schedules.cpu.matmul import batched_matmul_cpu_schedule
+
+        return batched_matmul_cpu_schedule(self, workding_dir)
+
 
 class BatchMatmulOp(Operator):
     def __init__(self, a: Tensor, b: Tensor, mma: str = 'simt'):
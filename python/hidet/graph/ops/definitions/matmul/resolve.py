@@ -99,7 +99,10 @@ class MatmulResolveRule(ResolveRule):
         mma = self.get_config('mma', default='simt')  # 'simt', 'mma', 'wmma'
 
         batch_size, m_size, n_size, k_size = a.shape[0], a.shape[1], b.shape[2], a.shape[2]
-        if parallel_k == 'default':
+        if a.device.type == 'cpu':
+            # the cpu kernel distributes the blocks of c among threads, splitting k only adds an extra reduction
+            nparts = 1
+        elif parallel_k == 'default':
             nparts = parallel_k_heuristic_nparts(batch_size, m_size, n_size, k_size)
         elif parallel_k == 'search':
             nparts = parallel_k_search_nparts(a.dtype.name, mma, batch_size, m_size, n_size, k_size)
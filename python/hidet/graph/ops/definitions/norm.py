@@ -10,11 +10,92 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from typing import List
-from .utils import Tensor, normalize_dim
+from hidet.ir import primitives as prim
+from hidet.ir.func import IRModule
+from hidet.utils import prod
+from .utils import Task, Operator, Tensor, TensorNode, compute, input_like, normalize_dim, reduce
 from .arithmetic import square, rsqrt
 
 
+class LayerNormTask(Task):
+    def __init__(self, x: TensorNode, num_last_dims: int, epsilon: float):
+        shape = x.const_shape()
+        rank = len(shape)
+        outer_shape = shape[: rank - num_last_dims]
+        norm_shape = shape[rank - num_last_dims :]
+        norm_size = prod(norm_shape)
+
+        self.x_shape = shape
+        self.num_last_dims = num_last_dims
+        self.epsilon = epsilon
+
+        dtype = x.ttype.dtype
+        num_outer_dims = len(outer_shape)
+
+        def centered(indices, ks):
+            return x[indices + ks] - mean[indices[:num_outer_dims]]
+
+        mean = compute(
+            name='mean',
+            shape=outer_shape,
+            fcompute=lambda *indices: reduce(shape=norm_shape, fcompute=lambda *ks: x[indices + ks], reduce_type='sum')
+            / norm_size,
+        )
+        variance = compute(
+            name='variance',
+            shape=outer_shape,
+            fcompute=lambda *indices: reduce(
+                shape=norm_shape,
+                fcompute=lambda *ks: centered(indices, ks) * centered(indices, ks),
+                reduce_type='sum',
+            )
+            / norm_size,
+        )
+        y = compute(
+            name='y',
+            shape=shape,
+            fcompute=lambda *indices: centered(indices[:num_outer_dims], indices[num_outer_dims:])
+            * prim.rsqrt(variance[indices[:num_outer_dims]] + dtype(epsilon)),
+        )
+        super().__init__(
+            name='layer_norm',
+            inputs=[x],
+            outputs=[y],
+            attributes={'num_last_dims': num_last_dims, 'epsilon': epsilon},
+        )
+
+    def implement_cuda(self, workding_dir: str) -> IRModule:
+        # pylint: disable=import-outside-toplevel
+        from hidet.graph.ops.schedules.cuda.norm import layer_norm_cuda_schedule
+
+        return layer_norm_cuda_schedule(self)
+
+    def implement_cpu(self, workding_dir: str) -> IRModule:
+        # pylint: disable=import-outside-toplevel
+        from hidet.graph.ops.schedules.cpu.norm import layer_norm_cpu_schedule
+
+        return layer_norm_cpu_schedule(self)
+
+
+class LayerNormOp(Operator):
+    def __init__(self, x: Tensor, num_last_dims: int = 1, epsilon: float = 1e-5):
+        if not 0 < num_last_dims <= len(x.shape):
+            raise ValueError(
+                'Can not normalize the last {} dimensions of a tensor with shape {}'.format(num_last_dims, x.shape)
+            )
+        super().__init__(
+            inputs=[x],
+            task=LayerNormTask(input_like(x, 'x'), num_last_dims, epsilon),
+            attributes={'num_last_dims': num_last_dims, 'epsilon': epsilon},
+        )
+
+
 def normalize(x: Tensor, dims: List[int], epsilon: float = 1e-5) -> Tensor:
+    rank = len(x.shape)
+    dims = sorted(normalize_dim(dims, rank))
+    if len(dims) > 0 and dims == list(range(rank - len(dims), rank)) and x.dtype.is_float():
+        # the normalized dimensions are the last ones, each row is normalized in one pass by the fused operator
+        return LayerNormOp(x, len(dims), epsilon).get_output(0)
     x = x - x.mean(dims, keep_dim=True)
     variance = square(x).mean(dims, keep_dim=True)
     return x * rsqrt(variance + epsilon)
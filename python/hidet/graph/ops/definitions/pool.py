@@ -48,6 +48,37 @@ class Pool2dTask(Task):
         super().__init__(name='{}_pool2d'.format(reduce_type), inputs=[x], outputs=[y])
 
 
+class Pool2dChannelLastTask(Task):
+    def __init__(self, x: TensorNode, kernel, strides, padding, reduce_type: str):
+        assert reduce_type in ['max', 'avg']
+        kernel = normalize_kernel(kernel)
+        strides = normalize_stride(strides)
+        padding = normalize_padding(padding)
+        batch_size, height, width, channels = x.const_shape()
+        out_height = (height + padding[0] + padding[2] - kernel[0]) // strides[0] + 1
+        out_width = (width + padding[1] + padding[3] - kernel[1]) // strides[1] + 1
+        pad_value = convert(0.0 if reduce_type == 'avg' else -1e30, dtype=x.type.dtype)
+        pad = compute(
+            name='pad',
+            shape=[batch_size, height + padding[0] + padding[2], width + padding[1] + padding[3], channels],
+            fcompute=lambda n, h, w, c: if_then_else(
+                LogicalAnd.join(padding[0] <= h, h < height + padding[0], padding[1] <= w, w < width + padding[1]),
+                x[n, h - padding[0], w - padding[1], c],
+                pad_value,
+            ),
+        )
+        y = compute(
+            name='y',
+            shape=[batch_size, out_height, out_width, channels],
+            fcompute=lambda n, h, w, c: reduce(
+                shape=[kernel[0], kernel[1]],
+                fcompute=lambda rx, ry: pad[n, h * strides[0] + rx, w * strides[1] + ry, c],
+                reduce_type=reduce_type,
+            ),
+        )
+        super().__init__(name='{}_pool2d_channel_last'.format(reduce_type), inputs=[x], outputs=[y])
+
+
 class Pool3dTask(Task):
     def __init__(self, x: TensorNode, kernel, strides, padding, reduce_type: str):
         assert reduce_type in ['max', 'avg']
@@ -137,6 +168,44 @@ class AdaptivePoolTask(Task):
         )
 
 
+class AdaptivePoolChannelLastTask(Task):
+    def __init__(self, x: TensorNode, output_size: Sequence[int], reduce_type: str):
+        assert reduce_type in ['max', 'avg']
+        x_shape: List[int] = x.const_shape()  # [N, D1, D2, ..., C]
+        output_size: List[int] = normalize_output(output_size, len(x_shape) - 2)
+        y_shape: List[int] = x_shape[:1] + output_size + x_shape[-1:]
+        spatial_ndim = len(output_size)
+
+        def grid_compute(*y_indices: Expr):
+            start_indices: List[Expr] = []
+            reduce_shape: List[Expr] = []
+            for dim in range(spatial_ndim):
+                extent, out_extent = x_shape[dim + 1], y_shape[dim + 1]
+                start = y_indices[dim + 1] * extent / out_extent
+                end = ((1 + y_indices[dim + 1]) * extent + out_extent - 1) / out_extent
+                start_indices.append(start)
+                reduce_shape.append(end - start)
+
+            def reduce_compute(*reduce_indices: Expr) -> Expr:
+                x_indices: List[Expr] = [y_indices[0]]
+                for dim in range(spatial_ndim):
+                    x_indices.append(start_indices[dim] + reduce_indices[dim])
+                x_indices.append(y_indices[-1])
+                return x[x_indices]
+
+            return reduce(
+                shape=reduce_shape, fcompute=reduce_compute, reduce_type=reduce_type, accumulate_dtype=x.type.dtype.name
+            )
+
+        y = compute(name='y', shape=y_shape, fcompute=grid_compute)
+        super().__init__(
+            name='adaptive_{}_pool{}d_channel_last'.format(reduce_type, spatial_ndim),
+            inputs=[x],
+            outputs=[y],
+            attributes={'output_size': output_size},
+        )
+
+
 class MaxPool2dOp(Operator):
     def __init__(
         self,
@@ -152,6 +221,21 @@ class MaxPool2dOp(Operator):
         )
 
 
+class MaxPool2dChannelLastOp(Operator):
+    def __init__(
+        self,
+        x: Tensor,
+        kernel: Union[int, Sequence[int]],
+        stride: Union[int, Sequence[int]],
+        padding: Union[int, Sequence[int]],
+    ):
+        super().__init__(
+            inputs=[x],
+            task=Pool2dChannelLastTask(input_like(x, 'x'), kernel, stride, padding, reduce_type='max'),
+            attributes={'kernel': kernel, 'stride': stride, 'padding': padding},
+        )
+
+
 class MaxPool3dOp(Operator):
     def __init__(
         self,
@@ -182,6 +266,21 @@ class AvgPool2dOp(Operator):
         )
 
 
+class AvgPool2dChannelLastOp(Operator):
+    def __init__(
+        self,
+        x: Tensor,
+        kernel: Union[int, Sequence[int]],
+        stride: Union[int, Sequence[int]],
+        padding: Union[int, Sequence[int]],
+    ):
+        super().__init__(
+            inputs=[x],
+            task=Pool2dChannelLastTask(input_like(x, 'x'), kernel, stride, padding, reduce_type='avg'),
+            attributes={'kernel': kernel, 'stride': stride, 'padding': padding},
+        )
+
+
 class AvgPool3dOp(Operator):
     def __init__(
         self,
@@ -243,6 +342,32 @@ class AdaptiveMaxPool3dOp(AdaptivePoolOp):
         super().__init__(x, output_size, reduce_type='max', attrs={'output_size': output_size}, spatial_ndim=3)
 
 
+class AdaptivePoolChannelLastOp(Operator):
+    def __init__(self, x: Tensor, output_size, reduce_type: str, attrs: Dict[str, Any], spatial_ndim: int):
+        if len(x.shape) != spatial_ndim + 2:
+            raise ValueError(
+                'Adaptive{}Pool{}d expects {}D input, got {}D one.'.format(
+                    reduce_type.capitalize(), spatial_ndim, spatial_ndim + 2, len(x.shape)
+                )
+            )
+        output_size = normalize_output(output_size, spatial_ndim)
+        super().__init__(
+            inputs=[x],
+            task=AdaptivePoolChannelLastTask(input_like(x, 'x'), output_size, reduce_type=reduce_type),
+            attributes=attrs,
+        )
+
+
+class AdaptiveAvgPool2dChannelLastOp(AdaptivePoolChannelLastOp):
+    def __init__(self, x: Tensor, output_size: Union[int, Sequence[int]]):
+        super().__init__(x, output_size, reduce_type='avg', attrs={'output_size': output_size}, spatial_ndim=2)
+
+
+class AdaptiveMaxPool2dChannelLastOp(AdaptivePoolChannelLastOp):
+    def __init__(self, x: Tensor, output_size: Union[int, Sequence[int]]):
+        super().__init__(x, output_size, reduce_type='max', attrs={'output_size': output_size}, spatial_ndim=2)
+
+
 def max_pool2d(x: Tensor, kernel, stride, padding) -> Tensor:
     return MaxPool2dOp(x, kernel, stride, padding).get_output(0)
 
@@ -281,3 +406,19 @@ def adaptive_max_pool2d(x: Tensor, output_size: Union[int, Sequence[int]]) -> Te
 
 def adaptive_max_pool3d(x: Tensor, output_size: Union[int, Sequence[int]]) -> Tensor:
     return AdaptiveMaxPool3dOp(x, output_size).get_output(0)
+
+
+def max_pool2d_channel_last(x: Tensor, kernel, stride, padding) -> Tensor:
+    return MaxPool2dChannelLastOp(x, kernel, stride, padding).get_output(0)
+
+
+def avg_pool2d_channel_last(x: Tensor, kernel, stride, padding) -> Tensor:
+    return AvgPool2dChannelLastOp(x, kernel, stride, padding).get_output(0)
+
+
+def adaptive_avg_pool2d_channel_last(x: Tensor, output_size: Union[int, Sequence[int]]) -> Tensor:
+    return AdaptiveAvgPool2dChannelLastOp(x, output_size).get_output(0)
+
+
+def adaptive_max_pool2d_channel_last(x: Tensor, output_size: Union[int, Sequence[int]]) -> Tensor:
+    return AdaptiveMaxPool2dChannelLastOp(x, output_size).get_output(0)
@@ -63,6 +63,12 @@ class SoftmaxTask(Task):
 
         return softmax_cuda_schedule(self)
 
+    def implement_cpu(self, workding_dir: str) -> IRModule:
+        # pylint: disable=import-outside-toplevel
+        from hidet.graph.ops.schedules.cpu.softmax import softmax_cpu_schedule
+
+        return softmax_cpu_schedule(self)
+
 
 class SoftmaxOp(Operator):
     def __init__(self, x: Tensor, axis: int = 1):
@@ -11,11 +11,13 @@
 # limitations under the License.
 from typing import List, Optional, Union, Sequence
 from hidet.ir.type import DataType, data_type
-from hidet.ir.expr import LogicalAnd, if_then_else, convert
+from hidet.ir.expr import Expr, LogicalAnd, if_then_else, convert
 from hidet.ir.layout import RowMajorLayout, ColumnMajorLayout
 from hidet.ir.utils import index_deserialize, index_serialize
+from hidet.ir.utils.symbol_utils import is_static_shape, bind_symbols, eval_shape
 from hidet.utils import prod
 from .utils import Task, InverseMap, Operator, Tensor, TensorNode, compute, input_like, normalize_dim, can_broadcast
+from .utils import same_numel, divide_numel
 
 
 def same_shape(shape_a: Sequence[int], shape_b: Sequence[int]) -> bool:
@@ -25,7 +27,7 @@ def same_shape(shape_a: Sequence[int], shape_b: Sequence[int]) -> bool:
 class ReshapeTask(Task):
     def __init__(self, x: TensorNode, y_shape: List[int]):
         x_shape = x.const_shape()
-        if prod(x_shape) != prod(y_shape):
+        if not same_numel(x_shape, y_shape):
             raise ValueError(
                 'Can not reshape {} to {} because they have different number '
                 'of elements: {} vs {}'.format(x_shape, y_shape, prod(x_shape), prod(y_shape))
@@ -37,6 +39,9 @@ class ReshapeTask(Task):
             )
 
         def index_map(dst_indices, src_shape, dst_shape):
+            if not (is_static_shape(src_shape) and is_static_shape(dst_shape)):
+                # the groups of dimensions can not be matched by their sizes, use the flattened index directly
+                return index_deserialize(index_serialize(dst_indices, dst_shape), src_shape)
             src_groups = []
             dst_groups = []
             i, j = 0, 0
@@ -91,6 +96,17 @@ class ReshapeTask(Task):
         )
 
 
+def is_unit(extent: Union[int, Expr]) -> bool:
+    return isinstance(extent, int) and extent == 1
+
+
+def rearrange_keeps_order(shape: Sequence[Union[int, Expr]], plan: List[List[int]]) -> bool:
+    # a rearrangement that only groups the dimensions in order and inserts or removes the unit dimensions keeps the
+    # row-major order of the elements, thus the rearranged tensor is a view of the original one
+    dims = [dim for group in plan for dim in group]
+    return [d for d in dims if not is_unit(shape[d])] == [d for d in range(len(shape)) if not is_unit(shape[d])]
+
+
 class RearrangeTask(Task):
     def __init__(self, x: TensorNode, plan: List[List[int]]):
         x_shape = x.const_shape()
@@ -299,38 +315,37 @@ class ReshapeOp(Operator):
                     )
                 shape[i] = origin_shape[i]
         size = prod(origin_shape)
-        cnt = sum(1 for v in shape if v == -1)
+        cnt = sum(1 for v in shape if isinstance(v, int) and v == -1)
         if cnt == 0:
-            if prod(shape) != size:
+            if not same_numel(shape, origin_shape):
                 raise ValueError(
                     'Reshape: given shape has different size with input tensor: '
                     'shape {} and size {}'.format(shape, size)
                 )
             return shape
         elif cnt == 1:
-            remain_size = prod([v for v in shape if v != -1])
-            if size % remain_size != 0:
+            remain_shape = [v for v in shape if not (isinstance(v, int) and v == -1)]
+            remain_size = divide_numel(origin_shape, remain_shape)
+            if remain_size is None:
                 raise ValueError(
                     'Given shape is incompatible with input tensor: ' 'shape {} and size {}'.format(shape, size)
                 )
-            return [v if v != -1 else size // remain_size for v in shape]
+            return [v if not (isinstance(v, int) and v == -1) else remain_size for v in shape]
         else:
             raise ValueError('Can not infer the shape when there are multiple -1: {}'.format(shape))
 
-    def imperative_run(self, inputs: List[Tensor]) -> List[Tensor]:
-        x = inputs[0]
-        if isinstance(x.layout, (RowMajorLayout, ColumnMajorLayout)):
-            shape = self.task.outputs[0].const_shape()
-            layout = x.layout.__class__(shape)
-            return [Tensor(shape=shape, dtype=x.dtype, device=x.device, storage=x.storage, layout=layout, trace=None)]
-        else:
-            return Operator.imperative_run(self, inputs)
+    def view_offset(self) -> Optional[int]:
+        return 0 if isinstance(self.inputs[0].layout, RowMajorLayout) else None
 
 
 class RearrangeOp(Operator):
     def __init__(self, x: Tensor, plan: List[List[int]]):
         super().__init__(inputs=[x], task=RearrangeTask(input_like(x, 'x'), plan=plan), attributes={'plan': plan})
 
+    def view_offset(self) -> Optional[int]:
+        x, plan = self.inputs[0], self.attrs['plan']
+        return 0 if isinstance(x.layout, RowMajorLayout) and rearrange_keeps_order(x.shape, plan) else None
+
 
 class SqueezeOp(Operator):
     def __init__(self, x: Tensor, dims: List[int]):
@@ -340,14 +355,8 @@ class SqueezeOp(Operator):
             attributes={'dims': dims},
         )
 
-    def imperative_run(self, inputs: Optional[List[Tensor]] = None) -> List[Tensor]:
-        x = inputs[0] if inputs else self.inputs[0]
-        if isinstance(x.layout, (RowMajorLayout, ColumnMajorLayout)):
-            shape = self.task.outputs[0].const_shape()
-            layout = x.layout.__class__(shape)
-            return [Tensor(shape=shape, dtype=x.dtype, device=x.device, storage=x.storage, layout=layout, trace=None)]
-        else:
-            return Operator.imperative_run(self, inputs)
+    def view_offset(self) -> Optional[int]:
+        return 0 if isinstance(self.inputs[0].layout, (RowMajorLayout, ColumnMajorLayout)) else None
 
 
 class UnsqueezeOp(Operator):
@@ -364,14 +373,8 @@ class UnsqueezeOp(Operator):
         assert c == len(x.shape)
         super().__init__(inputs=[x], task=RearrangeTask(input_like(x, 'x'), plan=plan), attributes={'dims': dims})
 
-    def imperative_run(self, inputs: Optional[List[Tensor]] = None) -> List[Tensor]:
-        x = inputs[0] if inputs else self.inputs[0]
-        if isinstance(x.layout, (RowMajorLayout, ColumnMajorLayout)):
-            shape = self.task.outputs[0].const_shape()
-            layout = x.layout.__class__(shape)
-            return [Tensor(shape=shape, dtype=x.dtype, device=x.device, storage=x.storage, layout=layout, trace=None)]
-        else:
-            return Operator.imperative_run(self, inputs)
+    def view_offset(self) -> Optional[int]:
+        return 0 if isinstance(self.inputs[0].layout, (RowMajorLayout, ColumnMajorLayout)) else None
 
 
 class FlattenOp(Operator):
@@ -388,14 +391,8 @@ class FlattenOp(Operator):
             attributes={'start_dim': start_dim, 'end_dim': end_dim},
         )
 
-    def imperative_run(self, inputs: List[Tensor]) -> List[Tensor]:
-        x = inputs[0] if inputs else self.inputs[0]
-        if isinstance(x.layout, (RowMajorLayout, ColumnMajorLayout)):
-            shape = self.task.outputs[0].const_shape()
-            layout = x.layout.__class__(shape)
-            return [Tensor(shape=shape, dtype=x.dtype, device=x.device, storage=x.storage, layout=layout, trace=None)]
-        else:
-            return Operator.imperative_run(self, inputs)
+    def view_offset(self) -> Optional[int]:
+        return 0 if isinstance(self.inputs[0].layout, RowMajorLayout) else None
 
 
 class PermuteDimsOp(Operator):
@@ -410,6 +407,12 @@ class PermuteDimsOp(Operator):
         plan = [[v] for v in axes]
         super().__init__(inputs=[x], task=RearrangeTask(input_like(x, 'x'), plan), attributes={'axes': axes})
 
+    def view_offset(self) -> Optional[int]:
+        # e.g., the transpose of a row or column vector
+        x = self.inputs[0]
+        plan = [[v] for v in self.attrs['axes']]
+        return 0 if isinstance(x.layout, RowMajorLayout) and rearrange_keeps_order(x.shape, plan) else None
+
 
 class CastOp(Operator):
     def __init__(self, x: Tensor, dtype: DataType):
@@ -460,6 +463,28 @@ class StridedSliceOp(Operator):
             inputs=[data], task=task, attributes={'starts': starts, 'ends': ends, 'axes': axes, 'strides': strides}
         )
 
+    def view_offset(self) -> Optional[int]:
+        # the slice is contiguous in a row-major tensor, when the dimensions after a sliced dimension are kept whole,
+        # and the dimensions before it are indexed by a single index
+        x = self.inputs[0]
+        in_shape, out_shape = list(x.shape), self.task.outputs[0].const_shape()
+        if not (isinstance(x.layout, RowMajorLayout) and is_static_shape(in_shape) and prod(out_shape) > 0):
+            return None
+        starts, strides = [0 for _ in in_shape], [1 for _ in in_shape]
+        for axis, start, stride in zip(self.attrs['axes'], self.attrs['starts'], self.attrs['strides']):
+            starts[axis], strides[axis] = start, stride
+        dim = len(in_shape) - 1
+        while dim >= 0 and starts[dim] == 0 and out_shape[dim] == in_shape[dim] and strides[dim] == 1:
+            dim -= 1
+        if dim >= 0 and strides[dim] != 1 and out_shape[dim] > 1:
+            return None
+        if any(out_shape[d] != 1 for d in range(dim)):
+            return None
+        offset = 0
+        for start, extent in zip(starts, in_shape):
+            offset = offset * extent + start
+        return offset * x.dtype.nbytes
+
     @staticmethod
     def normalize(data_shape, starts, ends, axes: Optional[List[int]], strides: Optional[List[Optional[int]]]):
         # follow: https://data-apis.org/array-api/latest/API_specification/indexing.html
@@ -13,7 +13,7 @@
 from typing import Tuple, List, Union, Sequence, Optional
 import builtins
 from hidet.ir.layout import DataLayout
-from hidet.ir.expr import Var, Expr
+from hidet.ir.expr import Var, Expr, Constant
 from hidet.ir.type import TensorType, tensor_type, DataType
 from hidet.ir.task import Task, InverseMap
 from hidet.ir.func import IRModule
@@ -114,12 +114,72 @@ def resolve_out_dtype(input_dtypes: Sequence[Union[DataType, str]]) -> str:
     return out_dtype.name
 
 
+def same_dim(a: Union[int, Expr], b: Union[int, Expr]) -> bool:
+    """
+    Check whether two dimensions are the same. A symbolic dimension only equals to itself.
+    """
+    if isinstance(a, Expr) or isinstance(b, Expr):
+        return a is b
+    return a == b
+
+
+def is_unit_dim(dim: Union[int, Expr]) -> bool:
+    return isinstance(dim, int) and dim == 1
+
+
+def _size_factors(shape: Sequence[Union[int, Expr]]) -> Tuple[int, List[Expr]]:
+    # split the number of elements into the static part and the symbolic factors
+    from hidet.ir.expr import Multiply
+
+    static_size, factors = 1, []
+    dims = list(shape)
+    while len(dims) > 0:
+        dim = dims.pop()
+        if isinstance(dim, (int, Constant)):
+            static_size *= int(dim)
+        elif isinstance(dim, Multiply):
+            dims.extend([dim.a, dim.b])
+        else:
+            factors.append(dim)
+    return static_size, factors
+
+
+def same_numel(x_shape: Sequence[Union[int, Expr]], y_shape: Sequence[Union[int, Expr]]) -> bool:
+    """
+    Check whether two shapes have the same number of elements. The symbolic dimensions are compared by identity.
+    """
+    x_static, x_factors = _size_factors(x_shape)
+    y_static, y_factors = _size_factors(y_shape)
+    return x_static == y_static and sorted(id(v) for v in x_factors) == sorted(id(v) for v in y_factors)
+
+
+def divide_numel(
+    x_shape: Sequence[Union[int, Expr]], y_shape: Sequence[Union[int, Expr]]
+) -> Optional[Union[int, Expr]]:
+    """
+    Get the number of elements of x_shape divided by the one of y_shape, or None if it is not divisible.
+    """
+    x_static, x_factors = _size_factors(x_shape)
+    y_static, y_factors = _size_factors(y_shape)
+    for factor in y_factors:
+        idx = next((i for i, v in enumerate(x_factors) if v is factor), None)
+        if idx is None:
+            return None
+        del x_factors[idx]
+    if x_static % y_static != 0:
+        return None
+    quotient: Union[int, Expr] = x_static // y_static
+    for factor in x_factors:
+        quotient = factor if is_unit_dim(quotient) else quotient * factor
+    return quotient
+
+
 def can_broadcast(src_shape: Sequence[int], dst_shape: Sequence[int]) -> bool:
     if len(dst_shape) < len(src_shape):
         return False
     src_shape = [1 for _ in range(len(dst_shape) - len(src_shape))] + list(src_shape)
     for a, b in zip(src_shape, dst_shape):
-        if a not in [1, b]:
+        if not (is_unit_dim(a) or same_dim(a, b)):
             return False
     return True
 
@@ -130,7 +190,7 @@ def can_mutually_broadcast(x_shape: Sequence[int], y_shape: Sequence[int]) -> bo
         x_shape = [1] + x_shape
     while len(y_shape) < len(x_shape):
         y_shape = [1] + y_shape
-    return all(p == q or p == 1 or q == 1 for p, q in zip(x_shape, y_shape))
+    return all(same_dim(p, q) or is_unit_dim(p) or is_unit_dim(q) for p, q in zip(x_shape, y_shape))
 
 
 def broadcast_shape(x_shape: Sequence[int], y_shape: Sequence[int]) -> List[int]:
@@ -146,9 +206,9 @@ def broadcast_shape(x_shape: Sequence[int], y_shape: Sequence[int]) -> List[int]
         y_shape = [1] + y_shape
     result_shape = []
     for p, q in zip(x_shape, y_shape):
-        if p != q and p != 1 and q != 1:
+        if not (same_dim(p, q) or is_unit_dim(p) or is_unit_dim(q)):
             raise ValueError('can not broadcast two arrays with shape {} and {}'.format(orig_shapes[0], orig_shapes[1]))
-        result_shape.append(builtins.max(p, q))
+        result_shape.append(q if is_unit_dim(p) else p)
     return result_shape
 
 
@@ -169,7 +229,7 @@ def broadcast_indices(
     pad_dim = len(out_shape) - len(shape)
     indices = list(indices[pad_dim:])
     for idx, dim in enumerate(shape):
-        if int(dim) == 1:
+        if isinstance(dim, (int, Constant)) and int(dim) == 1:
             indices[idx] = 0
     return indices
 
@@ -9,22 +9,26 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Union, List, Dict, Sequence, Tuple, Set
+from typing import Union, List, Dict, Sequence, Tuple, Set, Optional
+import logging
 
 from hidet.ir.type import tensor_pointer_type, void_pointer
-from hidet.ir.expr import TensorElement, Expr, Var, scalar_var, convert, cast
+from hidet.ir.expr import TensorElement, Expr, Var, SymbolVar, Constant, Dereference, scalar_var, convert, cast
 from hidet.ir.stmt import Stmt, AssignStmt, ForStmt, DeclareStmt, BufferStoreStmt
 from hidet.ir.task import Task
 from hidet.ir.func import IRModule, Function
 from hidet.ir.builders import FunctionBuilder, StmtBuilder
 from hidet.ir.functors import ExprRewriter, ExprVisitor, ComputeVisitor, ComputeRewriter
-from hidet.ir.tools import collect, rewrite, infer_type, simplify_to_int
+from hidet.ir.tools import rewrite, infer_type, simplify
 from hidet.ir.compute import ScalarInput, TensorInput, GridCompute, ReduceCompute, ArgReduceCompute
 from hidet.ir.compute import TensorNode, ScalarNode
 from hidet.ir.primitives.runtime import request_cuda_workspace, request_cpu_workspace
 from hidet.ir.dtypes import uint8, int32
 from hidet.utils import prod, DirectedGraph
 from hidet.utils.namer import Namer
+from hidet.graph.ir.memory_planner import MemoryPlan, plan_memory
+
+logger = logging.getLogger(__name__)
 
 
 class ScalarComputeFound(Exception):
@@ -69,6 +73,37 @@ class GridComputeInlineChecker(ExprVisitor, ComputeVisitor):
         raise ScalarComputeFound()
 
 
+class AccessedTensorCollector(ExprVisitor, ComputeVisitor):
+    """
+    Collect the tensor nodes accessed directly by an expression.
+
+    The input scalars of a reduce compute may contain the reduce computes of the accessed tensors, which should not
+    be treated as accessed, thus only the value of a reduce compute is visited.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.accessed: List[TensorNode] = []
+
+    def collect(self, e: Expr) -> List[TensorNode]:
+        self.visit(e)
+        return self.accessed
+
+    def visit_TensorInput(self, node: TensorInput):
+        self.accessed.append(node)
+
+    def visit_GridCompute(self, node: GridCompute):
+        self.accessed.append(node)
+
+    def visit_ReduceCompute(self, node: ReduceCompute):
+        self.visit(node.shape)
+        self.visit(node.value)
+
+    def visit_ArgReduceCompute(self, node: ArgReduceCompute):
+        self.visit(node.extent)
+        self.visit(node.value)
+
+
 def can_inline_grid_compute(gc: GridCompute) -> bool:
     return GridComputeInlineChecker().check(gc)
 
@@ -120,20 +155,50 @@ def inline_grid_compute(nodes: List[TensorNode]) -> List[TensorNode]:
     return [inliner.inline(node) for node in nodes]
 
 
+def unravel_index(index: Expr, shape: Sequence[Union[int, Expr]]) -> List[Expr]:
+    """
+    Convert a flat index into the indices of a row-major grid with the given shape.
+
+    It is used to traverse the grids with symbolic shapes, which can not be described by task mappings.
+
+    Parameters
+    ----------
+    index: Expr
+        The flat index, which should be less than the number of elements in the grid.
+
+    shape: Sequence[Union[int, Expr]]
+        The shape of the grid.
+
+    Returns
+    -------
+    ret: List[Expr]
+        The indices of the grid.
+    """
+    indices: List[Expr] = []
+    for i, extent in enumerate(reversed(shape)):
+        if i == len(shape) - 1:
+            indices.append(index)
+        else:
+            indices.append(index % extent)
+            index = index // extent
+    return list(reversed(indices))
+
+
 class AutoScheduler:
     def __init__(self):
         super().__init__()
         self.ir_module: IRModule = IRModule()
+        # the symbol vars of the task, which are passed to all the kernels
+        self.symbols: List[SymbolVar] = []
+        # the plan of the workspace for the intermediate tensors with static shapes
+        self.memory_plan: Optional[MemoryPlan] = None
 
     @staticmethod
     def get_accessed_nodes(node: TensorNode) -> List[TensorNode]:
         if isinstance(node, TensorInput):
             return []
         elif isinstance(node, GridCompute):
-            e = node.value
-            accessed_nodes: List[TensorNode] = collect(e, TensorNode, stop_when_found=True)
-            accessed_nodes = list(set(accessed_nodes))  # remove duplicated ones
-            return accessed_nodes
+            return AccessedTensorCollector().collect(node.value)
         else:
             raise NotImplementedError()
 
@@ -151,33 +216,70 @@ class AutoScheduler:
                 dag.add_edge(accessed_node, node)
         return dag
 
-    @staticmethod
     def plan_memory(
-        dag: DirectedGraph,  # pylint: disable=unused-argument
-        order: Sequence[TensorNode],
-        require_allocate: Set[TensorNode],
-    ) -> Tuple[int, Dict[TensorNode, int]]:
-        # dag has not been used in this simple plan.
+        self, dag: DirectedGraph, order: Sequence[TensorNode], require_allocate: Set[TensorNode]
+    ) -> Tuple[Union[int, Expr], Dict[TensorNode, Union[int, Expr]]]:
+        """
+        Plan the workspace of the intermediate tensors.
+
+        The tensors are computed one by one in the given order, and each tensor is alive from its computation to the
+        computation of its last consumer in the dag. The tensors with static shapes share the workspace when their
+        lifetimes do not overlap (see :mod:`hidet.graph.ir.memory_planner`). The tensors with symbolic shapes are
+        placed after them, at the offsets computed at runtime.
+
+        Parameters
+        ----------
+        dag: DirectedGraph
+            The dag of the tensor nodes, where each edge (src, dst) indicates src is accessed by dst.
+
+        order: Sequence[TensorNode]
+            The order to compute the tensor nodes.
+
+        require_allocate: Set[TensorNode]
+            The tensor nodes that require to be allocated in the workspace.
+
+        Returns
+        -------
+        ret: Tuple[Union[int, Expr], Dict[TensorNode, Union[int, Expr]]]
+            The number of bytes of the workspace, and the offset of each tensor in the workspace.
+        """
         alignment_bytes: int = 128  # make sure each buffer aligns with 128 bytes
-        allocated_bytes: int = 0
-        buffer_offset: Dict[TensorNode, int] = {}
+        node2index: Dict[TensorNode, int] = {node: idx for idx, node in enumerate(order)}
+        static_nodes: List[TensorNode] = []
+        static_bytes: List[int] = []
+        lifetimes: List[Tuple[int, int]] = []
+        symbolic_nodes: List[Tuple[TensorNode, Expr]] = []
         for tensor in order:
             if tensor not in require_allocate:
                 continue
+            nbytes: Expr = simplify(tensor.type.storage_bytes())
+            if isinstance(nbytes, Constant):
+                first = node2index[tensor]
+                last = max((node2index[consumer] for consumer in dag.adj_list[tensor]), default=first)
+                static_nodes.append(tensor)
+                static_bytes.append(int(nbytes))
+                lifetimes.append((first, last))
+            else:
+                symbolic_nodes.append((tensor, nbytes))
+
+        self.memory_plan = plan_memory(static_bytes, lifetimes, alignment=alignment_bytes)
+        buffer_offset: Dict[TensorNode, Union[int, Expr]] = dict(zip(static_nodes, self.memory_plan.offsets))
+        allocated_bytes: Union[int, Expr] = self.memory_plan.peak_size
+        for tensor, nbytes in symbolic_nodes:
+            # the buffers with symbolic shapes are placed at the offsets computed at runtime
             buffer_offset[tensor] = allocated_bytes
-            allocated_bytes += simplify_to_int(tensor.type.storage_bytes())
-            allocated_bytes = (allocated_bytes + alignment_bytes - 1) // alignment_bytes * alignment_bytes
+            allocated_bytes = (allocated_bytes + nbytes + alignment_bytes - 1) // alignment_bytes * alignment_bytes
         return allocated_bytes, buffer_offset
 
     @staticmethod
     def allocate_tensors(
         fb: FunctionBuilder,
         device: str,
-        buffer_bytes: int,
-        buffer_offset: Dict[TensorNode, int],
+        buffer_bytes: Union[int, Expr],
+        buffer_offset: Dict[TensorNode, Union[int, Expr]],
         node_map: Dict[TensorNode, Var],
     ):
-        if buffer_bytes > 0:
+        if isinstance(buffer_bytes, Expr) or buffer_bytes > 0:
             buffer = Var('buffer', tensor_pointer_type(dtype='uint8', shape=[buffer_bytes]))
             if device == 'cuda':
                 space_ptr: Expr = request_cuda_workspace(nbytes=buffer_bytes, require_clean=False)
@@ -217,6 +319,8 @@ class AutoScheduler:
         # Plan the memory for intermediate tensors
         require_allocate = set(node for node in order if node not in task.inputs and node not in outputs)
         buffer_bytes, buffer_offset = self.plan_memory(dag, order, require_allocate)
+        if len(self.memory_plan.offsets) > 0:
+            logger.debug('Workspace of task %s: %s', task.name, self.memory_plan)
 
         # Allocate the memory for intermediate tensors, get the mapping from node to tensor var or tensor pointer var
         with FunctionBuilder(name=task.name, kind='packed_func') as fb:
@@ -233,6 +337,11 @@ class AutoScheduler:
                 params.append(param)
                 fb += DeclareStmt(param, init=cast(args[idx], param.type))
 
+            # the values of the symbol vars follow the tensor arguments
+            self.symbols = task.symbols
+            for idx, symbol in enumerate(self.symbols):
+                fb += DeclareStmt(symbol, init=Dereference(cast(args[len(params) + idx], ~int32)))
+
             # allocate memory space for intermediate tensors
             node_map: Dict[TensorNode, Var] = {a: b for a, b in zip(task.inputs + outputs, params)}
             self.allocate_tensors(fb, device, buffer_bytes, buffer_offset, node_map)
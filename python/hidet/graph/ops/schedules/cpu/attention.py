@@ -0,0 +1,154 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List, Optional
+
+from hidet.ir import IRModule
+from hidet.ir import primitives as prim
+from hidet.ir.builders import FunctionBuilder
+from hidet.ir.expr import Expr, Var, scalar_var, tensor_var, cast
+from hidet.ir.stmt import AssignStmt, BufferStoreStmt, DeclareStmt
+from hidet.ir.type import DataType
+from hidet.graph.ops.definitions.attention import AttentionTask
+from hidet.graph.ops.definitions.utils import broadcast_indices
+from hidet.graph.ops.schedules.common import params_from_task
+from hidet.transforms.tools import fuse_and_pack
+from hidet.utils import prod
+from hidet.utils.py import cdiv
+from ..auto_scheduler import unravel_index
+from .norm import accumulate_dtype, parallel_rows
+
+# the bytes of the tiles of keys and values, and of the block of queries, kept on the stack of each thread
+max_kv_tile_bytes = 128 * 1024
+max_q_block_bytes = 64 * 1024
+
+
+def attention_cpu_schedule(task: AttentionTask) -> IRModule:
+    """
+    Attention on cpu, which never materializes the scores of all the queries and keys.
+
+    The queries are split into blocks, which are distributed among the threads. For each block of queries, the keys
+    and values are visited in tiles: the scores of the block and the tile are computed in a buffer, and the running
+    maximum, sum of exponentials and weighted sum of values of each query are rescaled to the new maximum (online
+    softmax). The buffers take O(block_q * (Lk_tile + D + Dv) + Lk_tile * (D + Dv)) elements, independent of the
+    sequence lengths.
+    """
+    x_dtype: DataType = task.inputs[0].ttype.dtype
+    if not x_dtype.is_float():
+        return NotImplemented
+    acc_dtype = accumulate_dtype(x_dtype)
+    nbytes = acc_dtype.nbytes
+
+    batch_shape: List[int] = task.q_shape[:-2]
+    q_size, head_size = task.q_shape[-2:]
+    kv_size, v_head_size = task.v_shape[-2:]
+    score_shape = batch_shape + [q_size, kv_size]
+    mask_shape: Optional[List[int]] = task.mask_shape
+
+    tile_k = min(64, kv_size)
+    while tile_k > 8 and (head_size + v_head_size) * tile_k * nbytes > max_kv_tile_bytes:
+        tile_k //= 2
+    block_q = min(16, q_size)
+    while block_q > 1 and block_q * (head_size + v_head_size + tile_k) * nbytes > max_q_block_bytes:
+        block_q //= 2
+    num_q_blocks = cdiv(q_size, block_q)
+    num_batches = prod(batch_shape)
+
+    with FunctionBuilder(name=task.name + '_kernel', kind='host_kernel', label='attention schedule') as fb:
+        params = params_from_task(task)
+        if mask_shape is None:
+            q, k, v, o = params
+            mask = None
+        else:
+            q, k, v, mask, o = params
+        fb.extend_params(params)
+
+        num_tasks = num_batches * num_q_blocks
+        with fb.for_loop('w', num_tasks, parallel=parallel_rows(num_tasks, block_q * kv_size * head_size)) as w:
+            bs: List[Expr] = unravel_index(w // num_q_blocks, batch_shape)
+            q_start = (w % num_q_blocks) * block_q
+
+            q_buf = tensor_var('q_buf', [block_q, head_size], acc_dtype)
+            o_buf = tensor_var('o_buf', [block_q, v_head_size], acc_dtype)
+            s_buf = tensor_var('s_buf', [block_q, tile_k], acc_dtype)
+            k_buf = tensor_var('k_buf', [head_size, tile_k], acc_dtype)
+            v_buf = tensor_var('v_buf', [tile_k, v_head_size], acc_dtype)
+            m_buf = tensor_var('m_buf', [block_q], acc_dtype)
+            l_buf = tensor_var('l_buf', [block_q], acc_dtype)
+            for buf in [q_buf, o_buf, s_buf, k_buf, v_buf, m_buf, l_buf]:
+                fb += DeclareStmt(buf)
+
+            # the scaled queries of the block, and the initial running statistics
+            with fb.for_loop('r', block_q) as r:
+                with fb.if_then(q_start + r < q_size):
+                    with fb.for_loop('d', head_size) as d:
+                        scaled = cast(q[bs + [q_start + r, d]], acc_dtype) * acc_dtype(task.scale)
+                        fb += BufferStoreStmt(q_buf, [r, d], scaled)
+                    with fb.for_loop('e', v_head_size) as e:
+                        fb += BufferStoreStmt(o_buf, [r, e], acc_dtype.zero)
+                    fb += BufferStoreStmt(m_buf, [r], acc_dtype.min_value)
+                    fb += BufferStoreStmt(l_buf, [r], acc_dtype.zero)
+
+            def attend_tile(sb: FunctionBuilder, kv_start: Expr, size: int):
+                # the extents of the inner loops are constants, so that they can be vectorized by the compiler
+                with sb.for_loop('d', head_size) as d:
+                    with sb.for_loop('j', size) as j:
+                        sb += BufferStoreStmt(k_buf, [d, j], cast(k[bs + [d, kv_start + j]], acc_dtype))
+                with sb.for_loop('j', size) as j:
+                    with sb.for_loop('e', v_head_size) as e:
+                        sb += BufferStoreStmt(v_buf, [j, e], cast(v[bs + [kv_start + j, e]], acc_dtype))
+
+                with sb.for_loop('r', block_q) as r:
+                    with sb.if_then(q_start + r < q_size):
+                        with sb.for_loop('j', size) as j:
+                            sb += BufferStoreStmt(s_buf, [r, j], acc_dtype.zero)
+                        with sb.for_loop('d', head_size) as d:
+                            with sb.for_loop('j', size) as j:
+                                sb += BufferStoreStmt(s_buf, [r, j], s_buf[r, j] + q_buf[r, d] * k_buf[d, j])
+                        if mask is not None:
+                            with sb.for_loop('j', size) as j:
+                                indices = broadcast_indices(bs + [q_start + r, kv_start + j], mask_shape, score_shape)
+                                sb += BufferStoreStmt(s_buf, [r, j], s_buf[r, j] + cast(mask[indices], acc_dtype))
+
+                        # rescale the running statistics to the new maximum
+                        new_max: Var = scalar_var('new_max', acc_dtype)
+                        tile_sum: Var = scalar_var('tile_sum', acc_dtype)
+                        factor: Var = scalar_var('factor', acc_dtype)
+                        sb += DeclareStmt(new_max, init=m_buf[r])
+                        with sb.for_loop('j', size) as j:
+                            sb += AssignStmt(new_max, prim.max(new_max, s_buf[r, j]))
+                        sb += DeclareStmt(factor, init=prim.exp(m_buf[r] - new_max))
+                        sb += DeclareStmt(tile_sum, init=acc_dtype.zero)
+                        with sb.for_loop('j', size) as j:
+                            sb += BufferStoreStmt(s_buf, [r, j], prim.exp(s_buf[r, j] - new_max))
+                            sb += AssignStmt(tile_sum, tile_sum + s_buf[r, j])
+                        sb += BufferStoreStmt(l_buf, [r], l_buf[r] * factor + tile_sum)
+                        sb += BufferStoreStmt(m_buf, [r], new_max)
+                        with sb.for_loop('e', v_head_size) as e:
+                            sb += BufferStoreStmt(o_buf, [r, e], o_buf[r, e] * factor)
+                        with sb.for_loop('j', size) as j:
+                            with sb.for_loop('e', v_head_size) as e:
+                                sb += BufferStoreStmt(o_buf, [r, e], o_buf[r, e] + s_buf[r, j] * v_buf[j, e])
+
+            num_full_tiles, remain = kv_size // tile_k, kv_size % tile_k
+            with fb.for_loop('t', num_full_tiles) as t:
+                attend_tile(fb, t * tile_k, tile_k)
+            if remain > 0:
+                attend_tile(fb, num_full_tiles * tile_k, remain)
+
+            with fb.for_loop('r', block_q) as r:
+                with fb.if_then(q_start + r < q_size):
+                    with fb.for_loop('e', v_head_size) as e:
+                        fb += BufferStoreStmt(o, bs + [q_start + r, e], cast(o_buf[r, e] / l_buf[r], x_dtype))
+
+    func = fb.get()
+    ir_module = IRModule(funcs={func.name: func}, task=task)
+    return fuse_and_pack(ir_module, func, task)
@@ -9,42 +9,196 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import List, Dict
+from typing import List, Dict, Sequence, Optional, Union, Tuple
+import os
 
-from hidet.ir.builders import FunctionBuilder
+from hidet import option
+from hidet.ir.builders import FunctionBuilder, StmtBuilder
 from hidet.ir.compute import TensorNode, GridCompute
-from hidet.ir.expr import Call, Expr, Var, convert
-from hidet.ir.tools import collect, rewrite
+from hidet.ir.dtypes import float32
+from hidet.ir.expr import Call, Expr, Var, Constant, TensorElement, Address, convert
+from hidet.ir.primitives.cpu.avx import avx_f32x8_store
+from hidet.ir.tools import collect, rewrite, simplify, simplify_to_int
+from hidet.ir.utils.symbol_utils import is_static_shape
 from hidet.ir.stmt import Stmt, BufferStoreStmt, EvaluateStmt
-from ..auto_scheduler import AutoScheduler, ComputeExprLower
+from hidet.utils import prod
+from ..auto_scheduler import AutoScheduler, unravel_index
+from .vectorize import ComputeExprVectorizer, VectorizedComputeExprLower, NotVectorizable, avx_supported
 
 
 class CpuAutoScheduler(AutoScheduler):
+    # the grid computes with fewer elements are computed by a single thread, to avoid the overhead of thread team
+    min_parallel_elements = 1024
+
+    @staticmethod
+    def get_num_parallel_dims(shape: Sequence[int], num_threads: int) -> int:
+        """
+        Get the number of leading dimensions whose iterations are distributed among the cpu threads.
+
+        We take the fewest leading dimensions that provide enough parallelism for all threads, so that the
+        remaining inner dimensions are traversed by each thread sequentially with contiguous memory accesses.
+
+        Parameters
+        ----------
+        shape: Sequence[int]
+            The shape of the grid compute.
+
+        num_threads: int
+            The number of threads.
+
+        Returns
+        -------
+        ret: int
+            The number of leading dimensions to parallelize. Zero means no parallelization.
+        """
+        if num_threads <= 1 or prod(shape) < CpuAutoScheduler.min_parallel_elements:
+            return 0
+        num_dims = 0
+        parallel_extent = 1
+        while num_dims < len(shape) and parallel_extent < num_threads:
+            parallel_extent *= shape[num_dims]
+            num_dims += 1
+        return num_dims
+
+    @staticmethod
+    def lower_grid_compute_element(
+        node: GridCompute, param_tensors: List[TensorNode], params: List[Var], task_index: List[Expr]
+    ) -> List[Stmt]:
+        out_param: Var = params[-1]
+        param_map: Dict[TensorNode, Expr] = dict(zip(param_tensors, params))
+        compute_lower = VectorizedComputeExprLower(node.value, param_map=param_map)
+        stmts, value = compute_lower.lower()
+        rmap = {axis: axis_value for axis, axis_value in zip(node.axes, task_index)}
+        stmts, value = [rewrite(stmt, rmap) for stmt in stmts], rewrite(value, rmap)
+        return stmts + [BufferStoreStmt(out_param, task_index, value)]
+
+    @staticmethod
+    def vectorize_grid_compute(
+        node: GridCompute, param_tensors: List[TensorNode], params: List[Var]
+    ) -> Optional[Tuple[List[Stmt], Expr]]:
+        """
+        Try to vectorize the grid compute along its innermost axis.
+
+        Parameters
+        ----------
+        node: GridCompute
+            The grid compute to vectorize.
+
+        param_tensors: List[TensorNode]
+            The tensor nodes passed to the kernel.
+
+        params: List[Var]
+            The kernel parameters corresponding to the tensor nodes.
+
+        Returns
+        -------
+        ret: Optional[Tuple[List[Stmt], Expr]]
+            The statements and the float32x8 vector that compute 8 consecutive elements along the innermost axis,
+            starting at the innermost axis of the grid compute. None if the grid compute can not be vectorized.
+        """
+        lanes = ComputeExprVectorizer.lanes
+        if not avx_supported() or len(node.shape) == 0 or node.type.dtype != float32:
+            return None
+        extent: Expr = simplify(node.shape[-1])
+        if not isinstance(extent, Constant) or int(extent) < lanes:
+            return None
+        param_map: Dict[TensorNode, Expr] = dict(zip(param_tensors, params))
+        try:
+            return ComputeExprVectorizer(node.axes[-1], param_map=param_map).vectorize(node.value)
+        except NotVectorizable:
+            return None
+
+    def lower_grid_compute_chunk(
+        self,
+        node: GridCompute,
+        param_tensors: List[TensorNode],
+        params: List[Var],
+        vectorized: Tuple[List[Stmt], Expr],
+        task_index: List[Expr],
+    ) -> List[Stmt]:
+        # the last task index is the index of the chunk of 8 consecutive elements along the innermost axis
+        lanes = ComputeExprVectorizer.lanes
+        extent: int = simplify_to_int(node.shape[-1])
+        num_chunks, num_remain = extent // lanes, extent % lanes
+        chunk = task_index[-1]
+
+        vec_stmts, vec_value = vectorized
+        rmap = {axis: axis_value for axis, axis_value in zip(node.axes, task_index[:-1] + [chunk * lanes])}
+        out_addr = Address(TensorElement(params[-1], task_index[:-1] + [chunk * lanes]))
+        vec_stmts = [rewrite(stmt, rmap) for stmt in vec_stmts]
+        vec_stmts.append(EvaluateStmt(avx_f32x8_store(out_addr, rewrite(vec_value, rmap))))
+        if num_remain == 0:
+            return vec_stmts
+
+        # the last chunk has fewer than 8 elements, compute them in scalar
+        sb = StmtBuilder()
+        with sb.if_then(chunk < num_chunks):
+            sb += vec_stmts
+        with sb.otherwise():
+            with sb.for_loop('t', num_remain) as t:
+                sb += self.lower_grid_compute_element(
+                    node, param_tensors, params, task_index[:-1] + [num_chunks * lanes + t]
+                )
+        return [sb.finish()]
+
     def schedule_grid_compute(self, node: GridCompute, node_map: Dict[TensorNode, Expr]) -> Stmt:
-        # pylint: disable=too-many-locals, import-outside-toplevel, unnecessary-comprehension
-        from hidet.ir.mapping import row_repeat, TaskMapping
+        # pylint: disable=too-many-locals, import-outside-toplevel
+        from hidet.ir.mapping import row_repeat, row_spatial, TaskMapping
 
         used_tensors: List[TensorNode] = collect(node.value, TensorNode, stop_when_found=True)
         param_tensors: List[TensorNode] = used_tensors + [node]
         params: List[Var] = [Var(tensor.name, tensor.type) for tensor in param_tensors]
 
+        shape: List[Union[int, Expr]] = [simplify(extent) for extent in node.shape]
+        shape = [int(extent) if isinstance(extent, Constant) else extent for extent in shape]
+        vectorized = self.vectorize_grid_compute(node, param_tensors, params)
+        if vectorized is not None:
+            # each task computes a chunk of 8 consecutive elements along the innermost axis
+            lanes = ComputeExprVectorizer.lanes
+            shape[-1] = (shape[-1] + lanes - 1) // lanes
+
+        num_threads: Optional[int] = option.get_option('cpu_num_threads')
+        parallel: Union[int, bool] = num_threads if num_threads else True
+
+        def lower_task(task_index: List[Expr]) -> List[Stmt]:
+            if vectorized is not None:
+                return self.lower_grid_compute_chunk(node, param_tensors, params, vectorized, task_index)
+            else:
+                return self.lower_grid_compute_element(node, param_tensors, params, task_index)
+
         with FunctionBuilder(name=f'compute_{node.name}', kind='host_kernel') as fb:
             # set function parameters
-            fb.extend_params(params)
-
-            mapping: TaskMapping = row_repeat(*node.shape)
-            iter_names = [f'i{i}' for i in range(len(node.shape))]
-            with fb.for_mapping(iter_names, mapping, convert(0)) as task_index:
-                out_param: Var = params[-1]
-                param_map: Dict[TensorNode, Expr] = {
-                    tensor_node: param_var for tensor_node, param_var in zip(param_tensors, params)
-                }
-                compute_lower = ComputeExprLower(node.value, param_map=param_map)
-                stmts, value = compute_lower.lower()
-                rmap = {axis: axis_value for axis, axis_value in zip(node.axes, task_index)}
-                stmts, value = [rewrite(stmt, rmap) for stmt in stmts], rewrite(value, rmap)
-                fb += stmts
-                fb += BufferStoreStmt(out_param, task_index, value)
+            fb.extend_params(params + self.symbols)
+
+            iter_names = [f'i{i}' for i in range(len(shape))]
+            if not is_static_shape(shape):
+                # the symbolic grid can not be described by task mappings, the leading dimensions are flattened into
+                # one parallel loop, and the innermost dimension is traversed by each thread when it is static
+                num_parallel_dims = len(shape) - 1 if isinstance(shape[-1], int) else len(shape)
+                with fb.for_loop('w', prod(shape[:num_parallel_dims]), parallel=parallel) as w:
+                    task_index = unravel_index(w, shape[:num_parallel_dims])
+                    if num_parallel_dims < len(shape):
+                        with fb.for_loop(iter_names[-1], shape[-1]) as i:
+                            fb += lower_task(task_index + [i])
+                    else:
+                        fb += lower_task(task_index)
+            else:
+                num_parallel_dims = self.get_num_parallel_dims(shape, num_threads if num_threads else os.cpu_count())
+                if num_parallel_dims > 0:
+                    # the leading dimensions are distributed among threads, each thread traverses the remaining
+                    # dimensions
+                    ones = [1] * len(shape)
+                    parallel_shape = shape[:num_parallel_dims] + ones[num_parallel_dims:]
+                    serial_shape = ones[:num_parallel_dims] + shape[num_parallel_dims:]
+                    mapping: TaskMapping = row_spatial(*parallel_shape) * row_repeat(*serial_shape)
+                    with fb.for_loop('w', prod(parallel_shape), parallel=parallel) as w:
+                        with fb.for_mapping(iter_names, mapping, w) as task_index:
+                            fb += lower_task(task_index)
+                else:
+                    mapping: TaskMapping = row_repeat(*shape)
+                    with fb.for_mapping(iter_names, mapping, convert(0)) as task_index:
+                        fb += lower_task(task_index)
         func = fb.get()
         func_var = self.add_function(func)
-        return EvaluateStmt(Call(func_var, args=[node_map[param_tensor] for param_tensor in param_tensors]))
+        args = [node_map[param_tensor] for param_tensor in param_tensors] + self.symbols
+        return EvaluateStmt(Call(func_var, args=args))
@@ -0,0 +1,167 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import hidet
+from hidet import option
+from hidet.ir.func import IRModule
+from hidet.ir.dtypes import float32, float32x8
+from hidet.ir.primitives.cpu.avx import avx_f32x8_load, avx_f32x8_store, avx_f32x8_broadcast
+from hidet.ir.primitives.cpu.avx import avx_f32x8_add, avx_f32x8_mul, avx_f32x8_fmadd
+from hidet.lang import attr, grid, tensor, f32
+from hidet.graph.ops.definitions.matmul import BatchMatmulTask
+from hidet.graph.ops.schedules import tune
+from hidet.transforms.tools import fuse_and_pack
+from hidet.utils.py import cdiv
+from .vectorize import avx_supported, fma_supported
+
+
+class BatchMatmulCpuTemplate:
+    def __init__(self, task: BatchMatmulTask):
+        self.task: BatchMatmulTask = task
+
+    def estimate_cost(self, block_m=48, block_n=128, block_k=256, tile_m=6, tile_n=16) -> float:
+        """
+        Estimate the relative cost of a schedule, for ranking the schedules when the tuning budget is limited.
+        """
+        task = self.task
+        batch_size, m_size, n_size, k_size = task.batch_size, task.m_size, task.n_size, task.k_size
+        lanes = 8
+        block_m = min(block_m, cdiv(m_size, tile_m) * tile_m)
+        block_n = min(block_n, cdiv(n_size, tile_n) * tile_n)
+        block_k = min(block_k, k_size)
+        m_blocks, n_blocks = cdiv(m_size, block_m), cdiv(n_size, block_n)
+
+        # the work including the padding of the blocks
+        work = batch_size * m_blocks * block_m * n_blocks * block_n * k_size
+        # the micro kernel issues tile_m * tile_n / lanes fma for each tile_m + tile_n / lanes loads
+        intensity = tile_m * (tile_n // lanes) / (tile_m + tile_n // lanes)
+        # the accumulators, the vectors of b and the broadcast of a should fit in the 16 avx registers
+        spill = 2.0 if tile_m * (tile_n // lanes) + tile_n // lanes + 1 > 16 else 1.0
+        # a is packed once for each block of n, and b is packed once for each block of m
+        packing = 1.0 + 4.0 / block_n + 4.0 / block_m
+        # the packed block of a and panel of b should stay in the l2 cache
+        cache = 1.5 if (block_m * block_k + block_k * block_n) * 4 > 512 * 1024 else 1.0
+        # the blocks are distributed among the threads
+        num_tasks = batch_size * m_blocks * n_blocks
+        num_threads = option.get_option('cpu_num_threads') or os.cpu_count() or 1
+        utilization = num_tasks / (cdiv(num_tasks, num_threads) * num_threads)
+        return work / intensity * spill * packing * cache / utilization
+
+    @tune.cost(estimate_cost)
+    @tune.space(2, 'block_m', [24, 48, 96, 192])
+    @tune.space(2, 'block_n', [64, 96, 128, 192, 256, 384])
+    @tune.space(2, 'block_k', [64, 128, 256, 512])
+    @tune.space(2, 'tile_m, tile_n', [[6, 16], [4, 24], [4, 16], [8, 8]])
+    @tune.space(1, 'block_m', [48, 96])
+    @tune.space(1, 'block_n', [128, 256])
+    @tune.space(1, 'block_k', [128, 256])
+    @tune.space(1, 'tile_m, tile_n', [[6, 16], [4, 16]])
+    def schedule(self, block_m=48, block_n=128, block_k=256, tile_m=6, tile_n=16) -> IRModule:
+        """
+        Batched matrix multiplication on cpu with cache blocking, packing and a register-tiled avx micro kernel.
+
+        Each block_m x block_n block of c is a task of the parallel loop. For each slice of block_k along the
+        reduction dimension, the block of a (block_m x block_k) and the panel of b (block_k x block_n) are packed
+        into contiguous buffers, so that the micro kernel reads both sequentially from the l1/l2 cache. The micro
+        kernel keeps a tile_m x tile_n tile of c in avx registers, and updates it with one broadcast of a and
+        tile_n / 8 vector loads of b for each k.
+        """
+        # pylint: disable=unused-variable, too-many-locals
+        task = self.task
+        batch_size, m_size, n_size, k_size = task.batch_size, task.m_size, task.n_size, task.k_size
+        lanes = 8
+        tune.check(tile_n % lanes == 0, 'the micro kernel works on whole avx vectors')
+        tune.check(block_m % tile_m == 0 and block_n % tile_n == 0, 'tiles divide blocks')
+        # the packed buffers and the block of c are allocated on the stack of each thread
+        tune.check((block_m * block_k + block_k * block_n + block_m * block_n) * 4 <= 1024 * 1024, 'stack <= 1 MiB')
+
+        # shrink the blocks for small matrices to avoid packing and computing the padding
+        block_m = min(block_m, cdiv(m_size, tile_m) * tile_m)
+        block_n = min(block_n, cdiv(n_size, tile_n) * tile_n)
+        block_k = min(block_k, k_size)
+        m_blocks, n_blocks, k_blocks = cdiv(m_size, block_m), cdiv(n_size, block_n), cdiv(k_size, block_k)
+        m_tiles, n_tiles, tile_vecs = block_m // tile_m, block_n // tile_n, tile_n // lanes
+        num_threads = option.get_option('cpu_num_threads')
+        parallel = num_threads if num_threads else True
+
+        def multiply_add(x, y, z):
+            if fma_supported():
+                return avx_f32x8_fmadd(x, y, z)
+            return avx_f32x8_add(avx_f32x8_mul(x, y), z)
+
+        with hidet.script_module() as module:
+
+            @hidet.script
+            def batch_matmul_cpu_kernel(
+                a: f32[batch_size, m_size, k_size],
+                b: f32[batch_size, k_size, n_size],
+                c: f32[batch_size, m_size, n_size],
+            ):
+                attr.func_kind = 'host_kernel'
+                for w in grid(batch_size * m_blocks * n_blocks, parallel=parallel):
+                    bi = w / (m_blocks * n_blocks)
+                    offset_m = (w / n_blocks) % m_blocks * block_m
+                    offset_n = w % n_blocks * block_n
+                    packed_a = tensor('default', f32, [m_tiles, block_k, tile_m])
+                    packed_b = tensor('default', f32, [n_tiles, block_k, tile_n])
+                    c_block = tensor('default', f32, [block_m, block_n])
+                    acc = tensor('default', float32x8, [tile_m, tile_vecs])
+                    b_vecs = tensor('default', float32x8, [tile_vecs])
+                    for i, j in grid(block_m, block_n):
+                        c_block[i, j] = 0.0
+                    for k0 in range(k_blocks):
+                        offset_k = k0 * block_k
+                        k_extent = min(block_k, k_size - offset_k)
+
+                        # pack the block of a and the panel of b, the out-of-bound rows and columns are zero-padded
+                        for p, kk, ii in grid(m_tiles, block_k, tile_m):
+                            if offset_m + p * tile_m + ii < m_size and kk < k_extent:
+                                packed_a[p, kk, ii] = a[bi, offset_m + p * tile_m + ii, offset_k + kk]
+                            else:
+                                packed_a[p, kk, ii] = 0.0
+                        for q, kk, jj in grid(n_tiles, block_k, tile_n):
+                            if offset_n + q * tile_n + jj < n_size and kk < k_extent:
+                                packed_b[q, kk, jj] = b[bi, offset_k + kk, offset_n + q * tile_n + jj]
+                            else:
+                                packed_b[q, kk, jj] = 0.0
+
+                        # micro kernel
+                        for p, q in grid(m_tiles, n_tiles):
+                            if offset_m + p * tile_m < m_size and offset_n + q * tile_n < n_size:
+                                for ii, jj in grid(tile_m, tile_vecs):
+                                    acc[ii, jj] = avx_f32x8_load(~c_block[p * tile_m + ii, q * tile_n + jj * lanes])
+                                for kk in range(k_extent):
+                                    for jj in range(tile_vecs):
+                                        b_vecs[jj] = avx_f32x8_load(~packed_b[q, kk, jj * lanes])
+                                    for ii in range(tile_m):
+                                        a_vec = avx_f32x8_broadcast(packed_a[p, kk, ii])
+                                        for jj in range(tile_vecs):
+                                            acc[ii, jj] = multiply_add(a_vec, b_vecs[jj], acc[ii, jj])
+                                for ii, jj in grid(tile_m, tile_vecs):
+                                    avx_f32x8_store(~c_block[p * tile_m + ii, q * tile_n + jj * lanes], acc[ii, jj])
+
+                    # write back the block of c
+                    for i, j in grid(block_m, block_n):
+                        if offset_m + i < m_size and offset_n + j < n_size:
+                            c[bi, offset_m + i, offset_n + j] = c_block[i, j]
+
+        ir_module = module.ir_module()
+        fuse_and_pack(ir_module, batch_matmul_cpu_kernel, task=task)
+        return ir_module
+
+
+def batched_matmul_cpu_schedule(task: BatchMatmulTask, working_dir: str) -> IRModule:
+    if not avx_supported() or any(node.type.dtype != float32 for node in task.inputs + task.outputs):
+        # fall back to the auto-scheduler
+        return NotImplemented
+    template = BatchMatmulCpuTemplate(task)
+    return tune.tune(template.schedule, task=task, target_device='cpu', working_dir=working_dir)
@@ -0,0 +1,203 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List, Sequence, Union
+
+from hidet import option
+from hidet.ir import IRModule
+from hidet.ir import primitives as prim
+from hidet.ir.builders import FunctionBuilder, StmtBuilder
+from hidet.ir.dtypes import float32, float32x8
+from hidet.ir.expr import Expr, Var, scalar_var, tensor_var, cast, convert
+from hidet.ir.mapping import row_repeat
+from hidet.ir.primitives.cpu.avx import avx_f32x8_setzero, avx_f32x8_broadcast, avx_f32x8_load, avx_f32x8_store
+from hidet.ir.primitives.cpu.avx import avx_f32x8_add, avx_f32x8_sub, avx_f32x8_mul
+from hidet.ir.stmt import AssignStmt, BufferStoreStmt, DeclareStmt, EvaluateStmt
+from hidet.ir.type import DataType
+from hidet.graph.ops.definitions.norm import LayerNormTask
+from hidet.graph.ops.schedules.common import params_from_task
+from hidet.transforms.tools import fuse_and_pack
+from hidet.utils import prod
+from ..auto_scheduler import unravel_index
+from .auto_scheduler import CpuAutoScheduler
+from .vectorize import avx_supported
+
+# the rows with at most this number of elements are cached in a buffer on the stack of each thread
+max_cached_row_size = 16384
+
+
+def accumulate_dtype(dtype: DataType) -> DataType:
+    # the statistics of half-precision rows are accumulated in float32
+    return float32 if dtype.nbytes < 4 else dtype
+
+
+def can_cache_row(dtype: DataType, row_size: int) -> bool:
+    # the cached rows are processed with avx
+    return avx_supported() and dtype == float32 and row_size <= max_cached_row_size
+
+
+def parallel_rows(num_rows: int, row_size: int) -> Union[int, bool]:
+    # the rows are distributed among the threads, unless there are too few elements to amortize the thread team
+    if num_rows == 1 or num_rows * row_size < CpuAutoScheduler.min_parallel_elements:
+        return False
+    num_threads = option.get_option('cpu_num_threads')
+    return num_threads if num_threads else True
+
+
+def row_offset(indices: Sequence[Expr], shape: Sequence[int]) -> Expr:
+    # the offset of an element in a row-major grid
+    offset = convert(0)
+    for index, extent in zip(indices, shape):
+        offset = offset * extent + index
+    return offset
+
+
+def welford_update(sb: StmtBuilder, count: Var, mean: Var, m2: Var, delta: Var, value: Expr):
+    sb += AssignStmt(count, count + count.type.one)
+    sb += AssignStmt(delta, value - mean)
+    sb += AssignStmt(mean, mean + delta / count)
+    sb += AssignStmt(m2, m2 + delta * (value - mean))
+
+
+def layer_norm_row_streaming(
+    fb: FunctionBuilder, task: LayerNormTask, x: Var, y: Var, outer_indices: List[Expr], norm_shape: List[int]
+):
+    """
+    Normalize a row by reading it twice from memory: the first pass computes the mean and variance with Welford's
+    algorithm, and the second pass writes the normalized row.
+    """
+    x_dtype: DataType = x.type.dtype
+    acc_dtype = accumulate_dtype(x_dtype)
+    iter_names = ['k{}'.format(i) for i in range(len(norm_shape))]
+
+    count = scalar_var('count', acc_dtype)
+    mean = scalar_var('mean', acc_dtype)
+    m2 = scalar_var('m2', acc_dtype)
+    delta = scalar_var('delta', acc_dtype)
+    fb += DeclareStmt(count, init=acc_dtype.zero)
+    fb += DeclareStmt(mean, init=acc_dtype.zero)
+    fb += DeclareStmt(m2, init=acc_dtype.zero)
+    fb += DeclareStmt(delta)
+    with fb.for_mapping(iter_names, row_repeat(*norm_shape), convert(0)) as norm_indices:
+        welford_update(fb, count, mean, m2, delta, cast(x[outer_indices + norm_indices], acc_dtype))
+
+    rstd = scalar_var('rstd', acc_dtype)
+    fb += DeclareStmt(rstd, init=prim.rsqrt(m2 / acc_dtype(prod(norm_shape)) + acc_dtype(task.epsilon)))
+    with fb.for_mapping(iter_names, row_repeat(*norm_shape), convert(0)) as norm_indices:
+        indices = outer_indices + norm_indices
+        fb += BufferStoreStmt(y, indices, cast((cast(x[indices], acc_dtype) - mean) * rstd, x_dtype))
+
+
+def layer_norm_row_cached(
+    fb: FunctionBuilder, task: LayerNormTask, x: Var, y: Var, outer_indices: List[Expr], norm_shape: List[int]
+):
+    """
+    Normalize a float32 row by reading it once from memory into a buffer.
+
+    Each lane of an avx vector runs Welford's algorithm over every 8-th element of the row, then the statistics of
+    the lanes and the remaining elements are merged. The row is normalized in the buffer and written back.
+    """
+    lanes = 8
+    norm_size = prod(norm_shape)
+    num_chunks, num_remain = norm_size // lanes, norm_size % lanes
+    iter_names = ['k{}'.format(i) for i in range(len(norm_shape))]
+
+    buf = tensor_var('buf', [norm_size], float32)
+    fb += DeclareStmt(buf)
+    with fb.for_mapping(iter_names, row_repeat(*norm_shape), convert(0)) as norm_indices:
+        fb += BufferStoreStmt(buf, [row_offset(norm_indices, norm_shape)], x[outer_indices + norm_indices])
+
+    count = scalar_var('count', float32)
+    mean = scalar_var('mean', float32)
+    m2 = scalar_var('m2', float32)
+    delta = scalar_var('delta', float32)
+    fb += DeclareStmt(count, init=float32(num_chunks * lanes))
+    fb += DeclareStmt(mean, init=float32.zero)
+    fb += DeclareStmt(m2, init=float32.zero)
+    fb += DeclareStmt(delta)
+    if num_chunks > 0:
+        mean_vec = scalar_var('mean_vec', float32x8)
+        m2_vec = scalar_var('m2_vec', float32x8)
+        value_vec = scalar_var('value_vec', float32x8)
+        delta_vec = scalar_var('delta_vec', float32x8)
+        fb += DeclareStmt(mean_vec, init=avx_f32x8_setzero())
+        fb += DeclareStmt(m2_vec, init=avx_f32x8_setzero())
+        fb += DeclareStmt(value_vec)
+        fb += DeclareStmt(delta_vec)
+        with fb.for_loop('c', num_chunks) as c:
+            rcp = avx_f32x8_broadcast(float32.one / cast(c + 1, float32))
+            fb += AssignStmt(value_vec, avx_f32x8_load(~buf[c * lanes]))
+            fb += AssignStmt(delta_vec, avx_f32x8_sub(value_vec, mean_vec))
+            fb += AssignStmt(mean_vec, avx_f32x8_add(mean_vec, avx_f32x8_mul(delta_vec, rcp)))
+            m2_update = avx_f32x8_mul(delta_vec, avx_f32x8_sub(value_vec, mean_vec))
+            fb += AssignStmt(m2_vec, avx_f32x8_add(m2_vec, m2_update))
+
+        # merge the lanes, which have the same number of elements
+        lane_mean = tensor_var('lane_mean', [lanes], float32)
+        lane_m2 = tensor_var('lane_m2', [lanes], float32)
+        fb += DeclareStmt(lane_mean)
+        fb += DeclareStmt(lane_m2)
+        fb += EvaluateStmt(avx_f32x8_store(~lane_mean[0], mean_vec))
+        fb += EvaluateStmt(avx_f32x8_store(~lane_m2[0], m2_vec))
+        with fb.for_loop('i', lanes) as i:
+            fb += AssignStmt(mean, mean + lane_mean[i])
+        fb += AssignStmt(mean, mean / float32(lanes))
+        with fb.for_loop('i', lanes) as i:
+            fb += AssignStmt(delta, lane_mean[i] - mean)
+            fb += AssignStmt(m2, m2 + lane_m2[i] + delta * delta * float32(num_chunks))
+    with fb.for_loop('t', num_remain) as t:
+        welford_update(fb, count, mean, m2, delta, buf[num_chunks * lanes + t])
+
+    rstd = scalar_var('rstd', float32)
+    fb += DeclareStmt(rstd, init=prim.rsqrt(m2 / float32(norm_size) + float32(task.epsilon)))
+    if num_chunks > 0:
+        mean_vec, rstd_vec = avx_f32x8_broadcast(mean), avx_f32x8_broadcast(rstd)
+        with fb.for_loop('c', num_chunks) as c:
+            normalized = avx_f32x8_mul(avx_f32x8_sub(avx_f32x8_load(~buf[c * lanes]), mean_vec), rstd_vec)
+            fb += EvaluateStmt(avx_f32x8_store(~buf[c * lanes], normalized))
+    with fb.for_loop('t', num_remain) as t:
+        fb += BufferStoreStmt(buf, [num_chunks * lanes + t], (buf[num_chunks * lanes + t] - mean) * rstd)
+
+    with fb.for_mapping(iter_names, row_repeat(*norm_shape), convert(0)) as norm_indices:
+        fb += BufferStoreStmt(y, outer_indices + norm_indices, buf[row_offset(norm_indices, norm_shape)])
+
+
+def layer_norm_cpu_schedule(task: LayerNormTask) -> IRModule:
+    """
+    Layer norm on cpu, which computes the mean and variance of each row in one pass with Welford's algorithm.
+
+    The rows that fit in a buffer on the stack are read once from memory and processed with avx, the other rows are
+    read twice.
+    """
+    x_dtype: DataType = task.inputs[0].ttype.dtype
+    if not x_dtype.is_float():
+        return NotImplemented
+
+    shape: List[int] = task.x_shape
+    num_outer_dims = len(shape) - task.num_last_dims
+    outer_shape, norm_shape = shape[:num_outer_dims], shape[num_outer_dims:]
+    num_rows, norm_size = prod(outer_shape), prod(norm_shape)
+
+    with FunctionBuilder(name=task.name + '_kernel', kind='host_kernel', label='layer norm schedule') as fb:
+        params = params_from_task(task)
+        x, y = params
+        fb.extend_params(params)
+
+        with fb.for_loop('w', num_rows, parallel=parallel_rows(num_rows, norm_size)) as w:
+            outer_indices: List[Expr] = unravel_index(w, outer_shape)
+            if can_cache_row(x_dtype, norm_size):
+                layer_norm_row_cached(fb, task, x, y, outer_indices, norm_shape)
+            else:
+                layer_norm_row_streaming(fb, task, x, y, outer_indices, norm_shape)
+
+    func = fb.get()
+    ir_module = IRModule(funcs={func.name: func}, task=task)
+    return fuse_and_pack(ir_module, func, task)
@@ -0,0 +1,147 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List
+
+from hidet.ir import IRModule
+from hidet.ir import primitives as prim
+from hidet.ir.builders import FunctionBuilder
+from hidet.ir.dtypes import float32, float32x8
+from hidet.ir.expr import Expr, Var, scalar_var, tensor_var, cast
+from hidet.ir.primitives.cpu.avx import avx_f32x8_broadcast, avx_f32x8_load, avx_f32x8_store, avx_f32x8_mul
+from hidet.ir.primitives.cpu.avx import avx_f32x8_max
+from hidet.ir.stmt import AssignStmt, BufferStoreStmt, DeclareStmt, EvaluateStmt
+from hidet.ir.type import DataType
+from hidet.graph.ops.definitions.softmax import SoftmaxTask
+from hidet.graph.ops.schedules.common import params_from_task
+from hidet.transforms.tools import fuse_and_pack
+from hidet.utils import prod
+from ..auto_scheduler import unravel_index
+from .norm import accumulate_dtype, can_cache_row, parallel_rows
+
+
+def softmax_row_streaming(fb: FunctionBuilder, x: Var, y: Var, other_indices: List[Expr], axis: int, extent: int):
+    """
+    Compute the softmax of a row by reading it twice from memory.
+
+    The first pass computes the maximum and the sum of exponentials of the row together (online softmax): when a
+    larger maximum is found, the partial sum is rescaled to the new maximum. The second pass writes the normalized
+    exponentials.
+    """
+    x_dtype: DataType = x.type.dtype
+    acc_dtype = accumulate_dtype(x_dtype)
+
+    def row_indices(k: Expr) -> List[Expr]:
+        return other_indices[:axis] + [k] + other_indices[axis:]
+
+    max_value = scalar_var('max_value', acc_dtype)
+    sum_value = scalar_var('sum_value', acc_dtype)
+    value = scalar_var('value', acc_dtype)
+    fb += DeclareStmt(max_value, init=acc_dtype.min_value)
+    fb += DeclareStmt(sum_value, init=acc_dtype.zero)
+    fb += DeclareStmt(value)
+    with fb.for_loop('k', extent) as k:
+        fb += AssignStmt(value, cast(x[row_indices(k)], acc_dtype))
+        with fb.if_then(value > max_value):
+            fb += AssignStmt(sum_value, sum_value * prim.exp(max_value - value) + acc_dtype.one)
+            fb += AssignStmt(max_value, value)
+        with fb.otherwise():
+            fb += AssignStmt(sum_value, sum_value + prim.exp(value - max_value))
+
+    fb += AssignStmt(sum_value, acc_dtype.one / sum_value)
+    with fb.for_loop('k', extent) as k:
+        normalized = prim.exp(cast(x[row_indices(k)], acc_dtype) - max_value) * sum_value
+        fb += BufferStoreStmt(y, row_indices(k), cast(normalized, x_dtype))
+
+
+def softmax_row_cached(fb: FunctionBuilder, x: Var, y: Var, other_indices: List[Expr], axis: int, extent: int):
+    """
+    Compute the softmax of a float32 row by reading it once from memory into a buffer.
+
+    The maximum and the scaling are computed with avx, and the exponentials are computed once and kept in the buffer.
+    """
+    lanes = 8
+    num_chunks, num_remain = extent // lanes, extent % lanes
+
+    def row_indices(k: Expr) -> List[Expr]:
+        return other_indices[:axis] + [k] + other_indices[axis:]
+
+    buf = tensor_var('buf', [extent], float32)
+    fb += DeclareStmt(buf)
+    with fb.for_loop('k', extent) as k:
+        fb += BufferStoreStmt(buf, [k], x[row_indices(k)])
+
+    max_value = scalar_var('max_value', float32)
+    sum_value = scalar_var('sum_value', float32)
+    fb += DeclareStmt(max_value, init=float32.min_value)
+    fb += DeclareStmt(sum_value, init=float32.zero)
+    if num_chunks > 0:
+        max_vec = scalar_var('max_vec', float32x8)
+        fb += DeclareStmt(max_vec, init=avx_f32x8_broadcast(float32.min_value))
+        with fb.for_loop('c', num_chunks) as c:
+            fb += AssignStmt(max_vec, avx_f32x8_max(max_vec, avx_f32x8_load(~buf[c * lanes])))
+        lane_max = tensor_var('lane_max', [lanes], float32)
+        fb += DeclareStmt(lane_max)
+        fb += EvaluateStmt(avx_f32x8_store(~lane_max[0], max_vec))
+        with fb.for_loop('i', lanes) as i:
+            fb += AssignStmt(max_value, prim.max(max_value, lane_max[i]))
+    with fb.for_loop('t', num_remain) as t:
+        fb += AssignStmt(max_value, prim.max(max_value, buf[num_chunks * lanes + t]))
+
+    with fb.for_loop('k', extent) as k:
+        fb += BufferStoreStmt(buf, [k], prim.exp(buf[k] - max_value))
+        fb += AssignStmt(sum_value, sum_value + buf[k])
+
+    fb += AssignStmt(sum_value, float32.one / sum_value)
+    if num_chunks > 0:
+        scale_vec = avx_f32x8_broadcast(sum_value)
+        with fb.for_loop('c', num_chunks) as c:
+            scaled = avx_f32x8_mul(avx_f32x8_load(~buf[c * lanes]), scale_vec)
+            fb += EvaluateStmt(avx_f32x8_store(~buf[c * lanes], scaled))
+    with fb.for_loop('t', num_remain) as t:
+        fb += BufferStoreStmt(buf, [num_chunks * lanes + t], buf[num_chunks * lanes + t] * sum_value)
+
+    with fb.for_loop('k', extent) as k:
+        fb += BufferStoreStmt(y, row_indices(k), buf[k])
+
+
+def softmax_cpu_schedule(task: SoftmaxTask) -> IRModule:
+    """
+    Softmax on cpu, which computes the maximum and the sum of exponentials of each row without materializing the
+    exponentials in memory.
+
+    The rows that fit in a buffer on the stack are read once from memory, the other rows are read twice with the
+    online softmax.
+    """
+    x_dtype: DataType = task.inputs[0].ttype.dtype
+    if not x_dtype.is_float():
+        return NotImplemented
+
+    shape: List[int] = task.x_shape
+    axis = task.axis
+    other_shape = shape[:axis] + shape[axis + 1 :]
+    num_rows, extent = prod(other_shape), shape[axis]
+
+    with FunctionBuilder(name=task.name + '_kernel', kind='host_kernel', label='softmax schedule') as fb:
+        params = params_from_task(task)
+        x, y = params
+        fb.extend_params(params)
+
+        with fb.for_loop('w', num_rows, parallel=parallel_rows(num_rows, extent)) as w:
+            other_indices: List[Expr] = unravel_index(w, other_shape)
+            if can_cache_row(x_dtype, extent):
+                softmax_row_cached(fb, x, y, other_indices, axis, extent)
+            else:
+                softmax_row_streaming(fb, x, y, other_indices, axis, extent)
+
+    func = fb.get()
+    ir_module = IRModule(funcs={func.name: func}, task=task)
+    return fuse_and_pack(ir_module, func, task)
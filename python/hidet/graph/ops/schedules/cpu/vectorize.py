@@ -0,0 +1,296 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List, Dict, Tuple, Union, Callable, Optional
+import functools
+import platform
+import re
+
+from hidet.ir.type import tensor_type
+from hidet.ir.expr import Expr, Var, TensorElement, Address, Call, Cast, Add, Sub, Multiply, Div, Neg
+from hidet.ir.expr import var, scalar_var, convert, cast
+from hidet.ir.stmt import Stmt, ForStmt, DeclareStmt, AssignStmt, EvaluateStmt
+from hidet.ir.builders import StmtBuilder
+from hidet.ir.functors import ExprFunctor, ComputeFunctor
+from hidet.ir.tools import collect, rewrite, infer_type, simplify_to_int
+from hidet.ir.compute import TensorNode, ScalarNode, GridCompute, ReduceCompute
+from hidet.ir.compute.reduce_operations import ReduceOperation, SumReduce, AverageReduce, MaxReduce, MinReduce
+from hidet.ir.dtypes import float32, float32x8
+from hidet.ir.primitives.cpu.avx import avx_f32x8_setzero, avx_f32x8_broadcast, avx_f32x8_load, avx_f32x8_store
+from hidet.ir.primitives.cpu.avx import avx_f32x8_add, avx_f32x8_sub, avx_f32x8_mul, avx_f32x8_div
+from hidet.ir.primitives.cpu.avx import avx_f32x8_max, avx_f32x8_min
+from hidet.utils import prod
+from ..auto_scheduler import ComputeExprLower
+
+
+class NotVectorizable(Exception):
+    pass
+
+
+@functools.lru_cache()
+def _cpu_flags() -> Tuple[str, ...]:
+    if platform.machine().lower() not in ['x86_64', 'amd64', 'i386', 'i686']:
+        return ()
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            cpuinfo = f.read()
+    except OSError:
+        return ()
+    match = re.search(r'^flags\s*:(.*)$', cpuinfo, flags=re.MULTILINE)
+    return tuple(match.group(1).split()) if match else ()
+
+
+def avx_supported() -> bool:
+    """
+    Check whether the host cpu supports the avx instructions used by the vectorized cpu kernels.
+
+    The cpu kernels are compiled with -march=native, thus the intrinsics are available if and only if the host cpu
+    supports them.
+
+    Returns
+    -------
+    ret: bool
+        True if the host cpu supports avx.
+    """
+    return 'avx' in _cpu_flags()
+
+
+def fma_supported() -> bool:
+    """
+    Check whether the host cpu supports the fused multiply-add instructions (e.g., _mm256_fmadd_ps).
+
+    Returns
+    -------
+    ret: bool
+        True if the host cpu supports avx and fma.
+    """
+    return avx_supported() and 'fma' in _cpu_flags()
+
+
+_vector_combine: Dict[type, Callable[[Expr, Expr], Expr]] = {
+    SumReduce: avx_f32x8_add,
+    AverageReduce: avx_f32x8_add,
+    MaxReduce: avx_f32x8_max,
+    MinReduce: avx_f32x8_min,
+}
+
+
+def _vectorizable_reduce(reduce_operation: ReduceOperation) -> bool:
+    return type(reduce_operation) in _vector_combine
+
+
+class ComputeExprVectorizer(ExprFunctor, ComputeFunctor):
+    """
+    Lower a compute expression to avx instructions that compute it for 8 consecutive values of the given axis.
+
+    The sub-expressions that do not depend on the axis are lowered to scalar computations and broadcast to all lanes.
+    The tensor elements whose last index is the axis (plus an offset that does not depend on the axis) are loaded
+    with a single vector load. Any other access pattern or operation can not be vectorized, and NotVectorizable is
+    raised.
+    """
+
+    lanes = 8
+
+    def __init__(self, axis: Var, param_map: Dict[Union[TensorNode, ScalarNode], Expr]):
+        super().__init__()
+        self.sb: StmtBuilder = StmtBuilder()
+        self.axis: Var = axis
+        self.param_map: Dict[Union[TensorNode, ScalarNode], Expr] = param_map
+
+    def vectorize(self, expr: Expr) -> Tuple[List[Stmt], Expr]:
+        """
+        Vectorize the compute expression.
+
+        Parameters
+        ----------
+        expr: Expr
+            The compute expression to vectorize.
+
+        Returns
+        -------
+        ret: Tuple[List[Stmt], Expr]
+            The statements to compute the expression and the float32x8 vector of the results, which correspond to
+            axis, axis + 1, ..., axis + 7.
+        """
+        if infer_type(expr) != float32:
+            raise NotVectorizable('Only float32 computations can be vectorized.')
+        try:
+            result = self.visit(expr)
+        except NotImplementedError as e:
+            raise NotVectorizable(str(e)) from e
+        assert len(self.sb.scope_stack) == 1, "some scope has not been exited?"
+        return self.sb.scope_stack[0], result
+
+    def depends_on_axis(self, expr: Expr) -> bool:
+        return any(v is self.axis for v in collect(expr, Var))
+
+    def visit(self, node):
+        if isinstance(node, Expr) and node not in self.memo and not self.depends_on_axis(node):
+            self.memo[node] = self.broadcast(node)
+        return super().visit(node)
+
+    def broadcast(self, expr: Expr) -> Expr:
+        stmts, value = VectorizedComputeExprLower(expr, param_map=self.param_map).lower()
+        self.sb += stmts
+        if infer_type(value) != float32:
+            value = cast(value, float32)
+        return avx_f32x8_broadcast(value)
+
+    def visit_TensorElement(self, e: TensorElement):
+        if not isinstance(e.base, TensorNode) or e.base not in self.param_map:
+            raise NotImplementedError('Only the elements of materialized tensors can be loaded.')
+        if e.base.type.dtype != float32:
+            raise NotImplementedError('Can not load the elements of {} tensor.'.format(e.base.type.dtype))
+        indices = list(e.indices)
+        if any(self.depends_on_axis(index) for index in indices[:-1]):
+            raise NotImplementedError('The accessed elements are not contiguous.')
+        last = indices[-1]
+        if last is self.axis:
+            pass
+        elif isinstance(last, Add) and (
+            (last.a is self.axis and not self.depends_on_axis(last.b))
+            or (last.b is self.axis and not self.depends_on_axis(last.a))
+        ):
+            pass
+        else:
+            raise NotImplementedError('The accessed elements are not contiguous.')
+        buf = self.param_map[e.base]
+        return avx_f32x8_load(Address(TensorElement(buf, indices)))
+
+    def visit_Add(self, e: Add):
+        return avx_f32x8_add(self.visit(e.a), self.visit(e.b))
+
+    def visit_Sub(self, e: Sub):
+        return avx_f32x8_sub(self.visit(e.a), self.visit(e.b))
+
+    def visit_Multiply(self, e: Multiply):
+        return avx_f32x8_mul(self.visit(e.a), self.visit(e.b))
+
+    def visit_Div(self, e: Div):
+        return avx_f32x8_div(self.visit(e.a), self.visit(e.b))
+
+    def visit_Neg(self, e: Neg):
+        return avx_f32x8_sub(avx_f32x8_setzero(), self.visit(e.a))
+
+    def visit_Cast(self, e: Cast):
+        if e.target_type != float32:
+            raise NotImplementedError('Can not vectorize the cast to {}.'.format(e.target_type))
+        return self.visit(e.expr)
+
+    def visit_Call(self, e: Call):
+        name = e.func_var.hint
+        if name == 'generic_max':
+            return avx_f32x8_max(self.visit(e.args[0]), self.visit(e.args[1]))
+        elif name == 'generic_min':
+            return avx_f32x8_min(self.visit(e.args[0]), self.visit(e.args[1]))
+        raise NotImplementedError('Can not vectorize the call to {}.'.format(name))
+
+    def visit_ReduceCompute(self, node: ReduceCompute):
+        shape, axes, value = node.shape, node.axes, node.value
+        if not _vectorizable_reduce(node.reduce_operation) or infer_type(value) != float32:
+            raise NotImplementedError('Can not vectorize the reduction {}.'.format(node.reduce_operation))
+
+        # declare the vector accumulator, each lane accumulates the reduction for one value of the axis
+        acc = Var(node.name + '_vec', float32x8)
+        self.sb += DeclareStmt(acc, init=self.broadcast(node.reduce_operation.initial_value(float32)))
+
+        # reduction loops
+        for i in range(len(shape)):
+            self.sb.enter_body(ForStmt(axes[i], shape[i]))
+
+        # at the innermost loop body
+        expr = self.visit(value)
+        self.sb += AssignStmt(acc, _vector_combine[type(node.reduce_operation)](acc, expr))
+
+        # exit loop scope
+        for i in range(len(shape)):
+            self.sb.exit_body()
+
+        # finalize
+        if isinstance(node.reduce_operation, AverageReduce):
+            return avx_f32x8_div(acc, self.broadcast(convert(prod(shape))))
+        return acc
+
+    def visit_GridCompute(self, node: GridCompute):
+        raise NotImplementedError('Can not vectorize an inlined grid compute.')
+
+
+class VectorizedComputeExprLower(ComputeExprLower):
+    """
+    Lower a compute expression to scalar computations, except that the reductions along a contiguous innermost axis
+    are computed with avx instructions: each lane accumulates a strided part of the reduction, the lanes are combined
+    at the end, and the remaining elements (fewer than 8) are accumulated in scalar.
+    """
+
+    lanes = ComputeExprVectorizer.lanes
+
+    def visit_ReduceCompute(self, node: ReduceCompute):
+        lowered = self.try_vectorize_reduce(node)
+        if lowered is None:
+            return ComputeExprLower.visit_ReduceCompute(self, node)
+        return lowered
+
+    def try_vectorize_reduce(self, node: ReduceCompute) -> Optional[Expr]:
+        # pylint: disable=too-many-locals
+        if not avx_supported() or not _vectorizable_reduce(node.reduce_operation):
+            return None
+        try:
+            extent = simplify_to_int(node.shape[-1])
+        except Exception:  # pylint: disable=broad-except
+            # symbolic extent
+            return None
+        if extent < self.lanes:
+            return None
+        try:
+            vec_stmts, vec_value = ComputeExprVectorizer(node.axes[-1], self.param_map).vectorize(node.value)
+        except NotVectorizable:
+            return None
+
+        reduce_op = node.reduce_operation
+        lanes, num_chunks, num_remain = self.lanes, extent // self.lanes, extent % self.lanes
+        outer_shape, outer_axes = node.shape[:-1], node.axes[:-1]
+
+        # accumulate the chunks of 8 consecutive elements
+        acc_vec = Var(node.name + '_vec', float32x8)
+        self.sb += DeclareStmt(acc_vec, init=avx_f32x8_broadcast(reduce_op.initial_value(float32)))
+        loop_vars = [var(axis.hint) for axis in outer_axes] + [var('c')]
+        for loop_var, loop_extent in zip(loop_vars, list(outer_shape) + [num_chunks]):
+            self.sb.enter_body(ForStmt(loop_var, loop_extent))
+        rmap = dict(zip(outer_axes, loop_vars[:-1]))
+        rmap[node.axes[-1]] = loop_vars[-1] * lanes
+        self.sb += [rewrite(stmt, rmap) for stmt in vec_stmts]
+        self.sb += AssignStmt(acc_vec, _vector_combine[type(reduce_op)](acc_vec, rewrite(vec_value, rmap)))
+        for _ in loop_vars:
+            self.sb.exit_body()
+
+        # combine the lanes
+        acc_lanes = Var(node.name + '_lanes', tensor_type(float32, [lanes]))
+        acc = scalar_var(node.name, float32)
+        self.sb += DeclareStmt(acc_lanes)
+        self.sb += EvaluateStmt(avx_f32x8_store(Address(TensorElement(acc_lanes, [0])), acc_vec))
+        self.sb += DeclareStmt(acc, init=reduce_op.initial_value(float32))
+        with self.sb.for_loop('l', lanes) as l:
+            self.sb += AssignStmt(acc, reduce_op.combine(acc, acc_lanes[l]))
+
+        # accumulate the remaining elements
+        if num_remain > 0:
+            stmts, value = VectorizedComputeExprLower(node.value, param_map=self.param_map).lower()
+            loop_vars = [var(axis.hint) for axis in outer_axes] + [var('t')]
+            for loop_var, loop_extent in zip(loop_vars, list(outer_shape) + [num_remain]):
+                self.sb.enter_body(ForStmt(loop_var, loop_extent))
+            rmap = dict(zip(outer_axes, loop_vars[:-1]))
+            rmap[node.axes[-1]] = num_chunks * lanes + loop_vars[-1]
+            self.sb += [rewrite(stmt, rmap) for stmt in stmts]
+            self.sb += AssignStmt(acc, reduce_op.combine(acc, rewrite(value, rmap)))
+            for _ in loop_vars:
+                self.sb.exit_body()
+
+        return reduce_op.finalize(acc, prod(node.shape))
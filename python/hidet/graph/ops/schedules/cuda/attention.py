@@ -0,0 +1,141 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List, Optional
+
+from hidet.ir import IRModule
+from hidet.ir import primitives as prim
+from hidet.ir.builders import FunctionBuilder, StmtBuilder
+from hidet.ir.expr import Expr, scalar_var, tensor_var, cast, if_then_else
+from hidet.ir.primitives import block_idx, thread_idx, active_mask, shfl_sync
+from hidet.ir.stmt import AssignStmt, BufferStoreStmt, DeclareStmt
+from hidet.ir.type import DataType
+from hidet.ir.dtypes import float32
+from hidet.graph.ops.definitions.attention import AttentionTask
+from hidet.graph.ops.definitions.utils import broadcast_indices
+from hidet.graph.ops.schedules.common import params_from_task
+from hidet.transforms.tools import fuse_and_pack
+from hidet.utils import prod
+from hidet.utils.py import cdiv
+from ..auto_scheduler import unravel_index
+from .softmax import warp_reduce_online_softmax
+
+
+def attention_cuda_schedule(task: AttentionTask) -> IRModule:
+    """
+    Attention on cuda, where each query is attended by a warp, without materializing the scores.
+
+    The keys are visited in tiles of 32, one key for each thread. The maximum and the sum of exponentials of the scores
+    of a tile are merged with one warp reduction, and the running statistics are rescaled to the new maximum (online
+    softmax). Then the weights of the tile are broadcast to the warp, where each thread accumulates the weighted values
+    of its elements of the output row in registers.
+    """
+    x_dtype: DataType = task.inputs[0].ttype.dtype
+    if not x_dtype.is_float():
+        return NotImplemented
+    acc_dtype = float32 if x_dtype.nbytes < 4 else x_dtype
+
+    batch_shape: List[int] = task.q_shape[:-2]
+    q_size, head_size = task.q_shape[-2:]
+    kv_size, v_head_size = task.v_shape[-2:]
+    score_shape = batch_shape + [q_size, kv_size]
+    mask_shape: Optional[List[int]] = task.mask_shape
+
+    warp_size = 32
+    num_tiles = cdiv(kv_size, warp_size)
+    num_acc = cdiv(v_head_size, warp_size)
+
+    with FunctionBuilder(
+        name=task.name + '_grid',
+        kind='cuda_kernel',
+        grid_dim=prod(batch_shape) * q_size,
+        block_dim=warp_size,
+        label='attention schedule',
+    ) as fb:
+        params = params_from_task(task)
+        if mask_shape is None:
+            q, k, v, o = params
+            mask = None
+        else:
+            q, k, v, mask, o = params
+        fb.extend_params(params)
+
+        sb = StmtBuilder()
+        bs: List[Expr] = unravel_index(block_idx() // q_size, batch_shape)
+        i = block_idx() % q_size
+        lane = thread_idx()
+
+        acc = tensor_var('acc', [num_acc], acc_dtype)
+        max_value = scalar_var('max_value', acc_dtype)
+        sum_value = scalar_var('sum_value', acc_dtype)
+        sb += DeclareStmt(acc)
+        sb += DeclareStmt(max_value, init=acc_dtype.min_value)
+        sb += DeclareStmt(sum_value, init=acc_dtype.zero)
+        for t in range(num_acc):
+            sb += BufferStoreStmt(acc, [t], acc_dtype.zero)
+
+        with sb.for_loop('tile', num_tiles) as tile:
+            j = tile * warp_size + lane
+            score = scalar_var('score', acc_dtype)
+            sb += DeclareStmt(score, init=acc_dtype.min_value)
+            with sb.if_then(j < kv_size):
+                sb += AssignStmt(score, acc_dtype.zero)
+                with sb.for_loop('d', head_size) as d:
+                    sb += AssignStmt(score, score + cast(q[bs + [i, d]], acc_dtype) * cast(k[bs + [d, j]], acc_dtype))
+                sb += AssignStmt(score, score * acc_dtype(task.scale))
+                if mask is not None:
+                    indices = broadcast_indices(bs + [i, j], mask_shape, score_shape)
+                    sb += AssignStmt(score, score + cast(mask[indices], acc_dtype))
+                # the masked scores are clamped, so that the merge of two masked threads does not produce nan
+                sb += AssignStmt(score, prim.max(score, acc_dtype.min_value))
+
+            # the maximum and the sum of exponentials of the tile
+            tile_max = scalar_var('tile_max', acc_dtype)
+            tile_sum = scalar_var('tile_sum', acc_dtype)
+            sb += DeclareStmt(tile_max, init=score)
+            sb += DeclareStmt(tile_sum, init=if_then_else(j < kv_size, acc_dtype.one, acc_dtype.zero))
+            sb += warp_reduce_online_softmax(tile_max, tile_sum)
+
+            # rescale the running statistics to the new maximum
+            new_max = scalar_var('new_max', acc_dtype)
+            factor = scalar_var('factor', acc_dtype)
+            weight = scalar_var('weight', acc_dtype)
+            sb += DeclareStmt(new_max, init=prim.max(max_value, tile_max))
+            sb += DeclareStmt(factor, init=prim.exp(max_value - new_max))
+            sb += DeclareStmt(weight)
+            # assigned instead of initialized, so that the exponential is not inlined into the loop over the keys
+            sb += AssignStmt(weight, if_then_else(j < kv_size, prim.exp(score - new_max), acc_dtype.zero))
+            sb += AssignStmt(sum_value, sum_value * factor + tile_sum * prim.exp(tile_max - new_max))
+            sb += AssignStmt(max_value, new_max)
+            for t in range(num_acc):
+                sb += BufferStoreStmt(acc, [t], acc[t] * factor)
+
+            # accumulate the values of the tile, weighted by the broadcast weights
+            with sb.let('mask', active_mask()) as lane_mask:
+                with sb.for_loop('jj', warp_size) as jj:
+                    key_weight = scalar_var('key_weight', acc_dtype)
+                    sb += DeclareStmt(key_weight, init=shfl_sync(lane_mask, weight, src_lane=jj))
+                    with sb.if_then(tile * warp_size + jj < kv_size):
+                        for t in range(num_acc):
+                            e = t * warp_size + lane
+                            with sb.if_then(e < v_head_size):
+                                value = cast(v[bs + [tile * warp_size + jj, e]], acc_dtype)
+                                sb += BufferStoreStmt(acc, [t], acc[t] + key_weight * value)
+
+        for t in range(num_acc):
+            e = t * warp_size + lane
+            with sb.if_then(e < v_head_size):
+                sb += BufferStoreStmt(o, bs + [i, e], cast(acc[t] / sum_value, x_dtype))
+
+        fb.set_body(sb.finish())
+    func = fb.get()
+    ir_module = IRModule(funcs={func.name: func}, task=task)
+    return fuse_and_pack(ir_module, func, task)
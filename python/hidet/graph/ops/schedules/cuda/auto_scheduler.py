@@ -9,15 +9,16 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import List, Dict
+from typing import List, Dict, Union
 
 from hidet.ir.builders import FunctionBuilder
 from hidet.ir.compute import TensorNode, GridCompute
-from hidet.ir.expr import Call, Expr, Var
-from hidet.ir.tools import collect, rewrite, simplify_to_int
+from hidet.ir.expr import Call, Expr, Var, Constant
+from hidet.ir.tools import collect, rewrite, simplify
+from hidet.ir.utils.symbol_utils import is_static_shape
 from hidet.ir.stmt import Stmt, BufferStoreStmt, EvaluateStmt
 from hidet.utils import prod
-from ..auto_scheduler import AutoScheduler, ComputeExprLower
+from ..auto_scheduler import AutoScheduler, ComputeExprLower, unravel_index
 
 
 class CudaAutoScheduler(AutoScheduler):
@@ -31,31 +32,42 @@ class CudaAutoScheduler(AutoScheduler):
         params: List[Var] = [Var(tensor.name, tensor.type) for tensor in param_tensors]
 
         block_dim = 500
-        grid_dim: int = simplify_to_int((prod(node.shape) + block_dim - 1) // block_dim)
+        shape: List[Expr] = [simplify(extent) for extent in node.shape]
+        grid_dim: Union[int, Expr] = simplify((prod(shape) + block_dim - 1) // block_dim)
+        if isinstance(grid_dim, Constant):
+            grid_dim = int(grid_dim)
+
+        def lower_task(task_index: List[Expr]) -> List[Stmt]:
+            out_param: Var = params[-1]
+            param_map: Dict[TensorNode, Expr] = {
+                tensor_node: param_var for tensor_node, param_var in zip(param_tensors, params)
+            }
+            compute_lower = ComputeExprLower(node.value, param_map=param_map)
+            stmts, value = compute_lower.lower()
+            rmap = {axis: axis_value for axis, axis_value in zip(node.axes, task_index)}
+            stmts, value = [rewrite(stmt, rmap) for stmt in stmts], rewrite(value, rmap)
+            return stmts + [BufferStoreStmt(out_param, task_index, value)]
 
         with FunctionBuilder(
             name=f'compute_{node.name}', kind='cuda_kernel', grid_dim=grid_dim, block_dim=block_dim
         ) as fb:
             # set function parameters
-            fb.extend_params(params)
+            fb.extend_params(params + self.symbols)
 
             # calculate task indices assigned to current worker
             worker = blockIdx.x * block_dim + threadIdx.x
 
-            mapping: TaskMapping = row_spatial(*node.shape)
-            iter_names = [f'i{i}' for i in range(len(node.shape))]
-            with fb.if_then(worker < mapping.num_workers):
-                with fb.for_mapping(iter_names, mapping, worker) as task_index:
-                    out_param: Var = params[-1]
-                    param_map: Dict[TensorNode, Expr] = {
-                        tensor_node: param_var for tensor_node, param_var in zip(param_tensors, params)
-                    }
-                    compute_lower = ComputeExprLower(node.value, param_map=param_map)
-                    stmts, value = compute_lower.lower()
-                    rmap = {axis: axis_value for axis, axis_value in zip(node.axes, task_index)}
-                    stmts, value = [rewrite(stmt, rmap) for stmt in stmts], rewrite(value, rmap)
-                    fb += stmts
-                    fb += BufferStoreStmt(out_param, task_index, value)
+            if not is_static_shape(shape):
+                # the grid dimension is computed from the symbol vars when the kernel is launched
+                with fb.if_then(worker < prod(shape)):
+                    fb += lower_task(unravel_index(worker, shape))
+            else:
+                mapping: TaskMapping = row_spatial(*shape)
+                iter_names = [f'i{i}' for i in range(len(shape))]
+                with fb.if_then(worker < mapping.num_workers):
+                    with fb.for_mapping(iter_names, mapping, worker) as task_index:
+                        fb += lower_task(task_index)
         func = fb.get()
         func_var = self.add_function(func)
-        return EvaluateStmt(Call(func_var, args=[node_map[param_tensor] for param_tensor in param_tensors]))
+        args = [node_map[param_tensor] for param_tensor in param_tensors] + self.symbols
+        return EvaluateStmt(Call(func_var, args=args))
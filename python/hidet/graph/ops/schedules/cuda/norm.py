@@ -0,0 +1,135 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List
+
+from hidet.ir import IRModule
+from hidet.ir import primitives as prim
+from hidet.ir.builders import FunctionBuilder, StmtBuilder
+from hidet.ir.dtypes import float32
+from hidet.ir.expr import Var, scalar_var, cast, if_then_else
+from hidet.ir.mapping import TaskMapping
+from hidet.ir.primitives import block_idx, thread_idx, active_mask, shfl_down_sync, shfl_sync
+from hidet.ir.stmt import Stmt, AssignStmt, BufferStoreStmt, DeclareStmt
+from hidet.graph.ops.definitions.norm import LayerNormTask
+from hidet.graph.ops.schedules.common import params_from_task
+from hidet.transforms.tools import fuse_and_pack
+from hidet.utils import prod
+from ..auto_scheduler import unravel_index
+
+
+def warp_reduce_welford(count: Var, mean: Var, m2: Var) -> Stmt:
+    """
+    Merge the Welford statistics (the number of elements, the mean, and the sum of squared deviations from the mean)
+    of the threads in a warp.
+
+    After the reduction, all the threads in the warp have the statistics of the whole row.
+    """
+    sb = StmtBuilder()
+    dtype = mean.type
+    other_count = scalar_var('other_count', dtype)
+    other_mean = scalar_var('other_mean', dtype)
+    other_m2 = scalar_var('other_m2', dtype)
+    delta = scalar_var('delta', dtype)
+    ratio = scalar_var('ratio', dtype)
+    for v in [other_count, other_mean, other_m2, delta, ratio]:
+        sb += DeclareStmt(v)
+    with sb.let('mask', active_mask()) as mask:
+        for lane_delta in [16, 8, 4, 2, 1]:
+            sb += AssignStmt(other_count, shfl_down_sync(mask, count, delta=lane_delta))
+            sb += AssignStmt(other_mean, shfl_down_sync(mask, mean, delta=lane_delta))
+            sb += AssignStmt(other_m2, shfl_down_sync(mask, m2, delta=lane_delta))
+            sb += AssignStmt(delta, other_mean - mean)
+            # the fraction of the merged elements from the other thread, the threads may have no elements
+            sb += AssignStmt(
+                ratio, if_then_else(count + other_count > dtype.zero, other_count / (count + other_count), dtype.zero)
+            )
+            sb += AssignStmt(m2, m2 + other_m2 + delta * delta * count * ratio)
+            sb += AssignStmt(mean, mean + delta * ratio)
+            sb += AssignStmt(count, count + other_count)
+        for v in [count, mean, m2]:
+            sb += AssignStmt(v, shfl_sync(mask, v, src_lane=0))
+    return sb.finish()
+
+
+def layer_norm_cuda_schedule(task: LayerNormTask) -> IRModule:
+    """
+    Layer norm on cuda, where each row is normalized by a warp.
+
+    Each thread computes the mean and variance of its elements in one pass with Welford's algorithm, and the
+    statistics of the threads are merged with one warp reduction. Then the row is read again to write the normalized
+    elements.
+    """
+    shape: List[int] = task.x_shape
+    num_outer_dims = len(shape) - task.num_last_dims
+    outer_shape, norm_shape = shape[:num_outer_dims], shape[num_outer_dims:]
+    norm_size = prod(norm_shape)
+
+    warp_size = 32
+    grid_layout = TaskMapping.row_major(task_shape=outer_shape) if num_outer_dims > 0 else None
+    # the number of elements of each thread, iterated by a loop instead of being unrolled, since the rows can be long
+    outer_extent = (norm_size + warp_size - 1) // warp_size
+
+    x_dtype = task.inputs[0].ttype.dtype
+    acc_dtype = float32 if x_dtype.nbytes < 4 else x_dtype
+
+    with FunctionBuilder(
+        name=task.name + '_grid',
+        kind='cuda_kernel',
+        grid_dim=prod(outer_shape),
+        block_dim=warp_size,
+        label='layer norm schedule',
+    ) as fb:
+        params = params_from_task(task)
+        x, y = params
+        fb.extend_params(params)
+
+        sb = StmtBuilder()
+        outer_indices = list(grid_layout.worker2task(block_idx())[0]) if grid_layout is not None else []
+
+        def row_indices(r):
+            return outer_indices + unravel_index(r, norm_shape)
+
+        count = scalar_var('count', acc_dtype)
+        mean = scalar_var('mean', acc_dtype)
+        m2 = scalar_var('m2', acc_dtype)
+        value = scalar_var('value', acc_dtype)
+        delta = scalar_var('delta', acc_dtype)
+        sb += DeclareStmt(count, init=acc_dtype.zero)
+        sb += DeclareStmt(mean, init=acc_dtype.zero)
+        sb += DeclareStmt(m2, init=acc_dtype.zero)
+        sb += DeclareStmt(value)
+        sb += DeclareStmt(delta)
+
+        # welford's online mean and variance of the elements of each thread
+        with sb.for_loop('i', outer_extent) as i:
+            r = i * warp_size + thread_idx()
+            with sb.if_then(r < norm_size):
+                sb += AssignStmt(value, cast(x[row_indices(r)], acc_dtype))
+                sb += AssignStmt(count, count + acc_dtype.one)
+                sb += AssignStmt(delta, value - mean)
+                sb += AssignStmt(mean, mean + delta / count)
+                sb += AssignStmt(m2, m2 + delta * (value - mean))
+        sb += warp_reduce_welford(count, mean, m2)
+
+        # normalize the row
+        rstd = scalar_var('rstd', acc_dtype)
+        sb += DeclareStmt(rstd, init=prim.rsqrt(m2 / acc_dtype(norm_size) + acc_dtype(task.epsilon)))
+        with sb.for_loop('i', outer_extent) as i:
+            r = i * warp_size + thread_idx()
+            with sb.if_then(r < norm_size):
+                normalized = (cast(x[row_indices(r)], acc_dtype) - mean) * rstd
+                sb += BufferStoreStmt(y, row_indices(r), cast(normalized, x_dtype))
+
+        fb.set_body(sb.finish())
+    func = fb.get()
+    ir_module = IRModule(funcs={func.name: func}, task=task)
+    return fuse_and_pack(ir_module, func, task)
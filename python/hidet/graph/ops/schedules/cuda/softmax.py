@@ -13,19 +13,59 @@ from typing import List
 
 from hidet.ir import IRModule
 from hidet.ir.builders import FunctionBuilder, StmtBuilder
-from hidet.ir.expr import scalar_var, if_then_else, tensor_var
+from hidet.ir.dtypes import float32
+from hidet.ir.expr import Var, scalar_var, tensor_var, cast
 from hidet.ir.mapping import TaskMapping
-from hidet.ir.primitives import block_idx, thread_idx
+from hidet.ir.primitives import block_idx, thread_idx, active_mask, shfl_down_sync, shfl_sync
 from hidet.ir import primitives as prim
-from hidet.ir.stmt import AssignStmt, BufferStoreStmt, DeclareStmt
+from hidet.ir.stmt import Stmt, AssignStmt, BufferStoreStmt, DeclareStmt
 from hidet.ir.layout import row_layout, local_layout
 from hidet.graph.ops.definitions.softmax import SoftmaxTask
 from hidet.graph.ops.schedules.common import params_from_task
 from hidet.transforms.tools import fuse_and_pack
-from .common import warp_reduce
+
+# the rows with at most this number of elements per thread are cached in registers
+max_cached_elements = 8
+
+
+def warp_reduce_online_softmax(max_value: Var, sum_value: Var) -> Stmt:
+    """
+    Merge the running maximums and sums of exponentials of the threads in a warp.
+
+    Each sum is relative to the maximum of its thread. When two threads are merged, both sums are rescaled to the
+    larger maximum. After the reduction, all the threads in the warp have the maximum and the sum of the whole row.
+    """
+    sb = StmtBuilder()
+    dtype = max_value.type
+    other_max = scalar_var('other_max', dtype)
+    other_sum = scalar_var('other_sum', dtype)
+    new_max = scalar_var('new_max', dtype)
+    sb += DeclareStmt(other_max)
+    sb += DeclareStmt(other_sum)
+    sb += DeclareStmt(new_max)
+    with sb.let('mask', active_mask()) as mask:
+        for delta in [16, 8, 4, 2, 1]:
+            sb += AssignStmt(other_max, shfl_down_sync(mask, max_value, delta=delta))
+            sb += AssignStmt(other_sum, shfl_down_sync(mask, sum_value, delta=delta))
+            sb += AssignStmt(new_max, prim.max(max_value, other_max))
+            sb += AssignStmt(
+                sum_value, sum_value * prim.exp(max_value - new_max) + other_sum * prim.exp(other_max - new_max)
+            )
+            sb += AssignStmt(max_value, new_max)
+        sb += AssignStmt(max_value, shfl_sync(mask, max_value, src_lane=0))
+        sb += AssignStmt(sum_value, shfl_sync(mask, sum_value, src_lane=0))
+    return sb.finish()
 
 
 def softmax_cuda_schedule(task: SoftmaxTask) -> IRModule:
+    """
+    Softmax on cuda, where each row is computed by a warp.
+
+    Each thread computes the maximum and the sum of exponentials of its elements in one pass (online softmax): when a
+    larger maximum is found, the partial sum is rescaled to the new maximum. The partial results of the threads are
+    merged with one warp reduction. The short rows are cached in registers, the long rows are read again to write
+    the normalized exponentials.
+    """
     shape: List[int] = task.x_shape
     axis = task.axis
 
@@ -36,8 +76,10 @@ def softmax_cuda_schedule(task: SoftmaxTask) -> IRModule:
     reduce_extent = shape[axis]
     outer_extent = (reduce_extent + warp_size - 1) // warp_size
     block_layout = TaskMapping.full_layout([outer_extent]) * TaskMapping.row_major([warp_size])
+    cache_row = outer_extent <= max_cached_elements
 
     x_dtype = task.inputs[0].ttype.dtype
+    acc_dtype = float32 if x_dtype.nbytes < 4 else x_dtype
 
     with FunctionBuilder(
         name=task.name + '_grid',
@@ -54,36 +96,42 @@ def softmax_cuda_schedule(task: SoftmaxTask) -> IRModule:
         # body
         sb = StmtBuilder()
 
-        # local variables
-        buf = tensor_var('buf', dtype=x_dtype, layout=row_layout(outer_extent) * local_layout(warp_size))
-        sb += DeclareStmt(buf)
-
-        rv = scalar_var('rv', x_dtype)  # rv stands for reduce value
-        sb += DeclareStmt(rv)
-
-        # get the max value along c dimension
-        sb += AssignStmt(rv, x_dtype.min_value)
         other_indices = grid_layout.worker2task(block_idx())[0]
-        for (r,) in block_layout.worker2task(thread_idx()):
-            with sb.if_then(r < reduce_extent):
-                sb += BufferStoreStmt(buf, [r], x[other_indices[:axis] + (r,) + other_indices[axis:]])
-                sb += AssignStmt(rv, prim.max(rv, buf[r]))
-        sb += warp_reduce(rv, prim.max)
 
-        # calculate exp(v-max)
-        for (r,) in block_layout.worker2task(thread_idx()):
-            sb += AssignStmt(buf[r], prim.exp(buf[r] - rv))
+        def row_indices(r):
+            return other_indices[:axis] + (r,) + other_indices[axis:]
 
-        # calculate sum(exp(v-max))
-        sb += AssignStmt(rv, x_dtype.zero)
+        # local variables
+        buf = tensor_var('buf', dtype=acc_dtype, layout=row_layout(outer_extent) * local_layout(warp_size))
+        if cache_row:
+            sb += DeclareStmt(buf)
+        value = scalar_var('value', acc_dtype)
+        max_value = scalar_var('max_value', acc_dtype)
+        sum_value = scalar_var('sum_value', acc_dtype)
+        sb += DeclareStmt(value)
+        sb += DeclareStmt(max_value, init=acc_dtype.min_value)
+        sb += DeclareStmt(sum_value, init=acc_dtype.zero)
+
+        # the running maximum and the sum of exponentials relative to it
         for (r,) in block_layout.worker2task(thread_idx()):
-            sb += AssignStmt(rv, rv + if_then_else(r < reduce_extent, buf[r], x_dtype.zero))
-        sb += warp_reduce(rv, lambda a, b: a + b)
+            with sb.if_then(r < reduce_extent):
+                sb += AssignStmt(value, cast(x[row_indices(r)], acc_dtype))
+                if cache_row:
+                    sb += BufferStoreStmt(buf, [r], value)
+                with sb.if_then(value > max_value):
+                    sb += AssignStmt(sum_value, sum_value * prim.exp(max_value - value) + acc_dtype.one)
+                    sb += AssignStmt(max_value, value)
+                with sb.otherwise():
+                    sb += AssignStmt(sum_value, sum_value + prim.exp(value - max_value))
+        sb += warp_reduce_online_softmax(max_value, sum_value)
 
         # calculate exp(v-max) / sum(exp(vv-max))
+        sb += AssignStmt(sum_value, acc_dtype.one / sum_value)
         for (r,) in block_layout.worker2task(thread_idx()):
             with sb.if_then(r < reduce_extent):
-                sb += BufferStoreStmt(y, other_indices[:axis] + (r,) + other_indices[axis:], buf[r] / rv)
+                row_value = buf[r] if cache_row else cast(x[row_indices(r)], acc_dtype)
+                normalized = prim.exp(row_value - max_value) * sum_value
+                sb += BufferStoreStmt(y, row_indices(r), cast(normalized, x_dtype))
 
         fb.set_body(sb.finish())
     func = fb.get()
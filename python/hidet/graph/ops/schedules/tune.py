@@ -9,9 +9,11 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Union, Sequence, TypeVar, Any, Dict, List, Optional
+from typing import Union, Sequence, TypeVar, Any, Dict, List, Optional, Tuple, Callable
 import os
+import inspect
 import itertools
+import random
 import shutil
 from tqdm import tqdm
 import numpy as np
@@ -20,6 +22,7 @@ from hidet.ir.task import Task
 import hidet.option
 from hidet.utils import prod
 from .resolve import dummy_inputs_from_task
+from .tuning_records import tuning_records
 
 Choice = TypeVar('Choice')
 
@@ -35,16 +38,31 @@ class TuningSpace:
         self.spaces: Dict[int, Dict[str, Any]] = {}
         self.existing_names: List[str] = []
 
-    def iterate_space(self, level: int):
+    def _level_space(self, level: int) -> Tuple[List[str], List[Sequence[Any]]]:
         # when given level is not defined, down to lower level
         while level > 0 and level not in self.spaces:
             level -= 1
         if level == 0 and level not in self.spaces:
-            yield {}
-            return
+            return [], []
+        return list(self.spaces[level].keys()), list(self.spaces[level].values())
+
+    @staticmethod
+    def _to_kwargs(keys: List[str], values: Sequence[Any]) -> Dict[str, Any]:
+        kwargs = {}
+        for key, value in zip(keys, values):
+            if ',' in key:
+                for name, v in zip(key.split(','), value):
+                    kwargs[name] = v
+            else:
+                kwargs[key] = value
+        return kwargs
 
-        sub_keys = list(self.spaces[level].keys())
-        sub_spaces = list(self.spaces[level].values())
+    def space_size(self, level: int) -> int:
+        _, sub_spaces = self._level_space(level)
+        return prod([len(s) for s in sub_spaces])
+
+    def iterate_space(self, level: int):
+        sub_keys, sub_spaces = self._level_space(level)
         space_size = prod([len(s) for s in sub_spaces])
         if space_size > self.MAX_SPACE_SIZE:
             raise ValueError(
@@ -53,14 +71,41 @@ class TuningSpace:
                 f'Please consider to reduce the search space.'
             )
         for values in itertools.product(*sub_spaces):
-            kwargs = {}
-            for key, value in zip(sub_keys, values):
-                if ',' in key:
-                    for name, v in zip(key.split(','), value):
-                        kwargs[name] = v
-                else:
-                    kwargs[key] = value
-            yield kwargs
+            yield self._to_kwargs(sub_keys, values)
+
+    def sample_space(self, level: int, num_samples: int, seed: int = 0) -> List[Dict[str, Any]]:
+        """
+        Sample distinct schedules from the space uniformly, without enumerating the whole space.
+
+        Parameters
+        ----------
+        level: int
+            The search space level.
+
+        num_samples: int
+            The number of schedules to sample. When the space is not larger than it, all the schedules are returned.
+
+        seed: int
+            The seed of the random sampling.
+
+        Returns
+        -------
+        ret: List[Dict[str, Any]]
+            The sampled schedules.
+        """
+        sub_keys, sub_spaces = self._level_space(level)
+        space_size = prod([len(s) for s in sub_spaces])
+        if space_size <= num_samples:
+            return [self._to_kwargs(sub_keys, values) for values in itertools.product(*sub_spaces)]
+        samples = []
+        for index in sorted(random.Random(seed).sample(range(space_size), num_samples)):
+            # decode the index of the schedule in the row-major order of the sub spaces
+            values = []
+            for sub_space in reversed(sub_spaces):
+                index, choice = divmod(index, len(sub_space))
+                values.append(sub_space[choice])
+            samples.append(self._to_kwargs(sub_keys, list(reversed(values))))
+        return samples
 
     def add_sub_space(self, level: int, names: str, choices: Sequence[Union[Choice, Sequence[Choice]]]):
         if level not in self.spaces:
@@ -90,6 +135,80 @@ def space(level: int, names: str, choices: Sequence[Union[Choice, Sequence[Choic
     return wrapper
 
 
+def cost(estimator: Callable[..., float]):
+    """
+    Attach an analytical cost model to a template function.
+
+    The estimator takes the same arguments as the template function (including ``self`` for methods) and returns
+    the estimated cost of the schedule, where a lower cost means a faster schedule. The estimate does not need to
+    be in any unit, since it is only used to rank the schedules and as a feature of the learned cost model.
+    """
+
+    def wrapper(func):
+        setattr(func, '_cost_estimator', estimator)
+        return func
+
+    return wrapper
+
+
+class CostModel:
+    """
+    The cost model that ranks the schedules of a tuning space.
+
+    The model predicts the logarithm of the latency of a schedule with a ridge regression over the schedule knobs,
+    where the numeric knobs (e.g., tile sizes) are featured by their logarithms, the other knobs (e.g., mma
+    instructions) are one-hot encoded, and the analytical cost of the template (if any) is an extra feature. Before
+    enough schedules are measured, the schedules are ranked by the analytical cost alone.
+
+    Parameters
+    ----------
+    kwargs_list: Sequence[Dict[str, Any]]
+        The schedules of the tuning space.
+
+    estimator: Optional[Callable[[Dict[str, Any]], float]]
+        The analytical cost of a schedule.
+    """
+
+    def __init__(self, kwargs_list: Sequence[Dict[str, Any]], estimator: Optional[Callable[[Dict[str, Any]], float]]):
+        self.estimator: Optional[Callable[[Dict[str, Any]], float]] = estimator
+        self.numeric_keys: List[str] = []
+        self.categories: List[Tuple[str, Any]] = []
+        keys = list(kwargs_list[0].keys()) if len(kwargs_list) > 0 else []
+        for key in keys:
+            values = [kwargs[key] for kwargs in kwargs_list]
+            if all(isinstance(v, (int, float)) and not isinstance(v, bool) and v > 0 for v in values):
+                self.numeric_keys.append(key)
+            else:
+                for value in values:
+                    if (key, value) not in self.categories:
+                        self.categories.append((key, value))
+        self.weights: Optional[np.ndarray] = None
+
+    def estimate(self, kwargs: Dict[str, Any]) -> float:
+        if self.estimator is None:
+            return 0.0
+        return float(np.log(max(float(self.estimator(kwargs)), 1e-12)))
+
+    def features(self, kwargs: Dict[str, Any]) -> np.ndarray:
+        feature = [1.0, self.estimate(kwargs)]
+        feature.extend(float(np.log2(kwargs[key])) for key in self.numeric_keys)
+        feature.extend(1.0 if kwargs[key] == value else 0.0 for key, value in self.categories)
+        return np.array(feature, dtype=np.float64)
+
+    def fit(self, kwargs_list: Sequence[Dict[str, Any]], latencies: Sequence[float], reg: float = 1e-2):
+        valid = [(kwargs, latency) for kwargs, latency in zip(kwargs_list, latencies) if latency < 1e30]
+        if len(valid) < 3:
+            return
+        x = np.stack([self.features(kwargs) for kwargs, _ in valid])
+        y = np.log(np.array([latency for _, latency in valid], dtype=np.float64))
+        self.weights = np.linalg.solve(x.T @ x + reg * np.eye(x.shape[1]), x.T @ y)
+
+    def predict(self, kwargs_list: Sequence[Dict[str, Any]]) -> List[float]:
+        if self.weights is None:
+            return [self.estimate(kwargs) for kwargs in kwargs_list]
+        return [float(self.features(kwargs) @ self.weights) for kwargs in kwargs_list]
+
+
 def _generate_summary(kwargs_list: List[Dict[str, Any]], latencies: List[float]) -> str:
     # sort by latency
     indices, kwargs_list, latencies = zip(
@@ -112,48 +231,19 @@ def _generate_summary(kwargs_list: List[Dict[str, Any]], latencies: List[float])
     return summary
 
 
-def tune(template_func, task: Task, target_device: str, working_dir: str) -> IRModule:
+def _benchmark(
+    ir_modules: List[IRModule], task: Task, target_device: str, output_dir: str, dummy_inputs: List[Any]
+) -> List[float]:
     from hidet.driver import build_ir_module_batch
     from hidet.runtime import CompiledFunction
 
-    # get ir modules to tune
-    if hasattr(template_func, '_tuning_space'):
-        tuning_space: TuningSpace = getattr(template_func, '_tuning_space')
-        # iterate space and instantiate schedules into tensor programs
-        kwargs_list = list(tuning_space.iterate_space(hidet.option.get_search_space()))
-    else:
-        raise ValueError(
-            'No tuning space is attached to the template function.\n'
-            'Please use @tune.space to decorate the template function to define the search space.'
-        )
-
-    ir_modules = []
-    ir_modules_kwargs = []
-    for kwargs in kwargs_list:
-        try:
-            ir_modules.append(template_func(**kwargs))
-            ir_modules_kwargs.append(kwargs)
-        except ScheduleError:
-            # the schedule is invalid, skip it
-            continue
-
-    if len(ir_modules) == 0:
-        raise ValueError('No valid schedule is found.')
-    elif len(ir_modules) == 1:
-        # do not need to tune
-        return ir_modules[0]
-
     # build ir modules into compiled functions
-    tuning_dir = os.path.join(working_dir, 'tuning')
     compiled_funcs: List[Optional[CompiledFunction]] = build_ir_module_batch(
-        ir_modules, func_name=task.name, output_dir=tuning_dir, parallel=True, verbose=True
+        ir_modules, func_name=task.name, output_dir=output_dir, parallel=True, verbose=True, target=target_device
     )
     assert len(compiled_funcs) == len(ir_modules)
-    if any(f is None for f in compiled_funcs):
-        raise ValueError('All ir modules failed to build.')
 
     # benchmark
-    dummy_inputs = dummy_inputs_from_task(task, target_device=target_device)
     latencies = []
     warmup, number, repeat = hidet.option.get_option('bench_config')
     for compiled_func in tqdm(compiled_funcs, desc='Benchmarking', total=len(ir_modules), ncols=80):
@@ -164,18 +254,191 @@ def tune(template_func, task: Task, target_device: str, working_dir: str) -> IRM
             # this ir module failed in building, skip
             latency = 1e30
         latencies.append(latency)
+    return latencies
+
+
+def _search(
+    template_func,
+    kwargs_list: List[Dict[str, Any]],
+    seeds: List[Dict[str, Any]],
+    budget: int,
+    task: Task,
+    target_device: str,
+    tuning_dir: str,
+) -> Tuple[List[IRModule], List[Dict[str, Any]], List[float]]:
+    # search the schedules in rounds: each round instantiates the schedules ranked best by the cost model (and a
+    # quarter of random ones to explore the space), then measures them and refits the cost model with the results.
+    # the search stops when the budget is used up, or the best latency does not improve for two rounds. the seeds
+    # (e.g., the recorded schedules of the nearest shapes) are measured first.
+    for seed in seeds:
+        if seed not in kwargs_list:
+            kwargs_list.append(seed)
+    seeded: List[int] = [kwargs_list.index(seed) for seed in seeds]
+    estimator = getattr(template_func, '_cost_estimator', None)
+
+    def estimate(kwargs: Dict[str, Any]) -> float:
+        if inspect.ismethod(template_func):
+            return estimator(template_func.__self__, **kwargs)
+        return estimator(**kwargs)
+
+    model = CostModel(kwargs_list, estimate if estimator is not None else None)
+    rng = random.Random(0)
+
+    pending: List[int] = list(range(len(kwargs_list)))
+    ir_modules: List[IRModule] = []
+    measured_kwargs: List[Dict[str, Any]] = []
+    latencies: List[float] = []
+    dummy_inputs = None
+    round_size = max(1, (budget + 3) // 4)
+    best_latency, stall_rounds, round_idx = 1e30, 0, 0
+    while len(pending) > 0 and len(latencies) < budget and stall_rounds < 2:
+        num = min(round_size, budget - len(latencies))
+        predictions = model.predict([kwargs_list[i] for i in pending])
+        ranked = [i for _, i in sorted(zip(predictions, pending))]
+        if round_idx == 0:
+            ranked = seeded + [i for i in ranked if i not in seeded]
+        explored = rng.sample(ranked, len(ranked))
+        selected: List[Tuple[int, IRModule]] = []
+        skipped = set()
+        for candidates, quota in [(ranked, num - num // 4), (explored, num)]:
+            for i in candidates:
+                if len(selected) >= quota:
+                    break
+                if i in skipped:
+                    continue
+                skipped.add(i)
+                try:
+                    selected.append((i, template_func(**kwargs_list[i])))
+                except ScheduleError:
+                    # the schedule is invalid, skip it
+                    continue
+        pending = [i for i in pending if i not in skipped]
+        if len(selected) == 0:
+            break
+        if len(latencies) == 0 and len(selected) == 1 and (budget == 1 or len(pending) == 0):
+            # do not need to tune
+            return [selected[0][1]], [kwargs_list[selected[0][0]]], [0.0]
+
+        if dummy_inputs is None:
+            dummy_inputs = dummy_inputs_from_task(task, target_device=target_device)
+        round_modules = [ir_module for _, ir_module in selected]
+        round_dir = os.path.join(tuning_dir, str(round_idx))
+        round_latencies = _benchmark(round_modules, task, target_device, round_dir, dummy_inputs)
+        ir_modules.extend(round_modules)
+        measured_kwargs.extend(kwargs_list[i] for i, _ in selected)
+        latencies.extend(round_latencies)
+        model.fit(measured_kwargs, latencies)
+
+        if min(round_latencies) < best_latency * 0.99:
+            best_latency, stall_rounds = min(round_latencies), 0
+        else:
+            stall_rounds += 1
+        round_idx += 1
+    return ir_modules, measured_kwargs, latencies
+
+
+def tune(template_func, task: Task, target_device: str, working_dir: str) -> IRModule:
+    """
+    Tune a template function over its tuning space, and return the fastest schedule.
+
+    When the tuning budget (see :func:`hidet.option.tuning_budget`) is not set, all the schedules in the space are
+    compiled and measured. Otherwise, the schedules are ranked by a :class:`CostModel` that is refined with the
+    measured latencies, and only the number of schedules given by the budget are compiled and measured. The
+    search stops early when the best latency stops improving.
+
+    The best schedule is saved in the tuning records (see :mod:`hidet.graph.ops.schedules.tuning_records`). When the
+    task has been recorded, the recorded schedule is replayed without tuning. Otherwise, the schedules recorded for
+    the nearest shapes of the same task family are measured first in a budgeted search.
+
+    Parameters
+    ----------
+    template_func:
+        The template function decorated by :func:`space`, and optionally :func:`cost`.
+
+    task: Task
+        The task to tune.
+
+    target_device: str
+        The target device, 'cuda' or 'cpu'.
+
+    working_dir: str
+        The working directory of the task.
+
+    Returns
+    -------
+    ret: IRModule
+        The ir module of the fastest schedule.
+    """
+    # get ir modules to tune
+    if hasattr(template_func, '_tuning_space'):
+        tuning_space: TuningSpace = getattr(template_func, '_tuning_space')
+    else:
+        raise ValueError(
+            'No tuning space is attached to the template function.\n'
+            'Please use @tune.space to decorate the template function to define the search space.'
+        )
+    level = hidet.option.get_search_space()
+    budget: Optional[int] = hidet.option.get_tuning_budget()
+    tuning_dir = os.path.join(working_dir, 'tuning')
+
+    # replay the recorded schedule of the task
+    records = tuning_records()
+    recorded_kwargs = records.lookup(task, template_func, target_device)
+    if recorded_kwargs is not None:
+        try:
+            return template_func(**recorded_kwargs)
+        except (ScheduleError, TypeError):
+            # the recorded schedule does not fit the current template function, tune the task again
+            pass
+
+    if budget is None:
+        # iterate space and instantiate schedules into tensor programs
+        ir_modules = []
+        ir_modules_kwargs = []
+        for kwargs in tuning_space.iterate_space(level):
+            try:
+                ir_modules.append(template_func(**kwargs))
+                ir_modules_kwargs.append(kwargs)
+            except ScheduleError:
+                # the schedule is invalid, skip it
+                continue
+
+        if len(ir_modules) == 0:
+            raise ValueError('No valid schedule is found.')
+        elif len(ir_modules) == 1:
+            # do not need to tune
+            return ir_modules[0]
+
+        dummy_inputs = dummy_inputs_from_task(task, target_device=target_device)
+        latencies = _benchmark(ir_modules, task, target_device, tuning_dir, dummy_inputs)
+    else:
+        # the space larger than the limit is sampled instead of enumerated
+        kwargs_list = tuning_space.sample_space(level, num_samples=TuningSpace.MAX_SPACE_SIZE)
+        seeds = records.nearest(task, template_func, target_device)
+        ir_modules, ir_modules_kwargs, latencies = _search(
+            template_func, kwargs_list, seeds, budget, task, target_device, tuning_dir
+        )
+        if len(ir_modules) == 0:
+            raise ValueError('No valid schedule is found.')
+        elif len(ir_modules) == 1:
+            return ir_modules[0]
+
+    if all(latency >= 1e30 for latency in latencies):
+        raise ValueError('All ir modules failed to build.')
 
     # remove tuning directory
     if not hidet.option.get_option('debug_cache_tuning'):
-        shutil.rmtree(tuning_dir)
+        shutil.rmtree(tuning_dir, ignore_errors=True)
 
     # generate summary
     summary = _generate_summary(ir_modules_kwargs, latencies)
     with open(os.path.join(working_dir, 'tuning_summary.txt'), 'w') as f:
         f.write(summary)
 
-    # select the best schedule and return
-    return ir_modules[np.argmin(latencies)]
+    # select the best schedule, record and return it
+    best = int(np.argmin(latencies))
+    records.add(task, template_func, target_device, ir_modules_kwargs[best], latencies[best])
+    return ir_modules[best]
 
 
 def check(condition: bool, message: str = ""):
@@ -0,0 +1,296 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+The database of tuning records.
+
+Each record stores the best schedule (the keyword arguments of the template function) found by tuning a task, and
+its latency. The records are keyed by the task family (the task name), the template function, the target device,
+the data types and shapes of the task parameters, and the task attributes. They are stored in an sqlite database
+``<cache_dir>/tuning/records.db``, and can be exported to and imported from JSON-lines files, e.g., to ship the
+records together with a model.
+
+When a task is tuned, :func:`~hidet.graph.ops.schedules.tune.tune` replays the recorded schedule of the task if
+there is one. Otherwise, the schedules recorded for the nearest shapes of the same task family seed the search.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import contextlib
+import json
+import math
+import os
+import sqlite3
+import time
+from hidet import option
+from hidet.ir.task import Task
+
+_columns = ['family', 'template', 'target', 'dtypes', 'attrs', 'shapes', 'kwargs', 'latency']
+
+
+def _task_key(task: Task, template_func, target: str) -> Dict[str, str]:
+    params = task.parameters
+    return {
+        'family': task.name,
+        'template': getattr(template_func, '__qualname__', str(template_func)),
+        'target': target,
+        'dtypes': json.dumps([param.type.dtype.name for param in params]),
+        'attrs': json.dumps({name: str(value) for name, value in task.attributes.items()}, sort_keys=True),
+        'shapes': json.dumps([[int(v) for v in param.const_shape()] for param in params]),
+    }
+
+
+def _shape_distance(lhs: List[List[int]], rhs: List[List[int]]) -> Optional[float]:
+    # the distance between the shapes of two tasks in the log space, None if their ranks differ
+    if len(lhs) != len(rhs) or any(len(a) != len(b) for a, b in zip(lhs, rhs)):
+        return None
+    distance = 0.0
+    for a, b in zip(lhs, rhs):
+        distance += sum(abs(math.log2(x + 1) - math.log2(y + 1)) for x, y in zip(a, b))
+    return distance
+
+
+class TuningRecords:
+    db_name = 'records.db'
+
+    def __init__(self, root: str):
+        self.root: str = os.path.abspath(root)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.root, self.db_name), timeout=60.0, isolation_level=None)
+        try:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS records ('
+                'family TEXT, template TEXT, target TEXT, dtypes TEXT, attrs TEXT, shapes TEXT, '
+                'kwargs TEXT, latency REAL, created REAL, '
+                'PRIMARY KEY (family, template, target, dtypes, attrs, shapes))'
+            )
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, record: Dict[str, Any]):
+        # keep the faster schedule when the task is already recorded
+        conn.execute(
+            'INSERT INTO records (family, template, target, dtypes, attrs, shapes, kwargs, latency, created) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (family, template, target, dtypes, attrs, shapes) DO UPDATE SET '
+            'kwargs = excluded.kwargs, latency = excluded.latency, created = excluded.created '
+            'WHERE excluded.latency < records.latency',
+            tuple(record[name] for name in _columns) + (time.time(),),
+        )
+
+    def add(self, task: Task, template_func, target: str, kwargs: Dict[str, Any], latency: float):
+        """
+        Record the schedule of a task. An existing record of the task is replaced only if the new schedule is faster.
+
+        Parameters
+        ----------
+        task: Task
+            The tuned task.
+
+        template_func:
+            The template function of the schedule.
+
+        target: str
+            The target device, 'cuda' or 'cpu'.
+
+        kwargs: Dict[str, Any]
+            The keyword arguments of the template function, which must be serializable to JSON.
+
+        latency: float
+            The latency of the schedule, in milliseconds.
+        """
+        record = _task_key(task, template_func, target)
+        record.update(kwargs=json.dumps(kwargs, sort_keys=True), latency=float(latency))
+        with self._connect() as conn:
+            self._insert(conn, record)
+
+    def lookup(self, task: Task, template_func, target: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the recorded schedule of a task.
+
+        Parameters
+        ----------
+        task: Task
+            The task.
+
+        template_func:
+            The template function.
+
+        target: str
+            The target device.
+
+        Returns
+        -------
+        ret: Optional[Dict[str, Any]]
+            The keyword arguments of the template function, or None if the task is not recorded.
+        """
+        key = _task_key(task, template_func, target)
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT kwargs FROM records WHERE family = ? AND template = ? AND target = ? AND dtypes = ? '
+                'AND attrs = ? AND shapes = ?',
+                tuple(key[name] for name in _columns[:6]),
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def nearest(self, task: Task, template_func, target: str, k: int = 4) -> List[Dict[str, Any]]:
+        """
+        Get the schedules recorded for the tasks of the same family, whose shapes are the nearest to the task.
+
+        Parameters
+        ----------
+        task: Task
+            The task.
+
+        template_func:
+            The template function.
+
+        target: str
+            The target device.
+
+        k: int
+            The maximum number of schedules to return.
+
+        Returns
+        -------
+        ret: List[Dict[str, Any]]
+            The keyword arguments of the template function, from the nearest to the farthest.
+        """
+        key = _task_key(task, template_func, target)
+        shapes = json.loads(key['shapes'])
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT shapes, kwargs FROM records WHERE family = ? AND template = ? AND target = ? AND dtypes = ?',
+                tuple(key[name] for name in _columns[:4]),
+            ).fetchall()
+        candidates: List[Tuple[float, str]] = []
+        for row_shapes, row_kwargs in rows:
+            distance = _shape_distance(shapes, json.loads(row_shapes))
+            if distance is not None:
+                candidates.append((distance, row_kwargs))
+        ret: List[Dict[str, Any]] = []
+        for _, row_kwargs in sorted(candidates):
+            kwargs = json.loads(row_kwargs)
+            if kwargs not in ret:
+                ret.append(kwargs)
+        return ret[:k]
+
+    def export_records(self, path: str) -> int:
+        """
+        Export the records to a JSON-lines file.
+
+        Parameters
+        ----------
+        path: str
+            The path of the file.
+
+        Returns
+        -------
+        ret: int
+            The number of exported records.
+        """
+        with self._connect() as conn:
+            rows = conn.execute('SELECT {} FROM records ORDER BY family, shapes'.format(', '.join(_columns))).fetchall()
+        dirname = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dirname, exist_ok=True)
+        with open(path, 'w') as f:
+            for row in rows:
+                record = dict(zip(_columns, row))
+                for name in ['dtypes', 'attrs', 'shapes', 'kwargs']:
+                    record[name] = json.loads(record[name])
+                f.write(json.dumps(record, sort_keys=True) + '\n')
+        return len(rows)
+
+    def import_records(self, path: str) -> int:
+        """
+        Import the records from a JSON-lines file exported by :meth:`export_records`. For the tasks that are already
+        recorded, the faster schedule is kept.
+
+        Parameters
+        ----------
+        path: str
+            The path of the file.
+
+        Returns
+        -------
+        ret: int
+            The number of records in the file.
+        """
+        records = []
+        with open(path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if any(name not in record for name in _columns):
+                    raise ValueError('Invalid tuning record in {}: {}'.format(path, line.strip()))
+                for name in ['dtypes', 'attrs', 'shapes', 'kwargs']:
+                    record[name] = json.dumps(record[name], sort_keys=True)
+                records.append(record)
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for record in records:
+                self._insert(conn, record)
+            conn.execute('COMMIT')
+        return len(records)
+
+    def num_records(self) -> int:
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+
+def tuning_records() -> TuningRecords:
+    """
+    Get the tuning records in the current cache directory.
+
+    Returns
+    -------
+    ret: TuningRecords
+        The tuning records.
+    """
+    return TuningRecords(os.path.join(option.get_option('cache_dir'), 'tuning'))
+
+
+def export_tuning_records(path: str) -> int:
+    """
+    Export the tuning records in the current cache directory to a JSON-lines file.
+
+    Parameters
+    ----------
+    path: str
+        The path of the file.
+
+    Returns
+    -------
+    ret: int
+        The number of exported records.
+    """
+    return tuning_records().export_records(path)
+
+
+def import_tuning_records(path: str) -> int:
+    """
+    Import the tuning records from a JSON-lines file into the current cache directory.
+
+    Parameters
+    ----------
+    path: str
+        The path of the file.
+
+    Returns
+    -------
+    ret: int
+        The number of records in the file.
+    """
+    return tuning_records().import_records(path)
@@ -20,6 +20,7 @@ import hidet.runtime.storage
 import hidet.cuda
 from hidet.ir import dtypes
 from hidet.ir.type import DataType, data_type
+from hidet.ir.expr import Expr, Constant, symbol_var
 from hidet.ir.layout import DataLayout, RowMajorLayout
 from hidet.runtime.storage import Storage
 from hidet.utils import prod
@@ -27,6 +28,14 @@ from hidet.utils.overrides import set_module
 from hidet.runtime.device import Device, instantiate_device
 
 
+def _normalize_dim(dim: Union[int, str, Expr], symbolic: bool) -> Union[int, Expr]:
+    if isinstance(dim, Expr) and not isinstance(dim, Constant) or isinstance(dim, str):
+        if not symbolic:
+            raise ValueError('Only symbolic tensors can have symbolic dimensions, got {}.'.format(dim))
+        return symbol_var(dim) if isinstance(dim, str) else dim
+    return int(dim)
+
+
 @set_module('hidet')
 class Tensor:
     """An n-dimension array, could be symbolic or concrete.
@@ -58,11 +67,11 @@ class Tensor:
     def __init__(self, shape, dtype, device, storage, layout=None, trace=None):
         from hidet.graph.operator import Operator
 
-        self._shape: List[int] = [int(v) for v in shape]
+        self._shape: List[Union[int, Expr]] = [_normalize_dim(v, symbolic=storage is None) for v in shape]
         self._dtype: DataType = data_type(dtype)
         self._device: Device = instantiate_device(device)
         self._storage: Optional[Storage] = storage
-        self._layout: DataLayout = layout if layout else DataLayout.row_major(shape)
+        self._layout: DataLayout = layout if layout else DataLayout.row_major(self._shape)
         self._trace: Optional[Tuple[Operator, int]] = trace
 
     @property
@@ -70,7 +79,8 @@ class Tensor:
         """
         The shape of the tensor.
 
-        The shape is a tuple of integers indicating the size of the tensor along each dimension.
+        The shape is a tuple of integers indicating the size of the tensor along each dimension. The shape of a
+        symbolic tensor may contain symbolic dimensions (see :func:`~hidet.ir.expr.symbol_var`).
 
         Returns
         -------
@@ -966,13 +976,15 @@ def empty(shape, dtype='float32', device='cpu', layout=None):
     return Tensor(shape=shape, dtype=dtype, device=device, storage=storage, layout=layout)
 
 
-def symbol(shape: Sequence[int], dtype='float32', device='cpu', layout=None) -> Tensor:
+def symbol(shape: Sequence[Union[int, str, Expr]], dtype='float32', device='cpu', layout=None) -> Tensor:
     """Create a symbolic tensor.
 
     Parameters
     ----------
-    shape: Sequence[int]
-        The shape of new tensor.
+    shape: Sequence[Union[int, str, Expr]]
+        The shape of new tensor. A dimension given by a string (e.g., 'batch_size') is a symbolic dimension, whose
+        value is given by the tensors passed to the graph at runtime. The kernels of the graph are built once and
+        serve all the values of the symbolic dimensions.
 
     dtype: str
         The data type of element of the tensor.
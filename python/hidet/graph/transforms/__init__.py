@@ -13,14 +13,16 @@ from hidet.graph.ir import FlowGraph
 
 from .base import GraphPass, PassContext, logger
 from .instruments import GraphPassInstrument, SaveGraphInstrument, ProfileInstrument
+# the resolve rules are imported before the graph patterns, which import the operators that register resolve rules
+from .resolve_variant import ResolveRule, register_resolve_rule, get_resolve_chain
 from .fold_const import fold_const_pass
 from .subgraph_rewrite import subgraph_rewrite_pass
+from .layout_propagation import layout_propagation_pass
 from .automatic_mix_precision import automatic_mix_precision_pass
 from .resolve_variant import resolve_variant_pass
 from .fuse_operator import fuse_operator_pass
 from .eliminate_barrier import eliminate_barrier_pass
 
-from .resolve_variant import ResolveRule, register_resolve_rule, get_resolve_chain
 from .graph_patterns import TensorPattern, OperatorPattern, SubgraphRewriteRule, register_rewrite_rule, op_pattern
 from .graph_patterns import registered_rewrite_rules
 
@@ -49,6 +51,7 @@ def optimize(graph: FlowGraph) -> FlowGraph:
     passes = [
         fold_const_pass(),
         subgraph_rewrite_pass(),
+        layout_propagation_pass(),
         automatic_mix_precision_pass(),
         resolve_variant_pass(),
         fuse_operator_pass(),
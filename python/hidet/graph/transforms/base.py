@@ -12,6 +12,7 @@
 from __future__ import annotations
 from typing import List, Optional, Dict, Any
 import logging
+import threading
 
 from hidet.graph.ir.flow_graph import FlowGraph
 from .instruments import GraphPassInstrument
@@ -44,6 +45,7 @@ class PassContext:
           ctx.set_precision(dtype='float16')  # use float16 as the data type
           ctx.set_reduce_precision(dtype='float32')  # use float32 for reduction accumulation
           ctx.set_mma('mma')  # use TensorCore in NVIDIA GPUs to accelerate matmul and conv2d
+          ctx.set_layout('nhwc')  # compute the convolution networks in channels-last layout
           ...   # other configs
 
           # call optimize function
@@ -62,7 +64,8 @@ class PassContext:
         The current configs of the pass context.
     """
 
-    _stack: List['PassContext'] = []
+    # each thread has its own stack of pass contexts, whose bottom is the default context shared by all threads
+    _local = threading.local()
 
     def __init__(self):
         self.instruments: List[GraphPassInstrument] = []
@@ -81,29 +84,36 @@ class PassContext:
             'parallel_k': 'default',
             # print lower details
             'verbose': False,
+            # the layout of the convolution networks:
+            # [None, 'nhwc']
+            'layout': None,
         }
 
     def __enter__(self) -> PassContext:
-        self._stack.append(self)
+        self._stack().append(self)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        popped = self._stack.pop()
+        popped = self._stack().pop()
         assert popped == self
 
+    @classmethod
+    def _stack(cls) -> List[PassContext]:
+        if not hasattr(cls._local, 'stack'):
+            cls._local.stack = [_default_context]
+        return cls._local.stack
+
     @classmethod
     def current(cls):
         """
-        Get the current pass context.
+        Get the current pass context of current thread.
 
         Returns
         -------
         ret: PassContext
             The current pass context.
         """
-        if len(cls._stack) == 0:
-            cls._stack.append(PassContext())
-        return cls._stack[-1]
+        return cls._stack()[-1]
 
     def set_precision(self, dtype: Optional[str] = None) -> PassContext:
         """
@@ -155,6 +165,27 @@ class PassContext:
         self.configs['verbose'] = True
         return self
 
+    def set_layout(self, layout: Optional[str] = None) -> PassContext:
+        """
+        Set the layout of the data in convolution networks. The convolutions and the pooling, padding and elementwise
+        operators around them are computed in the given layout, and the data is transposed only at the boundaries of
+        such regions. See :func:`~hidet.graph.transforms.layout_propagation_pass`.
+
+        Parameters
+        ----------
+        layout: Optional[str]
+            The layout to use. Candidates:
+
+            - None
+              Keep the NCHW layout of the operators.
+            - 'nhwc'
+              Use the channels-last layout.
+        """
+        if layout not in [None, 'nhwc']:
+            raise ValueError('Unsupported layout {}, candidates: None, \'nhwc\'.'.format(layout))
+        self.configs['layout'] = layout
+        return self
+
     def set_mma(self, mma: str) -> PassContext:
         """
         Specify the matrix-multiply-accumulate (mma) computation primitives used in matrix multiplication and
@@ -238,6 +269,9 @@ class PassContext:
         return self
 
 
+_default_context = PassContext()
+
+
 class GraphPass:
     def __init__(self):
         self.name = self.__class__.__name__
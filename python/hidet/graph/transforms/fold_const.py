@@ -9,16 +9,55 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from typing import List
+import logging
+from hidet.ir.layout import RowMajorLayout
+from hidet.ir.tools import evaluate_task
 from hidet.graph.ir import FlowGraph, Operator, GraphRewriter
+from hidet.graph.tensor import Tensor, from_numpy
 from hidet.graph.transforms import GraphPass
 from hidet import utils
 
+logger = logging.getLogger(__name__)
+
+
+def fold_operator(op: Operator, inputs: List[Tensor]) -> List[Tensor]:
+    """
+    Compute the outputs of an operator whose inputs are all constant.
+
+    The task of the operator is evaluated with numpy when possible, so that folding the common operators (e.g., the
+    reshape, transpose and cast of the weights) does not need to compile any kernel. Otherwise (e.g., the task can not
+    be evaluated, or numpy fails on an unusual dtype or broadcast), the operator is compiled and run.
+
+    Parameters
+    ----------
+    op: Operator
+        The operator to fold.
+
+    inputs: List[Tensor]
+        The constant inputs of the operator.
+
+    Returns
+    -------
+    ret: List[Tensor]
+        The constant outputs of the operator.
+    """
+    tensors = inputs + op.outputs
+    if all(isinstance(t.layout, RowMajorLayout) and t.dtype.short_name not in ['bf16', 'tf32'] for t in tensors):
+        try:
+            arrays = evaluate_task(op.task, [tensor.cpu().numpy() for tensor in inputs])
+        except (NotImplementedError, ValueError, TypeError, IndexError, ArithmeticError) as e:
+            logger.debug('Fall back to compiling operator %s, failed to evaluate it with numpy: %s', op.name, e)
+        else:
+            return [from_numpy(array).to(device=op.device) for array in arrays]
+    return Operator.imperative_run(op, inputs)
+
 
 class FoldConstantRewriter(GraphRewriter):
     def visit_Operator(self, op: Operator):
         inputs = [self(input) for input in op.inputs]
         if all(input.storage is not None for input in inputs):
-            outputs = Operator.imperative_run(op, inputs)
+            outputs = fold_operator(op, inputs)
             for original, updated in zip(op.outputs, outputs):
                 self.memo[original] = updated
             return None
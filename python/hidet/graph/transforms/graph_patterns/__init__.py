@@ -15,3 +15,5 @@ from .arithmetic_patterns import arithmetic_patterns
 from .transform_patterns import transform_patterns
 from .conv2d_patterns import conv2d_patterns
 from .matmul_patterns import matmul_patterns
+from .norm_patterns import norm_patterns
+from .attention_patterns import attention_patterns
@@ -0,0 +1,90 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List, Optional
+import itertools
+
+from hidet.graph.ir.flow_graph import Tensor
+from hidet.graph.ops.definitions.arithmetic import AddOp, MultiplyOp, DivideOp, MultiplyScalarOp, DivideScalarOp
+from hidet.graph.ops.definitions.attention import AttentionOp
+from hidet.graph.ops.definitions.matmul import MatmulOp, BatchMatmulOp
+from hidet.graph.ops.definitions.softmax import SoftmaxOp
+from hidet.graph.ops.definitions.utils import can_broadcast
+from hidet.utils import initialize
+from .base import SubgraphRewriteRule, TensorPattern, MatchDict, op_pattern, register_rewrite_rule
+from .norm_patterns import const_scalar
+
+
+class AttentionPattern(SubgraphRewriteRule):
+    """
+    The decomposed attention, which materializes the scores of all the queries and keys:
+
+        y = matmul(softmax(matmul(q, k) * scale + mask, axis=-1), v)
+
+    where the scale may be a multiplication or division by a scalar or a constant tensor with a single element, and
+    both the scale and the mask are optional.
+    """
+
+    def __init__(self, matmul_op, scale_op, has_mask: bool):
+        super().__init__(
+            'attention: {} scores, {} scale, {} mask'.format(
+                matmul_op.__name__, scale_op.__name__ if scale_op else 'no', 'additive' if has_mask else 'no'
+            )
+        )
+        self.scale_op = scale_op
+        self.q, self.k, self.v = TensorPattern.tensors(3)
+        self.scale = TensorPattern.tensor(is_const=True) if scale_op in [MultiplyOp, DivideOp] else None
+        self.mask = TensorPattern.tensor() if has_mask else None
+        self.score = op_pattern(matmul_op, [self.q, self.k])
+        if scale_op in [MultiplyOp, DivideOp]:
+            self.scaled = op_pattern(scale_op, [self.score, self.scale])
+        elif scale_op in [MultiplyScalarOp, DivideScalarOp]:
+            self.scaled = op_pattern(scale_op, [self.score])
+        else:
+            self.scaled = self.score
+        self.masked = op_pattern(AddOp, [self.scaled, self.mask]) if has_mask else self.scaled
+        self.prob = op_pattern(SoftmaxOp, [self.masked])
+        self.y = op_pattern(matmul_op, [self.prob, self.v])
+
+    def source(self) -> List[TensorPattern]:
+        return [self.y]
+
+    def target(self, matched: MatchDict) -> Optional[List[Tensor]]:
+        q, k, v = [matched[t] for t in [self.q, self.k, self.v]]
+        score, masked, prob = [matched[t] for t in [self.score, self.masked, self.prob]]
+        mask = matched[self.mask] if self.mask is not None else None
+        rank = len(q.shape)
+        if not (rank == len(k.shape) == len(v.shape) >= 2 and q.shape[:-2] == k.shape[:-2] == v.shape[:-2]):
+            return None
+        if prob.op.attrs['axis'] != rank - 1 or not q.dtype.is_float():
+            return None
+        if mask is not None:
+            if tuple(masked.shape) != tuple(score.shape) or not can_broadcast(mask.shape, score.shape):
+                return None
+
+        if self.scale_op in [MultiplyOp, DivideOp]:
+            scale = const_scalar(matched[self.scale])
+        elif self.scale_op in [MultiplyScalarOp, DivideScalarOp]:
+            scale = float(matched[self.scaled].op.attrs['scalar'])
+        else:
+            scale = 1.0
+        if scale is None or (self.scale_op in [DivideOp, DivideScalarOp] and scale == 0.0):
+            return None
+        if self.scale_op in [DivideOp, DivideScalarOp]:
+            scale = 1.0 / scale
+        return [AttentionOp(q, k, v, mask, scale).get_output(0)]
+
+
+@initialize()
+def attention_patterns():
+    scale_ops = [None, MultiplyScalarOp, DivideScalarOp, MultiplyOp, DivideOp]
+    for matmul_op, scale_op, has_mask in itertools.product([MatmulOp, BatchMatmulOp], scale_ops, [False, True]):
+        register_rewrite_rule(AttentionPattern(matmul_op, scale_op, has_mask))
@@ -0,0 +1,130 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List, Optional
+import itertools
+
+from hidet.graph import ops
+from hidet.graph.ir.flow_graph import Tensor, Operator
+from hidet.graph.ops.definitions.arithmetic import AddScalarOp, AddOp, SquareOp, PowOp, RsqrtOp, SqrtOp, ExpOp
+from hidet.graph.ops.definitions.arithmetic import MultiplyOp, DivideOp
+from hidet.graph.ops.definitions.reduce.reduce import ReduceMeanOp, ReduceMaxOp, ReduceSumOp
+from hidet.graph.ops.definitions.norm import LayerNormOp
+from hidet.utils import initialize, prod
+from .base import SubgraphRewriteRule, TensorPattern, MatchDict, op_pattern, register_rewrite_rule
+
+
+def const_scalar(tensor: Tensor) -> Optional[float]:
+    # the value of a constant tensor with a single element
+    if tensor.storage is None or prod(tensor.shape) != 1:
+        return None
+    return float(tensor.cpu().numpy().reshape(-1)[0])
+
+
+def reduced_last_dims(op: Operator, rank: int) -> Optional[int]:
+    # the number of the last dimensions reduced by a reduce operator that keeps the reduced dimensions
+    dims = sorted(op.attrs['dims'])
+    if not op.attrs['keepdims'] or len(dims) == 0 or dims != list(range(rank - len(dims), rank)):
+        return None
+    return len(dims)
+
+
+class LayerNormPattern(SubgraphRewriteRule):
+    """
+    The decomposed layer norm, as exported by the frontends that do not have a layer norm operator:
+
+        d = x - mean(x, dims)
+        y = d * rsqrt(mean(d * d, dims) + epsilon)
+
+    where d * d may be square(d) or pow(d, 2), and d * rsqrt(v) may be d / sqrt(v).
+    """
+
+    def __init__(self, square_op, add_op, div_op):
+        super().__init__(
+            'layer norm: {} variance, {} epsilon, {} normalize'.format(
+                square_op.__name__, add_op.__name__, div_op.__name__
+            )
+        )
+        self.x = TensorPattern.tensor()
+        self.epsilon = TensorPattern.tensor(is_const=True) if add_op is AddOp else None
+        self.exponent = TensorPattern.tensor(is_const=True) if square_op is PowOp else None
+        self.mean = op_pattern(ReduceMeanOp, [self.x])
+        self.centered = self.x - self.mean
+        if square_op is PowOp:
+            squared = op_pattern(PowOp, [self.centered, self.exponent])
+        else:
+            squared = op_pattern(SquareOp, [self.centered])
+        self.variance = op_pattern(ReduceMeanOp, [squared])
+        if add_op is AddOp:
+            self.shifted = op_pattern(AddOp, [self.variance, self.epsilon])
+        else:
+            self.shifted = op_pattern(AddScalarOp, [self.variance])
+        if div_op is DivideOp:
+            self.y = op_pattern(DivideOp, [self.centered, op_pattern(SqrtOp, [self.shifted])])
+        else:
+            self.y = op_pattern(MultiplyOp, [self.centered, op_pattern(RsqrtOp, [self.shifted])])
+
+    def source(self) -> List[TensorPattern]:
+        return [self.y]
+
+    def target(self, matched: MatchDict) -> Optional[List[Tensor]]:
+        x, mean, variance, shifted, y = [matched[t] for t in [self.x, self.mean, self.variance, self.shifted, self.y]]
+        rank = len(x.shape)
+        num_last_dims = reduced_last_dims(mean.op, rank)
+        if num_last_dims is None or reduced_last_dims(variance.op, rank) != num_last_dims:
+            return None
+        if not x.dtype.is_float() or tuple(y.shape) != tuple(x.shape):
+            return None
+        if self.exponent is not None and const_scalar(matched[self.exponent]) != 2.0:
+            return None
+        if self.epsilon is not None:
+            epsilon = const_scalar(matched[self.epsilon])
+        else:
+            epsilon = float(shifted.op.attrs['scalar'])
+        if epsilon is None:
+            return None
+        return [LayerNormOp(x, num_last_dims, epsilon).get_output(0)]
+
+
+class SoftmaxPattern(SubgraphRewriteRule):
+    """
+    The decomposed softmax:
+
+        e = exp(x - max(x, axis))
+        y = e / sum(e, axis)
+    """
+
+    def __init__(self):
+        super().__init__('exp(x - max(x)) / sum(exp(x - max(x))) => softmax(x)')
+        self.x = TensorPattern.tensor()
+        self.max = op_pattern(ReduceMaxOp, [self.x])
+        self.exp = op_pattern(ExpOp, [self.x - self.max])
+        self.sum = op_pattern(ReduceSumOp, [self.exp])
+        self.y = op_pattern(DivideOp, [self.exp, self.sum])
+
+    def source(self) -> List[TensorPattern]:
+        return [self.y]
+
+    def target(self, matched: MatchDict) -> Optional[List[Tensor]]:
+        x, max_value, sum_value, y = [matched[t] for t in [self.x, self.max, self.sum, self.y]]
+        max_op, sum_op = max_value.op, sum_value.op
+        if not (max_op.attrs['keepdims'] and sum_op.attrs['keepdims'] and len(max_op.attrs['dims']) == 1):
+            return None
+        if max_op.attrs['dims'] != sum_op.attrs['dims'] or not x.dtype.is_float() or tuple(y.shape) != tuple(x.shape):
+            return None
+        return [ops.softmax(x, axis=max_op.attrs['dims'][0])]
+
+
+@initialize()
+def norm_patterns():
+    for square_op, add_op, div_op in itertools.product([SquareOp, PowOp], [AddScalarOp, AddOp], [MultiplyOp, DivideOp]):
+        register_rewrite_rule(LayerNormPattern(square_op, add_op, div_op))
+    register_rewrite_rule(SoftmaxPattern())
@@ -0,0 +1,153 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List, Dict, Optional, Type
+from hidet.graph.ir.functors import GraphRewriter
+from hidet.graph.ir.flow_graph import FlowGraph, Operator, Tensor
+from hidet.graph import ops
+from hidet.graph.ops.definitions.arithmetic import UnaryElementwiseOp, BinaryElementwiseOp
+from hidet.graph.ops.definitions.conv2d import Conv2dOp, Conv2dChannelLastOp
+from hidet.graph.ops.definitions.pool import MaxPool2dOp, AvgPool2dOp, AdaptiveAvgPool2dOp, AdaptiveMaxPool2dOp
+from hidet.graph.ops.definitions.pool import MaxPool2dChannelLastOp, AvgPool2dChannelLastOp
+from hidet.graph.ops.definitions.pool import AdaptiveAvgPool2dChannelLastOp, AdaptiveMaxPool2dChannelLastOp
+from hidet.graph.ops.definitions.transform import CastOp, PadOp, ConcatOp, PermuteDimsOp
+from .base import GraphPass
+
+# the permutation of the dimensions from NCHW to NHWC, and from NHWC to NCHW
+channel_last_axes = [0, 2, 3, 1]
+channel_first_axes = [0, 3, 1, 2]
+
+
+class LayoutPropagationRewriter(GraphRewriter):
+    """
+    Compute the NCHW convolution networks in channels-last (NHWC) layout.
+
+    The convolutions are always computed in channels-last layout. The pooling, padding, concatenation and elementwise
+    operators follow the layout of their inputs: they are computed in channels-last layout when their inputs in
+    channels-last layout are no fewer than the non-constant ones in NCHW layout. The data is only transposed at the
+    boundaries of the channels-last regions, each tensor at most once, and the constants are transposed when the
+    graph is rewritten. The existing transposes from channels-last layout to NCHW (e.g., from a frontend of a
+    channels-last model) are absorbed by the channels-last consumers of their outputs.
+
+    The memo maps the original tensors to the rewritten tensors in NCHW layout, as in the other rewriters, and
+    channel_last maps the original tensors computed in channels-last layout to the rewritten ones.
+    """
+
+    # the channels-last counterparts of the operators, which take the same arguments and attributes
+    channel_last_ops: Dict[Type[Operator], Type[Operator]] = {
+        Conv2dOp: Conv2dChannelLastOp,
+        MaxPool2dOp: MaxPool2dChannelLastOp,
+        AvgPool2dOp: AvgPool2dChannelLastOp,
+        AdaptiveAvgPool2dOp: AdaptiveAvgPool2dChannelLastOp,
+        AdaptiveMaxPool2dOp: AdaptiveMaxPool2dChannelLastOp,
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.channel_last: Dict[Tensor, Tensor] = {}
+        # the original tensors computed in NCHW layout, mapped to their transposes in channels-last layout
+        self.transposed: Dict[Tensor, Tensor] = {}
+
+    def is_channel_last(self, x: Tensor) -> bool:
+        if x.trace is not None:
+            self(x.trace[0])
+        return x in self.channel_last
+
+    def to_channel_last(self, x: Tensor) -> Tensor:
+        if self.is_channel_last(x):
+            return self.channel_last[x]
+        if x not in self.transposed:
+            y = self(x)
+            if len(y.shape) < 4:
+                # the operand broadcast to the other operands of an elementwise operator
+                y = ops.unsqueeze(y, list(range(4 - len(y.shape))))
+            self.transposed[x] = ops.transpose(y, channel_last_axes)
+        return self.transposed[x]
+
+    def follows_channel_last(self, inputs: List[Tensor]) -> bool:
+        num_channel_last = sum(1 for x in inputs if self.is_channel_last(x))
+        num_channel_first = sum(1 for x in inputs if x not in self.channel_last and x.storage is None)
+        return num_channel_last > 0 and num_channel_last >= num_channel_first
+
+    def channel_last_outputs(self, op: Operator) -> Optional[List[Tensor]]:
+        # the outputs of the operator computed in channels-last layout, or None if it keeps the NCHW layout
+        x: Tensor = op.inputs[0]
+        if type(op) in self.channel_last_ops and (isinstance(op, Conv2dOp) or self.is_channel_last(x)):
+            cls = self.channel_last_ops[type(op)]
+            return cls(self.to_channel_last(x), *[self(v) for v in op.inputs[1:]], **op.attrs).run()
+        if isinstance(op, (UnaryElementwiseOp, CastOp)) and self.is_channel_last(x):
+            return op.reforward([self.channel_last[x]])
+        if isinstance(op, PadOp) and self.is_channel_last(x):
+            pads: List[int] = op.attrs['pads']
+            pads = [pads[d] for d in channel_last_axes] + [pads[4 + d] for d in channel_last_axes]
+            return op.reforward([self.channel_last[x]], update_attributes={'pads': pads})
+        if isinstance(op, BinaryElementwiseOp) and self.follows_channel_last(op.inputs):
+            return op.reforward([self.to_channel_last(v) for v in op.inputs])
+        if isinstance(op, ConcatOp) and self.follows_channel_last(op.inputs):
+            axis = channel_last_axes.index(op.attrs['axis'])
+            return op.reforward([self.to_channel_last(v) for v in op.inputs], update_attributes={'axis': axis})
+        return None
+
+    def visit_Operator(self, op: Operator):
+        if len(op.inputs) == 0 or len(op.outputs[0].shape) != 4:
+            return super().visit_Operator(op)
+        x, y = op.inputs[0], op.outputs[0]
+        if isinstance(op, PermuteDimsOp) and op.attrs['axes'] == channel_first_axes:
+            # the transpose from channels-last layout, which is only kept for the consumers in NCHW layout
+            self.channel_last[y] = self(x)
+            return None
+        if isinstance(op, PermuteDimsOp) and op.attrs['axes'] == channel_last_axes and self.is_channel_last(x):
+            self.memo[y] = self.channel_last[x]
+            return None
+        outputs: Optional[List[Tensor]] = self.channel_last_outputs(op)
+        if outputs is None:
+            return super().visit_Operator(op)
+        self.channel_last[y] = outputs[0]
+        return None
+
+    def visit_Tensor(self, tensor: Tensor):
+        if tensor.trace is not None:
+            self(tensor.trace[0])
+        if tensor in self.channel_last:
+            # the tensor is computed in channels-last layout, and used by an operator in NCHW layout
+            return ops.transpose(self.channel_last[tensor], channel_first_axes)
+        return super().visit_Tensor(tensor)
+
+
+class LayoutPropagationPass(GraphPass):
+    def process_graph(self, graph: FlowGraph) -> FlowGraph:
+        layout: Optional[str] = self.current_context().configs['layout']
+        if layout is None:
+            return graph
+        if graph.nodes is None:
+            graph.update_nodes()
+        if not any(isinstance(node, Conv2dOp) for node in graph.nodes):
+            # the other operators are only computed in channels-last layout around the convolutions
+            return graph
+        rewriter = LayoutPropagationRewriter()
+        return rewriter(graph)
+
+
+def layout_propagation_pass() -> GraphPass:
+    """
+    Choose the layout of the convolution networks, which is configured by
+    :meth:`~hidet.graph.PassContext.set_layout`.
+
+    With the channels-last layout, the convolutions and the pooling, padding, concatenation and elementwise operators
+    around them are computed in NHWC layout, and the data is transposed only at the boundaries of such regions. The
+    convolutions in channels-last layout are lowered to implicit gemm without transposing their outputs.
+
+    Returns
+    -------
+    ret: GraphPass
+        The layout propagation pass.
+    """
+    return LayoutPropagationPass()
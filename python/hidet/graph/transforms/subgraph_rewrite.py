@@ -10,14 +10,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # pylint: disable=unused-import
-from typing import List, Optional, Dict, Tuple, Set
+from typing import List, Optional, Dict, Tuple, Set, Type, Deque
+from collections import defaultdict, deque
 
 from hidet.graph.ir import functors
 from hidet.graph.ir.flow_graph import FlowGraph, Operator, Tensor
 from hidet.graph.transforms import GraphPass, PassContext
 from hidet.graph.ir.functors import analyze_usage, graph_collect
 from hidet.utils import strict_zip
-from .fold_const import fold_const_pass
+from .fold_const import fold_const_pass, fold_operator
 from .graph_patterns import SubgraphRewriteRule, TensorPattern, OperatorPattern, MatchDict, Usage, graph_pattern_match
 from .graph_patterns.base import registered_rewrite_rules, register_rewrite_rule
 
@@ -31,21 +32,24 @@ class SubgraphRewritePass(GraphPass):
        For example, if pattern a -> b -> c matched x -> y -> z. We need to make sure y has not been
        used by other operators in the original graph.
 
-    Time complexity of this implementation: O(num_applies * num_operators * num_patterns * pattern_size).
+    The rules are indexed by the operator class of their anchors (the operator that produces the first output
+    of the source pattern), so each operator is only matched against the rules that can match it. The operators
+    are processed with a worklist. After a transform is applied, only the operators near the changed region (within
+    the size of the largest pattern) are revisited, the usage of tensors is updated incrementally, and the operators
+    whose inputs become constant are folded immediately.
+
+    Time complexity of this implementation: O((num_operators + num_applies * neighborhood_size) * pattern_size)
     """
 
     max_num_transforms = 1000
 
     def process_graph(self, graph: FlowGraph) -> FlowGraph:
-        graph = functors.clone(graph)
-        fold_const = fold_const_pass()
-        for _ in range(self.max_num_transforms):
-            updated, graph = self.try_transform(graph, registered_rewrite_rules)
-            graph = fold_const.process_graph(graph)
-            if not updated:
-                graph.update_nodes()
-                return graph
-        print('Exceeded maximum number of transforms {}, stop early.'.format(self.max_num_transforms))
+        graph = fold_const_pass().process_graph(functors.clone(graph))
+        graph.update_nodes()
+        rewriter = _WorklistRewriter(graph, registered_rewrite_rules)
+        num_transforms = rewriter.run(self.max_num_transforms)
+        if num_transforms >= self.max_num_transforms:
+            print('Exceeded maximum number of transforms {}, stop early.'.format(self.max_num_transforms))
         graph.update_nodes()
         return graph
 
@@ -91,45 +95,156 @@ class SubgraphRewritePass(GraphPass):
                 return False
         return True
 
+
+class _WorklistRewriter:
+    def __init__(self, graph: FlowGraph, rules: List[SubgraphRewriteRule]):
+        self.graph: FlowGraph = graph
+        self.usage: Usage = analyze_usage(graph)
+        self.alive: Set[Operator] = set(graph.nodes)
+        self.worklist: Deque[Operator] = deque(graph.nodes)
+        self.queued: Set[Operator] = set(graph.nodes)
+
+        # index the rules by the operator class of their anchors
+        self.anchored_rules: Dict[Type[Operator], List[SubgraphRewriteRule]] = defaultdict(list)
+        self.free_rules: List[SubgraphRewriteRule] = []
+        self.radius = 1
+        for rule in rules:
+            anchor = rule.source()[0].trace
+            if anchor is None:
+                self.free_rules.append(rule)
+            else:
+                self.anchored_rules[anchor[0].op_cls].append(rule)
+            self.radius = max(self.radius, self._num_operators(rule))
+
     @staticmethod
-    def try_transform(graph: FlowGraph, graph_patterns: List[SubgraphRewriteRule]) -> Tuple[bool, FlowGraph]:
-        patterns: List[SubgraphRewriteRule] = graph_patterns
-        usage: Usage = analyze_usage(graph)
-        all_tensors: List[Tensor] = graph_collect(graph, Tensor)
-
-        for graph_pattern in patterns:
-            # print(graph_pattern.name)
-            for start_tensor in all_tensors:
-                # condition 1
-                matched = SubgraphRewritePass.match_pattern(graph_pattern, start_tensor, usage)
-                if matched is None:
-                    continue
-
-                # condition 2
-                success = SubgraphRewritePass.check_usage_requirement(matched, usage, graph_pattern)
-                if not success:
-                    continue
-
-                # generate target subgraph
-                target_output_tensors: Optional[List[Tensor]] = graph_pattern.target(matched)
-                if target_output_tensors is None:
-                    # matched graph pattern can not be applied to this subgraph
-                    continue
-
-                # apply the graph transform
-                if PassContext.current().configs['verbose']:
-                    print('Applying transform: {}'.format(graph_pattern.name))
-                source_output_pattern_tensors = graph_pattern.source()
-                source_output_tensors = [matched[t] for t in source_output_pattern_tensors]
-                for source_tensor, target_tensor in strict_zip(source_output_tensors, target_output_tensors):
-                    for use in usage[source_tensor]:
-                        op, idx = use
-                        if op is None:
-                            graph.outputs[idx] = target_tensor
-                        else:
-                            op.inputs[idx] = target_tensor
-                return True, graph
-        return False, graph
+    def _num_operators(rule: SubgraphRewriteRule) -> int:
+        visited: Set[OperatorPattern] = set()
+        stack: List[TensorPattern] = list(rule.source())
+        while stack:
+            tensor = stack.pop()
+            if tensor.trace is not None and tensor.trace[0] not in visited:
+                visited.add(tensor.trace[0])
+                stack.extend(tensor.trace[0].inputs)
+            for op, _ in tensor.uses:
+                if op not in visited:
+                    visited.add(op)
+                    stack.extend(op.inputs)
+        return len(visited)
+
+    def run(self, max_num_transforms: int) -> int:
+        num_transforms = 0
+        while self.worklist and num_transforms < max_num_transforms:
+            op = self.worklist.popleft()
+            self.queued.discard(op)
+            if op not in self.alive:
+                continue
+            if self.try_transform(op):
+                num_transforms += 1
+        return num_transforms
+
+    def try_transform(self, op: Operator) -> bool:
+        candidates = [(rule, op.outputs[rule.source()[0].trace[1]]) for rule in self.anchored_rules.get(type(op), [])]
+        candidates.extend((rule, tensor) for rule in self.free_rules for tensor in op.outputs)
+        for rule, start_tensor in candidates:
+            # condition 1
+            matched = SubgraphRewritePass.match_pattern(rule, start_tensor, self.usage)
+            if matched is None:
+                continue
+
+            # condition 2
+            if not SubgraphRewritePass.check_usage_requirement(matched, self.usage, rule):
+                continue
+
+            # generate target subgraph
+            target_output_tensors: Optional[List[Tensor]] = rule.target(matched)
+            if target_output_tensors is None:
+                # matched graph pattern can not be applied to this subgraph
+                continue
+
+            # apply the graph transform
+            if PassContext.current().configs['verbose']:
+                print('Applying transform: {}'.format(rule.name))
+            source_output_tensors = [matched[t] for t in rule.source()]
+            matched_ops = [v for v in matched.values() if isinstance(v, Operator)]
+            self.apply(source_output_tensors, target_output_tensors, matched_ops)
+            return True
+        return False
+
+    def apply(self, sources: List[Tensor], targets: List[Tensor], matched_ops: List[Operator]):
+        changed: List[Operator] = []
+        changed.extend(self.add_operators(targets))
+        replacements = list(strict_zip(sources, targets))
+        while replacements:
+            source, target = replacements.pop()
+            for op, idx in self.usage.pop(source, []):
+                if op is None:
+                    self.graph.outputs[idx] = target
+                else:
+                    op.inputs[idx] = target
+                    changed.append(op)
+                self.usage[target].append((op, idx))
+            # fold the operators whose inputs all become constant
+            for op, _ in list(self.usage[target]):
+                if op is not None and op in self.alive and all(x.storage is not None for x in op.inputs):
+                    outputs = fold_operator(op, op.inputs)
+                    replacements.extend(zip(op.outputs, outputs))
+                    matched_ops.append(op)
+        changed.extend(self.remove_dead_operators(matched_ops))
+        self.enqueue_neighbors(changed)
+
+    def add_operators(self, outputs: List[Tensor]) -> List[Operator]:
+        # register the operators created by the target sub-graph
+        added: List[Operator] = []
+        stack: List[Tensor] = list(outputs)
+        while stack:
+            tensor = stack.pop()
+            if tensor.trace is None or tensor.trace[0] in self.alive:
+                continue
+            op = tensor.trace[0]
+            self.alive.add(op)
+            added.append(op)
+            for idx, x in enumerate(op.inputs):
+                self.usage[x].append((op, idx))
+                stack.append(x)
+        return added
+
+    def remove_dead_operators(self, candidates: List[Operator]) -> List[Operator]:
+        # remove the operators whose outputs are not used anymore, return the alive operators next to them
+        neighbors: List[Operator] = []
+        stack: List[Operator] = list(candidates)
+        while stack:
+            op = stack.pop()
+            if op not in self.alive or any(len(self.usage.get(y, [])) > 0 for y in op.outputs):
+                continue
+            self.alive.discard(op)
+            for y in op.outputs:
+                self.usage.pop(y, None)
+            for idx, x in enumerate(op.inputs):
+                self.usage[x].remove((op, idx))
+                if x.trace is not None:
+                    stack.append(x.trace[0])
+                    neighbors.append(x.trace[0])
+                neighbors.extend(use for use, _ in self.usage[x] if use is not None)
+        return neighbors
+
+    def enqueue_neighbors(self, ops: List[Operator]):
+        # revisit the operators within the radius of the largest pattern, which may match a pattern now
+        frontier = [op for op in ops if op in self.alive]
+        visited: Set[Operator] = set(frontier)
+        for _ in range(self.radius):
+            next_frontier = []
+            for op in frontier:
+                neighbors = [x.trace[0] for x in op.inputs if x.trace is not None]
+                neighbors.extend(use for y in op.outputs for use, _ in self.usage.get(y, []) if use is not None)
+                for neighbor in neighbors:
+                    if neighbor not in visited and neighbor in self.alive:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        for op in visited:
+            if op not in self.queued:
+                self.queued.add(op)
+                self.worklist.append(op)
 
 
 def subgraph_rewrite_pass() -> GraphPass:
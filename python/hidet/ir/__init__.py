@@ -28,7 +28,7 @@ from .expr import Expr, Var, Constant
 from .expr import BinaryOp, Condition, LessThan, LessEqual, Equal, NotEqual, Add, Sub, Multiply, Div, Mod, FloorDiv
 from .expr import Let, Cast, LogicalAnd, LogicalOr, TensorElement, Call, TensorSlice, LogicalNot, Neg
 from .expr import BitwiseXor, BitwiseAnd, BitwiseNot, BitwiseOr, Dereference
-from .expr import var, scalar_var, tensor_var, is_one, is_zero, convert
+from .expr import SymbolVar, var, scalar_var, tensor_var, symbol_var, is_one, is_zero, convert
 
 from .layout import DataLayout
 
@@ -48,4 +48,4 @@ from .tools import infer_type
 from .utils import index_serialize, index_deserialize
 
 from .dtypes import float32, tfloat32, bfloat16, float16, int64, int32, int16, int8, uint64, uint32, uint16, uint8
-from .dtypes import float32x4, float16x2, boolean
+from .dtypes import float32x4, float32x8, float16x2, boolean
@@ -65,10 +65,16 @@ class StmtBuilder:
         seq_let_stmt = LetStmt(bind_vars, bind_values, body=1)
         return StmtScope(self, stmts=seq_let_stmt, ret=bind_vars)
 
-    def for_loop(self, v: Union[str, Var], extent: Union[int, Expr], unroll: Optional[bool] = None) -> StmtScope:
+    def for_loop(
+        self,
+        v: Union[str, Var],
+        extent: Union[int, Expr],
+        unroll: Optional[bool] = None,
+        parallel: Union[int, bool] = False,
+    ) -> StmtScope:
         if isinstance(v, str):
             v = var(v)
-        return StmtScope(self, stmts=ForStmt(v, extent, unroll), ret=v)
+        return StmtScope(self, stmts=ForStmt(v, extent, unroll, parallel=parallel), ret=v)
 
     def if_then(self, cond: Union[bool, Expr]) -> StmtScope:
         return StmtScope(self, stmts=[IfStmt(cond)], ret=None)
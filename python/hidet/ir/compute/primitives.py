@@ -12,8 +12,8 @@
 # pylint: disable=import-outside-toplevel
 from __future__ import annotations
 from typing import Union, Sequence, Tuple, Optional, List
-from hidet.ir.type import DataType, TensorType, tensor_type, data_type
-from hidet.ir.expr import Expr, convert, Var, var
+from hidet.ir.type import DataType, TensorType, Int, tensor_type, data_type
+from hidet.ir.expr import Expr, Constant, convert, Var, var
 from hidet.ir.layout import DataLayout
 from .reduce_operations import ReduceOperation, ReduceType
 
@@ -54,8 +54,8 @@ class TensorNode(ComputeNode):
     def ndim(self) -> int:
         return len(self.type.shape)
 
-    def const_shape(self) -> List[int]:
-        return [int(v) for v in self.type.shape]
+    def const_shape(self) -> List[Int]:
+        return [int(v) if isinstance(v, Constant) else v for v in self.type.shape]
 
 
 class ScalarInput(ScalarNode):
@@ -69,8 +69,8 @@ class TensorInput(TensorNode):
         super().__init__(name)
         self.ttype: TensorType = ttype
 
-    def const_shape(self) -> List[int]:
-        return [int(v) for v in self.ttype.shape]
+    def const_shape(self) -> List[Int]:
+        return [int(v) if isinstance(v, Constant) else v for v in self.ttype.shape]
 
 
 class ReduceCompute(ScalarNode):
@@ -97,8 +97,8 @@ class ReduceCompute(ScalarNode):
         assert all(isinstance(v, TensorNode) for v in self.input_tensors)
         assert all(isinstance(v, ScalarNode) for v in self.input_scalars)
 
-    def const_shape(self) -> List[int]:
-        return [int(v) for v in self.shape]
+    def const_shape(self) -> List[Int]:
+        return [int(v) if isinstance(v, Constant) else v for v in self.shape]
 
 
 class ArgReduceCompute(ScalarNode):
@@ -148,8 +148,8 @@ class GridCompute(TensorNode):
         assert all(isinstance(v, TensorNode) for v in self.input_tensors)
         assert all(isinstance(v, ScalarNode) for v in self.input_scalars)
 
-    def const_shape(self) -> List[int]:
-        return [int(v) for v in self.shape]
+    def const_shape(self) -> List[Int]:
+        return [int(v) if isinstance(v, Constant) else v for v in self.shape]
 
 
 # class ScalarNode(ComputeNode):
@@ -15,8 +15,8 @@ from .integer import i8, i16, i32, i64, u8, u16, u32, u64
 from .floats import float16, float32, float64, bfloat16, tfloat32
 from .floats import f16, f32, f64, bf16, tf32
 from .boolean import boolean
-from .vector import float16x2, float32x4
-from .vector import f16x2, f32x4
+from .vector import float16x2, float32x4, float32x8
+from .vector import f16x2, f32x4, f32x8
 from .promotion import promote_type
 from .utils import dtype_to_numpy, finfo, iinfo
 
@@ -36,6 +36,7 @@ name2dtype = {
     'uint8': uint8,
     'bool': boolean,
     'float32x4': float32x4,
+    'float32x8': float32x8,
     'float16x2': float16x2,
 }
 
@@ -55,6 +56,7 @@ sname2dtype = {
     'u8': uint8,
     'bool': boolean,
     'f32x4': f32x4,
+    'f32x8': f32x8,
     'f16x2': f16x2,
 }
 
@@ -69,7 +69,9 @@ class VectorType(DataType):
 
 
 float32x4 = VectorType(float32, 4)
+float32x8 = VectorType(float32, 8)
 float16x2 = VectorType(float16, 2)
 
 f32x4 = float32x4
+f32x8 = float32x8
 f16x2 = float16x2
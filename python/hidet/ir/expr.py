@@ -11,7 +11,7 @@
 # limitations under the License.
 # pylint: disable=import-outside-toplevel, useless-parent-delegation, redefined-outer-name, redefined-builtin
 # pylint: disable=useless-super-delegation
-from typing import Optional, Union, Sequence, Tuple
+from typing import Dict, Optional, Union, Sequence, Tuple
 import string
 import numpy as np
 from .node import Node
@@ -511,6 +511,56 @@ class Var(Expr):
         Var.id_clock = 0
 
 
+class SymbolVar(Var):
+    """
+    A symbolic dimension of tensor shapes, whose value is only known when the kernels are launched.
+
+    The symbol vars are identified by their names: :func:`symbol_var` returns the same var for the same name. A task
+    whose tensors have symbolic dimensions is compiled into a single kernel that serves all the values of its symbol
+    vars, which are passed to the kernel as int32 arguments.
+    """
+
+    def __init__(self, name: str, dtype: DataType):
+        super().__init__(hint=name, type=dtype)
+
+    def __int__(self):
+        raise ValueError('Symbolic dimension "{}" does not have a static value.'.format(self.hint))
+
+    def __reduce__(self):
+        # keep the identity of symbol vars across pickling, e.g., when a flow graph is saved and loaded
+        return symbol_var, (self.hint, self.type.name)
+
+
+_symbol_vars: Dict[str, SymbolVar] = {}
+
+
+def symbol_var(name: str, dtype: Union[str, DataType] = 'int32') -> SymbolVar:
+    """
+    Get the symbol var with the given name.
+
+    Parameters
+    ----------
+    name: str
+        The name of the symbol var, which must be a valid identifier.
+
+    dtype: str or DataType
+        The data type of the symbol var. Only int32 is supported for now.
+
+    Returns
+    -------
+    ret: SymbolVar
+        The symbol var with the given name.
+    """
+    dtype = data_type(dtype)
+    if not name.isidentifier():
+        raise ValueError('The name of symbol var must be a valid identifier, got "{}".'.format(name))
+    if dtype.name != 'int32':
+        raise ValueError('Only int32 symbol vars are supported, got {}.'.format(dtype.name))
+    if name not in _symbol_vars:
+        _symbol_vars[name] = SymbolVar(name, dtype)
+    return _symbol_vars[name]
+
+
 def var(hint: str = None, dtype='int32'):
     if isinstance(hint, str):
         assert set(hint) <= set(string.ascii_letters + '_.' + string.digits)
@@ -9,12 +9,36 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Any, Union, List, Dict, Tuple
+from typing import Any, Union, List, Dict, Tuple, Type, Callable
 from hidet.ir.node import Node
 from hidet.utils import same_list
 
 
 class BaseFunctor:
+    """
+    The base class of the functors on the IR nodes.
+
+    Each functor class declares its ``dispatch_rules``, an ordered mapping from the node classes it handles to the
+    names of the visit methods. A node is dispatched to the first matching rule, where the functor classes are
+    searched in the method resolution order of the functor, and the rules of a class in their declared order. The
+    resolved visit method of each (functor class, node class) pair is cached in the dispatch table of the functor
+    class, thus each node is dispatched by a single dict lookup after the first one of its class.
+    """
+
+    dispatch_rules: Dict[Union[Type, Tuple[Type, ...]], str] = {
+        tuple: 'visit_Tuple',
+        list: 'visit_List',
+        dict: 'visit_Dict',
+        (str, int, float, type(None)): 'visit_PyConstant',
+        Node: 'visit_NotDispatchedNode',
+    }
+
+    dispatch_table: Dict[Type, Callable[[Any, Any], Any]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch_table = {}
+
     def __init__(self, use_memo=True):
         self.memo = {} if use_memo else None
 
@@ -26,37 +50,29 @@ class BaseFunctor:
         if self.memo is not None and key in self.memo:
             return self.memo[key]
 
-        # iterate through the mro of the class to find a visit_dispatch method
-        for cls in type(self).__mro__:
-            if cls is object:
-                # we have reached the end of the mro but still not found a visit_dispatch method to dispatch the node
-                raise NotImplementedError("Can not dispatch object with type {}".format(type(node)))
-            if 'visit_dispatch' not in cls.__dict__:
-                continue
-            ret = cls.__dict__['visit_dispatch'](self, node)
-            if ret is not NotImplemented:
-                break
-        else:
-            assert False  # should never reach here as object is always in the mro
+        method = self.dispatch_table.get(type(node))
+        if method is None:
+            method = self.resolve_dispatch(type(node))
+        ret = method(self, node)
 
         if self.memo is not None:
             self.memo[key] = ret
 
         return ret
 
-    def visit_dispatch(self, node: Union[Node, Tuple, List, Dict[str, Any], str, int, float]):
-        if isinstance(node, tuple):
-            return self.visit_Tuple(node)
-        elif isinstance(node, list):
-            return self.visit_List(node)
-        elif isinstance(node, dict):
-            return self.visit_Dict(node)
-        elif isinstance(node, (str, int, float)) or node is None:
-            return self.visit_PyConstant(node)
-        elif isinstance(node, Node):
-            return self.visit_NotDispatchedNode(node)
-        else:
-            return NotImplemented
+    @classmethod
+    def resolve_dispatch(cls, node_cls: Type) -> Callable[[Any, Any], Any]:
+        # iterate through the mro of the functor class to find the first rule that matches the node class
+        for functor_cls in cls.__mro__:
+            rules = functor_cls.__dict__.get('dispatch_rules', None)
+            if rules is None:
+                continue
+            for rule_cls, method_name in rules.items():
+                if issubclass(node_cls, rule_cls):
+                    method = getattr(cls, method_name)
+                    cls.dispatch_table[node_cls] = method
+                    return method
+        raise NotImplementedError("Can not dispatch object with type {}".format(node_cls))
 
     def visit_Tuple(self, tp: Tuple):
         raise NotImplementedError()
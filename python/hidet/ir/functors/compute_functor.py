@@ -10,33 +10,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # pylint: disable=bad-staticmethod-argument, too-many-boolean-expressions
-from typing import Any, Union, List, Dict, Tuple
-
 from hidet.ir.task import Task, TaskGraph
 from hidet.ir.compute import TensorInput, ScalarInput, ReduceCompute, ArgReduceCompute, GridCompute
-from hidet.ir.node import Node
 from hidet.utils import same_list
 from .base_functor import BaseFunctor, BaseVisitor, BaseRewriter
 
 
 class ComputeFunctor(BaseFunctor):
-    def visit_dispatch(self, node: Union[Node, Tuple, List, Dict[str, Any], str]):
-        if isinstance(node, Task):
-            return self.visit_Task(node)
-        elif isinstance(node, TaskGraph):
-            return self.visit_TaskGraph(node)
-        elif isinstance(node, ScalarInput):
-            return self.visit_ScalarInput(node)
-        elif isinstance(node, TensorInput):
-            return self.visit_TensorInput(node)
-        elif isinstance(node, GridCompute):
-            return self.visit_GridCompute(node)
-        elif isinstance(node, ReduceCompute):
-            return self.visit_ReduceCompute(node)
-        elif isinstance(node, ArgReduceCompute):
-            return self.visit_ArgReduceCompute(node)
-        else:
-            return NotImplemented
+    dispatch_rules = {
+        Task: 'visit_Task',
+        TaskGraph: 'visit_TaskGraph',
+        ScalarInput: 'visit_ScalarInput',
+        TensorInput: 'visit_TensorInput',
+        GridCompute: 'visit_GridCompute',
+        ReduceCompute: 'visit_ReduceCompute',
+        ArgReduceCompute: 'visit_ArgReduceCompute',
+    }
 
     def visit_Task(self, task: Task):
         raise NotImplementedError()
@@ -20,75 +20,40 @@ from .base_functor import BaseFunctor, BaseVisitor, BaseRewriter
 
 
 class ExprFunctor(BaseFunctor):
-    def visit_dispatch(self, node):
-        if isinstance(node, Add):
-            return self.visit_Add(node)
-        elif isinstance(node, Add):
-            return self.visit_Add(node)
-        elif isinstance(node, Sub):
-            return self.visit_Sub(node)
-        elif isinstance(node, Multiply):
-            return self.visit_Multiply(node)
-        elif isinstance(node, Div):
-            return self.visit_Div(node)
-        elif isinstance(node, Mod):
-            return self.visit_Mod(node)
-        elif isinstance(node, FloorDiv):
-            return self.visit_FloorDiv(node)
-        elif isinstance(node, Neg):
-            return self.visit_Neg(node)
-        elif isinstance(node, LessThan):
-            return self.visit_LessThan(node)
-        elif isinstance(node, LessEqual):
-            return self.visit_LessEqual(node)
-        elif isinstance(node, Equal):
-            return self.visit_Equal(node)
-        elif isinstance(node, NotEqual):
-            return self.visit_NotEqual(node)
-        elif isinstance(node, LogicalAnd):
-            return self.visit_And(node)
-        elif isinstance(node, LogicalOr):
-            return self.visit_Or(node)
-        elif isinstance(node, LogicalNot):
-            return self.visit_Not(node)
-        elif isinstance(node, BitwiseAnd):
-            return self.visit_BitwiseAnd(node)
-        elif isinstance(node, BitwiseOr):
-            return self.visit_BitwiseOr(node)
-        elif isinstance(node, BitwiseNot):
-            return self.visit_BitwiseNot(node)
-        elif isinstance(node, BitwiseXor):
-            return self.visit_BitwiseXor(node)
-        elif isinstance(node, LeftShift):
-            return self.visit_LeftShift(node)
-        elif isinstance(node, RightShift):
-            return self.visit_RightShift(node)
-        elif isinstance(node, TensorElement):
-            return self.visit_TensorElement(node)
-        elif isinstance(node, TensorSlice):
-            return self.visit_TensorSlice(node)
-        elif isinstance(node, IfThenElse):
-            return self.visit_IfThenElse(node)
-        elif isinstance(node, Call):
-            return self.visit_Call(node)
-        elif isinstance(node, Let):
-            return self.visit_Let(node)
-        elif isinstance(node, Var):
-            return self.visit_Var(node)
-        elif isinstance(node, Constant):
-            return self.visit_Constant(node)
-        elif isinstance(node, Cast):
-            return self.visit_Cast(node)
-        elif isinstance(node, Dereference):
-            return self.visit_Dereference(node)
-        elif isinstance(node, Address):
-            return self.visit_Address(node)
-        elif isinstance(node, Reference):
-            return self.visit_Reference(node)
-        elif isinstance(node, AnyExpr):
-            return self.visit_AnyExpr(node)
-        else:
-            return NotImplemented
+    dispatch_rules = {
+        Add: 'visit_Add',
+        Sub: 'visit_Sub',
+        Multiply: 'visit_Multiply',
+        Div: 'visit_Div',
+        Mod: 'visit_Mod',
+        FloorDiv: 'visit_FloorDiv',
+        Neg: 'visit_Neg',
+        LessThan: 'visit_LessThan',
+        LessEqual: 'visit_LessEqual',
+        Equal: 'visit_Equal',
+        NotEqual: 'visit_NotEqual',
+        LogicalAnd: 'visit_And',
+        LogicalOr: 'visit_Or',
+        LogicalNot: 'visit_Not',
+        BitwiseAnd: 'visit_BitwiseAnd',
+        BitwiseOr: 'visit_BitwiseOr',
+        BitwiseNot: 'visit_BitwiseNot',
+        BitwiseXor: 'visit_BitwiseXor',
+        LeftShift: 'visit_LeftShift',
+        RightShift: 'visit_RightShift',
+        TensorElement: 'visit_TensorElement',
+        TensorSlice: 'visit_TensorSlice',
+        IfThenElse: 'visit_IfThenElse',
+        Call: 'visit_Call',
+        Let: 'visit_Let',
+        Var: 'visit_Var',
+        Constant: 'visit_Constant',
+        Cast: 'visit_Cast',
+        Dereference: 'visit_Dereference',
+        Address: 'visit_Address',
+        Reference: 'visit_Reference',
+        AnyExpr: 'visit_AnyExpr',
+    }
 
     def visit_Add(self, e: Add):
         raise NotImplementedError()
@@ -14,15 +14,11 @@ from .base_functor import BaseFunctor, BaseVisitor, BaseRewriter
 
 
 class MappingFunctor(BaseFunctor):
-    def visit_dispatch(self, node):
-        if isinstance(node, SpatialTaskMapping):
-            return self.visit_SpatialTaskMapping(node)
-        elif isinstance(node, RepeatTaskMapping):
-            return self.visit_RepeatTaskMapping(node)
-        elif isinstance(node, ComposedTaskMapping):
-            return self.visit_ComposedTaskMapping(node)
-        else:
-            return NotImplemented
+    dispatch_rules = {
+        SpatialTaskMapping: 'visit_SpatialTaskMapping',
+        RepeatTaskMapping: 'visit_RepeatTaskMapping',
+        ComposedTaskMapping: 'visit_ComposedTaskMapping',
+    }
 
     def visit_SpatialTaskMapping(self, mapping: SpatialTaskMapping):
         raise NotImplementedError()
@@ -17,13 +17,10 @@ from .base_functor import BaseFunctor, BaseVisitor, BaseRewriter
 
 
 class ModuleFunctor(BaseFunctor):
-    def visit_dispatch(self, node):
-        if isinstance(node, IRModule):
-            return self.visit_IRModule(node)
-        elif isinstance(node, Function):
-            return self.visit_Function(node)
-        else:
-            return NotImplemented
+    dispatch_rules = {
+        IRModule: 'visit_IRModule',
+        Function: 'visit_Function',
+    }
 
     def visit_IRModule(self, module: IRModule):
         raise NotImplementedError()
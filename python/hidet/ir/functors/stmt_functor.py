@@ -12,7 +12,6 @@
 # pylint: disable=bad-staticmethod-argument
 from typing import List
 
-from hidet.ir.node import Node
 from hidet.ir.expr import Expr, Var
 from hidet.ir.stmt import EvaluateStmt, DeclareStmt, BufferStoreStmt, AssignStmt, LetStmt, ForStmt, ForTaskStmt, SeqStmt
 from hidet.ir.stmt import WhileStmt, BreakStmt, ContinueStmt, IfStmt, ReturnStmt, AsmStmt, AssertStmt, BlackBoxStmt
@@ -23,43 +22,25 @@ from .base_functor import BaseFunctor, BaseVisitor, BaseRewriter
 
 
 class StmtFunctor(BaseFunctor):
-    def visit_dispatch(self, node: Node):
-        if isinstance(node, EvaluateStmt):
-            return self.visit_EvaluateStmt(node)
-        elif isinstance(node, DeclareStmt):
-            return self.visit_DeclareStmt(node)
-        elif isinstance(node, BufferStoreStmt):
-            return self.visit_BufferStoreStmt(node)
-        elif isinstance(node, AssignStmt):
-            return self.visit_AssignStmt(node)
-        elif isinstance(node, LetStmt):
-            return self.visit_LetStmt(node)
-        elif isinstance(node, ForStmt):
-            return self.visit_ForStmt(node)
-        elif isinstance(node, ForTaskStmt):
-            return self.visit_ForTaskStmt(node)
-        elif isinstance(node, WhileStmt):
-            return self.visit_WhileStmt(node)
-        elif isinstance(node, BreakStmt):
-            return self.visit_BreakStmt(node)
-        elif isinstance(node, ContinueStmt):
-            return self.visit_ContinueStmt(node)
-        elif isinstance(node, IfStmt):
-            return self.visit_IfStmt(node)
-        elif isinstance(node, ReturnStmt):
-            return self.visit_ReturnStmt(node)
-        elif isinstance(node, AsmStmt):
-            return self.visit_AsmStmt(node)
-        elif isinstance(node, LaunchKernelStmt):
-            return self.visit_LaunchKernelStmt(node)
-        elif isinstance(node, AssertStmt):
-            return self.visit_AssertStmt(node)
-        elif isinstance(node, BlackBoxStmt):
-            return self.visit_BlackBoxStmt(node)
-        elif isinstance(node, SeqStmt):
-            return self.visit_SeqStmt(node)
-        else:
-            return NotImplemented
+    dispatch_rules = {
+        EvaluateStmt: 'visit_EvaluateStmt',
+        DeclareStmt: 'visit_DeclareStmt',
+        BufferStoreStmt: 'visit_BufferStoreStmt',
+        AssignStmt: 'visit_AssignStmt',
+        LetStmt: 'visit_LetStmt',
+        ForStmt: 'visit_ForStmt',
+        ForTaskStmt: 'visit_ForTaskStmt',
+        WhileStmt: 'visit_WhileStmt',
+        BreakStmt: 'visit_BreakStmt',
+        ContinueStmt: 'visit_ContinueStmt',
+        IfStmt: 'visit_IfStmt',
+        ReturnStmt: 'visit_ReturnStmt',
+        AsmStmt: 'visit_AsmStmt',
+        LaunchKernelStmt: 'visit_LaunchKernelStmt',
+        AssertStmt: 'visit_AssertStmt',
+        BlackBoxStmt: 'visit_BlackBoxStmt',
+        SeqStmt: 'visit_SeqStmt',
+    }
 
     def visit_DeclareStmt(self, stmt: DeclareStmt):
         raise NotImplementedError()
@@ -242,7 +223,7 @@ class StmtRewriter(StmtFunctor, BaseRewriter):
         if loop_var is stmt.loop_var and extent is stmt.extent and body is stmt.body:
             return stmt
         else:
-            return ForStmt(loop_var, extent, stmt.unroll, body)
+            return ForStmt(loop_var, extent, stmt.unroll, body, stmt.parallel)
 
     def visit_ForTaskStmt(self, stmt: ForTaskStmt):
         loop_vars: List[Expr] = [self.visit(v) for v in stmt.loop_vars]
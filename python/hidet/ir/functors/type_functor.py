@@ -16,21 +16,14 @@ from .base_functor import BaseFunctor, BaseVisitor, BaseRewriter
 
 
 class TypeFunctor(BaseFunctor):
-    def visit_dispatch(self, node):
-        if isinstance(node, DataType):
-            return self.visit_ScalarType(node)
-        elif isinstance(node, TensorType):
-            return self.visit_TensorType(node)
-        elif isinstance(node, PointerType):
-            return self.visit_PointerType(node)
-        elif isinstance(node, TensorPointerType):
-            return self.visit_TensorPointerType(node)
-        elif isinstance(node, ReferenceType):
-            return self.visit_ReferenceType(node)
-        elif isinstance(node, VoidType):
-            return self.visit_VoidType(node)
-        else:
-            return NotImplemented
+    dispatch_rules = {
+        DataType: 'visit_ScalarType',
+        TensorType: 'visit_TensorType',
+        PointerType: 'visit_PointerType',
+        TensorPointerType: 'visit_TensorPointerType',
+        ReferenceType: 'visit_ReferenceType',
+        VoidType: 'visit_VoidType',
+    }
 
     def visit_ScalarType(self, t: DataType):
         raise NotImplementedError()
@@ -10,3 +10,4 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from . import math
+from . import avx
@@ -0,0 +1,93 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+The x86 AVX/AVX2 intrinsics for 8-lane float32 vectors, see
+  https://www.intel.com/content/www/us/en/docs/intrinsics-guide/index.html
+"""
+from hidet.ir.expr import Expr
+from hidet.ir.type import FuncType, VoidType
+from hidet.ir.dtypes import float32, float32x8
+from hidet.ir.primitives.func import register_primitive_function, call_primitive_func
+from hidet.utils import initialize
+
+
+@initialize()
+def register_functions():
+    f32, f32x8 = float32, float32x8
+    register_primitive_function(
+        'avx_x86_float32x8_setzero', func_or_type=FuncType([], f32x8), codegen_name='_mm256_setzero_ps'
+    )
+    register_primitive_function(
+        'avx_x86_float32x8_broadcast', func_or_type=FuncType([f32], f32x8), codegen_name='_mm256_set1_ps'
+    )
+    register_primitive_function(
+        'avx_x86_float32x8_load', func_or_type=FuncType([~f32], f32x8), codegen_name='_mm256_loadu_ps'
+    )
+    register_primitive_function(
+        'avx_x86_float32x8_store', func_or_type=FuncType([~f32, f32x8], VoidType()), codegen_name='_mm256_storeu_ps'
+    )
+    for name in ['add', 'sub', 'mul', 'div', 'max', 'min']:
+        register_primitive_function(
+            'avx_x86_float32x8_{}'.format(name),
+            func_or_type=FuncType([f32x8, f32x8], f32x8),
+            codegen_name='_mm256_{}_ps'.format(name),
+        )
+    register_primitive_function(
+        'avx_x86_float32x8_fmadd', func_or_type=FuncType([f32x8, f32x8, f32x8], f32x8), codegen_name='_mm256_fmadd_ps'
+    )
+
+
+def avx_f32x8_setzero() -> Expr:
+    return call_primitive_func('avx_x86_float32x8_setzero', [])
+
+
+def avx_f32x8_broadcast(value: Expr) -> Expr:
+    return call_primitive_func('avx_x86_float32x8_broadcast', [value])
+
+
+def avx_f32x8_load(addr: Expr) -> Expr:
+    return call_primitive_func('avx_x86_float32x8_load', [addr])
+
+
+def avx_f32x8_store(addr: Expr, value: Expr) -> Expr:
+    return call_primitive_func('avx_x86_float32x8_store', [addr, value])
+
+
+def avx_f32x8_add(a: Expr, b: Expr) -> Expr:
+    return call_primitive_func('avx_x86_float32x8_add', [a, b])
+
+
+def avx_f32x8_sub(a: Expr, b: Expr) -> Expr:
+    return call_primitive_func('avx_x86_float32x8_sub', [a, b])
+
+
+def avx_f32x8_mul(a: Expr, b: Expr) -> Expr:
+    return call_primitive_func('avx_x86_float32x8_mul', [a, b])
+
+
+def avx_f32x8_div(a: Expr, b: Expr) -> Expr:
+    return call_primitive_func('avx_x86_float32x8_div', [a, b])
+
+
+def avx_f32x8_max(a: Expr, b: Expr) -> Expr:
+    return call_primitive_func('avx_x86_float32x8_max', [a, b])
+
+
+def avx_f32x8_min(a: Expr, b: Expr) -> Expr:
+    return call_primitive_func('avx_x86_float32x8_min', [a, b])
+
+
+def avx_f32x8_fmadd(a: Expr, b: Expr, c: Expr) -> Expr:
+    """
+    Compute a * b + c with a single rounding (requires the FMA extension).
+    """
+    return call_primitive_func('avx_x86_float32x8_fmadd', [a, b, c])
@@ -100,7 +100,9 @@ class LetStmt(Stmt):
 class ForStmt(Stmt):
     DEFAULT_UNROLL_LIMIT = 32
 
-    def __init__(self, loop_var, extent, unroll: Optional[Union[int, bool]] = None, body=None):
+    def __init__(
+        self, loop_var, extent, unroll: Optional[Union[int, bool]] = None, body=None, parallel: Union[int, bool] = False
+    ):
         from hidet.ir.tools import simplify  # pylint: disable=import-outside-toplevel
 
         super().__init__()
@@ -108,6 +110,8 @@ class ForStmt(Stmt):
         self.extent: Expr = simplify(convert(extent))
         self.unroll: Optional[Union[int, bool]] = unroll
         self.body: Optional[Stmt] = body
+        # whether to distribute the iterations among cpu threads, an integer gives the number of threads
+        self.parallel: Union[int, bool] = parallel
 
 
 class ForTaskStmt(Stmt):
@@ -11,11 +11,11 @@
 # limitations under the License.
 # pylint: disable=import-outside-toplevel
 from __future__ import annotations
-from typing import Any, Dict, List, Union, Optional, Sequence, Callable
+from typing import Any, Dict, List, Union, Optional, Sequence, Callable, Tuple
 import os
 import pickle
 from hidet.ir.node import Node
-from hidet.ir.expr import Expr, Var, var
+from hidet.ir.expr import Expr, Var, SymbolVar, var
 from hidet.ir.func import IRModule
 from hidet.ir.compute import ComputeNode, TensorNode, TensorInput, ScalarNode, ScalarInput, GridCompute
 
@@ -136,6 +136,8 @@ class Task(Node):
         self.attributes: Dict[str, Union[str, float, int, bool]] = attributes
         self.inverse_map: Dict[TensorInput, InverseMap] = {a: InverseMap.from_obj(b) for a, b in inverse_map.items()}
         self.task_graph: Optional[TaskGraph] = TaskGraph.from_task(self)
+        # the memoized structural hash and the task graph it was computed with
+        self._hash: Optional[Tuple[TaskGraph, str]] = None
 
         # sanity check
         for tn, im in self.inverse_map.items():
@@ -167,10 +169,42 @@ class Task(Node):
             fuse_doc = ' ({} fused)'.format(len(self.task_graph.nodes) - 1)
         return ''.join([self.name, '(', param_doc, ')', fuse_doc])
 
+    def structural_hash(self) -> str:
+        """
+        Get the structural hash of the task.
+
+        The hash does not change across python processes, and two tasks with the same hash are implemented by the
+        same kernel. It is much cheaper than printing the task, and is used to look up the compiled tasks.
+
+        Returns
+        -------
+        ret: str
+            The hash as a hex string of 16 characters.
+        """
+        from hidet.ir.tools import TaskHash
+
+        # the task graph of a fused task is replaced after the task is copied from its anchor
+        memo = getattr(self, '_hash', None)
+        if memo is None or memo[0] is not self.task_graph:
+            memo = (self.task_graph, TaskHash().hash(self).hex())
+            self._hash = memo
+        return memo[1]
+
     @property
     def parameters(self) -> List[TensorNode]:
         return self.task_graph.input_tensors + self.task_graph.output_tensors
 
+    @property
+    def symbols(self) -> List[SymbolVar]:
+        """
+        The symbol vars in the shapes of the parameters.
+
+        The kernel of the task takes the values of the symbol vars as int32 arguments, after the tensor parameters.
+        """
+        from hidet.ir.utils.symbol_utils import collect_symbols
+
+        return collect_symbols([param.type.shape for param in self.parameters])
+
     @property
     def self_params(self) -> List[TensorNode]:
         params: List[TensorNode] = []
@@ -184,13 +218,16 @@ class Task(Node):
 
         if isinstance(target, str):
             target = Target.from_string(target)
+        # the hand-written schedules are specialized for static shapes, the tasks with symbolic dimensions are
+        # scheduled by the auto-schedulers
+        is_static = len(self.symbols) == 0
         if target.name == 'cuda':
-            ret = self.implement_cuda(workding_dir)
+            ret = self.implement_cuda(workding_dir) if is_static else NotImplemented
             if ret is NotImplemented:
                 auto_scheduler = CudaAutoScheduler()
                 ret = auto_scheduler.schedule_task(self, 'cuda')
         elif target.name == 'cpu':
-            ret = self.implement_cpu(workding_dir)
+            ret = self.implement_cpu(workding_dir) if is_static else NotImplemented
             if ret is NotImplemented:
                 auto_scheduler = CpuAutoScheduler()
                 ret = auto_scheduler.schedule_task(self, 'cpu')
@@ -13,4 +13,5 @@ from .type_infer import infer_type, TypeInfer
 from .util_functors import rewrite, collect, collect_free_vars, clone
 from .printer import astext
 from .simplifier import simplify, simplify_to_int
-from .hasher import ExprHash
+from .hasher import ExprHash, TaskHash
+from .task_evaluator import evaluate_task, NumpyTaskEvaluator
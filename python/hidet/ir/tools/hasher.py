@@ -17,9 +17,12 @@ from hidet.ir.expr import Var, Constant, Add, Sub, Multiply, Div, Mod, FloorDiv,
 from hidet.ir.expr import NotEqual, Equal, IfThenElse, LogicalAnd, LogicalOr, LogicalNot, BitwiseAnd, BitwiseOr
 from hidet.ir.expr import BitwiseNot, BitwiseXor, LeftShift, RightShift
 from hidet.ir.expr import TensorSlice, TensorElement, Cast, Dereference, Address, Reference, Call, Let
-from hidet.ir.type import ReferenceType, TensorPointerType, VoidType, PointerType, DataType, TensorType
+from hidet.ir.type import ReferenceType, TensorPointerType, VoidType, PointerType, DataType, TensorType, FuncType
+from hidet.ir.layout import RowMajorLayout
+from hidet.ir.compute import ScalarInput, TensorInput, GridCompute, ReduceCompute, ArgReduceCompute
+from hidet.ir.task import Task, TaskGraph
 from hidet.ir.utils.hash_sum import HashSum
-from hidet.ir.functors import ExprFunctor, TypeFunctor, BaseFunctor
+from hidet.ir.functors import ExprFunctor, TypeFunctor, ComputeFunctor, BaseFunctor
 
 
 class ExprHash(ExprFunctor, TypeFunctor, BaseFunctor):
@@ -43,115 +46,209 @@ class ExprHash(ExprFunctor, TypeFunctor, BaseFunctor):
         return HashSum(tuple(self(v) for v in tp))
 
     def visit_Var(self, e: Var):
-        return HashSum(e) + hash(Var)
+        return HashSum(e) + HashSum(Var)
 
     def visit_Constant(self, e: Constant):
-        return HashSum(e.value) + self(e.type) + hash(Constant)
+        return HashSum(e.value) + self(e.type) + HashSum(Constant)
 
     def visit_Add(self, e: Add):
-        return (self(e.a) & self(e.b)) + hash(Add)
+        return (self(e.a) & self(e.b)) + HashSum(Add)
 
     def visit_Sub(self, e: Sub):
-        return self(e.a) + self(e.b) + hash(Sub)
+        return self(e.a) + self(e.b) + HashSum(Sub)
 
     def visit_Multiply(self, e: Multiply):
-        return (self(e.a) & self(e.b)) + hash(Multiply)
+        return (self(e.a) & self(e.b)) + HashSum(Multiply)
 
     def visit_Div(self, e: Div):
-        return self(e.a) + self(e.b) + hash(Div)
+        return self(e.a) + self(e.b) + HashSum(Div)
 
     def visit_Mod(self, e: Mod):
-        return self(e.a) + self(e.b) + hash(Mod)
+        return self(e.a) + self(e.b) + HashSum(Mod)
 
     def visit_FloorDiv(self, e: FloorDiv):
-        return self(e.a) + self(e.b) + hash(FloorDiv)
+        return self(e.a) + self(e.b) + HashSum(FloorDiv)
 
     def visit_Neg(self, e: Neg):
-        return self(e.a) + hash(Neg)
+        return self(e.a) + HashSum(Neg)
 
     def visit_LessThan(self, e: LessThan):
-        return self(e.a) + self(e.b) + hash(LessThan)
+        return self(e.a) + self(e.b) + HashSum(LessThan)
 
     def visit_LessEqual(self, e: LessEqual):
-        return self(e.a) + self(e.b) + hash(LessEqual)
+        return self(e.a) + self(e.b) + HashSum(LessEqual)
 
     def visit_NotEqual(self, e: NotEqual):
-        return self(e.a) + self(e.b) + hash(NotEqual)
+        return self(e.a) + self(e.b) + HashSum(NotEqual)
 
     def visit_Equal(self, e: Equal):
-        return (self(e.a) & self(e.b)) + hash(Equal)
+        return (self(e.a) & self(e.b)) + HashSum(Equal)
 
     def visit_IfThenElse(self, e: IfThenElse):
-        return self(e.cond) + self(e.then_expr) + self(e.else_expr) + hash(IfThenElse)
+        return self(e.cond) + self(e.then_expr) + self(e.else_expr) + HashSum(IfThenElse)
 
     def visit_And(self, e: LogicalAnd):
-        return (self(e.a) & self(e.b)) + hash(LogicalAnd)
+        return (self(e.a) & self(e.b)) + HashSum(LogicalAnd)
 
     def visit_Or(self, e: LogicalOr):
-        return (self(e.a) & self(e.b)) + hash(LogicalOr)
+        return (self(e.a) & self(e.b)) + HashSum(LogicalOr)
 
     def visit_Not(self, e: LogicalNot):
-        return self(e.a) + hash(LogicalNot)
+        return self(e.a) + HashSum(LogicalNot)
 
     def visit_BitwiseAnd(self, e: BitwiseAnd):
-        return (self(e.a) & self(e.b)) + hash(BitwiseAnd)
+        return (self(e.a) & self(e.b)) + HashSum(BitwiseAnd)
 
     def visit_BitwiseOr(self, e: BitwiseOr):
-        return (self(e.a) & self(e.b)) + hash(BitwiseOr)
+        return (self(e.a) & self(e.b)) + HashSum(BitwiseOr)
 
     def visit_BitwiseNot(self, e: BitwiseNot):
-        return self(e.base) + hash(BitwiseNot)
+        return self(e.base) + HashSum(BitwiseNot)
 
     def visit_BitwiseXor(self, e: BitwiseXor):
-        return (self(e.a) & self(e.b)) + hash(BitwiseXor)
+        return (self(e.a) & self(e.b)) + HashSum(BitwiseXor)
 
     def visit_LeftShift(self, e: LeftShift):
-        return (self(e.base) + self(e.cnt)) + hash(LeftShift)
+        return (self(e.base) + self(e.cnt)) + HashSum(LeftShift)
 
     def visit_RightShift(self, e: RightShift):
-        return (self(e.base) + self(e.cnt)) + hash(RightShift)
+        return (self(e.base) + self(e.cnt)) + HashSum(RightShift)
 
     def visit_TensorElement(self, e: TensorElement):
-        return self(e.base) + self(e.indices) + hash(TensorElement)
+        return self(e.base) + self(e.indices) + HashSum(TensorElement)
 
     def visit_Cast(self, e: Cast):
-        return self(e.expr) + self(e.target_type) + hash(Cast)
+        return self(e.expr) + self(e.target_type) + HashSum(Cast)
 
     def visit_Dereference(self, e: Dereference):
-        return self(e.expr) + hash(Dereference)
+        return self(e.expr) + HashSum(Dereference)
 
     def visit_Address(self, e: Address):
-        return self(e.expr) + hash(Address)
+        return self(e.expr) + HashSum(Address)
 
     def visit_Reference(self, e: Reference):
-        return self(e.expr) + hash(Reference)
+        return self(e.expr) + HashSum(Reference)
 
     def visit_Call(self, e: Call):
-        return self(e.func_var) + self(e.args) + hash(Call)
+        return self(e.func_var) + self(e.args) + HashSum(Call)
 
     def visit_Let(self, e: Let):
-        return self(e.var) + self(e.value) + self(e.body) + hash(Let)
+        return self(e.var) + self(e.value) + self(e.body) + HashSum(Let)
 
     def visit_ScalarType(self, t: DataType):
-        return self(t.name) + hash(DataType)
+        return self(t.name) + HashSum(DataType)
 
     def visit_TensorType(self, t: TensorType):
-        return self(t.dtype) + self(t.shape) + hash(TensorType)
+        return self(t.dtype) + self(t.shape) + HashSum(TensorType)
 
     def visit_PointerType(self, t: PointerType):
-        return self(t.base_type) + hash(PointerType)
+        return self(t.base_type) + HashSum(PointerType)
 
     def visit_TensorPointerType(self, t: TensorPointerType):
-        return self(t.tensor_type) + hash(TensorPointerType)
+        return self(t.tensor_type) + HashSum(TensorPointerType)
 
     def visit_ReferenceType(self, t: ReferenceType):
-        return self(t.base_type) + hash(ReferenceType)
+        return self(t.base_type) + HashSum(ReferenceType)
 
     def visit_VoidType(self, t: VoidType):
-        return hash(VoidType)
+        return HashSum(VoidType)
 
     def visit_TensorSlice(self, e: TensorSlice):
-        return self(e.base) + self(e.indices) + self(e.starts) + self(e.ends) + hash(TensorSlice)
+        return self(e.base) + self(e.indices) + self(e.starts) + self(e.ends) + HashSum(TensorSlice)
 
     def visit_AnyExpr(self, e: AnyExpr):
-        return HashSum(e) + hash(AnyExpr)
+        return HashSum(e) + HashSum(AnyExpr)
+
+
+class TaskHash(ExprHash, ComputeFunctor):
+    """
+    The structural hash of tasks, which does not change across python processes.
+
+    The hash only depends on the structure of a task: the bound variables (e.g., the axes of computations) are
+    identified by the order they are bound, and the input tensors are identified by their positions in the
+    parameters of the task, instead of their names.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.num_bound_vars: int = 0
+
+    def hash(self, expr):
+        self.memo.clear()
+        self.num_bound_vars = 0
+        return self(expr)
+
+    def bind(self, variables):
+        for v in variables:
+            self.memo[v] = HashSum(('bound', self.num_bound_vars)) + HashSum(Var)
+            self.num_bound_vars += 1
+
+    def visit_Var(self, e: Var):
+        if isinstance(e.type, FuncType):
+            # the primitive functions are identified by their names
+            return HashSum(e.hint) + HashSum(FuncType)
+        # free variables, e.g., the symbolic dimensions
+        return HashSum(e.hint) + self(e.type) + HashSum(Var)
+
+    def visit_TensorType(self, t: TensorType):
+        layout = RowMajorLayout if t.layout is None else type(t.layout)
+        return self(t.dtype) + self(t.shape) + HashSum(layout) + HashSum(TensorType)
+
+    def visit_Task(self, task: Task):
+        for idx, param in enumerate(task.task_graph.input_tensors):
+            self.memo[param] = HashSum(('param', idx)) + self(param.type)
+        items = []
+        if len(task.task_graph.nodes) > 1:
+            # visit the task graph first, which binds the inputs of the anchor task to the tensors they consume
+            items.append(self(task.task_graph))
+        items.extend([self(task.outputs), self.visit_TaskAttrs(task)])
+        for tensor, inverse_map in task.inverse_map.items():
+            self.bind(inverse_map.axes)
+            items.append(self(tensor) + self(inverse_map.indices))
+        return HashSum(tuple(items)) + HashSum(Task)
+
+    def visit_TaskAttrs(self, task: Task):
+        # the task class decides how the task is implemented
+        attrs = tuple((name, str(value)) for name, value in task.attributes.items())
+        return HashSum((task.name, attrs)) + HashSum(type(task))
+
+    def visit_TaskGraph(self, task_graph: TaskGraph):
+        items = []
+        for task in task_graph.nodes:
+            for task_input in task.inputs:
+                if task_input in task_graph.consume:
+                    self.memo[task_input] = self(task_graph.consume[task_input])
+            items.append(self(task.outputs) + self.visit_TaskAttrs(task) + HashSum(task is task_graph.anchor))
+        items.append(self(task_graph.output_tensors))
+        return HashSum(tuple(items)) + HashSum(TaskGraph)
+
+    def visit_ScalarInput(self, node: ScalarInput):
+        return HashSum(node.name) + self(node.dtype) + HashSum(ScalarInput)
+
+    def visit_TensorInput(self, node: TensorInput):
+        # the input tensors that are not parameters of the task
+        return HashSum(node.name) + self(node.ttype) + HashSum(TensorInput)
+
+    def visit_GridCompute(self, node: GridCompute):
+        self.bind(node.axes)
+        return self(node.shape) + self(node.value) + HashSum(GridCompute)
+
+    def visit_ReduceCompute(self, node: ReduceCompute):
+        self.bind(node.axes)
+        return (
+            self(node.shape)
+            + self(node.value)
+            + HashSum(str(node.reduce_operation))
+            + self(node.accumulate_dtype)
+            + HashSum(ReduceCompute)
+        )
+
+    def visit_ArgReduceCompute(self, node: ArgReduceCompute):
+        self.bind([node.axis])
+        return (
+            self(node.extent)
+            + self(node.value)
+            + HashSum(str(node.reduce_operation))
+            + self(node.index_dtype)
+            + HashSum(ArgReduceCompute)
+        )
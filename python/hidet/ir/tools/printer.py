@@ -292,6 +292,8 @@ class IRPrinter(IRFunctor):
                 doc += '[unroll]'
             else:
                 doc += '[no-unroll]'
+        if stmt.parallel:
+            doc += '[parallel]'
         doc += self(stmt.body).indent(4)
         return doc
 
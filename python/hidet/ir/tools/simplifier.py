@@ -139,7 +139,7 @@ class Simplifier(StmtRewriter, ExprRewriter, BaseRewriter):
             if loop_var is stmt.loop_var and body is stmt.body:
                 return stmt
             else:
-                return ForStmt(loop_var, extent, stmt.unroll, body)
+                return ForStmt(loop_var, extent, stmt.unroll, body, stmt.parallel)
 
 
 def simplify(node: Union[Stmt, Expr], repeat_limit=10):
@@ -0,0 +1,336 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Callable, Dict, List, Sequence
+import math
+import numpy as np
+from hidet.ir.type import DataType
+from hidet.ir.expr import Add, Sub, Multiply, Div, Mod, FloorDiv, Neg, LessThan, LessEqual, Equal, NotEqual, LogicalAnd
+from hidet.ir.expr import LogicalOr, LogicalNot, BitwiseAnd, BitwiseOr, BitwiseNot, BitwiseXor, LeftShift, RightShift
+from hidet.ir.expr import Expr, TensorElement, IfThenElse, Call, Let, Var, Constant, Cast
+from hidet.ir.compute import TensorNode, TensorInput, GridCompute, ReduceCompute, ArgReduceCompute
+from hidet.ir.compute.reduce_operations import SumReduce, AverageReduce, ProductReduce, MaxReduce, MinReduce
+from hidet.ir.compute.reduce_operations import AndReduce, OrReduce
+from hidet.ir.dtypes.utils import dtype_to_numpy
+from hidet.ir.layout import RowMajorLayout
+from hidet.ir.task import Task
+from hidet.ir.functors import ExprFunctor, ComputeFunctor
+from hidet.ir.tools.type_infer import infer_type
+from hidet.utils import prod
+
+_erf = np.vectorize(math.erf, otypes=[np.float64])
+
+_primitive_functions: Dict[str, Callable[..., np.ndarray]] = {
+    'generic_sin': np.sin,
+    'generic_cos': np.cos,
+    'generic_tanh': np.tanh,
+    'generic_exp': np.exp,
+    # rounds half away from zero as the c math library
+    'generic_round': lambda a: np.trunc(a + np.copysign(0.5, a)),
+    'generic_floor': np.floor,
+    'generic_ceil': np.ceil,
+    'generic_rsqrt': lambda a: 1 / np.sqrt(a),
+    'generic_sqrt': np.sqrt,
+    'generic_erf': lambda a: _erf(a).astype(np.asarray(a).dtype),
+    'generic_log': np.log,
+    'generic_log2': np.log2,
+    'generic_log10': np.log10,
+    'generic_log1p': np.log1p,
+    'generic_trunc': np.trunc,
+    'generic_isfinite': np.isfinite,
+    'generic_isinf': np.isinf,
+    'generic_isnan': np.isnan,
+    'generic_min': np.minimum,
+    'generic_max': np.maximum,
+    'generic_pow': np.power,
+    'generic_mod': np.fmod,
+    'generic_atan2': np.arctan2,
+    'generic_fma': lambda a, b, c: a * b + c,
+}
+
+_reduce_functions: Dict[type, Callable[..., np.ndarray]] = {
+    SumReduce: np.sum,
+    AverageReduce: np.mean,
+    ProductReduce: np.prod,
+    MaxReduce: np.max,
+    MinReduce: np.min,
+    AndReduce: np.all,
+    OrReduce: np.any,
+}
+
+
+def _numpy_dtype(dtype) -> np.dtype:
+    if not isinstance(dtype, DataType):
+        raise NotImplementedError('Can not evaluate the values of type {}.'.format(dtype))
+    try:
+        return np.dtype(dtype_to_numpy(dtype))
+    except (KeyError, RuntimeError) as e:
+        raise NotImplementedError('Numpy does not support data type {}.'.format(dtype)) from e
+
+
+def _is_integer(a: np.ndarray) -> bool:
+    return np.issubdtype(np.asarray(a).dtype, np.integer)
+
+
+class NumpyTaskEvaluator(ExprFunctor, ComputeFunctor):
+    """
+    Evaluate the computation of a task with numpy, without compiling it.
+
+    The computation is evaluated in a vectorized way: the axes of a grid compute are bound to index arrays that
+    broadcast to the shape of the grid, and each expression evaluates to an array broadcastable to the shape of the
+    grid. The reduce axes of a reduce compute are appended to the axes of the enclosing grid, and reduced at the end.
+
+    The computations that can not be evaluated (e.g., the tasks with symbolic shapes, the data types that numpy does
+    not support, or the primitive functions other than the generic math functions) raise NotImplementedError.
+
+    Parameters
+    ----------
+    max_elements: int
+        The maximum number of elements of the intermediate arrays, e.g., the product of the grid shape and the reduce
+        shape of a reduce compute. Larger computations raise NotImplementedError, and should be compiled instead.
+    """
+
+    def __init__(self, max_elements: int = 2**26):
+        super().__init__(use_memo=False)
+        self.max_elements: int = max_elements
+        self.tensors: Dict[TensorNode, np.ndarray] = {}
+        self.env: Dict[Var, np.ndarray] = {}
+        self.extents: List[int] = []
+
+    def evaluate(self, task: Task, inputs: Sequence[np.ndarray]) -> List[np.ndarray]:
+        if len(inputs) != len(task.inputs):
+            raise ValueError('Task {} expects {} inputs, got {}.'.format(task.name, len(task.inputs), len(inputs)))
+        for tensor_input, array in zip(task.inputs, inputs):
+            expected = tuple(self.const_shape(tensor_input))
+            if tuple(array.shape) != expected:
+                msg = 'Expect input {} with shape {}, got {}.'.format(tensor_input.name, expected, array.shape)
+                raise ValueError(msg)
+            self.tensors[tensor_input] = np.asarray(array, dtype=_numpy_dtype(tensor_input.ttype.dtype))
+        with np.errstate(all='ignore'):
+            return [self.visit(output) for output in task.outputs]
+
+    @staticmethod
+    def const_shape(node: TensorNode) -> List[int]:
+        shape = node.const_shape()
+        if not all(isinstance(v, int) for v in shape):
+            raise NotImplementedError('Can not evaluate tensor {} with symbolic shape {}.'.format(node.name, shape))
+        return shape
+
+    def check_size(self, shape: Sequence[int]):
+        if prod(shape) > self.max_elements:
+            raise NotImplementedError('Too many elements to evaluate with numpy: {}.'.format(list(shape)))
+
+    def bind(self, var: Var, value: np.ndarray):
+        # the bound values always have the rank of the current grid, so that more axes can be appended to them
+        value = np.asarray(value)
+        self.env[var] = value.reshape((1,) * (len(self.extents) - value.ndim) + value.shape)
+
+    def typed(self, e: Expr, value) -> np.ndarray:
+        return np.asarray(value).astype(_numpy_dtype(infer_type(e)), copy=False)
+
+    def visit_TensorInput(self, node: TensorInput):
+        if node not in self.tensors:
+            raise NotImplementedError('The value of tensor input {} is not given.'.format(node.name))
+        return self.tensors[node]
+
+    def visit_GridCompute(self, node: GridCompute):
+        if node in self.tensors:
+            return self.tensors[node]
+        if node.layout is not None and not isinstance(node.layout, RowMajorLayout):
+            raise NotImplementedError('Can not evaluate grid compute {} with layout {}.'.format(node.name, node.layout))
+        shape = self.const_shape(node)
+        self.check_size(shape)
+        env, extents = self.env, self.extents
+        self.env, self.extents = {}, shape
+        for i, (axis, extent) in enumerate(zip(node.axes, shape)):
+            self.bind(axis, np.arange(extent).reshape([1] * i + [extent] + [1] * (len(shape) - i - 1)))
+        value = np.broadcast_to(self.visit(node.value), shape)
+        self.env, self.extents = env, extents
+        self.tensors[node] = np.array(value, dtype=_numpy_dtype(node.type.dtype))
+        return self.tensors[node]
+
+    def visit_ReduceCompute(self, node: ReduceCompute):
+        reduce = _reduce_functions.get(type(node.reduce_operation), None)
+        if reduce is None:
+            raise NotImplementedError('Can not evaluate reduction {}.'.format(node.reduce_operation))
+        rank, num_axes = len(self.extents), len(node.shape)
+        # the reduce extents may depend on the axes of the enclosing grid (e.g., cumsum), reduce over the largest
+        # extents and mask the elements out of the actual extents
+        extents = [self(extent) for extent in node.shape]
+        shape = [int(np.max(extent)) if extent.size > 0 else 0 for extent in extents]
+        value = self.visit_reduce_value(node.axes, shape, node.value)
+        value = value.astype(_numpy_dtype(node.accumulate_dtype), copy=False)
+        axis = tuple(range(rank, rank + num_axes))
+        if all(extent.ndim == 0 for extent in extents):
+            return self.typed(node, reduce(value, axis=axis))
+        mask = np.full(value.shape, True)
+        for i, extent in enumerate(extents):
+            index = np.arange(shape[i]).reshape([1] * (rank + i) + [shape[i]] + [1] * (num_axes - i - 1))
+            extent = np.asarray(extent).reshape((1,) * (rank - extent.ndim) + extent.shape + (1,) * num_axes)
+            mask = mask & (index < extent)
+        if isinstance(node.reduce_operation, AverageReduce):
+            return self.typed(node, np.sum(np.where(mask, value, 0), axis=axis) / np.sum(mask, axis=axis))
+        init = node.reduce_operation.initial_value(node.accumulate_dtype)
+        return self.typed(node, reduce(np.where(mask, value, self(init)), axis=axis))
+
+    def visit_ArgReduceCompute(self, node: ArgReduceCompute):
+        if isinstance(node.reduce_operation, MaxReduce):
+            reduce = np.argmax
+        elif isinstance(node.reduce_operation, MinReduce):
+            reduce = np.argmin
+        else:
+            raise NotImplementedError('Can not evaluate arg reduction {}.'.format(node.reduce_operation))
+        extent = self(node.extent)
+        if extent.ndim != 0:
+            raise NotImplementedError('Can not evaluate arg reduction with extent {}.'.format(node.extent))
+        value = self.visit_reduce_value([node.axis], [int(extent)], node.value)
+        return reduce(value, axis=len(self.extents)).astype(_numpy_dtype(node.index_dtype))
+
+    def visit_reduce_value(self, axes: Sequence[Var], shape: Sequence[int], value: Expr) -> np.ndarray:
+        # evaluate the value with the reduce axes appended to the axes of the enclosing grid
+        rank, num_axes = len(self.extents), len(shape)
+        extents = self.extents + list(shape)
+        self.check_size(extents)
+        env = self.env
+        self.env = {var: array.reshape(array.shape + (1,) * num_axes) for var, array in env.items()}
+        self.extents = extents
+        for i, (axis, extent) in enumerate(zip(axes, shape)):
+            self.bind(axis, np.arange(extent).reshape([1] * (rank + i) + [extent] + [1] * (num_axes - i - 1)))
+        ret = np.broadcast_to(self.visit(value), extents)
+        self.env, self.extents = env, extents[:rank]
+        return ret
+
+    def visit_Var(self, e: Var):
+        if e not in self.env:
+            raise NotImplementedError('Can not evaluate free variable {}.'.format(e))
+        return self.env[e]
+
+    def visit_Constant(self, e: Constant):
+        if e.is_tensor():
+            return np.asarray(e.value, dtype=_numpy_dtype(e.type.dtype))
+        return np.asarray(e.value, dtype=_numpy_dtype(e.type))
+
+    def visit_Add(self, e: Add):
+        return self.typed(e, self(e.a) + self(e.b))
+
+    def visit_Sub(self, e: Sub):
+        return self.typed(e, self(e.a) - self(e.b))
+
+    def visit_Multiply(self, e: Multiply):
+        return self.typed(e, self(e.a) * self(e.b))
+
+    def visit_Div(self, e: Div):
+        a, b = self(e.a), self(e.b)
+        if _is_integer(a) and _is_integer(b):
+            # the integer division truncates towards zero as in c
+            q = np.floor_divide(a, b)
+            return self.typed(e, np.where((np.remainder(a, b) != 0) & ((a < 0) != (b < 0)), q + 1, q))
+        return self.typed(e, np.true_divide(a, b))
+
+    def visit_Mod(self, e: Mod):
+        return self.typed(e, np.fmod(self(e.a), self(e.b)))
+
+    def visit_FloorDiv(self, e: FloorDiv):
+        return self.typed(e, np.floor_divide(self(e.a), self(e.b)))
+
+    def visit_Neg(self, e: Neg):
+        return np.negative(self(e.a))
+
+    def visit_LessThan(self, e: LessThan):
+        return np.less(self(e.a), self(e.b))
+
+    def visit_LessEqual(self, e: LessEqual):
+        return np.less_equal(self(e.a), self(e.b))
+
+    def visit_Equal(self, e: Equal):
+        return np.equal(self(e.a), self(e.b))
+
+    def visit_NotEqual(self, e: NotEqual):
+        return np.not_equal(self(e.a), self(e.b))
+
+    def visit_And(self, e: LogicalAnd):
+        return np.logical_and(self(e.a), self(e.b))
+
+    def visit_Or(self, e: LogicalOr):
+        return np.logical_or(self(e.a), self(e.b))
+
+    def visit_Not(self, e: LogicalNot):
+        return np.logical_not(self(e.a))
+
+    def visit_BitwiseAnd(self, e: BitwiseAnd):
+        return np.bitwise_and(self(e.a), self(e.b))
+
+    def visit_BitwiseOr(self, e: BitwiseOr):
+        return np.bitwise_or(self(e.a), self(e.b))
+
+    def visit_BitwiseXor(self, e: BitwiseXor):
+        return np.bitwise_xor(self(e.a), self(e.b))
+
+    def visit_BitwiseNot(self, e: BitwiseNot):
+        return np.invert(self(e.base))
+
+    def visit_LeftShift(self, e: LeftShift):
+        return np.left_shift(self(e.base), self(e.cnt))
+
+    def visit_RightShift(self, e: RightShift):
+        return np.right_shift(self(e.base), self(e.cnt))
+
+    def visit_TensorElement(self, e: TensorElement):
+        if not isinstance(e.base, TensorNode):
+            raise NotImplementedError('Can not evaluate the element of {}.'.format(type(e.base).__name__))
+        base = self(e.base)
+        # the out-of-bound indices only appear in the branches discarded by if-then-else (e.g., padding), clip them
+        # since both branches are evaluated
+        indices = tuple(np.clip(self(index), 0, extent - 1) for index, extent in zip(e.indices, base.shape))
+        return base[indices]
+
+    def visit_IfThenElse(self, e: IfThenElse):
+        return self.typed(e, np.where(self(e.cond), self(e.then_expr), self(e.else_expr)))
+
+    def visit_Let(self, e: Let):
+        self.bind(e.var, self(e.value))
+        ret = self(e.body)
+        del self.env[e.var]
+        return ret
+
+    def visit_Cast(self, e: Cast):
+        return np.asarray(self(e.expr)).astype(_numpy_dtype(e.target_type))
+
+    def visit_Call(self, e: Call):
+        func = _primitive_functions.get(e.func_var.hint, None)
+        if func is None:
+            raise NotImplementedError('Can not evaluate primitive function {}.'.format(e.func_var.hint))
+        return self.typed(e, func(*[self(arg) for arg in e.args]))
+
+
+def evaluate_task(task: Task, inputs: Sequence[np.ndarray]) -> List[np.ndarray]:
+    """
+    Evaluate a task with numpy, without compiling it.
+
+    Parameters
+    ----------
+    task: Task
+        The task to evaluate.
+
+    inputs: Sequence[np.ndarray]
+        The values of the inputs of the task, in row-major layout.
+
+    Returns
+    -------
+    ret: List[np.ndarray]
+        The values of the outputs of the task.
+
+    Raises
+    ------
+    NotImplementedError
+        If the task contains computations that can not be evaluated with numpy.
+    """
+    return NumpyTaskEvaluator().evaluate(task, inputs)
@@ -149,8 +149,18 @@ class TensorType(TypeNode):
     def storage_bytes(self) -> Expr:
         return self.layout.size * self.dtype.nbytes
 
-    def const_shape(self) -> List[int]:
-        return [int(v) for v in self.shape]
+    def const_shape(self) -> List[Int]:
+        """
+        Get the shape of the tensor, where the constant dimensions are converted to python ints.
+
+        Returns
+        -------
+        ret: List[Int]
+            The shape. The symbolic dimensions (see :class:`~hidet.ir.expr.SymbolVar`) are kept as expressions.
+        """
+        from hidet.ir.expr import Constant
+
+        return [int(v) if isinstance(v, Constant) else v for v in self.shape]
 
 
 class VoidType(TypeNode):
@@ -222,6 +232,13 @@ class FuncType(TypeNode):
         return FuncType([param.type for param in func.params], func.ret_type)
 
 
+def _static_dim(dim: Int) -> Int:
+    # the static dimensions are compared by their values, and the symbolic ones by their identities
+    from hidet.ir.expr import Constant
+
+    return int(dim) if isinstance(dim, (int, Constant)) else id(dim)
+
+
 def tensor_type(dtype, shape: Optional[Sequence[Union[int, Expr]]] = None, layout=None):
     """
     Construct a tensor type.
@@ -263,7 +280,7 @@ def tensor_type(dtype, shape: Optional[Sequence[Union[int, Expr]]] = None, layou
         assert isinstance(layout, DataLayout)
         assert isinstance(shape, (list, tuple))
         for a, b in zip(shape, layout.shape):
-            if int(a) != int(b):
+            if _static_dim(a) != _static_dim(b):
                 raise ValueError(
                     'The shape of tensor and the shape of layout are not compatible, '
                     '{} vs {}'.format(list(shape), list(layout.shape))
@@ -14,7 +14,9 @@ from . import hash_sum
 from . import index_transform
 from . import task_utils
 from . import expr_utils
+from . import symbol_utils
 
 from .index_transform import index_serialize, index_deserialize
 from .task_utils import validate_schedule
 from .expr_utils import as_expr
+from .symbol_utils import collect_symbols, bind_symbols, eval_shape, is_static_shape
@@ -9,16 +9,58 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Iterable
+from typing import Any, Iterable
+import hashlib
 import numpy as np
 
 
+def _digest(tag: bytes, data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(tag + data, digest_size=8).digest(), 'little')
+
+
+def stable_hash(obj: Any) -> int:
+    """
+    Get the 64-bit hash of an object.
+
+    Unlike the builtin hash function, the hash of python constants (e.g., str, int, float, None), classes, numpy
+    arrays and the tuples (or lists) of them does not change across python processes. Other objects are hashed by
+    the builtin hash function, which usually depends on their identity.
+
+    Parameters
+    ----------
+    obj: Any
+        The object to hash.
+
+    Returns
+    -------
+    ret: int
+        The hash value.
+    """
+    if isinstance(obj, HashSum):
+        return obj.value
+    elif obj is None:
+        return _digest(b'n', b'')
+    elif isinstance(obj, (bool, int, np.integer)):
+        return _digest(b'i', str(int(obj)).encode())
+    elif isinstance(obj, (float, np.floating)):
+        return _digest(b'f', repr(float(obj)).encode())
+    elif isinstance(obj, str):
+        return _digest(b's', obj.encode())
+    elif isinstance(obj, bytes):
+        return _digest(b'b', obj)
+    elif isinstance(obj, (tuple, list)):
+        return _digest(b't', b''.join(stable_hash(v).to_bytes(8, 'little') for v in obj))
+    elif isinstance(obj, type):
+        return _digest(b'c', '{}.{}'.format(obj.__module__, obj.__qualname__).encode())
+    elif isinstance(obj, np.ndarray):
+        return _digest(b'a', '{}{}'.format(obj.dtype.str, obj.shape).encode() + np.ascontiguousarray(obj).tobytes())
+    else:
+        return hash(obj) & 0xFFFFFFFFFFFFFFFF
+
+
 class HashSum:
     def __init__(self, obj):
-        if isinstance(obj, np.ndarray):
-            self.value = id(obj)
-        else:
-            self.value = hash(obj)
+        self.value = stable_hash(obj)
         self.hashed_obj = obj
 
     def __str__(self):
@@ -41,6 +83,9 @@ class HashSum:
         assert isinstance(other, HashSum)
         return self.value == other.value
 
+    def hex(self) -> str:
+        return '{:016x}'.format(self.value)
+
     @staticmethod
     def hash_set(objs: Iterable) -> 'HashSum':
-        return HashSum(tuple(sorted([hash(obj) for obj in objs])))
+        return HashSum(tuple(sorted([stable_hash(obj) for obj in objs])))
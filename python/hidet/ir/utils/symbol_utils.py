@@ -0,0 +1,120 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Dict, List, Sequence, Union
+from hidet.ir.expr import Expr, Constant, SymbolVar, convert
+
+Int = Union[int, Expr]
+
+
+def is_static_shape(shape: Sequence[Int]) -> bool:
+    return all(isinstance(v, (int, Constant)) for v in shape)
+
+
+def collect_symbols(shapes: Sequence[Sequence[Int]]) -> List[SymbolVar]:
+    """
+    Collect the symbol vars used in the given shapes, in the order of their first appearances.
+
+    Parameters
+    ----------
+    shapes: Sequence[Sequence[Int]]
+        The shapes.
+
+    Returns
+    -------
+    ret: List[SymbolVar]
+        The symbol vars.
+    """
+    from hidet.ir.tools import collect
+
+    symbols: List[SymbolVar] = []
+    for shape in shapes:
+        for dim in shape:
+            if isinstance(dim, Expr) and not isinstance(dim, Constant):
+                for symbol in collect(dim, SymbolVar):
+                    if symbol not in symbols:
+                        symbols.append(symbol)
+    return symbols
+
+
+def bind_symbols(
+    expected_shapes: Sequence[Sequence[Int]], actual_shapes: Sequence[Sequence[int]]
+) -> Dict[SymbolVar, int]:
+    """
+    Bind the symbol vars to the values given by the actual shapes.
+
+    The symbol vars are bound by the dimensions that are exactly a symbol var. Other dimensions (including the
+    dimensions that are expressions of symbol vars) are checked against the actual shapes.
+
+    Parameters
+    ----------
+    expected_shapes: Sequence[Sequence[Int]]
+        The expected shapes, which may contain symbolic dimensions.
+
+    actual_shapes: Sequence[Sequence[int]]
+        The actual shapes.
+
+    Returns
+    -------
+    ret: Dict[SymbolVar, int]
+        The values of the symbol vars.
+
+    Raises
+    ------
+    ValueError
+        When the actual shapes do not match the expected ones.
+    """
+    bindings: Dict[SymbolVar, int] = {}
+    for expected, actual in zip(expected_shapes, actual_shapes):
+        if len(expected) != len(actual):
+            raise ValueError('Expect a tensor with shape {}, got {}.'.format(list(expected), list(actual)))
+        for dim, value in zip(expected, actual):
+            if isinstance(dim, SymbolVar):
+                if bindings.setdefault(dim, value) != value:
+                    raise ValueError(
+                        'Symbolic dimension "{}" is bound to both {} and {}.'.format(dim.hint, bindings[dim], value)
+                    )
+    for expected, actual in zip(expected_shapes, actual_shapes):
+        if eval_shape(expected, bindings) != list(actual):
+            raise ValueError('Expect a tensor with shape {}, got {}.'.format(list(expected), list(actual)))
+    return bindings
+
+
+def eval_shape(shape: Sequence[Int], bindings: Dict[SymbolVar, int]) -> List[int]:
+    """
+    Evaluate a shape with the given values of symbol vars.
+
+    Parameters
+    ----------
+    shape: Sequence[Int]
+        The shape, which may contain symbolic dimensions.
+
+    bindings: Dict[SymbolVar, int]
+        The values of the symbol vars.
+
+    Returns
+    -------
+    ret: List[int]
+        The evaluated shape.
+    """
+    from hidet.ir.tools import rewrite, simplify_to_int
+
+    ret: List[int] = []
+    for dim in shape:
+        if isinstance(dim, (int, Constant)):
+            ret.append(int(dim))
+        elif isinstance(dim, SymbolVar):
+            if dim not in bindings:
+                raise ValueError('Symbolic dimension "{}" is not bound.'.format(dim.hint))
+            ret.append(bindings[dim])
+        else:
+            ret.append(simplify_to_int(rewrite(dim, {s: convert(v) for s, v in bindings.items()})))
+    return ret
@@ -65,7 +65,7 @@ def as_tensor_pointer(
     return cast(expr, tensor_pointer(dtype, shape, layout))
 
 
-def grid(*dim_extents):
+def grid(*dim_extents, parallel: Union[bool, int] = False):  # pylint: disable=unused-argument
     raise ValueError('Please call this function within the @hidet.script decorated function.')
 
 
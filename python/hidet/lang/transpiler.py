@@ -760,12 +760,21 @@ class PythonToHidetTranslator(PythonAstFunctor):
             #  for i, j in grid(3, 4):
             #    ...
             # Will be translated to nested for loops (i.e., ForStmt).
+            # The outermost loop is distributed among cpu threads when parallel=True (or the number of threads) is
+            # given, e.g., grid(3, 4, parallel=True).
             call = stmt.iter
             extents = [self.visit(arg) for arg in call.args]
+            parallel = False
+            for keyword in call.keywords:
+                if keyword.arg != 'parallel':
+                    raise HidetProgramError(self, keyword, 'Unexpected keyword argument "{}".'.format(keyword.arg))
+                parallel = self.visit(keyword.value)
+                if not isinstance(parallel, (bool, int)):
+                    raise HidetProgramError(self, keyword, 'Expect a python bool or int for parallel.')
             declare_loop_vars(num=len(extents))
             body = visit_body()
-            for loop_var, extent in zip(reversed(loop_vars), reversed(extents)):
-                body = ir.ForStmt(loop_var=loop_var, extent=extent, body=body)
+            for idx, loop_var, extent in reversed(list(zip(range(len(extents)), loop_vars, extents))):
+                body = ir.ForStmt(loop_var=loop_var, extent=extent, body=body, parallel=parallel if idx == 0 else False)
             self.current_scope.append(body)
         elif isinstance(stmt.iter, Call) and isinstance(stmt.iter.func, Attribute) and stmt.iter.func.attr == 'on':
             # case 3:
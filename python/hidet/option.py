@@ -12,6 +12,7 @@
 from __future__ import annotations
 from typing import Dict, Any, List, Optional, Callable, Iterable, Tuple
 import os
+import threading
 
 
 class OptionRegistry:
@@ -57,6 +58,11 @@ class OptionRegistry:
 register_option = OptionRegistry.register_option
 
 
+def _is_none_or_positive_int(value: Any) -> bool:
+    # the checkers are pickled with the dumped options, thus we can not use lambda functions
+    return value is None or (isinstance(value, int) and value > 0)
+
+
 def register_hidet_options():
     from hidet.utils import git_utils
 
@@ -106,6 +112,25 @@ def register_hidet_options():
         default_value=False,
         description='Whether to cache the generated kernels during tuning.',
         choices=[True, False],
+    ).register_option(
+        name='cpu_num_threads',
+        type_hint='Optional[int]',
+        default_value=None,
+        description='The maximum number of threads used by a cpu kernel. None means using all cores.',
+        checker=_is_none_or_positive_int,
+    ).register_option(
+        name='op_cache_limit',
+        type_hint='Optional[int]',
+        default_value=None,
+        description='The maximum size of the operator cache on disk in bytes. None means no limit.',
+        checker=_is_none_or_positive_int,
+    ).register_option(
+        name='tuning_budget',
+        type_hint='Optional[int]',
+        default_value=None,
+        description='The maximum number of schedules to compile and measure when tuning an operator. '
+        'None means measuring all the schedules in the search space.',
+        checker=_is_none_or_positive_int,
     )
 
 
@@ -115,9 +140,13 @@ register_hidet_options()
 class OptionContext:
     """
     The option context.
+
+    Each thread has its own stack of option contexts, whose bottom is the default context shared by all threads. To
+    use the options of one thread in another thread, dump them by :func:`dump_options` and restore them by
+    :func:`restore_options` in the other thread.
     """
 
-    stack: List[OptionContext] = []
+    _local = threading.local()
 
     def __init__(self):
         self.options: Dict[str, Any] = {}
@@ -134,18 +163,45 @@ class OptionContext:
         ret: OptionContext
             The option context itself.
         """
-        OptionContext.stack.append(self)
+        OptionContext.stack().append(self)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
         Exit the option context.
         """
-        OptionContext.stack.pop()
+        OptionContext.stack().pop()
+
+    @staticmethod
+    def stack() -> List[OptionContext]:
+        """
+        Get the option context stack of current thread.
+
+        Returns
+        -------
+        ret: List[OptionContext]
+            The option context stack of current thread.
+        """
+        local = OptionContext._local
+        if not hasattr(local, 'stack'):
+            local.stack = [_default_context]
+        return local.stack
+
+    @staticmethod
+    def set_stack(stack: List[OptionContext]):
+        """
+        Set the option context stack of current thread.
+
+        Parameters
+        ----------
+        stack: List[OptionContext]
+            The new option context stack of current thread.
+        """
+        OptionContext._local.stack = stack
 
     @staticmethod
     def current() -> OptionContext:
-        return OptionContext.stack[-1]
+        return OptionContext.stack()[-1]
 
     def set_option(self, name: str, value: Any):
         if name not in OptionRegistry.registered_options:
@@ -162,7 +218,7 @@ class OptionContext:
         self.options[name] = value
 
     def get_option(self, name: str) -> Any:
-        for ctx in reversed(OptionContext.stack):
+        for ctx in reversed(OptionContext.stack()):
             if name in ctx.options:
                 return ctx.options[name]
         if name not in OptionRegistry.registered_options:
@@ -171,31 +227,34 @@ class OptionContext:
         return registry.default_value
 
 
-OptionContext.stack.append(OptionContext())
+_default_context = OptionContext()
 
 
 def dump_options() -> Dict[str, Any]:
     """
-    Dump the options in option context stack.
+    Dump the options in the option context stack of current thread.
 
     Returns
     -------
     ret: Dict[str, Any]
         The dumped options.
     """
-    return {'option_context_stack': OptionContext.stack, 'registered_options': OptionRegistry.registered_options}
+    stack = [OptionContext() for _ in OptionContext.stack()]
+    for ctx, dumped in zip(OptionContext.stack(), stack):
+        dumped.options = dict(ctx.options)
+    return {'option_context_stack': stack, 'registered_options': OptionRegistry.registered_options}
 
 
 def restore_options(dumped_options: Dict[str, Any]):
     """
-    Restore the options from dumped options.
+    Restore the options from dumped options, as the option context stack of current thread.
 
     Parameters
     ----------
     dumped_options: Dict[str, Any]
         The dumped options.
     """
-    OptionContext.stack = dumped_options['option_context_stack']
+    OptionContext.set_stack(list(dumped_options['option_context_stack']))
     OptionRegistry.registered_options = dumped_options['registered_options']
 
 
@@ -495,3 +554,91 @@ def debug_cache_tuning(enabled: bool = True):
         Whether to debug cache tuning.
     """
     OptionContext.current().set_option('debug_cache_tuning', enabled)
+
+
+def cpu_num_threads(num_threads: Optional[int] = None):
+    """
+    Set the maximum number of threads used by each cpu kernel.
+
+    The auto-scheduled cpu kernels distribute the outer loops among a team of openmp threads. By default (None),
+    the number of threads is decided by the openmp runtime, which uses all cores unless the environment variable
+    ``OMP_NUM_THREADS`` is set.
+
+    .. note::
+
+        The number of threads is embedded into the generated kernels, thus kernels are compiled and cached
+        separately for different number of threads.
+
+    Parameters
+    ----------
+    num_threads: Optional[int]
+        The maximum number of threads. None to use all cores.
+    """
+    OptionContext.current().set_option('cpu_num_threads', num_threads)
+
+
+def get_cpu_num_threads() -> Optional[int]:
+    """
+    Get the maximum number of threads used by each cpu kernel.
+
+    Returns
+    -------
+    ret: Optional[int]
+        The maximum number of threads. None means using all cores.
+    """
+    return OptionContext.current().get_option('cpu_num_threads')
+
+
+def op_cache_limit(num_bytes: Optional[int] = None):
+    """
+    Set the maximum size of the operator cache on disk.
+
+    When the total size of the cached operators exceeds the limit, the least recently used operators are evicted
+    from the cache.
+
+    Parameters
+    ----------
+    num_bytes: Optional[int]
+        The maximum size in bytes. None means no limit.
+    """
+    OptionContext.current().set_option('op_cache_limit', num_bytes)
+
+
+def get_op_cache_limit() -> Optional[int]:
+    """
+    Get the maximum size of the operator cache on disk.
+
+    Returns
+    -------
+    ret: Optional[int]
+        The maximum size in bytes. None means no limit.
+    """
+    return OptionContext.current().get_option('op_cache_limit')
+
+
+def tuning_budget(num_schedules: Optional[int] = None):
+    """
+    Set the maximum number of schedules to compile and measure when tuning an operator.
+
+    By default (None), all the schedules in the search space are compiled and measured. When a budget is given,
+    the schedules are ranked by a cost model that is refined with the measured latencies, and only the most
+    promising schedules are compiled and measured, up to the budget.
+
+    Parameters
+    ----------
+    num_schedules: Optional[int]
+        The maximum number of schedules to measure for each operator. None to measure all the schedules.
+    """
+    OptionContext.current().set_option('tuning_budget', num_schedules)
+
+
+def get_tuning_budget() -> Optional[int]:
+    """
+    Get the maximum number of schedules to compile and measure when tuning an operator.
+
+    Returns
+    -------
+    ret: Optional[int]
+        The maximum number of schedules. None means measuring all the schedules.
+    """
+    return OptionContext.current().get_option('tuning_budget')
@@ -43,23 +43,23 @@ class CompiledFunction:
         return self.packed_func.profile(*args, warmup=warmup, number=number, repeat=repeat)
 
 
-CompiledTaskKey = namedtuple('CompiledTaskKey', ['device', 'space', 'task_str'])
+CompiledTaskKey = namedtuple('CompiledTaskKey', ['device', 'space', 'task_hash'])
 
 
 class CompiledTaskCache:
     def __init__(self):
         self.cached: Dict[Tuple[str, int, str], CompiledFunction] = {}
 
-    def contains(self, device_type: str, space: int, task_str: str) -> bool:
-        key = CompiledTaskKey(device_type, space, task_str)
+    def contains(self, device_type: str, space: int, task_hash: str) -> bool:
+        key = CompiledTaskKey(device_type, space, task_hash)
         return key in self.cached
 
-    def get(self, device_type: str, space: int, task_str: str) -> Optional[CompiledFunction]:
-        key = CompiledTaskKey(device_type, space, task_str)
+    def get(self, device_type: str, space: int, task_hash: str) -> Optional[CompiledFunction]:
+        key = CompiledTaskKey(device_type, space, task_hash)
         return self.cached.get(key) if key in self.cached else None
 
-    def add(self, device_type: str, space: int, task_str: str, func: CompiledFunction):
-        key = CompiledTaskKey(device_type, space, task_str)
+    def add(self, device_type: str, space: int, task_hash: str, func: CompiledFunction):
+        key = CompiledTaskKey(device_type, space, task_hash)
         self.cached[key] = func
 
 
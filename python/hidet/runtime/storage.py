@@ -10,8 +10,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from __future__ import annotations
-from typing import Callable, Dict, List, Optional, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from collections import defaultdict
+import bisect
+import ctypes
+import ctypes.util
+import threading
 import hidet.cuda
 from hidet.cuda.stream import Stream
 from hidet.utils import green, initialize, exiting
@@ -47,6 +51,19 @@ class MemoryAPI:
     def memory_info(self) -> (int, int):
         raise NotImplementedError
 
+    def stream_key(self) -> Optional[int]:
+        """
+        The key of the stream that the memory allocated now will be used on.
+
+        The memory freed on a stream is only reused on the same stream, so that no synchronization is needed.
+
+        Returns
+        -------
+        ret: Optional[int]
+            The key of current stream, or None when the device does not have streams.
+        """
+        return None
+
 
 class CudaMemoryAPI(MemoryAPI):
     def malloc(self, nbytes: int) -> int:
@@ -69,10 +86,31 @@ class CudaMemoryAPI(MemoryAPI):
     def memory_info(self) -> (int, int):
         return hidet.cuda.memory_info()
 
+    def stream_key(self) -> Optional[int]:
+        return int(hidet.cuda.current_stream(self.device.id).handle())
+
 
 class CpuMemoryAPI(MemoryAPI):
+    def __init__(self, device: Device):
+        super().__init__(device)
+        # use page-locked memory when cuda is available to speed up the host-device copies, otherwise (e.g., on the
+        # cpu-only machines) use the memory from the c library directly.
+        self.use_page_locked: bool = hidet.cuda.available()
+        self.libc: Optional[ctypes.CDLL] = None
+        if not self.use_page_locked:
+            self.libc = ctypes.CDLL(ctypes.util.find_library('c'))
+            self.libc.aligned_alloc.restype = ctypes.c_void_p
+            self.libc.aligned_alloc.argtypes = [ctypes.c_size_t, ctypes.c_size_t]
+            self.libc.free.restype = None
+            self.libc.free.argtypes = [ctypes.c_void_p]
+
     def malloc(self, nbytes: int) -> int:
-        addr = hidet.cuda.malloc_host(nbytes)
+        if self.use_page_locked:
+            addr = hidet.cuda.malloc_host(nbytes)
+        else:
+            # the size passed to aligned_alloc must be a multiple of the alignment
+            addr = self.libc.aligned_alloc(256, (nbytes + 255) // 256 * 256)
+            addr = addr if addr is not None else 0
         if addr == 0 and nbytes != 0:
             return 0
         self.allocated += nbytes
@@ -81,7 +119,10 @@ class CpuMemoryAPI(MemoryAPI):
         return addr
 
     def free(self, addr: int):
-        hidet.cuda.free_host(addr)
+        if self.use_page_locked:
+            hidet.cuda.free_host(addr)
+        else:
+            self.libc.free(addr)
         self.allocated -= self.addr2nbytes.pop(addr)
 
     def memory_info(self) -> (int, int):
@@ -140,7 +181,10 @@ class Storage:
             return src
 
         dst: Storage = Storage.new(dst_device, src.num_bytes)
-        if src.device.is_cuda() and dst.device.is_cuda() and src.device.id != dst_device.id:
+        if src.device.is_cpu() and dst.device.is_cpu():
+            # copy among host memory does not need the cuda runtime
+            ctypes.memmove(dst.addr, src.addr, src.num_bytes)
+        elif src.device.is_cuda() and dst.device.is_cuda() and src.device.id != dst_device.id:
             # peer to peer copy among cuda devices
             if non_blocking:
                 hidet.cuda.memcpy_peer_async(dst.addr, dst_device.id, src.addr, src.device.id, src.num_bytes, stream)
@@ -244,55 +288,258 @@ class Storage:
         """
         return Storage._convert(self, self.device, non_blocking=True, stream=stream, copy=True)
 
+    def view(self, offset: int, num_bytes: int) -> Storage:
+        """
+        Create a storage that aliases a range of this storage, without copying.
+
+        The created storage keeps this storage alive until it is freed itself.
+
+        Parameters
+        ----------
+        offset: int
+            The offset of the range in bytes.
+
+        num_bytes: int
+            The number of bytes of the range.
+
+        Returns
+        -------
+        ret: Storage
+            The storage aliasing the range.
+        """
+        if offset < 0 or num_bytes < 0 or offset + num_bytes > self.num_bytes:
+            raise ValueError(
+                'Can not view {} bytes at offset {} of a storage with {} bytes.'.format(
+                    num_bytes, offset, self.num_bytes
+                )
+            )
+
+        def free_handler(storage: Storage):
+            storage.addr = 0
+            del storage.base
+
+        storage = Storage(self.device, self.addr + offset, num_bytes, free_handler)
+        storage.base = self
+        return storage
+
+
+class Segment:
+    """
+    A piece of memory allocated from the memory api, which is split into blocks.
+    """
+
+    def __init__(self, addr: int, nbytes: int, stream: Optional[int]):
+        self.addr: int = addr
+        self.nbytes: int = nbytes
+        self.stream: Optional[int] = stream
+        self.num_active_blocks: int = 0
+
+
+class Block:
+    """
+    A block of memory in a segment. The blocks of a segment are linked in the order of their addresses.
+    """
+
+    def __init__(self, segment: Segment, addr: int, nbytes: int):
+        self.segment: Segment = segment
+        self.addr: int = addr
+        self.nbytes: int = nbytes
+        self.is_free: bool = True
+        self.prev: Optional[Block] = None
+        self.next: Optional[Block] = None
+
+    def key(self) -> Tuple[int, int]:
+        return self.nbytes, self.addr
+
 
 class MemoryPool:
-    def __init__(self, memory_api: MemoryAPI, block_size: int, max_reserve_size: int):
+    """
+    A best-fit caching allocator.
+
+    The pool allocates segments (of at least segment_size bytes) from the memory api, and carves blocks out of them.
+    A request is served by the smallest free block that fits, which is split when the remaining part is large enough.
+    A freed block is merged with its free neighbors in the same segment, and is only reused on the stream it was
+    allocated on. When the free memory in the pool exceeds max_reserve_size, the segments that are entirely free
+    are returned to the memory api.
+
+    Parameters
+    ----------
+    memory_api: MemoryAPI
+        The memory api to allocate segments from.
+
+    block_size: int
+        The granularity of the allocations. All requests are rounded up to a multiple of block_size.
+
+    max_reserve_size: int
+        The maximum number of free bytes kept in the pool.
+
+    segment_size: int
+        The minimum size of the segments. The requests larger than segment_size get a segment of their own.
+    """
+
+    def __init__(self, memory_api: MemoryAPI, block_size: int, max_reserve_size: int, segment_size: int = 2 * 1024**2):
         self.memory_api: MemoryAPI = memory_api
         self.block_size: int = block_size
         self.max_reserve_size: int = max_reserve_size
-
-        self.reserved_size: int = 0
-        self.active_blocks = 0
-        self.memory_blocks: Dict[int, List[Storage]] = defaultdict(list)
+        self.segment_size: int = (segment_size + block_size - 1) // block_size * block_size
+        # reentrant, since a storage can be freed by the garbage collector while the same thread is in malloc
+        self.lock = threading.RLock()
+
+        self.segments: Dict[int, Segment] = {}
+        self.active_blocks: Dict[int, Block] = {}
+        # the free blocks of each stream, sorted by (nbytes, addr)
+        self.free_blocks: Dict[Optional[int], List[Block]] = defaultdict(list)
+        self.free_keys: Dict[Optional[int], List[Tuple[int, int]]] = defaultdict(list)
+
+        self.segment_bytes: int = 0
+        self.active_bytes: int = 0
+        self.num_mallocs: int = 0
+        self.num_cache_hits: int = 0
+        self.num_splits: int = 0
+        self.num_merges: int = 0
+        self.num_releases: int = 0
+
+    @property
+    def reserved_size(self) -> int:
+        """
+        The number of free bytes kept in the pool.
+        """
+        return self.segment_bytes - self.active_bytes
+
+    def _insert_free(self, block: Block):
+        stream = block.segment.stream
+        idx = bisect.bisect_left(self.free_keys[stream], block.key())
+        self.free_keys[stream].insert(idx, block.key())
+        self.free_blocks[stream].insert(idx, block)
+
+    def _remove_free(self, block: Block):
+        stream = block.segment.stream
+        idx = bisect.bisect_left(self.free_keys[stream], block.key())
+        assert self.free_blocks[stream][idx] is block
+        del self.free_keys[stream][idx]
+        del self.free_blocks[stream][idx]
+
+    def _new_segment(self, nbytes: int, stream: Optional[int]) -> Block:
+        nbytes = max(nbytes, self.segment_size)
+        addr = self.memory_api.malloc(nbytes)
+        if addr == 0 and nbytes != 0:
+            # out of memory, return the free segments to the memory api and try again
+            self.release()
+            addr = self.memory_api.malloc(nbytes)
+            if addr == 0:
+                free, total = self.memory_api.memory_info()
+                raise MemoryError(
+                    f'Can not allocate memory from {self.memory_api.device} device, '
+                    f'total {nbytes2str(total)}, '
+                    f'hidet allocated {nbytes2str(self.memory_api.allocated)}, '
+                    f'free {nbytes2str(free)}, '
+                    f'requesting {nbytes2str(nbytes)}.'
+                )
+        segment = Segment(addr, nbytes, stream)
+        self.segments[addr] = segment
+        self.segment_bytes += nbytes
+        return Block(segment, addr, nbytes)
 
     def malloc(self, nbytes: int) -> Storage:
-        allocated = (nbytes + self.block_size - 1) // self.block_size * self.block_size
-        block_list = self.memory_blocks[allocated]
-        if len(block_list) > 0:
-            storage = block_list.pop()
-            addr = storage.addr
-            self.reserved_size -= storage.num_bytes
-        else:
-            addr = self.memory_api.malloc(allocated)
-            if addr == 0 and allocated != 0:
-                # out of memory
-                self.clear()
-                addr = self.memory_api.malloc(allocated)
-                if addr == 0:
-                    free, total = self.memory_api.memory_info()
-                    raise MemoryError(
-                        f'Can not allocate memory from {self.memory_api.device} device, '
-                        f'total {nbytes2str(total)}, '
-                        f'hidet allocated {nbytes2str(self.memory_api.allocated)}, '
-                        f'free {nbytes2str(free)}, '
-                        f'requesting {nbytes2str(allocated)}.'
-                    )
-        return Storage(device=self.memory_api.device, addr=addr, num_bytes=allocated, free_handler=self.free)
+        with self.lock:
+            nbytes = max((nbytes + self.block_size - 1) // self.block_size * self.block_size, self.block_size)
+            stream = self.memory_api.stream_key()
+            self.num_mallocs += 1
+
+            # find the best-fit free block
+            keys = self.free_keys[stream]
+            idx = bisect.bisect_left(keys, (nbytes, 0))
+            if idx < len(keys):
+                block = self.free_blocks[stream][idx]
+                self._remove_free(block)
+                self.num_cache_hits += 1
+            else:
+                block = self._new_segment(nbytes, stream)
+
+            # split the block when the remaining part can serve other requests
+            if block.nbytes - nbytes >= self.block_size:
+                rest = Block(block.segment, block.addr + nbytes, block.nbytes - nbytes)
+                rest.prev, rest.next = block, block.next
+                if block.next is not None:
+                    block.next.prev = rest
+                block.next = rest
+                block.nbytes = nbytes
+                self._insert_free(rest)
+                self.num_splits += 1
+
+            block.is_free = False
+            block.segment.num_active_blocks += 1
+            self.active_blocks[block.addr] = block
+            self.active_bytes += block.nbytes
+            return Storage(
+                device=self.memory_api.device, addr=block.addr, num_bytes=block.nbytes, free_handler=self.free
+            )
 
     def free(self, storage: Storage):
-        self.memory_blocks[storage.num_bytes].append(storage)
-        self.reserved_size += storage.num_bytes
-        if self.reserved_size > self.max_reserve_size:
-            self.clear()
+        with self.lock:
+            block = self.active_blocks.pop(storage.addr)
+            block.is_free = True
+            block.segment.num_active_blocks -= 1
+            self.active_bytes -= block.nbytes
+
+            # merge with the free neighbors
+            for neighbor in [block.prev, block.next]:
+                if neighbor is not None and neighbor.is_free:
+                    self._remove_free(neighbor)
+                    if neighbor is block.prev:
+                        neighbor.nbytes += block.nbytes
+                        neighbor.next = block.next
+                        if block.next is not None:
+                            block.next.prev = neighbor
+                        block = neighbor
+                    else:
+                        block.nbytes += neighbor.nbytes
+                        block.next = neighbor.next
+                        if neighbor.next is not None:
+                            neighbor.next.prev = block
+                    self.num_merges += 1
+            self._insert_free(block)
+
+            if self.reserved_size > self.max_reserve_size:
+                self.release()
+
+    def release(self):
+        """
+        Return the segments that are entirely free to the memory api.
+        """
+        with self.lock:
+            free_segments = [segment for segment in self.segments.values() if segment.num_active_blocks == 0]
+            if len(free_segments) == 0:
+                return
+            if hidet.cuda.available():
+                # the freed memory might still be used by the pending kernels or copies
+                hidet.cuda.synchronize()
+            for segment in free_segments:
+                # an entirely free segment has been merged into a single free block
+                stream = segment.stream
+                idx = bisect.bisect_left(self.free_keys[stream], (segment.nbytes, segment.addr))
+                del self.free_keys[stream][idx]
+                del self.free_blocks[stream][idx]
+                del self.segments[segment.addr]
+                self.memory_api.free(segment.addr)
+                self.segment_bytes -= segment.nbytes
+                self.num_releases += 1
 
     def clear(self):
-        hidet.cuda.synchronize()
-        for block_list in self.memory_blocks.values():
-            for storage in block_list:
-                self.memory_api.free(storage.addr)
-                storage.addr = 0
-        self.memory_blocks.clear()
-        self.reserved_size = 0
+        self.release()
+
+    def fragmentation(self) -> float:
+        """
+        The external fragmentation of the free memory in the pool: 1 - (the largest free block) / (all free bytes).
+
+        Returns
+        -------
+        ret: float
+            The fragmentation, 0 when the free memory is contiguous (or there is no free memory).
+        """
+        with self.lock:
+            largest = max((blocks[-1].nbytes for blocks in self.free_blocks.values() if len(blocks) > 0), default=0)
+            return 1.0 - largest / self.reserved_size if self.reserved_size > 0 else 0.0
 
     def status(self) -> str:
         allocated = self.memory_api.allocated
@@ -301,11 +548,14 @@ class MemoryPool:
             ['Allocated', allocated],
             ['Peak', peak_allocated],
             ['Reserved', self.reserved_size],
-            ['Active', allocated - self.reserved_size],
+            ['Active', self.active_bytes],
         ]
         lines = [
             'Status of {} memory pool'.format(self.memory_api.device),
             *['{:>12}: {}'.format(name, nbytes2str(nbytes)) for name, nbytes in items],
+            '{:>12}: {}'.format('Segments', len(self.segments)),
+            '{:>12}: {:.1f}%'.format('Fragment', self.fragmentation() * 100),
+            '{:>12}: {}/{}'.format('Cache hits', self.num_cache_hits, self.num_mallocs),
         ]
         return '\n'.join(lines)
 
@@ -315,7 +565,7 @@ class MemoryPool:
     def __del__(self, is_shutting_down=exiting.is_exiting):
         if is_shutting_down():
             return
-        self.clear()
+        self.release()
 
 
 class MemoryPoolContext:
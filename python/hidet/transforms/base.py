@@ -10,6 +10,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from typing import List, Optional
+import threading
 from hidet.ir.stmt import Stmt
 from hidet.ir.func import IRModule, Function
 
@@ -17,25 +18,33 @@ from .instruments import PassInstrument
 
 
 class PassContext:
-    stack: List['PassContext'] = []
+    # each thread has its own stack of pass contexts, whose bottom is the default context
+    _local = threading.local()
 
     def __init__(self, instruments: Optional[List[PassInstrument]] = None, verbose: bool = False):
         self.instruments = instruments
         self.verbose = verbose
 
+    @classmethod
+    def stack(cls) -> List['PassContext']:
+        if not hasattr(cls._local, 'stack'):
+            cls._local.stack = [_default_context]
+        return cls._local.stack
+
     @classmethod
     def current(cls):
-        return cls.stack[-1]
+        return cls.stack()[-1]
 
     def __enter__(self):
-        self.stack.append(self)
+        self.stack().append(self)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        assert len(self.stack) > 0 and self.stack[-1] is self
-        self.stack.pop()
+        stack = self.stack()
+        assert len(stack) > 0 and stack[-1] is self
+        stack.pop()
 
 
-PassContext.stack.append(PassContext())
+_default_context = PassContext()
 
 
 class Pass:
@@ -0,0 +1,131 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import pytest
+
+import hidet
+
+onnx = pytest.importorskip('onnx')
+
+# pylint: disable=wrong-import-position
+from onnx import TensorProto, helper, numpy_helper
+from hidet.graph.frontend.onnx.onnx import OnnxGraph, OnnxTensorLoader
+
+
+class RecordingLoader(OnnxTensorLoader):
+    def __init__(self, device, base_dir=''):
+        super().__init__(device, base_dir)
+        self.mapped = {}
+
+    def map_external_data(self, tensor):
+        array = super().map_external_data(tensor)
+        self.mapped[tensor.name] = array
+        return array
+
+
+def make_model(nodes, inputs, outputs, initializers=()):
+    graph = helper.make_graph(nodes, 'test', inputs, outputs, initializer=list(initializers))
+    return helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+
+
+def test_external_data_mmap(tmp_path):
+    w = np.random.randn(4, 8).astype(np.float32)
+    model = make_model(
+        nodes=[helper.make_node('Add', ['x', 'w'], ['y'])],
+        inputs=[helper.make_tensor_value_info('x', TensorProto.FLOAT, [4, 8])],
+        outputs=[helper.make_tensor_value_info('y', TensorProto.FLOAT, [4, 8])],
+        initializers=[numpy_helper.from_array(w, name='w')],
+    )
+    path = str(tmp_path / 'model.onnx')
+    onnx.save_model(model, path, save_as_external_data=True, location='weights.bin', size_threshold=0)
+
+    # the initializer is mapped from the external data file, and the cpu tensor shares the mapped pages
+    model = onnx.load_model(path, load_external_data=False)
+    loader = RecordingLoader('cpu', base_dir=str(tmp_path))
+    graph = OnnxGraph(model.graph, op_sets=[13], loader=loader)
+    param = graph.load_parameter('w')
+    assert isinstance(loader.mapped['w'], np.memmap)
+    assert param.device.is_cpu() and param.storage.addr == loader.mapped['w'].ctypes.data
+    np.testing.assert_equal(param.numpy(), w)
+
+    # the external data is found relative to the model file
+    module = hidet.frontend.from_onnx(path, device='cpu')
+    y = module(hidet.symbol([4, 8], device='cpu'))
+    assert y.shape == (4, 8)
+    np.testing.assert_equal(module.graph.parameters['w'].numpy(), w)
+
+
+def test_lazy_initializers():
+    def init(name):
+        return numpy_helper.from_array(np.ones([4], dtype=np.float32), name=name)
+
+    def branch(op_type):
+        return helper.make_graph(
+            [helper.make_node(op_type, ['y', 'w_branch'], ['out_' + op_type])],
+            op_type,
+            [],
+            [helper.make_tensor_value_info('out_' + op_type, TensorProto.FLOAT, [4])],
+        )
+
+    cond = numpy_helper.from_array(np.array(True), name='cond')
+    model = make_model(
+        nodes=[
+            helper.make_node('Constant', [], ['cond'], value=cond),
+            helper.make_node('Add', ['x', 'w_main'], ['y']),
+            helper.make_node('If', ['cond'], ['z'], then_branch=branch('Mul'), else_branch=branch('Sub')),
+        ],
+        inputs=[helper.make_tensor_value_info('x', TensorProto.FLOAT, [4])],
+        outputs=[helper.make_tensor_value_info('z', TensorProto.FLOAT, [4])],
+        initializers=[init('w_main'), init('w_branch'), init('w_unused')],
+    )
+
+    graph = OnnxGraph(model.graph, op_sets=[13], loader=OnnxTensorLoader('cpu'), lazy=True)
+    assert all(param is None for param in graph.parameters.values())
+
+    # the initializers are loaded when consumed, including the ones used by the sub-graph through its parent
+    (z,) = graph(hidet.symbol([4], device='cpu'))
+    assert z.shape == (4,)
+    assert graph.parameters['w_main'] is not None
+    assert graph.parameters['w_branch'] is not None
+    assert graph.parameters['w_unused'] is None
+
+    graph = OnnxGraph(model.graph, op_sets=[13], loader=OnnxTensorLoader('cpu'), lazy=False)
+    assert all(param is not None for param in graph.parameters.values())
+
+
+def test_constant_device():
+    def scalar(name, value):
+        return helper.make_node('Constant', [], [name], value=numpy_helper.from_array(np.array(value, np.int64)))
+
+    model = make_model(
+        nodes=[
+            helper.make_node('Shape', ['x'], ['shape']),
+            scalar('start', 0),
+            scalar('limit', 6),
+            scalar('delta', 2),
+            helper.make_node('Range', ['start', 'limit', 'delta'], ['range']),
+        ],
+        inputs=[helper.make_tensor_value_info('x', TensorProto.FLOAT, [2, 3])],
+        outputs=[
+            helper.make_tensor_value_info('shape', TensorProto.INT64, [2]),
+            helper.make_tensor_value_info('range', TensorProto.INT64, [3]),
+            helper.make_tensor_value_info('start', TensorProto.INT64, []),
+        ],
+    )
+
+    # the tensors created by the operators are placed on the requested device, even when cuda is available
+    module = hidet.frontend.from_onnx(model, device='cpu')
+    shape, arange, start = module(hidet.symbol([2, 3], device='cpu'))
+    assert all(tensor.device.is_cpu() for tensor in [shape, arange, start])
+    np.testing.assert_equal(shape.numpy(), [2, 3])
+    np.testing.assert_equal(arange.numpy(), [0, 2, 4])
+    np.testing.assert_equal(start.numpy(), 0)
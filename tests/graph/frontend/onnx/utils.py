@@ -39,7 +39,7 @@ def check_onnx_and_hidet(
     torch.onnx.export(torch_model, args=tuple(inputs), f=onnx_path)
 
     # run onnx via hidet
-    onnx_model = hidet.frontend.from_onnx(onnx_path)
+    onnx_model = hidet.frontend.from_onnx(onnx_path, device=device.type)
     hidet_inputs = [hidet.from_torch(x) for x in inputs]
     symbol_inputs = [hidet.symbol_like(x) for x in hidet_inputs]
     symbol_outputs = onnx_model(*symbol_inputs)
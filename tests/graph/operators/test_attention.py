@@ -0,0 +1,50 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List, Optional
+
+import pytest
+import numpy as np
+
+import hidet as hi
+from hidet import ops
+
+
+def numpy_attention(q, k, v, mask, scale):
+    score = np.matmul(q, k) * scale
+    if mask is not None:
+        score = score + mask
+    prob = np.exp(score - np.max(score, -1, keepdims=True))
+    prob = prob / np.sum(prob, -1, keepdims=True)
+    return np.matmul(prob, v)
+
+
+@pytest.mark.parametrize('device', ['cuda', 'cpu'])
+@pytest.mark.parametrize(
+    "q_shape, kv_size, v_head_size, mask_shape",
+    [
+        [[5, 8], 7, 6, None],
+        [[2, 3, 37, 16], 130, 40, None],
+        [[4, 64, 64], 200, 64, [1, 1, 200]],
+        [[2, 33, 16], 64, 16, [33, 64]],
+    ],
+)
+def test_attention(device, q_shape: List[int], kv_size: int, v_head_size: int, mask_shape: Optional[List[int]]):
+    scale = 0.3
+    batch_shape, head_size = q_shape[:-2], q_shape[-1]
+    q = np.random.randn(*q_shape).astype('float32')
+    k = np.random.randn(*batch_shape, head_size, kv_size).astype('float32')
+    v = np.random.randn(*batch_shape, kv_size, v_head_size).astype('float32')
+    mask = np.random.randn(*mask_shape).astype('float32') if mask_shape is not None else None
+    args = [hi.asarray(t).to(device=device) for t in [q, k, v]]
+    hidet_mask = hi.asarray(mask).to(device=device) if mask is not None else None
+    hidet_result = ops.attention(*args, mask=hidet_mask, scale=scale).cpu().numpy()
+    np.testing.assert_allclose(hidet_result, numpy_attention(q, k, v, mask, scale), atol=1e-5, rtol=1e-5)
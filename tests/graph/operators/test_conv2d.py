@@ -51,5 +51,36 @@ def test_conv2d(hidet_op, n, c, h, w, oc, kx, ky, padding, stride, dilations):
     )
 
 
+@pytest.mark.parametrize("hidet_op", [ops.conv2d_channel_last, ops.conv2d_gemm_channel_last])
+@pytest.mark.parametrize(
+    "n, c, h, w, oc, kx, ky, groups",
+    [
+        [1, 3, 32, 32, 12, 3, 3, 1],  # kernel 3,
+        [2, 4, 32, 32, 12, 5, 5, 2],  # kernel 5, batch size 2, groups 2
+        [1, 12, 32, 32, 12, 3, 3, 12],  # depthwise
+    ],
+)
+@pytest.mark.parametrize("padding", [[0, 0, 0, 0], [1, 2, 1, 2]])
+@pytest.mark.parametrize("stride", [[1, 1], [2, 3]])
+def test_conv2d_channel_last(hidet_op, n, c, h, w, oc, kx, ky, groups, padding, stride):
+    def numpy_op(data, weight):
+        data_torch, weight_torch = torch.from_numpy(data).permute(0, 3, 1, 2), torch.from_numpy(weight)
+        torch_out = torch.nn.functional.conv2d(
+            data_torch, weight_torch, bias=None, stride=stride, padding=[padding[0], padding[1]], groups=groups
+        )
+        return torch_out.permute(0, 2, 3, 1).numpy()
+
+    pads = [0, padding[0], padding[1], 0, 0, padding[2], padding[3], 0]
+    check_binary(
+        a_shape=[n, h, w, c],
+        b_shape=[oc, c // groups, kx, ky],
+        numpy_op=numpy_op,
+        hidet_op=lambda data, weight: hidet_op(ops.pad(data, pads), weight, stride=stride, groups=groups),
+        dtype='float32',
+        atol=2e-5,
+        rtol=2e-5,
+    )
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
@@ -74,3 +74,26 @@ def test_batch_norm_2d(shape):
 )
 def test_instance_norm(shape):
     check_unary(shape, numpy_op=numpy_instance_norm, hidet_op=ops.instance_norm, atol=1e-4, rtol=1e-4)
+
+
+def numpy_layer_norm(data: np.ndarray, num_last_dims: int = 1, epsilon: float = 1e-5) -> np.ndarray:
+    dims = tuple(range(len(data.shape) - num_last_dims, len(data.shape)))
+    mean = data.mean(axis=dims, keepdims=True)
+    var = data.var(axis=dims, keepdims=True)
+    return (data - mean) / np.sqrt(var + epsilon)
+
+
+@pytest.mark.parametrize('device', ['cuda', 'cpu'])
+@pytest.mark.parametrize(
+    "shape, num_last_dims",
+    [[[1, 1], 1], [[2, 3], 1], [[4, 768], 1], [[2, 3, 5, 7], 2], [[16, 1000], 1], [[2, 20000], 1], [[3, 8, 4099], 2]],
+)
+def test_layer_norm(device, shape, num_last_dims):
+    check_unary(
+        shape,
+        numpy_op=lambda x: numpy_layer_norm(x, num_last_dims),
+        hidet_op=lambda x: ops.layer_norm(x, num_last_dims),
+        device=device,
+        atol=1e-4,
+        rtol=1e-4,
+    )
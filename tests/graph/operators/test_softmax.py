@@ -26,11 +26,18 @@ def numpy_softmax(data, axis):
     return data
 
 
+@pytest.mark.parametrize('device', ['cuda', 'cpu'])
 @pytest.mark.parametrize(
     "shape, axis",
     [[[1, 1000], 1], [[16, 1000], 1], [[1, 1000, 1, 1], 1], [[16, 1000, 1, 1], 1], [[1, 128, 128, 128], 2]],
 )
-def test_softmax(shape, axis):
+def test_softmax(device, shape, axis):
     check_unary(
-        shape, lambda x: numpy_softmax(x, axis), lambda x: ops.softmax(x, axis), dtype='float32', atol=1e-5, rtol=1e-5
+        shape,
+        lambda x: numpy_softmax(x, axis),
+        lambda x: ops.softmax(x, axis),
+        device=device,
+        dtype='float32',
+        atol=1e-5,
+        rtol=1e-5,
     )
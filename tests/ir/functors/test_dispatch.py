@@ -0,0 +1,47 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+from hidet.ir.expr import var, symbol_var, Var
+from hidet.ir.compute import tensor_input
+from hidet.ir.functors import ExprVisitor, IRVisitor
+
+
+class VisitedKinds(IRVisitor):
+    def __init__(self):
+        super().__init__(use_memo=False)
+        self.kinds = []
+
+    def visit_Var(self, e: Var):
+        self.kinds.append('var')
+
+    def visit_TensorInput(self, node):
+        self.kinds.append('tensor_input')
+
+    def visit_PyConstant(self, c):
+        self.kinds.append('constant')
+
+
+def test_dispatch_order():
+    visitor = VisitedKinds()
+    # the compute functor comes before the expr functor in the mro of IRVisitor
+    visitor.visit([var('a'), symbol_var('n'), tensor_input('x', 'float32', [4]), 1, None])
+    assert visitor.kinds == ['var', 'var', 'tensor_input', 'constant', 'constant']
+    assert VisitedKinds.dispatch_table is not IRVisitor.dispatch_table
+
+
+def test_dispatch_unknown_type():
+    with pytest.raises(NotImplementedError):
+        ExprVisitor().visit(object())
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,33 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import subprocess
+import sys
+import hidet
+
+
+def _softmax_hash(shape):
+    x = hidet.symbol(shape, device='cpu')
+    return hidet.ops.softmax(x, axis=1).op.task.structural_hash()
+
+
+def test_task_hash():
+    a = hidet.symbol([3, 4], device='cpu')
+    b = hidet.symbol([3, 4], device='cpu')
+    assert hidet.ops.add(a, b).op.task.structural_hash() == hidet.ops.add(b, a).op.task.structural_hash()
+    assert hidet.ops.add(a, b).op.task.structural_hash() != hidet.ops.subtract(a, b).op.task.structural_hash()
+    assert _softmax_hash([3, 4]) == _softmax_hash([3, 4])
+    assert _softmax_hash([3, 4]) != _softmax_hash([3, 5])
+
+    # the hash does not change across processes
+    code = 'import hidet; x = hidet.symbol([3, 4]); print(hidet.ops.softmax(x, axis=1).op.task.structural_hash())'
+    output = subprocess.check_output([sys.executable, '-c', code]).decode().strip()
+    assert output.splitlines()[-1] == _softmax_hash([3, 4])
@@ -0,0 +1,102 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import numpy as np
+import hidet
+
+
+def test_add_cpu():
+    a = hidet.randn([10], device='cpu')
+    b = hidet.randn([10], device='cpu')
+    c = a + b
+    c_np = a.numpy() + b.numpy()
+    np.testing.assert_allclose(actual=c.numpy(), desired=c_np, atol=1e-5, rtol=1e-5)
+
+
+def test_reduce_cpu():
+    a = hidet.randn([4, 33], device='cpu')
+    b = hidet.ops.softmax(a, axis=1)
+    a_np = np.exp(a.numpy() - a.numpy().max(axis=1, keepdims=True))
+    b_np = a_np / a_np.sum(axis=1, keepdims=True)
+    np.testing.assert_allclose(actual=b.numpy(), desired=b_np, atol=1e-5, rtol=1e-5)
+
+
+def test_parallel_cpu():
+    with hidet.option.context():
+        hidet.option.cpu_num_threads(4)
+        a = hidet.randn([3, 64, 128], device='cpu')
+        b = hidet.ops.softmax(a + a, axis=2)
+        a_np = np.exp(2 * a.numpy() - 2 * a.numpy().max(axis=2, keepdims=True))
+        b_np = a_np / a_np.sum(axis=2, keepdims=True)
+        np.testing.assert_allclose(actual=b.numpy(), desired=b_np, atol=1e-5, rtol=1e-5)
+
+
+def test_vectorize_cpu():
+    # the innermost extents are not multiples of the simd width
+    a = hidet.randn([5, 37], device='cpu')
+    b = hidet.randn([37], device='cpu')
+    c = hidet.ops.relu(a * b + 1.0)
+    np.testing.assert_allclose(actual=c.numpy(), desired=np.maximum(a.numpy() * b.numpy() + 1.0, 0.0), atol=1e-5)
+
+    x = hidet.randn([3, 19, 20], device='cpu')
+    for dim in [1, 2]:
+        np.testing.assert_allclose(
+            actual=hidet.ops.mean(x, dim).numpy(), desired=x.numpy().mean(axis=dim), atol=1e-5, rtol=1e-5
+        )
+        np.testing.assert_allclose(actual=hidet.ops.max(x, dim).numpy(), desired=x.numpy().max(axis=dim))
+
+
+@pytest.mark.parametrize('batch_size, m_size, k_size, n_size', [[1, 1, 1, 1], [2, 37, 29, 41], [1, 128, 300, 96]])
+def test_batch_matmul_cpu(batch_size, m_size, k_size, n_size):
+    a = hidet.randn([batch_size, m_size, k_size], device='cpu')
+    b = hidet.randn([batch_size, k_size, n_size], device='cpu')
+    c = hidet.ops.batch_matmul(a, b)
+    np.testing.assert_allclose(actual=c.numpy(), desired=a.numpy() @ b.numpy(), atol=1e-4, rtol=1e-4)
+
+
+def test_compiled_graph_cpu():
+    x = hidet.symbol([3, 20], device='cpu')
+    w = hidet.randn([20, 8], device='cpu')
+    y = hidet.ops.softmax(hidet.ops.relu(hidet.ops.matmul(x, w)) + 1.0, axis=1)
+    graph = hidet.trace_from([y, x], [x])
+    compiled_graph = graph.compile()
+    # the arena of the intermediate tensors is allocated once, and reused by all runs
+    assert len(compiled_graph.arenas) == 1
+    a = hidet.randn([3, 20], device='cpu')
+    b, c = compiled_graph(a)
+    b_np = np.exp(np.maximum(a.numpy() @ w.numpy(), 0.0) + 1.0)
+    b_np = b_np / b_np.sum(axis=1, keepdims=True)
+    np.testing.assert_allclose(actual=b.numpy(), desired=b_np, atol=1e-5, rtol=1e-5)
+    np.testing.assert_allclose(actual=c.numpy(), desired=a.numpy())
+    with pytest.raises(ValueError):
+        compiled_graph(hidet.randn([3, 21], device='cpu'))
+
+
+def test_forward_threads_cpu():
+    x = hidet.symbol([16, 20], device='cpu')
+    w = hidet.randn([20, 8], device='cpu')
+    y = hidet.ops.relu(hidet.ops.matmul(x + 1.0, w)) * 2.0
+    graph = hidet.trace_from(y, [x])
+    graph(hidet.randn([16, 20], device='cpu'))
+    inputs = [hidet.randn([16, 20], device='cpu') for _ in range(8)]
+    # the intermediate tensors of the concurrent calls do not overwrite each other
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        outputs = list(executor.map(lambda a: [graph(a).numpy() for _ in range(20)], inputs))
+    for a, ys in zip(inputs, outputs):
+        desired = np.maximum((a.numpy() + 1.0) @ w.numpy(), 0.0) * 2.0
+        for b in ys:
+            np.testing.assert_allclose(actual=b, desired=desired, atol=1e-5, rtol=1e-5)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
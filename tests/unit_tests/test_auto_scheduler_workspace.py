@@ -0,0 +1,44 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import hidet
+from hidet.ir.compute import tensor_input, compute, reduce
+from hidet.ir.task import Task
+from hidet.graph.ops.schedules.cpu.auto_scheduler import CpuAutoScheduler
+
+
+def test_workspace_reuse():
+    n = 32
+    x = tensor_input('x', 'float32', [n, n])
+    y = x
+    for i in range(4):
+        # y_{i+1} = y_i @ x, the intermediate tensors can not be inlined and only two of them are alive at a time
+        y = compute(
+            'y{}'.format(i), [n, n], lambda a, b, y=y: reduce([n], lambda k, y=y, a=a, b=b: y[a, k] * x[k, b], 'sum')
+        )
+    out = compute('out', [n, n], lambda a, b: y[a, b] + 1.0)
+    task = Task('chain', inputs=[x], outputs=[out])
+
+    scheduler = CpuAutoScheduler()
+    scheduler.schedule_task(task, 'cpu')
+    plan = scheduler.memory_plan
+    assert len(plan.offsets) == 4
+    assert plan.peak_size == 2 * n * n * 4 and plan.total_size == 4 * n * n * 4
+
+    func = hidet.driver.build_task(task, target_device='cpu')
+    a = np.random.rand(n, n).astype('float32') / n
+    b = hidet.empty([n, n])
+    func(hidet.asarray(a), b)
+    expected = a
+    for _ in range(4):
+        expected = expected @ a
+    np.testing.assert_allclose(b.numpy(), expected + 1.0, rtol=1e-4, atol=1e-6)
@@ -0,0 +1,46 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+import numpy as np
+import hidet
+
+
+def check_bucketed_graph(bucketed_graph, w, batch_size, seq_len):
+    a = hidet.randn([batch_size, seq_len, 16], device='cpu')
+    b_np = np.maximum(a.numpy() @ w.numpy(), 0.0) + 1.0
+    b = bucketed_graph(a)
+    assert b.shape == (batch_size, seq_len, 8)
+    np.testing.assert_allclose(actual=b.numpy(), desired=b_np, atol=1e-5, rtol=1e-5)
+
+
+def test_bucketed_graph():
+    x = hidet.symbol(['batch', 'seq', 16], device='cpu')
+    w = hidet.randn([16, 8], device='cpu')
+    y = hidet.ops.relu(hidet.ops.matmul(x, w)) + 1.0
+    bucketed_graph = hidet.trace_from(y, [x]).bucketed({'batch': [1, 2, 4], 'seq': [4, 8]}, use_cuda_graph=False)
+    assert bucketed_graph.num_graphs == 6
+
+    # the inputs smaller than their buckets are padded
+    for batch_size, seq_len in [(3, 5), (2, 1), (1, 7)]:
+        check_bucketed_graph(bucketed_graph, w, batch_size, seq_len)
+
+    # the inputs that exactly match a bucket are passed directly, also after the bucket has served padded inputs
+    for batch_size, seq_len in [(1, 4), (4, 8), (2, 4), (1, 8)]:
+        check_bucketed_graph(bucketed_graph, w, batch_size, seq_len)
+    check_bucketed_graph(bucketed_graph, w, 3, 6)
+    check_bucketed_graph(bucketed_graph, w, 4, 8)
+
+    # the values larger than the largest bucket are rejected
+    with pytest.raises(ValueError, match='exceeds the largest bucket 4'):
+        bucketed_graph(hidet.randn([5, 4, 16], device='cpu'))
+    with pytest.raises(ValueError, match='exceeds the largest bucket 8'):
+        bucketed_graph(hidet.randn([1, 9, 16], device='cpu'))
@@ -0,0 +1,74 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import pytest
+import hidet
+from hidet.graph import ops
+from hidet.graph.operator import Operator
+from hidet.graph.transforms import fold_const_pass
+from hidet.ir.tools import evaluate_task
+
+
+@pytest.mark.parametrize(
+    'func',
+    [
+        lambda x, y: ops.transpose(x, [2, 0, 1]),
+        lambda x, y: ops.cast(x, 'float16'),
+        lambda x, y: ops.pad(x, [1, 2, 0, 1]),
+        lambda x, y: ops.matmul(x, y),
+        lambda x, y: ops.softmax(x, axis=2),
+        lambda x, y: ops.cumsum(x, 1),
+        lambda x, y: ops.argmax(x, dim=1),
+        lambda x, y: ops.concat([x, x], axis=1),
+    ],
+)
+def test_evaluate_task(func):
+    a, b = hidet.randn([3, 4, 5]), hidet.randn([3, 5, 4])
+    x, y = hidet.symbol_like(a), hidet.symbol_like(b)
+    out = func(x, y)
+    bindings = {x: a, y: b}
+    inputs = [bindings.get(t, t) for t in out.op.inputs]
+    expected = Operator.imperative_run(out.op, inputs)[0].numpy()
+    actual = evaluate_task(out.op.task, [t.numpy() for t in inputs])[0]
+    assert actual.dtype == expected.dtype
+    np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_fold_const_without_compilation(monkeypatch):
+    x = hidet.symbol([4, 16])
+    w = hidet.symbol([16, 32])
+    y = ops.matmul(x, ops.cast(ops.transpose(ops.reshape(w, [32, 16]), [1, 0]), 'float32'))
+    # turn the symbolic weight into a constant, so that the operators on it are not run when they are created
+    w._storage = hidet.randn([16, 32]).storage
+    graph = hidet.trace_from(y, [x])
+
+    def imperative_run(op, inputs):
+        raise AssertionError('operator {} is compiled to fold constants'.format(op.name))
+
+    monkeypatch.setattr(Operator, 'imperative_run', imperative_run)
+    folded = fold_const_pass().process_graph(graph)
+    folded.update_nodes()
+    assert [node.name for node in folded.nodes] == ['Matmul']
+
+
+def test_fold_const_fallback(monkeypatch):
+    from hidet.graph.transforms import fold_const
+
+    def evaluate_task(task, inputs):
+        raise ValueError('operands could not be broadcast together')
+
+    monkeypatch.setattr(fold_const, 'evaluate_task', evaluate_task)
+    a = hidet.randn([3, 4])
+    y = ops.transpose(hidet.symbol_like(a), [1, 0])
+    # the operator is compiled and run when numpy fails to evaluate it
+    folded = fold_const.fold_operator(y.op, [a])[0]
+    np.testing.assert_allclose(folded.numpy(), a.numpy().T)
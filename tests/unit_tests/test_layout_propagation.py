@@ -0,0 +1,40 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import hidet
+from hidet.graph import ops
+from hidet.graph.transforms import layout_propagation_pass
+
+
+def test_layout_propagation():
+    x = hidet.symbol([2, 3, 16, 16])
+    y = ops.conv2d(ops.conv_pad(x, 1), hidet.randn([8, 3, 3, 3], stddev=0.3), stride=1)
+    y = ops.relu(y * hidet.randn([8, 1, 1]) + hidet.randn([8, 1, 1]))
+    y = ops.max_pool2d(y, 3, 2, 1)
+    z = ops.conv2d(y, hidet.randn([8, 8, 1, 1], stddev=0.3), stride=1)
+    y = ops.relu(y + z)
+    y = ops.conv2d(ops.conv_pad(y, 1), hidet.randn([8, 1, 3, 3], stddev=0.3), stride=1, groups=8)
+    y = ops.conv2d(y, hidet.randn([16, 4, 1, 1], stddev=0.3), stride=2, groups=2)
+    y = ops.concat([y, ops.sigmoid(y)], axis=1)
+    y = ops.flatten(ops.adaptive_avg_pool2d(y, 1), 1)
+    graph = hidet.trace_from(y, [x])
+    with hidet.graph.PassContext() as ctx:
+        ctx.set_layout('nhwc')
+        rewritten = layout_propagation_pass()(graph)
+    rewritten.update_nodes()
+
+    # the data is only transposed before the first convolution and after the global pooling
+    names = [node.name for node in rewritten.nodes]
+    assert names.count('PermuteDims') == 2
+    assert names.count('Conv2dChannelLast') == 4 and 'Conv2d' not in names
+    a = hidet.randn([2, 3, 16, 16])
+    np.testing.assert_allclose(graph(a).numpy(), rewritten(a).numpy(), rtol=1e-4, atol=1e-4)
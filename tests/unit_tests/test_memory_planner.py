@@ -0,0 +1,29 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import random
+from hidet.graph.ir.memory_planner import plan_memory
+
+
+def test_plan_memory():
+    rng = random.Random(0)
+    sizes, lifetimes = [], []
+    for _ in range(200):
+        first = rng.randint(0, 100)
+        sizes.append(rng.randint(1, 1 << 20))
+        lifetimes.append((first, first + rng.randint(0, 10)))
+    plan = plan_memory(sizes, lifetimes)
+    assert plan.peak_size <= plan.total_size
+    for i in range(len(sizes)):
+        assert plan.offsets[i] % 256 == 0 and plan.offsets[i] + sizes[i] <= plan.peak_size
+        for j in range(i):
+            if lifetimes[i][0] <= lifetimes[j][1] and lifetimes[j][0] <= lifetimes[i][1]:
+                assert plan.offsets[i] + sizes[i] <= plan.offsets[j] or plan.offsets[j] + sizes[j] <= plan.offsets[i]
@@ -0,0 +1,91 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from concurrent.futures import ThreadPoolExecutor
+import random
+import sys
+from hidet.runtime.device import Device
+from hidet.runtime.storage import MemoryAPI, MemoryPool
+
+
+class FakeMemoryAPI(MemoryAPI):
+    def __init__(self):
+        super().__init__(Device('cpu'))
+        self.next_addr = 1 << 20
+
+    def malloc(self, nbytes: int) -> int:
+        addr = self.next_addr
+        self.next_addr += nbytes + (1 << 20)
+        self.addr2nbytes[addr] = nbytes
+        self.allocated += nbytes
+        return addr
+
+    def free(self, addr: int):
+        self.allocated -= self.addr2nbytes.pop(addr)
+
+
+def test_memory_pool():
+    api = FakeMemoryAPI()
+    pool = MemoryPool(api, block_size=256, max_reserve_size=1 << 30, segment_size=8192)
+
+    # the requests are carved out of one segment
+    a, x, b, y = pool.malloc(1000), pool.malloc(1024), pool.malloc(2000), pool.malloc(1024)
+    assert len(api.addr2nbytes) == 1 and a.num_bytes == 1024 and b.num_bytes == 2048
+    assert x.addr == a.addr + 1024 and b.addr == x.addr + 1024 and y.addr == b.addr + 2048
+
+    # the smallest free block that fits is used
+    addr_a, addr_b = a.addr, b.addr
+    del a, b
+    assert pool.fragmentation() > 0.0
+    c = pool.malloc(1500)
+    assert c.addr == addr_b
+
+    # the freed neighbors are merged
+    del c, x, y
+    assert pool.fragmentation() == 0.0
+    assert pool.malloc(8192).addr == addr_a
+
+    # the large requests get their own segments, which are released when they are entirely free
+    e = pool.malloc(10000)
+    assert len(api.addr2nbytes) == 2 and e.num_bytes == 10240
+    del e
+    assert pool.reserved_size == 8192 + 10240
+    pool.clear()
+    assert len(api.addr2nbytes) == 0 and api.allocated == 0 and pool.reserved_size == 0
+
+
+def test_memory_pool_threads():
+    api = FakeMemoryAPI()
+    pool = MemoryPool(api, block_size=256, max_reserve_size=16384, segment_size=8192)
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        storages = []
+        for _ in range(2000):
+            if len(storages) > 0 and rng.random() < 0.5:
+                storages.pop(rng.randrange(len(storages)))
+            else:
+                storages.append(pool.malloc(rng.randint(1, 12000)))
+        addrs = [storage.addr for storage in storages]
+        assert len(set(addrs)) == len(addrs)
+
+    # switch between the threads as often as possible to interleave the allocations
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(worker, range(8)))
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert len(pool.active_blocks) == 0 and pool.active_bytes == 0
+    pool.clear()
+    assert len(api.addr2nbytes) == 0 and api.allocated == 0 and pool.reserved_size == 0
@@ -0,0 +1,46 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import mmap
+import pickle
+import numpy as np
+import hidet
+from hidet.graph.ir.model_file import is_model_file
+
+
+def test_model_file(tmp_path):
+    x = hidet.symbol([4, 16])
+    w = hidet.randn([16, 16])
+    y = hidet.ops.matmul(hidet.ops.relu(hidet.ops.matmul(x, w) + hidet.randn([16])), w)
+    graph = hidet.trace_from(y, [x])
+    a = hidet.randn([4, 16])
+    expected = graph(a).numpy()
+
+    model_file = str(tmp_path / 'model.hidet')
+    graph.save(model_file)
+    assert is_model_file(model_file)
+    for lazy in [True, False]:
+        loaded = hidet.load_graph(model_file, lazy=lazy)
+        # the weights are wrapped as tensors without copying, and shared tensors stay shared
+        weights = [t for node in loaded.nodes for t in node.inputs if t.storage is not None]
+        assert all(isinstance(getattr(t.storage, 'mapping', None), mmap.mmap) for t in weights)
+        assert len({id(t) for t in weights}) == 2
+        np.testing.assert_allclose(loaded(a).numpy(), expected, rtol=1e-5, atol=1e-5)
+
+    # the plain pickled graphs saved by the previous versions can still be loaded
+    pickle_file = str(tmp_path / 'model.pkl')
+    with open(pickle_file, 'wb') as f:
+        pickle.dump(hidet.load_graph(model_file), f)
+    assert not is_model_file(pickle_file)
+    for path in [model_file, pickle_file]:
+        loaded = hidet.load_graph(path, device='cpu')
+        assert all(t.device.is_cpu() for node in loaded.nodes for t in node.inputs + node.outputs)
+        np.testing.assert_allclose(loaded(a).numpy(), expected, rtol=1e-5, atol=1e-5)
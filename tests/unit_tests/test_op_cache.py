@@ -0,0 +1,52 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+from hidet.backend.op_cache import OpCache
+
+
+def _commit(cache: OpCache, key: str, content: bytes) -> str:
+    with cache.staging() as staging_dir:
+        with open(os.path.join(staging_dir, 'lib.so'), 'wb') as f:
+            f.write(content)
+        return cache.commit(key, staging_dir)
+
+
+def test_op_cache(tmp_path):
+    cache = OpCache(str(tmp_path))
+    assert cache.lookup('a/1') is None
+    entry_dir = _commit(cache, 'a/1', b'1' * 100)
+    assert cache.lookup('a/1') == entry_dir
+
+    # the entries without a digest file (e.g., committed by previous versions) are hashed once in the lookup
+    digest_path = os.path.join(entry_dir, OpCache.digest_name)
+    os.remove(digest_path)
+    assert cache.lookup('a/1') == entry_dir and os.path.isfile(digest_path)
+
+    # a corrupted entry is treated as a miss and removed
+    with open(os.path.join(entry_dir, 'lib.so'), 'ab') as f:
+        f.write(b'x')
+    assert cache.lookup('a/1') is None
+    assert not os.path.exists(entry_dir)
+
+    # the least recently used entries are evicted first
+    _commit(cache, 'a/1', b'1' * 100)
+    _commit(cache, 'b/2', b'2' * 100)
+    _commit(cache, 'c/3', b'3' * 100)
+    entry_size = cache.stats()['size'] // 3
+    assert cache.lookup('a/1') is not None
+    cache.evict(limit=2 * entry_size)
+    assert cache.lookup('b/2') is None
+    assert cache.lookup('a/1') is not None and cache.lookup('c/3') is not None
+
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['size'] == 2 * entry_size
+    assert stats['corruptions'] == 1 and stats['evictions'] == 1
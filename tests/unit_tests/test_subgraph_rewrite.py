@@ -0,0 +1,61 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import hidet
+from hidet.graph.transforms.subgraph_rewrite import subgraph_rewrite_pass
+
+
+def test_subgraph_rewrite():
+    x = hidet.symbol([4, 16])
+    h = x
+    for _ in range(3):
+        # (x - a) + b is rewritten to x + (b - a), and the three matmuls are fused into one
+        t = (h - hidet.randn([16])) + hidet.randn([16])
+        ys = [hidet.ops.matmul(t, hidet.randn([16, 16], stddev=0.25)) for _ in range(3)]
+        h = hidet.ops.relu(ys[0] + ys[1] * ys[2])
+    graph = hidet.trace_from(h, [x])
+    rewritten = subgraph_rewrite_pass().process_graph(graph)
+
+    def count(g, op_name):
+        return sum(1 for node in g.nodes if node.name == op_name)
+
+    assert count(graph, 'Matmul') == 9 and count(rewritten, 'Matmul') == 3
+    assert count(graph, 'Subtract') == 3 and count(rewritten, 'Subtract') == 0
+    a = hidet.randn([4, 16])
+    np.testing.assert_allclose(graph(a).numpy(), rewritten(a).numpy(), rtol=1e-4, atol=1e-4)
+
+
+def test_norm_rewrite():
+    x = hidet.symbol([4, 32])
+    d = x - x.mean([1], keep_dim=True)
+    ln = d / hidet.ops.sqrt(hidet.ops.square(d).mean([1], keep_dim=True) + 1e-5)
+    e = hidet.ops.exp(ln - hidet.ops.max(ln, [1], keep_dim=True))
+    y = e / hidet.ops.sum(e, [1], keep_dim=True)
+    graph = hidet.trace_from(y, [x])
+    rewritten = subgraph_rewrite_pass().process_graph(graph)
+
+    assert [node.name for node in rewritten.nodes] == ['LayerNorm', 'Softmax']
+    a = hidet.randn([4, 32])
+    np.testing.assert_allclose(graph(a).numpy(), rewritten(a).numpy(), rtol=1e-4, atol=1e-4)
+
+
+def test_attention_rewrite():
+    q, k, v = hidet.symbol([2, 4, 40, 16]), hidet.symbol([2, 4, 16, 40]), hidet.symbol([2, 4, 40, 8])
+    mask = hidet.randn([1, 1, 40, 40])
+    score = hidet.ops.matmul(q, k) / 4.0 + mask
+    y = hidet.ops.matmul(hidet.ops.softmax(score, axis=-1), v)
+    graph = hidet.trace_from(y, [q, k, v])
+    rewritten = subgraph_rewrite_pass().process_graph(graph)
+
+    assert [node.name for node in rewritten.nodes] == ['Attention']
+    args = [hidet.randn(t.shape) for t in [q, k, v]]
+    np.testing.assert_allclose(graph(*args).numpy(), rewritten(*args).numpy(), rtol=1e-5, atol=1e-5)
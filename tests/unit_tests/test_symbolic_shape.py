@@ -0,0 +1,31 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+import numpy as np
+import hidet
+
+
+def test_symbolic_batch():
+    x = hidet.symbol(['batch', 20], device='cpu')
+    w = hidet.randn([20, 8], device='cpu')
+    y = hidet.ops.softmax(hidet.ops.relu(hidet.ops.matmul(x, w)) + 1.0, axis=1)
+    graph = hidet.graph.optimize(hidet.trace_from(y, [x]))
+    compiled_graph = graph.compile()
+    for batch_size in [1, 3, 17]:
+        a = hidet.randn([batch_size, 20], device='cpu')
+        b_np = np.exp(np.maximum(a.numpy() @ w.numpy(), 0.0) + 1.0)
+        b_np = b_np / b_np.sum(axis=1, keepdims=True)
+        np.testing.assert_allclose(actual=compiled_graph(a).numpy(), desired=b_np, atol=1e-5, rtol=1e-5)
+    # all batch sizes are served by the same kernels
+    assert all(len(node.task.symbols) == 1 for node in graph.nodes)
+    with pytest.raises(ValueError):
+        compiled_graph(hidet.randn([3, 21], device='cpu'))
@@ -0,0 +1,54 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import pytest
+import hidet
+from hidet.graph import ops
+
+
+@pytest.mark.parametrize(
+    'func, np_func, is_view',
+    [
+        (lambda x: ops.reshape(x, [6, 20]), lambda x: x.reshape(6, 20), True),
+        (lambda x: ops.unsqueeze(x, [0, 2]), lambda x: x.reshape(1, 4, 1, 5, 6), True),
+        (lambda x: ops.flatten(x, start_dim=1), lambda x: x.reshape(4, 30), True),
+        (lambda x: x[2], lambda x: x[2], True),
+        (lambda x: x[1:3], lambda x: x[1:3], True),
+        (lambda x: x[2, 1:4], lambda x: x[2, 1:4], True),
+        (lambda x: x[:, 1:3], lambda x: x[:, 1:3], False),
+        (lambda x: x[1, 2:3, ::2], lambda x: x[1, 2:3, ::2], False),
+    ],
+)
+def test_eager_view(func, np_func, is_view):
+    x = hidet.randn([4, 5, 6])
+    y = func(x)
+    np.testing.assert_allclose(y.numpy(), np_func(x.numpy()))
+    offset = y.storage.addr - x.storage.addr
+    assert (0 <= offset < x.storage.num_bytes) == is_view
+
+
+def test_compiled_graph_view():
+    x = hidet.symbol([4, 6])
+    a = x + 1.0
+    b = ops.reshape(a, [2, 12])[1]
+    graph = hidet.trace_from([b * 2.0, ops.reshape(a, [24])], [x])
+    compiled = graph.compile()
+    # the reshapes and the slice alias the memory of their inputs, instead of launching kernels
+    assert len([inst for inst in compiled.instructions if inst.packed_func is not None]) == 2
+
+    inputs = [hidet.randn([4, 6]) for _ in range(2)]
+    outputs = [compiled.run(t) for t in inputs]
+    for t, (y1, y2) in zip(inputs, outputs):
+        # the aliased output of the first run is not overwritten by the second run
+        expected = t.numpy().reshape(24) + 1.0
+        np.testing.assert_allclose(y2.numpy(), expected)
+        np.testing.assert_allclose(y1.numpy(), expected[12:] * 2.0)
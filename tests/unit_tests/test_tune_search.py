@@ -0,0 +1,49 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import math
+from hidet.graph.ops.schedules import tune
+
+
+@tune.space(1, 'block_m', [16, 32, 64, 128])
+@tune.space(1, 'block_n', [16, 32, 64, 128])
+@tune.space(1, 'mma, warps', [['simt', 4], ['mma', 8]])
+def template(block_m, block_n, mma, warps):
+    return block_m, block_n, mma, warps
+
+
+def latency(kwargs):
+    return 1000.0 / (kwargs['block_m'] * kwargs['block_n']) + (0.5 if kwargs['mma'] == 'simt' else 0.0)
+
+
+def test_sample_space():
+    tuning_space: tune.TuningSpace = getattr(template, '_tuning_space')
+    assert tuning_space.space_size(1) == 32
+    all_kwargs = list(tuning_space.iterate_space(1))
+    samples = tuning_space.sample_space(1, num_samples=10)
+    assert len(samples) == 10 and all(kwargs in all_kwargs for kwargs in samples)
+    assert len(set(tuple(kwargs.items()) for kwargs in samples)) == 10
+    assert tuning_space.sample_space(1, num_samples=100) == all_kwargs
+
+
+def test_cost_model():
+    all_kwargs = list(getattr(template, '_tuning_space').iterate_space(1))
+    model = tune.CostModel(all_kwargs, estimator=None)
+    measured = all_kwargs[::3]
+    model.fit(measured, [latency(kwargs) for kwargs in measured])
+    predictions = model.predict(all_kwargs)
+    best = min(range(len(all_kwargs)), key=lambda i: predictions[i])
+    assert all_kwargs[best] == {'block_m': 128, 'block_n': 128, 'mma': 'mma', 'warps': 8}
+
+    # before any measurement, the schedules are ranked by the analytical cost
+    model = tune.CostModel(all_kwargs, estimator=latency)
+    predictions = model.predict(all_kwargs)
+    assert all(math.isclose(p, math.log(latency(kwargs))) for p, kwargs in zip(predictions, all_kwargs))
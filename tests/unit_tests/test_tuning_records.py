@@ -0,0 +1,51 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from hidet.ir.compute import tensor_input
+from hidet.graph.ops.definitions.matmul import BatchMatmulTask
+from hidet.graph.ops.schedules.tuning_records import TuningRecords
+
+
+def matmul_task(m: int, n: int, k: int) -> BatchMatmulTask:
+    a = tensor_input('a', 'float32', [1, m, k])
+    b = tensor_input('b', 'float32', [1, k, n])
+    return BatchMatmulTask(a, b)
+
+
+def template(block_m=64, block_n=64):
+    return block_m, block_n
+
+
+def test_tuning_records(tmp_path):
+    records = TuningRecords(str(tmp_path / 'a'))
+    assert records.lookup(matmul_task(128, 128, 128), template, 'cpu') is None
+    records.add(matmul_task(128, 128, 128), template, 'cpu', {'block_m': 32, 'block_n': 32}, latency=2.0)
+    records.add(matmul_task(1024, 1024, 1024), template, 'cpu', {'block_m': 128, 'block_n': 128}, latency=9.0)
+
+    # the faster schedule is kept
+    records.add(matmul_task(128, 128, 128), template, 'cpu', {'block_m': 64, 'block_n': 32}, latency=1.0)
+    records.add(matmul_task(128, 128, 128), template, 'cpu', {'block_m': 16, 'block_n': 16}, latency=3.0)
+    assert records.lookup(matmul_task(128, 128, 128), template, 'cpu') == {'block_m': 64, 'block_n': 32}
+    assert records.lookup(matmul_task(128, 128, 128), template, 'cuda') is None
+
+    # the schedules of the nearest shapes seed the unseen shapes
+    assert records.nearest(matmul_task(768, 1024, 512), template, 'cpu') == [
+        {'block_m': 128, 'block_n': 128},
+        {'block_m': 64, 'block_n': 32},
+    ]
+
+    # the records can be shipped to another cache
+    path = str(tmp_path / 'records.jsonl')
+    assert records.export_records(path) == 2
+    imported = TuningRecords(str(tmp_path / 'b'))
+    assert imported.import_records(path) == 2
+    assert imported.num_records() == 2
+    assert imported.lookup(matmul_task(1024, 1024, 1024), template, 'cpu') == {'block_m': 128, 'block_n': 128}